@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Security
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from datetime import timedelta, datetime
 from typing import Any, Dict, List
 
-from app.core.db import supabase
+from app.core.db import supabase, db
 from app.core.security import (
     create_access_token, 
     create_refresh_token, 
@@ -61,7 +62,7 @@ async def register(user_in: UserCreate) -> Any:
     Register a new user.
     """
     # Check if user already exists
-    user_data = supabase.table("users").select("*").eq("email", user_in.email).execute()
+    user_data = await db.table("users").select("*").eq("email", user_in.email).execute()
     if user_data.data:
         raise create_auth_error(
             status_code=status.HTTP_409_CONFLICT,
@@ -80,7 +81,7 @@ async def register(user_in: UserCreate) -> Any:
     
     # Create user in Supabase Auth
     try:
-        auth_user = supabase.auth.sign_up({
+        auth_user = await run_in_threadpool(supabase.auth.sign_up, {
             "email": user_in.email,
             "password": user_in.password
         })
@@ -96,7 +97,7 @@ async def register(user_in: UserCreate) -> Any:
             "phone": user_in.phone
         }
         
-        response = supabase.table("users").insert(user_data).execute()
+        response = await db.table("users").insert(user_data).execute()
         
         if not response.data:
             # If users table insertion fails, we should handle this case (could clean up auth user)
@@ -153,7 +154,7 @@ async def login(login_data: LoginRequest) -> Any:
     """
     try:
         # First check if user exists in our database
-        user_check = supabase.table("users").select("*").eq("email", login_data.email).execute()
+        user_check = await db.table("users").select("*").eq("email", login_data.email).execute()
         if not user_check.data:
             raise create_auth_error(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -164,7 +165,7 @@ async def login(login_data: LoginRequest) -> Any:
 
         # Attempt to authenticate with Supabase
         try:
-            auth_response = supabase.auth.sign_in_with_password({
+            auth_response = await run_in_threadpool(supabase.auth.sign_in_with_password, {
                 "email": login_data.email,
                 "password": login_data.password
             })
@@ -202,7 +203,7 @@ async def login(login_data: LoginRequest) -> Any:
         user_id = auth_response.user.id
         
         # Get user from database to check role
-        user_data = supabase.table("users").select("*").eq("id", user_id).execute()
+        user_data = await db.table("users").select("*").eq("id", user_id).execute()
         
         if not user_data.data:
             raise create_auth_error(
@@ -280,12 +281,12 @@ async def forgot_password(email: str) -> Any:
     """
     try:
         # Check if user exists first
-        user_check = supabase.table("users").select("id").eq("email", email).execute()
+        user_check = await db.table("users").select("id").eq("email", email).execute()
         if not user_check.data:
             # For security reasons, still return success even if email doesn't exist
             return {"message": "If your email is registered, you will receive a password reset link shortly."}
             
-        supabase.auth.reset_password_email(email)
+        await run_in_threadpool(supabase.auth.reset_password_email, email)
         return {"message": "If your email is registered, you will receive a password reset link shortly."}
     except Exception as e:
         raise create_auth_error(
@@ -309,7 +310,8 @@ async def reset_password(new_password: str, token: str) -> Any:
                 error_type="invalid_password"
             )
             
-        supabase.auth.update_user(
+        await run_in_threadpool(
+            supabase.auth.update_user,
             {
                 "password": new_password
             }
@@ -343,7 +345,7 @@ async def get_current_user_info(current_user = Depends(get_current_active_user))
     """
     Get current user info.
     """
-    user_data = supabase.table("users").select("*").eq("id", current_user.user_id).execute()
+    user_data = await db.table("users").select("*").eq("id", current_user.user_id).execute()
     
     if not user_data.data:
         raise create_auth_error(
@@ -372,7 +374,7 @@ async def update_current_user_info(
             error_type="no_update_data"
         )
     
-    response = supabase.table("users").update(update_data).eq("id", current_user.user_id).execute()
+    response = await db.table("users").update(update_data).eq("id", current_user.user_id).execute()
     
     if not response.data:
         raise create_auth_error(
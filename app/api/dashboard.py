@@ -1,13 +1,143 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import Any, Dict, List, Optional
-from datetime import datetime, date, time, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from datetime import datetime, date, timedelta
+import json
 
-from app.core.db import supabase
+from app.core.cache import RevalidatingCache
+from app.core.config import settings
+from app.core.db import db, fan_out
+from app.core.paging import iter_pages
+from app.core.query_memo import bypass_query_memo
 from app.core.security import get_current_active_user
-from app.schemas.dashboard import DashboardOverview, DashboardStats, VehiclePerformance, DriverPerformance, TimeSeriesData, CollectionTrend, DetailedVehiclePerformance, VehiclePerformanceList, DetailedDriverPerformance, DriverPerformanceList, PerformanceSummary
+from app.services import overview, reference
+from app.services.comparison import compare_metrics
+from app.services.expiry import vehicle_expiry
+from app.services.live import LiveFeedFull, Subscription, live_dashboard
+from app.services.rollups import RangeTotals, trip_rollups
+from app.services.trip_records import decode_trips
+from app.schemas.dashboard import DashboardOverview, DashboardStats, VehiclePerformance, DriverPerformance, TimeSeriesData, CollectionTrend, DetailedVehiclePerformance, DetailedVehiclePerformanceBatch, VehiclePerformanceList, DetailedDriverPerformance, DetailedDriverPerformanceBatch, DriverPerformanceList, PerformanceSummary
 
 router = APIRouter()
 
+# Results of the costlier dashboard endpoints, shared by every user. A write to
+# the trips (see trip_rollups.version) marks them stale, like their age does.
+dashboard_cache = RevalidatingCache(
+    "dashboard",
+    settings.DASHBOARD_CACHE_MAX_ENTRIES,
+    settings.DASHBOARD_CACHE_FRESH,
+    settings.DASHBOARD_CACHE_STALE
+)
+
+async def cached_result(key, compute):
+    """Result of `compute()` from the dashboard cache, recomputed by one task at a time"""
+    async def run():
+        # Shared by concurrent requests, so it must not read through one request's query memo
+        with bypass_query_memo():
+            return await compute()
+    return await dashboard_cache.get(key, run, version=trip_rollups.version)
+
+# Metrics compared per vehicle and per driver when a baseline period is given
+VEHICLE_COMPARED_FIELDS = ["total_collections", "total_expenses", "net_profit", "trip_count", "profit_per_trip", "utilization_rate"]
+DRIVER_COMPARED_FIELDS = ["total_collections", "trip_count", "avg_per_trip", "collection_efficiency"]
+
+def parse_baseline(baseline_start_date: Optional[str], baseline_end_date: Optional[str]) -> Optional[Tuple[date, date]]:
+    """The baseline period of a comparison, or None when none was requested"""
+    if not baseline_start_date and not baseline_end_date:
+        return None
+    if not baseline_start_date or not baseline_end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give both baseline_start_date and baseline_end_date to compare periods."
+        )
+    try:
+        baseline = (
+            datetime.strptime(baseline_start_date, "%Y-%m-%d").date(),
+            datetime.strptime(baseline_end_date, "%Y-%m-%d").date()
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid baseline date format. Use YYYY-MM-DD."
+        )
+    if baseline[1] < baseline[0]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Baseline end date must be after baseline start date"
+        )
+    return baseline
+
+def parse_period(start_date: Optional[str], end_date: Optional[str]) -> Tuple[date, date]:
+    """The requested date range, the last 30 days by default"""
+    today = date.today()
+    try:
+        parsed_start_date = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else today - timedelta(days=29)
+        parsed_end_date = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else today
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date format. Use YYYY-MM-DD."
+        )
+    if parsed_end_date < parsed_start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End date must be after start date"
+        )
+    return parsed_start_date, parsed_end_date
+
+def parse_batch_ids(ids: List[str]) -> List[str]:
+    """The IDs of a batch request, without duplicates, at most API_PAGE_SIZE_MAX of them"""
+    unique_ids = list(dict.fromkeys(ids))
+    if len(unique_ids) > settings.API_PAGE_SIZE_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.API_PAGE_SIZE_MAX} IDs per request"
+        )
+    return unique_ids
+
+async def vehicle_registrations(cells) -> Dict[str, str]:
+    """Registration of every vehicle in the rollup cells, by vehicle ID"""
+    vehicle_ids = {cell.vehicle_id for cell in cells if cell.vehicle_id}
+    if not vehicle_ids:
+        return {}
+    return {
+        vehicle["id"]: vehicle.get("reg_no", "Unknown")
+        for vehicle in (await reference.vehicles.get_many(vehicle_ids)).values()
+    }
+
+def add_comparison(current, baseline, items_key, id_key, item_fields, total_fields):
+    """Attach the baseline period and the changes from it to a performance list and each of its items"""
+    baseline_items = {item[id_key]: item for item in baseline[items_key]}
+    for item in current[items_key]:
+        item["comparison"] = compare_metrics(item, baseline_items.get(item[id_key]), item_fields)
+    current["comparison"] = compare_metrics(current, baseline, total_fields)
+    current["baseline_start_date"] = baseline["start_date"]
+    current["baseline_end_date"] = baseline["end_date"]
+    return current
+
+async def compute_financial_overview(today: date) -> Dict[str, Any]:
+    """Every dashboard finance card, from one scan of the last 30 days of trips"""
+    aggregator = overview.FinancialOverview(today)
+
+    async def scan_trips():
+        # One paged scan over the widest window (last 30 days) feeds every trip-based card
+        columns = await overview.TRIP_COLUMNS.resolve()
+        scan_start = overview.overview_scan_start(today).isoformat()
+        async for page in iter_pages(
+            lambda: db.table("trips").select(columns).gte("collection_time", scan_start)
+        ):
+            for trip in decode_trips(page, overview.TRIP_COLUMNS):
+                aggregator.add(trip)
+
+    # Counts come from the (cached) vehicles table and renewals from the expiry index, read during the scan
+    _, vehicles, expiring = await fan_out(
+        scan_trips(),
+        reference.vehicles.all(),
+        vehicle_expiry.expiring_within(overview.RENEWAL_WINDOW_DAYS, today)
+    )
+
+    return aggregator.result(vehicles, expiring)
+
 @router.get("/overview/finances", response_model=DashboardOverview)
 async def get_financial_overview(current_user = Depends(get_current_active_user)) -> Any:
     """
@@ -22,161 +152,8 @@ async def get_financial_overview(current_user = Depends(get_current_active_user)
     - Average collection compared to previous week
     """
     try:
-        # Get today's date for filtering
         today = date.today()
-        today_str = today.isoformat()
-        yesterday = today - timedelta(days=1)
-        yesterday_str = yesterday.isoformat()
-        week_ago = today - timedelta(days=7)
-        
-        # 1. Calculate Total Revenue Today
-        # Sum collected_amount from trips with collection_time today
-        today_trips = supabase.table("trips").select("collected_amount").gte("collection_time", f"{today_str}T00:00:00").lt("collection_time", f"{today_str}T23:59:59").execute()
-        
-        # Calculate total revenue from today's trips
-        total_revenue_today = 0
-        for trip in today_trips.data:
-            total_revenue_today += float(trip.get("collected_amount", 0) or 0)
-        
-        # 2. Count Active Vehicles
-        active_vehicles_response = supabase.table("vehicles").select("id").eq("status", "active").execute()
-        active_vehicles_count = len(active_vehicles_response.data)
-        
-        # 2.1 Count Total Vehicles (all vehicles regardless of status)
-        total_vehicles_response = supabase.table("vehicles").select("id").execute()
-        total_vehicles_count = len(total_vehicles_response.data)
-        
-        # 3. Upcoming Renewals - Calculate based on expiry dates
-        # Get vehicles with any license expiring within the next 10 days
-        expiry_threshold = (today + timedelta(days=10)).isoformat()
-        
-        # Query vehicles with any expiry date within the threshold
-        upcoming_renewal_vehicles = supabase.table("vehicles").select("id,reg_no,insurance_expiry,tlb_expiry,inspection_expiry,speed_governor_expiry").or_(
-            f"insurance_expiry.gte.{today_str},insurance_expiry.lte.{expiry_threshold}," +
-            f"tlb_expiry.gte.{today_str},tlb_expiry.lte.{expiry_threshold}," +
-            f"inspection_expiry.gte.{today_str},inspection_expiry.lte.{expiry_threshold}," +
-            f"speed_governor_expiry.gte.{today_str},speed_governor_expiry.lte.{expiry_threshold}"
-        ).execute()
-        
-        # Count vehicles with upcoming renewals
-        upcoming_renewals = len(upcoming_renewal_vehicles.data)
-        
-        # Prepare detailed renewals information
-        renewals = []
-        for vehicle in upcoming_renewal_vehicles.data:
-            expiring_licenses = []
-            
-            # Check each expiry type
-            if vehicle.get("insurance_expiry") and today <= datetime.fromisoformat(vehicle["insurance_expiry"].replace('Z', '+00:00')).date() <= (today + timedelta(days=10)):
-                days_left = (datetime.fromisoformat(vehicle["insurance_expiry"].replace('Z', '+00:00')).date() - today).days
-                expiring_licenses.append({"license": "Insurance", "days_left": days_left})
-                
-            if vehicle.get("tlb_expiry") and today <= datetime.fromisoformat(vehicle["tlb_expiry"].replace('Z', '+00:00')).date() <= (today + timedelta(days=10)):
-                days_left = (datetime.fromisoformat(vehicle["tlb_expiry"].replace('Z', '+00:00')).date() - today).days
-                expiring_licenses.append({"license": "TLB", "days_left": days_left})
-                
-            if vehicle.get("inspection_expiry") and today <= datetime.fromisoformat(vehicle["inspection_expiry"].replace('Z', '+00:00')).date() <= (today + timedelta(days=10)):
-                days_left = (datetime.fromisoformat(vehicle["inspection_expiry"].replace('Z', '+00:00')).date() - today).days
-                expiring_licenses.append({"license": "Inspection", "days_left": days_left})
-                
-            if vehicle.get("speed_governor_expiry") and today <= datetime.fromisoformat(vehicle["speed_governor_expiry"].replace('Z', '+00:00')).date() <= (today + timedelta(days=10)):
-                days_left = (datetime.fromisoformat(vehicle["speed_governor_expiry"].replace('Z', '+00:00')).date() - today).days
-                expiring_licenses.append({"license": "Speed Governor", "days_left": days_left})
-            
-            if expiring_licenses:
-                renewals.append({
-                    "vehicle_name": vehicle.get("reg_no", f"Vehicle {vehicle.get('id')}"),
-                    "expiring_licenses": expiring_licenses
-                })
-        
-        # 4. Average Collection Per Vehicle
-        # First, get all active vehicles
-        all_vehicles = supabase.table("vehicles").select("id").execute()
-        
-        # Then, get all trips from the last 30 days to calculate average
-        thirty_days_ago = (today - timedelta(days=30)).isoformat()
-        recent_trips = supabase.table("trips").select("vehicle_id,collected_amount").gte("collection_time", f"{thirty_days_ago}T00:00:00").execute()
-        
-        # Calculate total collections per vehicle
-        vehicle_collections = {}
-        for trip in recent_trips.data:
-            vehicle_id = trip.get("vehicle_id")
-            if vehicle_id:
-                if vehicle_id not in vehicle_collections:
-                    vehicle_collections[vehicle_id] = 0
-                vehicle_collections[vehicle_id] += float(trip.get("collected_amount", 0) or 0)
-        
-        # Calculate average
-        if all_vehicles.data and len(all_vehicles.data) > 0:
-            total_collections = sum(vehicle_collections.values())
-            avg_collection_per_vehicle = total_collections / len(all_vehicles.data)
-        else:
-            avg_collection_per_vehicle = 0
-        
-        # 5. Revenue comparison between today and yesterday
-        yesterday_trips = supabase.table("trips").select("collected_amount").gte("collection_time", f"{yesterday_str}T00:00:00").lt("collection_time", f"{yesterday_str}T23:59:59").execute()
-        
-        # Calculate yesterday's revenue
-        total_revenue_yesterday = 0
-        for trip in yesterday_trips.data:
-            total_revenue_yesterday += float(trip.get("collected_amount", 0) or 0)
-        
-        # Calculate percentage change
-        if total_revenue_yesterday > 0:
-            revenue_comparison = ((total_revenue_today - total_revenue_yesterday) / total_revenue_yesterday) * 100
-        else:
-            revenue_comparison = 100 if total_revenue_today > 0 else 0
-        
-        # 6. Calculate vehicle utilization
-        # Get all trips that were active today by looking at collection_time and status
-        all_active_trips_today = supabase.table("trips").select("vehicle_id").gte("collection_time", f"{today_str}T00:00:00").lt("collection_time", f"{today_str}T23:59:59").execute()
-        
-        # Count unique vehicles that had trips today
-        active_vehicles_today = set()
-        for trip in all_active_trips_today.data:
-            if trip.get("vehicle_id"):
-                active_vehicles_today.add(trip.get("vehicle_id"))
-        
-        # Calculate utilization percentage
-        if active_vehicles_count > 0:
-            vehicle_utilization = (len(active_vehicles_today) / active_vehicles_count) * 100
-        else:
-            vehicle_utilization = 0
-        
-        # 7. Average collection compared to previous week
-        prev_week_start = week_ago - timedelta(days=7)
-        prev_week_trips = supabase.table("trips").select("vehicle_id,collected_amount").gte("collection_time", f"{prev_week_start.isoformat()}T00:00:00").lt("collection_time", f"{week_ago.isoformat()}T00:00:00").execute()
-        
-        # Calculate previous week's average
-        prev_week_collections = {}
-        for trip in prev_week_trips.data:
-            vehicle_id = trip.get("vehicle_id")
-            if vehicle_id:
-                if vehicle_id not in prev_week_collections:
-                    prev_week_collections[vehicle_id] = 0
-                prev_week_collections[vehicle_id] += float(trip.get("collected_amount", 0) or 0)
-        
-        if prev_week_collections and len(all_vehicles.data) > 0:
-            prev_week_avg = sum(prev_week_collections.values()) / len(all_vehicles.data)
-            if prev_week_avg > 0:
-                avg_collection_comparison = ((avg_collection_per_vehicle - prev_week_avg) / prev_week_avg) * 100
-            else:
-                avg_collection_comparison = 100 if avg_collection_per_vehicle > 0 else 0
-        else:
-            avg_collection_comparison = 0
-        
-        # Return the overview data
-        return {
-            "total_revenue_today": total_revenue_today,
-            "active_vehicles_count": active_vehicles_count,
-            "total_vehicles_count": total_vehicles_count,
-            "upcoming_renewals": len(renewals),
-            "renewals": renewals,
-            "avg_collection_per_vehicle": avg_collection_per_vehicle,
-            "revenue_comparison": revenue_comparison,
-            "vehicle_utilization": vehicle_utilization,
-            "avg_collection_comparison": avg_collection_comparison
-        }
+        return await cached_result(("overview", today), lambda: compute_financial_overview(today))
         
     except Exception as e:
         raise HTTPException(
@@ -184,6 +161,99 @@ async def get_financial_overview(current_user = Depends(get_current_active_user)
             detail=f"Error fetching financial overview: {str(e)}"
         )
 
+async def compute_dashboard_stats(days: int, today: date) -> Dict[str, Any]:
+    """Dashboard statistics for the last `days` days, from the trip rollups"""
+    start_date = today - timedelta(days=days)
+    
+    # The financial overview, the totals and the daily series are independent
+    financial, vehicle_totals, driver_totals, daily_totals = await fan_out(
+        cached_result(("overview", today), lambda: compute_financial_overview(today)),
+        trip_rollups.totals_by("vehicle", start=start_date),
+        trip_rollups.totals_by("driver", start=start_date),
+        trip_rollups.daily(start_date)
+    )
+    
+    # Process vehicle performance from the day index totals since the start date
+    top_vehicles = []
+    for vehicle_id, totals in vehicle_totals.items():
+        total_expenses = totals.fuel_expense + totals.repair_expense
+        top_vehicles.append({
+            "vehicle_id": vehicle_id,
+            "total_collections": totals.collected_amount,
+            "total_expenses": total_expenses,
+            "trip_count": totals.trip_count,
+            "net_profit": totals.collected_amount - total_expenses,
+            "registration": "Unknown"
+        })
+    
+    # Sort by net profit and get top 5
+    top_vehicles.sort(key=lambda x: x["net_profit"], reverse=True)
+    top_vehicles = top_vehicles[:5]
+    
+    # Process driver performance
+    top_drivers = []
+    for driver_id, totals in driver_totals.items():
+        top_drivers.append({
+            "driver_id": driver_id,
+            "total_collections": totals.collected_amount,
+            "trip_count": totals.trip_count,
+            "avg_per_trip": totals.collected_amount / totals.trip_count if totals.trip_count > 0 else 0,
+            "name": "Unknown"
+        })
+    
+    # Sort by total collections and get top 5
+    top_drivers.sort(key=lambda x: x["total_collections"], reverse=True)
+    top_drivers = top_drivers[:5]
+    
+    # Registrations and names are only needed for the top rows; both (cached) lookups run at once
+    vehicles, drivers = await fan_out(
+        reference.vehicles.get_many(m["vehicle_id"] for m in top_vehicles),
+        reference.drivers.get_many(m["driver_id"] for m in top_drivers)
+    )
+    for metrics in top_vehicles:
+        metrics["registration"] = vehicles.get(metrics["vehicle_id"], {}).get("reg_no", "Unknown")
+    for metrics in top_drivers:
+        metrics["name"] = drivers.get(metrics["driver_id"], {}).get("name", "Unknown")
+    
+    # Process time series data (days with trips only)
+    day_metrics: Dict[str, Dict[str, float]] = {}
+    for day, totals in daily_totals:
+        if not totals.trip_count:
+            continue
+        
+        day_metrics[day.isoformat()] = {
+            "revenue": totals.collected_amount,
+            "expenses": totals.fuel_expense + totals.repair_expense
+        }
+    
+    # Prepare time series data
+    revenue_by_day = []
+    expenses_by_day = []
+    profit_by_day = []
+    
+    # Sort days
+    sorted_days = sorted(day_metrics.keys())
+    
+    for day in sorted_days:
+        metrics = day_metrics[day]
+        revenue = metrics["revenue"]
+        expenses = metrics["expenses"]
+        profit = revenue - expenses
+        
+        revenue_by_day.append({"label": day, "value": revenue})
+        expenses_by_day.append({"label": day, "value": expenses})
+        profit_by_day.append({"label": day, "value": profit})
+    
+    # Return all dashboard stats
+    return {
+        "overview": financial,
+        "top_vehicles": top_vehicles,
+        "top_drivers": top_drivers,
+        "revenue_by_day": revenue_by_day,
+        "expenses_by_day": expenses_by_day,
+        "profit_by_day": profit_by_day
+    }
+
 @router.get("/stats", response_model=DashboardStats)
 async def get_dashboard_stats(
     days: int = 30,
@@ -200,172 +270,8 @@ async def get_dashboard_stats(
     - days: Number of days to include in the statistics (default: 30)
     """
     try:
-        # Get date range
         today = date.today()
-        start_date = today - timedelta(days=days)
-        
-        # Get the financial overview first
-        overview = await get_financial_overview(current_user)
-        
-        # Get all trips in the date range
-        trips_response = supabase.table("trips").select("*").gte("collection_time", start_date.isoformat()).execute()
-        trips = trips_response.data
-        
-        # Process vehicle performance
-        vehicle_metrics: Dict[str, Dict] = {}
-        for trip in trips:
-            vehicle_id = trip.get("vehicle_id")
-            if not vehicle_id:
-                continue
-                
-            if vehicle_id not in vehicle_metrics:
-                vehicle_metrics[vehicle_id] = {
-                    "vehicle_id": vehicle_id,
-                    "total_collections": 0,
-                    "total_expenses": 0,
-                    "trip_count": 0
-                }
-            
-            # Add collections
-            collected = float(trip.get("collected_amount", 0) or 0)
-            vehicle_metrics[vehicle_id]["total_collections"] += collected
-            
-            # Add expenses
-            fuel_expense = float(trip.get("fuel_expense", 0) or 0)
-            repair_expense = float(trip.get("repair_expense", 0) or 0)
-            vehicle_metrics[vehicle_id]["total_expenses"] += (fuel_expense + repair_expense)
-            
-            # Count trip
-            vehicle_metrics[vehicle_id]["trip_count"] += 1
-        
-        # Get vehicle registration numbers
-        vehicle_ids = list(vehicle_metrics.keys())
-        if vehicle_ids:
-            vehicles_response = supabase.table("vehicles").select("id,registration").in_("id", vehicle_ids).execute()
-            
-            for vehicle in vehicles_response.data:
-                v_id = vehicle.get("id")
-                if v_id in vehicle_metrics:
-                    vehicle_metrics[v_id]["registration"] = vehicle.get("registration", "Unknown")
-        
-        # Calculate net profit and prepare top vehicles list
-        top_vehicles = []
-        for v_id, metrics in vehicle_metrics.items():
-            net_profit = metrics["total_collections"] - metrics["total_expenses"]
-            metrics["net_profit"] = net_profit
-            if "registration" not in metrics:
-                metrics["registration"] = "Unknown"
-                
-            top_vehicles.append(metrics)
-        
-        # Sort by net profit and get top 5
-        top_vehicles.sort(key=lambda x: x["net_profit"], reverse=True)
-        top_vehicles = top_vehicles[:5]
-        
-        # Process driver performance
-        driver_metrics: Dict[str, Dict] = {}
-        for trip in trips:
-            driver_id = trip.get("driver_id")
-            if not driver_id:
-                continue
-                
-            if driver_id not in driver_metrics:
-                driver_metrics[driver_id] = {
-                    "driver_id": driver_id,
-                    "total_collections": 0,
-                    "trip_count": 0
-                }
-            
-            # Add collections
-            collected = float(trip.get("collected_amount", 0) or 0)
-            driver_metrics[driver_id]["total_collections"] += collected
-            
-            # Count trip
-            driver_metrics[driver_id]["trip_count"] += 1
-        
-        # Get driver names
-        driver_ids = list(driver_metrics.keys())
-        if driver_ids:
-            drivers_response = supabase.table("drivers").select("id,name").in_("id", driver_ids).execute()
-            
-            for driver in drivers_response.data:
-                d_id = driver.get("id")
-                if d_id in driver_metrics:
-                    driver_metrics[d_id]["name"] = driver.get("name", "Unknown")
-        
-        # Calculate average per trip and prepare top drivers list
-        top_drivers = []
-        for d_id, metrics in driver_metrics.items():
-            if metrics["trip_count"] > 0:
-                metrics["avg_per_trip"] = metrics["total_collections"] / metrics["trip_count"]
-            else:
-                metrics["avg_per_trip"] = 0
-                
-            if "name" not in metrics:
-                metrics["name"] = "Unknown"
-                
-            top_drivers.append(metrics)
-        
-        # Sort by total collections and get top 5
-        top_drivers.sort(key=lambda x: x["total_collections"], reverse=True)
-        top_drivers = top_drivers[:5]
-        
-        # Process time series data
-        day_metrics: Dict[str, Dict[str, float]] = {}
-        for trip in trips:
-            # Get the date from start_time
-            start_time = trip.get("collection_time")
-            if not start_time:
-                continue
-                
-            # Convert to date
-            if isinstance(start_time, str):
-                trip_date = datetime.fromisoformat(start_time.replace('Z', '+00:00')).date().isoformat()
-            else:
-                trip_date = start_time.date().isoformat()
-                
-            if trip_date not in day_metrics:
-                day_metrics[trip_date] = {
-                    "revenue": 0,
-                    "expenses": 0
-                }
-            
-            # Add revenue
-            collected = float(trip.get("collected_amount", 0) or 0)
-            day_metrics[trip_date]["revenue"] += collected
-            
-            # Add expenses
-            fuel_expense = float(trip.get("fuel_expense", 0) or 0)
-            repair_expense = float(trip.get("repair_expense", 0) or 0)
-            day_metrics[trip_date]["expenses"] += (fuel_expense + repair_expense)
-        
-        # Prepare time series data
-        revenue_by_day = []
-        expenses_by_day = []
-        profit_by_day = []
-        
-        # Sort days
-        sorted_days = sorted(day_metrics.keys())
-        
-        for day in sorted_days:
-            metrics = day_metrics[day]
-            revenue = metrics["revenue"]
-            expenses = metrics["expenses"]
-            profit = revenue - expenses
-            
-            revenue_by_day.append({"label": day, "value": revenue})
-            expenses_by_day.append({"label": day, "value": expenses})
-            profit_by_day.append({"label": day, "value": profit})
-        
-        # Return all dashboard stats
-        return {
-            "overview": overview,
-            "top_vehicles": top_vehicles,
-            "top_drivers": top_drivers,
-            "revenue_by_day": revenue_by_day,
-            "expenses_by_day": expenses_by_day,
-            "profit_by_day": profit_by_day
-        }
+        return await cached_result(("stats", today, days), lambda: compute_dashboard_stats(days, today))
         
     except Exception as e:
         raise HTTPException(
@@ -373,6 +279,68 @@ async def get_dashboard_stats(
             detail=f"Error fetching dashboard statistics: {str(e)}"
         )
 
+def sse_event(event: str, data: Any) -> bytes:
+    """One server-sent event carrying `data` as JSON"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+
+async def live_events(request: Request, subscription: Subscription) -> AsyncIterator[bytes]:
+    """
+    Events of one live dashboard connection: the full cards first, then the
+    changed ones. The generator only reads the next cards once the previous
+    event was sent, so a slow client gets the latest values merged instead
+    of a growing queue.
+    """
+    try:
+        # Ask clients to reconnect after 5 seconds if the stream breaks
+        yield b"retry: 5000\n\n"
+        event = "snapshot"
+        while True:
+            cards = await subscription.next(settings.LIVE_KEEPALIVE)
+            if cards is None:
+                if await request.is_disconnected():
+                    break
+                # Picks up rollup rebuilds and the day rolling over
+                live_dashboard.check()
+                yield b": keep-alive\n\n"
+                continue
+            yield sse_event(event, cards)
+            event = "update"
+    finally:
+        live_dashboard.unsubscribe(subscription)
+
+@router.get("/live")
+async def stream_live_dashboard(
+    request: Request,
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Stream live dashboard cards as server-sent events:
+    - snapshot: today's revenue, utilization and top movers on connect
+    - update: the cards that changed after trips were created or updated
+    
+    The cards are computed once per burst of trip writes and shared by
+    every connection. Idle connections get a keep-alive comment every
+    LIVE_KEEPALIVE seconds.
+    """
+    try:
+        subscription = await live_dashboard.subscribe()
+    except LiveFeedFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error computing live dashboard: {str(e)}"
+        )
+    
+    return StreamingResponse(
+        live_events(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/trends/collections", response_model=CollectionTrend)
 async def get_collection_trends(
     start_date: Optional[str] = Query(None, description="Start date for trend data (DD-MM-YYYY)"),
@@ -454,32 +422,22 @@ async def get_collection_trends(
             "total_expense": 0
         } for date_str in date_range}
         
-        # Get trips in date range
-        trips_response = supabase.table("trips").select("*").gte("collection_time", f"{parsed_start_date.isoformat()}T00:00:00").lte("collection_time", f"{parsed_end_date.isoformat()}T23:59:59").execute()
-        
-        # Process trips data
-        for trip in trips_response.data:
-            # Extract date from start_time
-            if isinstance(trip.get("collection_time"), str):
-                trip_date = datetime.fromisoformat(trip.get("collection_time").replace('Z', '+00:00')).date().isoformat()
-            else:
-                trip_date = trip.get("collection_time").date().isoformat()
+        # Get the fleet's daily totals in the date range from the day index
+        for day, totals in await trip_rollups.daily(parsed_start_date, parsed_end_date):
+            trip_date = day.isoformat()
             
             # Skip if date is not in our range
-            if trip_date not in trend_data:
+            if trip_date not in trend_data or not totals.trip_count:
                 continue
             
             # Add collection amount
-            collected_amount = float(trip.get("collected_amount", 0) or 0)
-            trend_data[trip_date]["collection_amount"] += collected_amount
+            trend_data[trip_date]["collection_amount"] += totals.collected_amount
             
             # Add fuel expense
-            fuel_expense = float(trip.get("fuel_cost", 0) or 0)
-            trend_data[trip_date]["fuel_expense"] += fuel_expense
+            trend_data[trip_date]["fuel_expense"] += totals.fuel_cost
             
             # Add repair expense (using other_expenses as repair expense)
-            repair_expense = float(trip.get("other_expenses", 0) or 0)
-            trend_data[trip_date]["repair_expense"] += repair_expense
+            trend_data[trip_date]["repair_expense"] += totals.other_expenses
             
             # Calculate total expense
             trend_data[trip_date]["total_expense"] = trend_data[trip_date]["fuel_expense"] + trend_data[trip_date]["repair_expense"]
@@ -502,10 +460,80 @@ async def get_collection_trends(
             detail=f"Error fetching collection trends: {str(e)}"
         )
 
+def vehicle_performance_list(vehicles, range_totals, start_date, end_date):
+    """Vehicle performance list over start_date .. end_date from per-vehicle day index totals"""
+    # Process data for each vehicle
+    vehicle_metrics = {}
+    date_range = (end_date - start_date).days + 1
+    
+    for vehicle in vehicles:
+        vehicle_id = vehicle["id"]
+        totals = range_totals.get(vehicle_id) or RangeTotals()
+        vehicle_metrics[vehicle_id] = {
+            "vehicle_id": vehicle_id,
+            "registration": vehicle.get("reg_no", "Unknown"),
+            "total_collections": totals.collected_amount,
+            "total_expenses": totals.fuel_expense + totals.repair_expense,
+            "fuel_expense": totals.fuel_expense,
+            "repair_expense": totals.repair_expense,
+            "net_profit": 0,
+            "trip_count": totals.trip_count,
+            "active_days": totals.active_days,  # To calculate utilization
+        }
+    
+    # Calculate derived metrics
+    vehicles_list = []
+    total_collections = 0
+    total_profit = 0
+    
+    for vehicle_id, metrics in vehicle_metrics.items():
+        # Calculate net profit
+        metrics["net_profit"] = metrics["total_collections"] - metrics["total_expenses"]
+        
+        # Calculate profit per trip (if trips > 0)
+        metrics["profit_per_trip"] = (metrics["net_profit"] / metrics["trip_count"]) if metrics["trip_count"] > 0 else 0
+        
+        # Calculate collection per trip
+        metrics["collection_per_trip"] = (metrics["total_collections"] / metrics["trip_count"]) if metrics["trip_count"] > 0 else 0
+        
+        # Calculate expense ratio (expenses as % of collections)
+        metrics["expense_ratio"] = (metrics["total_expenses"] / metrics["total_collections"] * 100) if metrics["total_collections"] > 0 else 0
+        
+        # Calculate utilization rate
+        metrics["utilization_rate"] = (metrics["active_days"] / date_range * 100) if date_range > 0 else 0
+        
+        # Clean up and remove temporary fields
+        del metrics["active_days"]
+        
+        # Add to running totals
+        total_collections += metrics["total_collections"]
+        total_profit += metrics["net_profit"]
+        
+        # Add to list
+        vehicles_list.append(metrics)
+    
+    # Sort by net profit
+    vehicles_list.sort(key=lambda x: x["net_profit"], reverse=True)
+    
+    # Calculate average profit per vehicle
+    avg_profit_per_vehicle = total_profit / len(vehicles_list) if vehicles_list else 0
+    
+    return {
+        "vehicles": vehicles_list,
+        "total_vehicles": len(vehicles_list),
+        "total_collections": total_collections,
+        "total_profit": total_profit,
+        "average_profit_per_vehicle": avg_profit_per_vehicle,
+        "start_date": start_date,
+        "end_date": end_date
+    }
+
 @router.get("/performance/vehicles", response_model=VehiclePerformanceList)
 async def get_vehicle_performance(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    baseline_start_date: Optional[str] = Query(None, description="Start of the period to compare with (YYYY-MM-DD)"),
+    baseline_end_date: Optional[str] = Query(None, description="End of the period to compare with (YYYY-MM-DD)"),
     current_user = Depends(get_current_active_user)
 ) -> Any:
     """
@@ -517,6 +545,9 @@ async def get_vehicle_performance(
     - Fuel and repair expenses
     - Profit calculations
     - Efficiency metrics
+    
+    With baseline_start_date and baseline_end_date, every vehicle and the
+    fleet totals also carry a `comparison` with the baseline period.
     """
     try:
         # Parse date strings if provided
@@ -552,121 +583,174 @@ async def get_vehicle_performance(
                 detail="End date must be after start date"
             )
             
-        # Get all active vehicles
-        vehicles_response = supabase.table("vehicles").select("id,reg_no").execute()
-        
-        if not vehicles_response.data:
-            return {
-                "vehicles": [],
-                "total_vehicles": 0,
-                "total_collections": 0,
-                "total_profit": 0,
-                "average_profit_per_vehicle": 0,
-                "start_date": parsed_start_date,
-                "end_date": parsed_end_date
-            }
+        baseline = parse_baseline(baseline_start_date, baseline_end_date)
+        periods = [(parsed_start_date, parsed_end_date)] + ([baseline] if baseline else [])
+        
+        # Get all active vehicles and each vehicle's totals in both periods (one read of the day index) at once
+        vehicles, period_totals = await fan_out(
+            reference.vehicles.all(),
+            trip_rollups.period_totals_by("vehicle", periods)
+        )
         
-        # Get all trips in date range for these vehicles
-        trips_response = supabase.table("trips").select("*").gte("collection_time", parsed_start_date.isoformat()).lte("collection_time", parsed_end_date.isoformat()).execute()
-        
-        # Process data for each vehicle
-        vehicle_metrics = {}
-        date_range = (parsed_end_date - parsed_start_date).days + 1
-        
-        # Initialize vehicle metrics
-        for vehicle in vehicles_response.data:
-            vehicle_id = vehicle["id"]
-            vehicle_metrics[vehicle_id] = {
-                "vehicle_id": vehicle_id,
-                "registration": vehicle.get("reg_no", "Unknown"),
-                "total_collections": 0,
-                "total_expenses": 0,
+        result = vehicle_performance_list(vehicles, period_totals[0], parsed_start_date, parsed_end_date)
+        if baseline:
+            add_comparison(
+                result,
+                vehicle_performance_list(vehicles, period_totals[1], *baseline),
+                "vehicles",
+                "vehicle_id",
+                VEHICLE_COMPARED_FIELDS,
+                ["total_collections", "total_profit", "average_profit_per_vehicle"]
+            )
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching vehicle performance: {str(e)}"
+        )
+
+def vehicle_detail_performance(vehicle_id, vehicle, cells, start_date, end_date):
+    """Detailed performance of one vehicle over start_date .. end_date from its rollup cells in that range"""
+    # Initialize performance metrics
+    vehicle_detail = {
+        "vehicle_id": vehicle_id,
+        "registration": vehicle.get("reg_no", "Unknown"),
+        "total_collections": 0,
+        "total_expenses": 0,
+        "fuel_expense": 0,
+        "repair_expense": 0,
+        "net_profit": 0,
+        "trip_count": 0,
+        "collections_by_day": [],
+        "expenses_by_day": [],
+        "profit_by_day": [],
+        "trips_by_day": []
+    }
+    
+    # Process trip data and organize by day
+    daily_data = {}
+    date_range = (end_date - start_date).days + 1
+    active_days = set()
+    
+    for cell in cells:
+        # Extract values
+        collected_amount = cell.collected_amount
+        fuel_expense = cell.fuel_expense
+        repair_expense = cell.repair_expense
+        total_expense = fuel_expense + repair_expense
+        
+        trip_date_str = cell.day.isoformat()
+        active_days.add(trip_date_str)
+        
+        # Initialize daily data if needed
+        if trip_date_str not in daily_data:
+            daily_data[trip_date_str] = {
+                "collection": 0,
                 "fuel_expense": 0,
                 "repair_expense": 0,
-                "net_profit": 0,
-                "trip_count": 0,
-                "active_days": set(),  # To calculate utilization
-                "collections_by_date": {},  # For time series data
-                "expenses_by_date": {},  # For time series data
+                "total_expense": 0,
+                "trip_count": 0
             }
         
-        # Process trip data
-        for trip in trips_response.data:
-            vehicle_id = trip.get("vehicle_id")
-            if not vehicle_id or vehicle_id not in vehicle_metrics:
-                continue
-            
-            # Extract values
-            collected_amount = float(trip.get("collected_amount", 0) or 0)
-            fuel_expense = float(trip.get("fuel_expense", 0) or 0)
-            repair_expense = float(trip.get("repair_expense", 0) or 0)
-            total_expense = fuel_expense + repair_expense
-            
-            # Get trip date
-            if "collection_time" in trip and trip["collection_time"]:
-                trip_date_str = datetime.fromisoformat(trip["collection_time"].replace('Z', '+00:00')).date().isoformat()
-                vehicle_metrics[vehicle_id]["active_days"].add(trip_date_str)
-                
-                # Add to daily collections/expenses
-                if trip_date_str not in vehicle_metrics[vehicle_id]["collections_by_date"]:
-                    vehicle_metrics[vehicle_id]["collections_by_date"][trip_date_str] = 0
-                    vehicle_metrics[vehicle_id]["expenses_by_date"][trip_date_str] = 0
-                
-                vehicle_metrics[vehicle_id]["collections_by_date"][trip_date_str] += collected_amount
-                vehicle_metrics[vehicle_id]["expenses_by_date"][trip_date_str] += total_expense
-            
-            # Update aggregates
-            vehicle_metrics[vehicle_id]["total_collections"] += collected_amount
-            vehicle_metrics[vehicle_id]["fuel_expense"] += fuel_expense
-            vehicle_metrics[vehicle_id]["repair_expense"] += repair_expense
-            vehicle_metrics[vehicle_id]["total_expenses"] += total_expense
-            vehicle_metrics[vehicle_id]["trip_count"] += 1
-        
-        # Calculate derived metrics
-        vehicles_list = []
-        total_collections = 0
-        total_profit = 0
-        
-        for vehicle_id, metrics in vehicle_metrics.items():
-            # Calculate net profit
-            metrics["net_profit"] = metrics["total_collections"] - metrics["total_expenses"]
-            
-            # Calculate profit per trip (if trips > 0)
-            metrics["profit_per_trip"] = (metrics["net_profit"] / metrics["trip_count"]) if metrics["trip_count"] > 0 else 0
-            
-            # Calculate collection per trip
-            metrics["collection_per_trip"] = (metrics["total_collections"] / metrics["trip_count"]) if metrics["trip_count"] > 0 else 0
-            
-            # Calculate expense ratio (expenses as % of collections)
-            metrics["expense_ratio"] = (metrics["total_expenses"] / metrics["total_collections"] * 100) if metrics["total_collections"] > 0 else 0
-            
-            # Calculate utilization rate
-            metrics["utilization_rate"] = (len(metrics["active_days"]) / date_range * 100) if date_range > 0 else 0
-            
-            # Clean up and remove temporary fields
-            del metrics["active_days"]
-            del metrics["collections_by_date"]
-            del metrics["expenses_by_date"]
-            
-            # Add to running totals
-            total_collections += metrics["total_collections"]
-            total_profit += metrics["net_profit"]
-            
-            # Add to list
-            vehicles_list.append(metrics)
+        # Add to daily data
+        daily_data[trip_date_str]["collection"] += collected_amount
+        daily_data[trip_date_str]["fuel_expense"] += fuel_expense
+        daily_data[trip_date_str]["repair_expense"] += repair_expense
+        daily_data[trip_date_str]["total_expense"] += total_expense
+        daily_data[trip_date_str]["trip_count"] += cell.trip_count
+        
+        # Update aggregates
+        vehicle_detail["total_collections"] += collected_amount
+        vehicle_detail["fuel_expense"] += fuel_expense
+        vehicle_detail["repair_expense"] += repair_expense
+        vehicle_detail["total_expenses"] += (fuel_expense + repair_expense)
+        vehicle_detail["trip_count"] += cell.trip_count
+    
+    # Calculate net profit
+    vehicle_detail["net_profit"] = vehicle_detail["total_collections"] - vehicle_detail["total_expenses"]
+    
+    # Calculate derived metrics
+    if vehicle_detail["trip_count"] > 0:
+        vehicle_detail["profit_per_trip"] = vehicle_detail["net_profit"] / vehicle_detail["trip_count"]
+        vehicle_detail["collection_per_trip"] = vehicle_detail["total_collections"] / vehicle_detail["trip_count"]
+    
+    if vehicle_detail["total_collections"] > 0:
+        vehicle_detail["expense_ratio"] = (vehicle_detail["total_expenses"] / vehicle_detail["total_collections"]) * 100
+    
+    vehicle_detail["utilization_rate"] = (len(active_days) / date_range) * 100 if date_range > 0 else 0
+    
+    # Prepare time series data
+    # Sort dates
+    dates = sorted(daily_data.keys())
+    
+    for date_str in dates:
+        day_data = daily_data[date_str]
+        profit = day_data["collection"] - day_data["total_expense"]
+        
+        vehicle_detail["collections_by_day"].append({
+            "label": date_str,
+            "value": day_data["collection"]
+        })
+        
+        vehicle_detail["expenses_by_day"].append({
+            "label": date_str,
+            "value": day_data["total_expense"]
+        })
+        
+        vehicle_detail["profit_by_day"].append({
+            "label": date_str,
+            "value": profit
+        })
+        
+        vehicle_detail["trips_by_day"].append({
+            "label": date_str,
+            "value": day_data["trip_count"]
+        })
+    
+    return vehicle_detail
+
+@router.get("/performance/vehicles/batch", response_model=DetailedVehiclePerformanceBatch)
+async def get_vehicle_detail_performance_batch(
+    vehicle_ids: List[str] = Query(..., description="Vehicle IDs"),
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Get detailed performance metrics of several vehicles at once, by vehicle ID.
+    
+    Each entry is what /performance/vehicles/{vehicle_id} returns for that
+    vehicle, read with one vehicles lookup and one rollups read for the
+    whole batch. Unknown IDs are listed in `not_found`.
+    """
+    try:
+        parsed_start_date, parsed_end_date = parse_period(start_date, end_date)
+        vehicle_ids = parse_batch_ids(vehicle_ids)
         
-        # Sort by net profit
-        vehicles_list.sort(key=lambda x: x["net_profit"], reverse=True)
+        # Look up the vehicles and their daily rollups in the date range at once
+        vehicles, cells = await fan_out(
+            reference.vehicles.get_many(vehicle_ids),
+            trip_rollups.cells(start=parsed_start_date, end=parsed_end_date, vehicle_ids=vehicle_ids)
+        )
         
-        # Calculate average profit per vehicle
-        avg_profit_per_vehicle = total_profit / len(vehicles_list) if vehicles_list else 0
+        cells_by_vehicle = {}
+        for cell in cells:
+            cells_by_vehicle.setdefault(cell.vehicle_id, []).append(cell)
         
         return {
-            "vehicles": vehicles_list,
-            "total_vehicles": len(vehicles_list),
-            "total_collections": total_collections,
-            "total_profit": total_profit,
-            "average_profit_per_vehicle": avg_profit_per_vehicle,
+            "vehicles": {
+                vehicle_id: vehicle_detail_performance(
+                    vehicle_id,
+                    vehicles[vehicle_id],
+                    cells_by_vehicle.get(vehicle_id, []),
+                    parsed_start_date,
+                    parsed_end_date
+                )
+                for vehicle_id in vehicle_ids if vehicle_id in vehicles
+            },
+            "not_found": [vehicle_id for vehicle_id in vehicle_ids if vehicle_id not in vehicles],
             "start_date": parsed_start_date,
             "end_date": parsed_end_date
         }
@@ -675,7 +759,7 @@ async def get_vehicle_performance(
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching vehicle performance: {str(e)}"
+            detail=f"Error fetching detailed vehicle performance: {str(e)}"
         )
 
 @router.get("/performance/vehicles/{vehicle_id}", response_model=DetailedVehiclePerformance)
@@ -715,130 +799,118 @@ async def get_vehicle_detail_performance(
                     detail="Invalid end_date format. Use YYYY-MM-DD."
                 )
         
-        # Check if vehicle exists
-        vehicle_response = supabase.table("vehicles").select("id,reg_no").eq("id", vehicle_id).execute()
+        # Look up the vehicle and its daily rollups in the date range at once
+        vehicle, cells = await fan_out(
+            reference.vehicles.get(vehicle_id),
+            trip_rollups.cells(start=parsed_start_date, end=parsed_end_date, vehicle_ids=[vehicle_id])
+        )
         
-        if not vehicle_response.data:
+        if not vehicle:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Vehicle not found"
             )
         
-        # Get all trips for this vehicle in date range
-        trips_response = supabase.table("trips").select("*").eq("vehicle_id", vehicle_id).gte("collection_time", parsed_start_date.isoformat()).lte("collection_time", parsed_end_date.isoformat()).execute()
-        
-        # Initialize performance metrics
-        vehicle_detail = {
-            "vehicle_id": vehicle_id,
-            "registration": vehicle_response.data[0].get("reg_no", "Unknown"),
+        return vehicle_detail_performance(vehicle_id, vehicle, cells, parsed_start_date, parsed_end_date)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching detailed vehicle performance: {str(e)}"
+        )
+
+def driver_performance_list(drivers, cells, vehicle_reg_map, start_date, end_date):
+    """Driver performance list over start_date .. end_date from the rollup cells of that range"""
+    # Process data for each driver
+    driver_metrics = {}
+    
+    # Initialize driver metrics
+    for driver in drivers:
+        driver_id = driver["id"]
+        driver_metrics[driver_id] = {
+            "driver_id": driver_id,
+            "name": driver.get("name", "Unknown"),
             "total_collections": 0,
-            "total_expenses": 0,
-            "fuel_expense": 0,
-            "repair_expense": 0,
-            "net_profit": 0,
             "trip_count": 0,
-            "collections_by_day": [],
-            "expenses_by_day": [],
-            "profit_by_day": [],
-            "trips_by_day": []
+            "total_expected": 0,  # For calculating efficiency
+            "vehicles": set(),    # Set of vehicles driven
+            "vehicle_trips": {}   # Count trips per vehicle to find most driven
         }
-        
-        # Process trip data and organize by day
-        daily_data = {}
-        date_range = (parsed_end_date - parsed_start_date).days + 1
-        active_days = set()
-        
-        for trip in trips_response.data:
-            # Extract values
-            collected_amount = float(trip.get("collected_amount", 0) or 0)
-            fuel_expense = float(trip.get("fuel_expense", 0) or 0)
-            repair_expense = float(trip.get("repair_expense", 0) or 0)
-            total_expense = fuel_expense + repair_expense
-            
-            # Get trip date
-            if "collection_time" in trip and trip["collection_time"]:
-                trip_date = datetime.fromisoformat(trip["collection_time"].replace('Z', '+00:00')).date()
-                trip_date_str = trip_date.isoformat()
-                active_days.add(trip_date_str)
-                
-                # Initialize daily data if needed
-                if trip_date_str not in daily_data:
-                    daily_data[trip_date_str] = {
-                        "collection": 0,
-                        "fuel_expense": 0,
-                        "repair_expense": 0,
-                        "total_expense": 0,
-                        "trip_count": 0
-                    }
-                
-                # Add to daily data
-                daily_data[trip_date_str]["collection"] += collected_amount
-                daily_data[trip_date_str]["fuel_expense"] += fuel_expense
-                daily_data[trip_date_str]["repair_expense"] += repair_expense
-                daily_data[trip_date_str]["total_expense"] += total_expense
-                daily_data[trip_date_str]["trip_count"] += 1
+    
+    # Process rollup data
+    for cell in cells:
+        driver_id = cell.driver_id
+        if not driver_id or driver_id not in driver_metrics:
+            continue
+        
+        vehicle_id = cell.vehicle_id
+        
+        # Update aggregates
+        driver_metrics[driver_id]["total_collections"] += cell.collected_amount
+        driver_metrics[driver_id]["total_expected"] += cell.expected_amount
+        driver_metrics[driver_id]["trip_count"] += cell.trip_count
+        
+        # Track vehicles driven
+        if vehicle_id:
+            driver_metrics[driver_id]["vehicles"].add(vehicle_id)
             
-            # Update aggregates
-            vehicle_detail["total_collections"] += collected_amount
-            vehicle_detail["fuel_expense"] += fuel_expense
-            vehicle_detail["repair_expense"] += repair_expense
-            vehicle_detail["total_expenses"] += (fuel_expense + repair_expense)
-            vehicle_detail["trip_count"] += 1
-        
-        # Calculate net profit
-        vehicle_detail["net_profit"] = vehicle_detail["total_collections"] - vehicle_detail["total_expenses"]
+            # Count trips per vehicle
+            if vehicle_id not in driver_metrics[driver_id]["vehicle_trips"]:
+                driver_metrics[driver_id]["vehicle_trips"][vehicle_id] = 0
+            driver_metrics[driver_id]["vehicle_trips"][vehicle_id] += cell.trip_count
+    
+    # Calculate derived metrics
+    drivers_list = []
+    total_collections = 0
+    
+    for driver_id, metrics in driver_metrics.items():
+        # Calculate average per trip
+        metrics["avg_per_trip"] = metrics["total_collections"] / metrics["trip_count"] if metrics["trip_count"] > 0 else 0
         
-        # Calculate derived metrics
-        if vehicle_detail["trip_count"] > 0:
-            vehicle_detail["profit_per_trip"] = vehicle_detail["net_profit"] / vehicle_detail["trip_count"]
-            vehicle_detail["collection_per_trip"] = vehicle_detail["total_collections"] / vehicle_detail["trip_count"]
+        # Calculate collection efficiency
+        metrics["collection_efficiency"] = (metrics["total_collections"] / metrics["total_expected"] * 100) if metrics["total_expected"] > 0 else 0
         
-        if vehicle_detail["total_collections"] > 0:
-            vehicle_detail["expense_ratio"] = (vehicle_detail["total_expenses"] / vehicle_detail["total_collections"]) * 100
+        # Set total vehicles driven
+        metrics["total_vehicles_driven"] = len(metrics["vehicles"])
         
-        vehicle_detail["utilization_rate"] = (len(active_days) / date_range) * 100 if date_range > 0 else 0
+        # Find most driven vehicle
+        if metrics["vehicle_trips"]:
+            most_driven_id = max(metrics["vehicle_trips"].items(), key=lambda x: x[1])[0]
+            metrics["most_driven_vehicle"] = vehicle_reg_map.get(most_driven_id, "Unknown")
         
-        # Prepare time series data
-        # Sort dates
-        dates = sorted(daily_data.keys())
+        # Clean up temporary fields
+        del metrics["vehicles"]
+        del metrics["vehicle_trips"]
+        del metrics["total_expected"]
         
-        for date_str in dates:
-            day_data = daily_data[date_str]
-            profit = day_data["collection"] - day_data["total_expense"]
-            
-            vehicle_detail["collections_by_day"].append({
-                "label": date_str,
-                "value": day_data["collection"]
-            })
-            
-            vehicle_detail["expenses_by_day"].append({
-                "label": date_str,
-                "value": day_data["total_expense"]
-            })
-            
-            vehicle_detail["profit_by_day"].append({
-                "label": date_str,
-                "value": profit
-            })
-            
-            vehicle_detail["trips_by_day"].append({
-                "label": date_str,
-                "value": day_data["trip_count"]
-            })
+        # Add to total collections
+        total_collections += metrics["total_collections"]
         
-        return vehicle_detail
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching detailed vehicle performance: {str(e)}"
-        )
+        # Add to list
+        drivers_list.append(metrics)
+    
+    # Sort by total collections
+    drivers_list.sort(key=lambda x: x["total_collections"], reverse=True)
+    
+    # Calculate average collections per driver
+    avg_collections_per_driver = total_collections / len(drivers_list) if drivers_list else 0
+    
+    return {
+        "drivers": drivers_list,
+        "total_drivers": len(drivers_list),
+        "total_collections": total_collections,
+        "average_collections_per_driver": avg_collections_per_driver,
+        "start_date": start_date,
+        "end_date": end_date
+    }
 
 @router.get("/performance/drivers", response_model=DriverPerformanceList)
 async def get_driver_performance(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    baseline_start_date: Optional[str] = Query(None, description="Start of the period to compare with (YYYY-MM-DD)"),
+    baseline_end_date: Optional[str] = Query(None, description="End of the period to compare with (YYYY-MM-DD)"),
     current_user = Depends(get_current_active_user)
 ) -> Any:
     """
@@ -850,6 +922,9 @@ async def get_driver_performance(
     - Average collections per trip
     - Collection efficiency
     - Vehicles driven
+    
+    With baseline_start_date and baseline_end_date, every driver and the
+    totals also carry a `comparison` with the baseline period.
     """
     try:
         # Parse date strings if provided
@@ -885,116 +960,217 @@ async def get_driver_performance(
                 detail="End date must be after start date"
             )
             
-        # Get all active drivers
-        drivers_response = supabase.table("drivers").select("id,name").execute()
-        
-        if not drivers_response.data:
-            return {
-                "drivers": [],
-                "total_drivers": 0,
-                "total_collections": 0,
-                "average_collections_per_driver": 0,
-                "start_date": parsed_start_date,
-                "end_date": parsed_end_date
-            }
-        
-        # Get all trips in date range
-        trips_response = supabase.table("trips").select("*").gte("collection_time", parsed_start_date.isoformat()).lte("collection_time", parsed_end_date.isoformat()).execute()
-        
-        # Process data for each driver
-        driver_metrics = {}
-        
-        # Initialize driver metrics
-        for driver in drivers_response.data:
-            driver_id = driver["id"]
-            driver_metrics[driver_id] = {
-                "driver_id": driver_id,
-                "name": driver.get("name", "Unknown"),
-                "total_collections": 0,
-                "trip_count": 0,
-                "total_expected": 0,  # For calculating efficiency
-                "vehicles": set(),    # Set of vehicles driven
-                "vehicle_trips": {}   # Count trips per vehicle to find most driven
-            }
+        baseline = parse_baseline(baseline_start_date, baseline_end_date)
+        periods = [(parsed_start_date, parsed_end_date)] + ([baseline] if baseline else [])
+        
+        # Get all active drivers and the daily rollups of both periods (one pass over their union) at once
+        drivers, cells = await fan_out(
+            reference.drivers.all(),
+            trip_rollups.cells(
+                start=min(start for start, _ in periods),
+                end=max(end for _, end in periods)
+            )
+        )
         
         # Get vehicle registrations for reference
         vehicle_ids = set()
-        for trip in trips_response.data:
-            if trip.get("vehicle_id"):
-                vehicle_ids.add(trip["vehicle_id"])
+        if drivers:
+            for cell in cells:
+                if cell.vehicle_id:
+                    vehicle_ids.add(cell.vehicle_id)
         
         vehicle_reg_map = {}
         if vehicle_ids:
-            vehicles_response = supabase.table("vehicles").select("id,reg_no").in_("id", list(vehicle_ids)).execute()
-            for vehicle in vehicles_response.data:
+            for vehicle in (await reference.vehicles.get_many(vehicle_ids)).values():
                 vehicle_reg_map[vehicle["id"]] = vehicle.get("reg_no", "Unknown")
         
-        # Process trip data
-        for trip in trips_response.data:
-            driver_id = trip.get("driver_id")
-            if not driver_id or driver_id not in driver_metrics:
-                continue
-            
-            # Extract values
-            collected_amount = float(trip.get("collected_amount", 0) or 0)
-            expected_amount = float(trip.get("expected_amount", 0) or 0)
-            vehicle_id = trip.get("vehicle_id")
-            
-            # Update aggregates
-            driver_metrics[driver_id]["total_collections"] += collected_amount
-            driver_metrics[driver_id]["total_expected"] += expected_amount
-            driver_metrics[driver_id]["trip_count"] += 1
-            
-            # Track vehicles driven
-            if vehicle_id:
-                driver_metrics[driver_id]["vehicles"].add(vehicle_id)
-                
-                # Count trips per vehicle
-                if vehicle_id not in driver_metrics[driver_id]["vehicle_trips"]:
-                    driver_metrics[driver_id]["vehicle_trips"][vehicle_id] = 0
-                driver_metrics[driver_id]["vehicle_trips"][vehicle_id] += 1
-        
-        # Calculate derived metrics
-        drivers_list = []
-        total_collections = 0
-        
-        for driver_id, metrics in driver_metrics.items():
-            # Calculate average per trip
-            metrics["avg_per_trip"] = metrics["total_collections"] / metrics["trip_count"] if metrics["trip_count"] > 0 else 0
-            
-            # Calculate collection efficiency
-            metrics["collection_efficiency"] = (metrics["total_collections"] / metrics["total_expected"] * 100) if metrics["total_expected"] > 0 else 0
-            
-            # Set total vehicles driven
-            metrics["total_vehicles_driven"] = len(metrics["vehicles"])
-            
-            # Find most driven vehicle
-            if metrics["vehicle_trips"]:
-                most_driven_id = max(metrics["vehicle_trips"].items(), key=lambda x: x[1])[0]
-                metrics["most_driven_vehicle"] = vehicle_reg_map.get(most_driven_id, "Unknown")
+        def period_cells(start, end):
+            return [cell for cell in cells if start <= cell.day <= end]
+        
+        result = driver_performance_list(
+            drivers,
+            period_cells(parsed_start_date, parsed_end_date),
+            vehicle_reg_map,
+            parsed_start_date,
+            parsed_end_date
+        )
+        if baseline:
+            add_comparison(
+                result,
+                driver_performance_list(drivers, period_cells(*baseline), vehicle_reg_map, *baseline),
+                "drivers",
+                "driver_id",
+                DRIVER_COMPARED_FIELDS,
+                ["total_collections", "average_collections_per_driver"]
+            )
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching driver performance: {str(e)}"
+        )
+
+def driver_detail_performance(driver_id, driver, cells, vehicle_reg_map):
+    """Detailed performance of one driver from their rollup cells in a date range"""
+    # Initialize performance metrics
+    driver_detail = {
+        "driver_id": driver_id,
+        "name": driver.get("name", "Unknown"),
+        "total_collections": 0,
+        "trip_count": 0,
+        "avg_per_trip": 0,
+        "collection_efficiency": 0,
+        "total_vehicles_driven": 0,
+        "most_driven_vehicle": None,
+        "collections_by_day": [],
+        "trips_by_day": [],
+        "vehicles_driven": []
+    }
+    
+    # Process trip data and organize by day
+    daily_data = {}
+    vehicle_data = {}
+    total_expected = 0
+    vehicles_driven = set()
+    vehicle_trips = {}
+    
+    for cell in cells:
+        # Extract values
+        collected_amount = cell.collected_amount
+        vehicle_id = cell.vehicle_id
+        trip_date_str = cell.day.isoformat()
+        
+        # Initialize daily data if needed
+        if trip_date_str not in daily_data:
+            daily_data[trip_date_str] = {
+                "collection": 0,
+                "trip_count": 0
+            }
+        
+        # Add to daily data
+        daily_data[trip_date_str]["collection"] += collected_amount
+        daily_data[trip_date_str]["trip_count"] += cell.trip_count
+        
+        # Track vehicle usage
+        if vehicle_id:
+            vehicles_driven.add(vehicle_id)
             
-            # Clean up temporary fields
-            del metrics["vehicles"]
-            del metrics["vehicle_trips"]
-            del metrics["total_expected"]
+            # Count trips per vehicle
+            if vehicle_id not in vehicle_trips:
+                vehicle_trips[vehicle_id] = 0
+            vehicle_trips[vehicle_id] += cell.trip_count
             
-            # Add to total collections
-            total_collections += metrics["total_collections"]
+            # Collect data per vehicle
+            if vehicle_id not in vehicle_data:
+                vehicle_data[vehicle_id] = {
+                    "vehicle_id": vehicle_id,
+                    "registration": "Unknown",
+                    "trip_count": 0,
+                    "total_collections": 0
+                }
             
-            # Add to list
-            drivers_list.append(metrics)
+            vehicle_data[vehicle_id]["trip_count"] += cell.trip_count
+            vehicle_data[vehicle_id]["total_collections"] += collected_amount
+        
+        # Update aggregates
+        driver_detail["total_collections"] += collected_amount
+        driver_detail["trip_count"] += cell.trip_count
+        total_expected += cell.expected_amount
+    
+    # Fill in vehicle registrations
+    for v_id, v_data in vehicle_data.items():
+        v_data["registration"] = vehicle_reg_map.get(v_id, "Unknown")
+    
+    # Find most driven vehicle
+    most_driven_vehicle = None
+    most_trips = 0
+    for v_id, trips in vehicle_trips.items():
+        if trips > most_trips:
+            most_trips = trips
+            most_driven_vehicle = v_id
+    
+    if most_driven_vehicle and most_driven_vehicle in vehicle_data:
+        driver_detail["most_driven_vehicle"] = vehicle_data[most_driven_vehicle]["registration"]
+    
+    # Calculate derived metrics
+    if driver_detail["trip_count"] > 0:
+        driver_detail["avg_per_trip"] = driver_detail["total_collections"] / driver_detail["trip_count"]
+    
+    if total_expected > 0:
+        driver_detail["collection_efficiency"] = (driver_detail["total_collections"] / total_expected) * 100
+    
+    driver_detail["total_vehicles_driven"] = len(vehicles_driven)
+    
+    # Prepare time series data
+    # Sort dates
+    dates = sorted(daily_data.keys())
+    
+    for date_str in dates:
+        day_data = daily_data[date_str]
+        
+        driver_detail["collections_by_day"].append({
+            "label": date_str,
+            "value": day_data["collection"]
+        })
+        
+        driver_detail["trips_by_day"].append({
+            "label": date_str,
+            "value": day_data["trip_count"]
+        })
+    
+    # Prepare vehicles driven data
+    for v_id, v_data in vehicle_data.items():
+        driver_detail["vehicles_driven"].append(v_data)
+    
+    # Sort vehicles by trip count
+    driver_detail["vehicles_driven"].sort(key=lambda x: x["trip_count"], reverse=True)
+    
+    return driver_detail
+
+@router.get("/performance/drivers/batch", response_model=DetailedDriverPerformanceBatch)
+async def get_driver_detail_performance_batch(
+    driver_ids: List[str] = Query(..., description="Driver IDs"),
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Get detailed performance metrics of several drivers at once, by driver ID.
+    
+    Each entry is what /performance/drivers/{driver_id} returns for that
+    driver, read with one drivers lookup, one rollups read and one vehicles
+    lookup for the whole batch. Unknown IDs are listed in `not_found`.
+    """
+    try:
+        parsed_start_date, parsed_end_date = parse_period(start_date, end_date)
+        driver_ids = parse_batch_ids(driver_ids)
         
-        # Sort by total collections
-        drivers_list.sort(key=lambda x: x["total_collections"], reverse=True)
+        # Look up the drivers and their daily rollups in the date range at once
+        drivers, cells = await fan_out(
+            reference.drivers.get_many(driver_ids),
+            trip_rollups.cells(start=parsed_start_date, end=parsed_end_date, driver_ids=driver_ids)
+        )
         
-        # Calculate average collections per driver
-        avg_collections_per_driver = total_collections / len(drivers_list) if drivers_list else 0
+        # Get registrations of the vehicles driven by any of them
+        vehicle_reg_map = await vehicle_registrations(cells)
+        
+        cells_by_driver = {}
+        for cell in cells:
+            cells_by_driver.setdefault(cell.driver_id, []).append(cell)
         
         return {
-            "drivers": drivers_list,
-            "total_drivers": len(drivers_list),
-            "total_collections": total_collections,
-            "average_collections_per_driver": avg_collections_per_driver,
+            "drivers": {
+                driver_id: driver_detail_performance(
+                    driver_id,
+                    drivers[driver_id],
+                    cells_by_driver.get(driver_id, []),
+                    vehicle_reg_map
+                )
+                for driver_id in driver_ids if driver_id in drivers
+            },
+            "not_found": [driver_id for driver_id in driver_ids if driver_id not in drivers],
             "start_date": parsed_start_date,
             "end_date": parsed_end_date
         }
@@ -1003,7 +1179,7 @@ async def get_driver_performance(
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching driver performance: {str(e)}"
+            detail=f"Error fetching detailed driver performance: {str(e)}"
         )
 
 @router.get("/performance/drivers/{driver_id}", response_model=DetailedDriverPerformance)
@@ -1043,140 +1219,22 @@ async def get_driver_detail_performance(
                     detail="Invalid end_date format. Use YYYY-MM-DD."
                 )
         
-        # Check if driver exists
-        driver_response = supabase.table("drivers").select("id,name").eq("id", driver_id).execute()
+        # Look up the driver and their daily rollups in the date range at once
+        driver, cells = await fan_out(
+            reference.drivers.get(driver_id),
+            trip_rollups.cells(start=parsed_start_date, end=parsed_end_date, driver_ids=[driver_id])
+        )
         
-        if not driver_response.data:
+        if not driver:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Driver not found"
             )
         
-        # Get all trips for this driver in date range
-        trips_response = supabase.table("trips").select("*").eq("driver_id", driver_id).gte("collection_time", parsed_start_date.isoformat()).lte("collection_time", parsed_end_date.isoformat()).execute()
-        
-        # Initialize performance metrics
-        driver_detail = {
-            "driver_id": driver_id,
-            "name": driver_response.data[0].get("name", "Unknown"),
-            "total_collections": 0,
-            "trip_count": 0,
-            "avg_per_trip": 0,
-            "collection_efficiency": 0,
-            "total_vehicles_driven": 0,
-            "most_driven_vehicle": None,
-            "collections_by_day": [],
-            "trips_by_day": [],
-            "vehicles_driven": []
-        }
-        
-        # Process trip data and organize by day
-        daily_data = {}
-        vehicle_data = {}
-        total_expected = 0
-        vehicles_driven = set()
-        vehicle_trips = {}
-        
-        for trip in trips_response.data:
-            # Extract values
-            collected_amount = float(trip.get("collected_amount", 0) or 0)
-            expected_amount = float(trip.get("expected_amount", 0) or 0)
-            vehicle_id = trip.get("vehicle_id")
-            
-            # Get trip date
-            if "collection_time" in trip and trip["collection_time"]:
-                trip_date = datetime.fromisoformat(trip["collection_time"].replace('Z', '+00:00')).date()
-                trip_date_str = trip_date.isoformat()
-                
-                # Initialize daily data if needed
-                if trip_date_str not in daily_data:
-                    daily_data[trip_date_str] = {
-                        "collection": 0,
-                        "trip_count": 0
-                    }
-                
-                # Add to daily data
-                daily_data[trip_date_str]["collection"] += collected_amount
-                daily_data[trip_date_str]["trip_count"] += 1
-            
-            # Track vehicle usage
-            if vehicle_id:
-                vehicles_driven.add(vehicle_id)
-                
-                # Count trips per vehicle
-                if vehicle_id not in vehicle_trips:
-                    vehicle_trips[vehicle_id] = 0
-                vehicle_trips[vehicle_id] += 1
-                
-                # Collect data per vehicle
-                if vehicle_id not in vehicle_data:
-                    vehicle_data[vehicle_id] = {
-                        "vehicle_id": vehicle_id,
-                        "registration": "Unknown",  # Will be filled later
-                        "trip_count": 0,
-                        "total_collections": 0
-                    }
-                
-                vehicle_data[vehicle_id]["trip_count"] += 1
-                vehicle_data[vehicle_id]["total_collections"] += collected_amount
-            
-            # Update aggregates
-            driver_detail["total_collections"] += collected_amount
-            driver_detail["trip_count"] += 1
-            total_expected += expected_amount
-        
-        # Get vehicle registrations
-        if vehicles_driven:
-            vehicles_response = supabase.table("vehicles").select("id,reg_no").in_("id", list(vehicles_driven)).execute()
-            for vehicle in vehicles_response.data:
-                if vehicle["id"] in vehicle_data:
-                    vehicle_data[vehicle["id"]]["registration"] = vehicle.get("reg_no", "Unknown")
-        
-        # Find most driven vehicle
-        most_driven_vehicle = None
-        most_trips = 0
-        for v_id, trips in vehicle_trips.items():
-            if trips > most_trips:
-                most_trips = trips
-                most_driven_vehicle = v_id
-        
-        if most_driven_vehicle and most_driven_vehicle in vehicle_data:
-            driver_detail["most_driven_vehicle"] = vehicle_data[most_driven_vehicle]["registration"]
-        
-        # Calculate derived metrics
-        if driver_detail["trip_count"] > 0:
-            driver_detail["avg_per_trip"] = driver_detail["total_collections"] / driver_detail["trip_count"]
-        
-        if total_expected > 0:
-            driver_detail["collection_efficiency"] = (driver_detail["total_collections"] / total_expected) * 100
-        
-        driver_detail["total_vehicles_driven"] = len(vehicles_driven)
-        
-        # Prepare time series data
-        # Sort dates
-        dates = sorted(daily_data.keys())
-        
-        for date_str in dates:
-            day_data = daily_data[date_str]
-            
-            driver_detail["collections_by_day"].append({
-                "label": date_str,
-                "value": day_data["collection"]
-            })
-            
-            driver_detail["trips_by_day"].append({
-                "label": date_str,
-                "value": day_data["trip_count"]
-            })
-        
-        # Prepare vehicles driven data
-        for v_id, v_data in vehicle_data.items():
-            driver_detail["vehicles_driven"].append(v_data)
+        # Get registrations of the vehicles driven
+        vehicle_reg_map = await vehicle_registrations(cells)
         
-        # Sort vehicles by trip count
-        driver_detail["vehicles_driven"].sort(key=lambda x: x["trip_count"], reverse=True)
-        
-        return driver_detail
+        return driver_detail_performance(driver_id, driver, cells, vehicle_reg_map)
     except HTTPException:
         raise
     except Exception as e:
@@ -1185,12 +1243,38 @@ async def get_driver_detail_performance(
             detail=f"Error fetching detailed driver performance: {str(e)}"
         )
 
+def performance_summary(totals, start_date, end_date, vehicle_ids, driver_ids):
+    """Performance summary over start_date .. end_date from the range totals"""
+    total_collections = totals.collected_amount
+    total_fuel_expense = totals.fuel_expense
+    total_repair_expense = totals.repair_expense
+    trip_count = totals.trip_count
+    
+    # Calculate total expenses and net revenue
+    total_expenses = total_fuel_expense + total_repair_expense
+    net_revenue = total_collections - total_expenses
+    
+    return {
+        "total_collections": total_collections,
+        "total_expenses": total_expenses,
+        "fuel_expense": total_fuel_expense,
+        "repair_expense": total_repair_expense,
+        "net_revenue": net_revenue,
+        "trip_count": trip_count,
+        "start_date": start_date,
+        "end_date": end_date,
+        "vehicle_ids": vehicle_ids,
+        "driver_ids": driver_ids
+    }
+
 @router.get("/performance/summary", response_model=PerformanceSummary)
 async def get_performance_summary(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     vehicle_ids: Optional[List[str]] = Query(None, description="List of vehicle IDs to filter by"),
     driver_ids: Optional[List[str]] = Query(None, description="List of driver IDs to filter by"),
+    baseline_start_date: Optional[str] = Query(None, description="Start of the period to compare with (YYYY-MM-DD)"),
+    baseline_end_date: Optional[str] = Query(None, description="End of the period to compare with (YYYY-MM-DD)"),
     current_user = Depends(get_current_active_user)
 ) -> Any:
     """
@@ -1199,7 +1283,9 @@ async def get_performance_summary(
     Accepts date range and optional filters for specific vehicles and drivers.
     Returns aggregated collections, expenses, and net revenue.
     
-    Default date range is the last 7 days if not specified.
+    Default date range is the last 7 days if not specified. With
+    baseline_start_date and baseline_end_date the response also carries a
+    `comparison` with the baseline period.
     """
     try:
         # Parse date strings if provided
@@ -1235,60 +1321,26 @@ async def get_performance_summary(
                 detail="End date must be after start date"
             )
         
-        start_datetime = datetime.combine(parsed_start_date, time.min).isoformat()  # 00:00:00
-        end_datetime = datetime.combine(parsed_end_date, time.max).isoformat()  # 23:59:59.999999
-
-        
-        # Build the query with date range filter
-        query = supabase.table("trips").select("*").gte("collection_time", start_datetime).lte("collection_time", end_datetime)
-        
-        # Add vehicle filter if provided
-        if vehicle_ids and len(vehicle_ids) > 0:
-            query = query.in_("vehicle_id", vehicle_ids)
-        
-        # Add driver filter if provided
-        if driver_ids and len(driver_ids) > 0:
-            query = query.in_("driver_id", driver_ids)
-        
-        # Execute the query
-        trips_response = query.execute()
-        
-        # Initialize counters
-        total_collections = 0.0
-        total_fuel_expense = 0.0
-        total_repair_expense = 0.0
-        trip_count = 0
+        baseline = parse_baseline(baseline_start_date, baseline_end_date)
+        periods = [(parsed_start_date, parsed_end_date)] + ([baseline] if baseline else [])
         
-        # Process trip data
-        for trip in trips_response.data:
-            # Extract values with safety checks
-            collected_amount = float(trip.get("collected_amount", 0) or 0)
-            fuel_expense = float(trip.get("fuel_expense", 0) or 0)
-            repair_expense = float(trip.get("repair_expense", 0) or 0)
-            
-            # Update totals
-            total_collections += collected_amount
-            total_fuel_expense += fuel_expense
-            total_repair_expense += repair_expense
-            trip_count += 1
-        
-        # Calculate total expenses and net revenue
-        total_expenses = total_fuel_expense + total_repair_expense
-        net_revenue = total_collections - total_expenses
+        # Get the totals of both periods at once, filtered by vehicles and drivers if provided
+        period_totals = await trip_rollups.period_totals(
+            periods,
+            vehicle_ids=vehicle_ids,
+            driver_ids=driver_ids
+        )
         
-        # Return the summary
-        return {
-            "total_collections": total_collections,
-            "total_expenses": total_expenses,
-            "fuel_expense": total_fuel_expense,
-            "repair_expense": total_repair_expense,
-            "net_revenue": net_revenue,
-            "trip_count": trip_count,
-            "start_date": parsed_start_date,
-            "end_date": parsed_end_date,
-            "vehicle_ids": vehicle_ids,
-            "driver_ids": driver_ids
-        }
+        result = performance_summary(period_totals[0], parsed_start_date, parsed_end_date, vehicle_ids, driver_ids)
+        if baseline:
+            baseline_summary = performance_summary(period_totals[1], *baseline, vehicle_ids, driver_ids)
+            result["comparison"] = compare_metrics(
+                result,
+                baseline_summary,
+                ["total_collections", "total_expenses", "net_revenue", "trip_count"]
+            )
+            result["baseline_start_date"], result["baseline_end_date"] = baseline
+        return result
     except HTTPException:
         raise
     except Exception as e:
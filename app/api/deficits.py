@@ -3,8 +3,10 @@ from typing import Optional, List
 from uuid import UUID
 from datetime import datetime
 
-from app.core.db import supabase
+from app.core.db import db, fan_out
 from app.core.security import get_current_active_user
+from app.services.names import NameResolver
+from app.services import reference
 from app.schemas.deficits import (
     DeficitCreate, 
     Deficit, 
@@ -33,16 +35,16 @@ async def create_deficit(
         The created deficit record
     """
     try:
-        # Verify driver exists
-        driver_response = supabase.table("drivers").select("id, name").eq("id", deficit.driver).execute()
+        # Verify driver and vehicle exist
+        driver, vehicle = await fan_out(
+            reference.drivers.get(str(deficit.driver)),
+            reference.vehicles.get(str(deficit.vehicle))
+        )
         
-        if not driver_response.data:
+        if not driver:
             raise HTTPException(status_code=404, detail="Driver not found")
         
-        # Verify vehicle exists
-        vehicle_response = supabase.table("vehicles").select("id, reg_no").eq("id", deficit.vehicle).execute()
-        
-        if not vehicle_response.data:
+        if not vehicle:
             raise HTTPException(status_code=404, detail="Vehicle not found")
         
         # Create deficit record
@@ -53,7 +55,7 @@ async def create_deficit(
             "deficit_type": deficit.deficit_type
         }
         
-        result = supabase.table("deficits").insert(deficit_data).execute()
+        result = await db.table("deficits").insert(deficit_data).execute()
         
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to create deficit record")
@@ -91,7 +93,7 @@ async def get_deficits(
     """
     try:
         # Set up query for deficits
-        query = supabase.table("deficits").select("*")
+        query = db.table("deficits").select("*")
         
         # Apply filters if provided
         if driver_id:
@@ -101,22 +103,17 @@ async def get_deficits(
             query = query.eq("vehicle", str(vehicle_id))
         
         # Execute query
-        deficits_result = query.order("created_at", desc=True).execute()
+        deficits_result = await query.order("created_at", desc=True).execute()
+        
+        # Resolve driver names and vehicle registrations in one batch
+        names = NameResolver().collect(deficits_result.data, driver_key="driver", vehicle_key="vehicle")
+        await names.load()
         
-        # Join with driver and vehicle information
         deficits = []
         total_deficit = 0
         total_repaid = 0
         
         for row in deficits_result.data:
-            # Get driver info for each deficit
-            driver_info = supabase.table("drivers").select("name").eq("id", row["driver"]).execute()
-            driver_name = driver_info.data[0]["name"] if driver_info.data else None
-            
-            # Get vehicle info for each deficit
-            vehicle_info = supabase.table("vehicles").select("reg_no").eq("id", row["vehicle"]).execute()
-            vehicle_registration = vehicle_info.data[0]["reg_no"] if vehicle_info.data else None
-            
             deficit = {
                 "id": row["id"],
                 "created_at": row["created_at"],
@@ -153,8 +150,7 @@ async def get_deficits(
             driver_balance = driver_total_deficit - driver_total_repaid
             
             # Get driver name
-            driver_info = supabase.table("drivers").select("name").eq("id", driver).execute()
-            driver_name = driver_info.data[0]["name"] if driver_info.data else None
+            driver_name = names.driver_name(driver)
             
             driver_summaries.append({
                 "driver_id": driver,
@@ -178,8 +174,7 @@ async def get_deficits(
             vehicle_balance = vehicle_total_deficit - vehicle_total_repaid
             
             # Get vehicle reg_no
-            vehicle_info = supabase.table("vehicles").select("reg_no").eq("id", vehicle).execute()
-            vehicle_registration = vehicle_info.data[0]["reg_no"] if vehicle_info.data else None
+            vehicle_registration = names.vehicle_reg_no(vehicle)
             
             vehicle_summaries.append({
                 "vehicle_id": vehicle,
@@ -208,7 +203,7 @@ async def get_deficit(
     Get a specific deficit by ID.
     """
     try:
-        result = supabase.table("deficits").select("*").eq("id", str(deficit_id)).execute()
+        result = await db.table("deficits").select("*").eq("id", str(deficit_id)).execute()
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Deficit not found")
@@ -239,13 +234,13 @@ async def delete_deficit(
     """
     try:
         # Check if deficit exists
-        result = supabase.table("deficits").select("*").eq("id", str(deficit_id)).execute()
+        result = await db.table("deficits").select("*").eq("id", str(deficit_id)).execute()
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Deficit not found")
         
         # Delete the deficit
-        supabase.table("deficits").delete().eq("id", str(deficit_id)).execute()
+        await db.table("deficits").delete().eq("id", str(deficit_id)).execute()
         
         return None
     except HTTPException:
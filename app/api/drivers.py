@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Any, Optional
 from datetime import date, timedelta
 
-from app.core.db import supabase
+from app.core.db import db
 from app.core.security import get_current_user, check_admin_role
+from app.services import reference
 from app.schemas.driver import (
     DriverCreate,
     DriverUpdate,
@@ -23,12 +24,12 @@ async def get_drivers(
     """
     Retrieve all drivers with optional status filtering.
     """
-    query = supabase.table("drivers").select("*").order("name").range(skip, skip + limit - 1)
+    query = db.table("drivers").select("*").order("name").range(skip, skip + limit - 1)
     
     if status:
         query = query.eq("status", status)
     
-    response = query.execute()
+    response = await query.execute()
     
     return response.data
 
@@ -41,7 +42,7 @@ async def create_driver(
     Create new driver.
     """
     # Check if license_no already exists
-    existing = supabase.table("drivers").select("*").eq("license_no", driver_in.license_no).execute()
+    existing = await db.table("drivers").select("*").eq("license_no", driver_in.license_no).execute()
     
     if existing.data:
         raise HTTPException(
@@ -49,7 +50,7 @@ async def create_driver(
             detail="Driver with this license number already exists",
         )
     
-    response = supabase.table("drivers").insert(driver_in.dict()).execute()
+    response = await db.table("drivers").insert(driver_in.dict()).execute()
     
     if not response.data:
         raise HTTPException(
@@ -57,6 +58,8 @@ async def create_driver(
             detail="Failed to create driver",
         )
     
+    reference.drivers.put(response.data[0])
+    
     return response.data[0]
 
 @router.get("/{driver_id}", response_model=DriverResponse)
@@ -67,7 +70,7 @@ async def get_driver(
     """
     Get driver by ID.
     """
-    response = supabase.table("drivers").select("*").eq("id", driver_id).execute()
+    response = await db.table("drivers").select("*").eq("id", driver_id).execute()
     
     if not response.data:
         raise HTTPException(
@@ -87,7 +90,7 @@ async def update_driver(
     Update a driver.
     """
     # Check if driver exists
-    existing = supabase.table("drivers").select("*").eq("id", driver_id).execute()
+    existing = await db.table("drivers").select("*").eq("id", driver_id).execute()
     
     if not existing.data:
         raise HTTPException(
@@ -104,7 +107,8 @@ async def update_driver(
             detail="No fields to update",
         )
     
-    response = supabase.table("drivers").update(update_data).eq("id", driver_id).execute()
+    response = await db.table("drivers").update(update_data).eq("id", driver_id).execute()
+    reference.drivers.put(response.data[0])
     
     return response.data[0]
 
@@ -117,7 +121,7 @@ async def delete_driver(
     Delete a driver.
     """
     # Check if driver exists
-    existing = supabase.table("drivers").select("*").eq("id", driver_id).execute()
+    existing = await db.table("drivers").select("*").eq("id", driver_id).execute()
     
     if not existing.data:
         raise HTTPException(
@@ -126,18 +130,20 @@ async def delete_driver(
         )
     
     # Check if driver has operations
-    operations = supabase.table("operations").select("id").eq("driver_id", driver_id).limit(1).execute()
+    operations = await db.table("operations").select("id").eq("driver_id", driver_id).limit(1).execute()
     
     # Check if driver has deficits
-    deficits = supabase.table("deficits").select("id").eq("driver", driver_id).limit(1).execute()
+    deficits = await db.table("deficits").select("id").eq("driver", driver_id).limit(1).execute()
     
     if operations.data or deficits.data:
         # Instead of deleting, mark as inactive
-        response = supabase.table("drivers").update({"status": "inactive"}).eq("id", driver_id).execute()
+        response = await db.table("drivers").update({"status": "inactive"}).eq("id", driver_id).execute()
+        reference.drivers.invalidate(driver_id)
         return {"message": "Driver marked as inactive (has related records)"}
     
     # If no operations or deficits, delete the driver
-    response = supabase.table("drivers").delete().eq("id", driver_id).execute()
+    response = await db.table("drivers").delete().eq("id", driver_id).execute()
+    reference.drivers.invalidate(driver_id)
     
     return {"message": "Driver deleted successfully"}
 
@@ -151,7 +157,7 @@ async def get_driver_performance(
     Get driver performance stats.
     """
     # Check if driver exists
-    driver = supabase.table("drivers").select("*").eq("id", driver_id).execute()
+    driver = await db.table("drivers").select("*").eq("id", driver_id).execute()
     
     if not driver.data:
         raise HTTPException(
@@ -164,7 +170,7 @@ async def get_driver_performance(
     start_date = today - timedelta(days=days)
     
     # Get operations data
-    operations = supabase.table("operations").select("*").eq("driver_id", driver_id).gte("date", start_date.isoformat()).execute()
+    operations = await db.table("operations").select("*").eq("driver_id", driver_id).gte("date", start_date.isoformat()).execute()
     
     # Calculate performance metrics
     total_days = len(operations.data)
@@ -205,7 +211,7 @@ async def rate_driver(
     Rate a driver.
     """
     # Check if driver exists
-    existing = supabase.table("drivers").select("*").eq("id", driver_id).execute()
+    existing = await db.table("drivers").select("*").eq("id", driver_id).execute()
     
     if not existing.data:
         raise HTTPException(
@@ -214,6 +220,7 @@ async def rate_driver(
         )
     
     # Update driver's rating
-    response = supabase.table("drivers").update({"rating": rating.rating}).eq("id", driver_id).execute()
+    response = await db.table("drivers").update({"rating": rating.rating}).eq("id", driver_id).execute()
+    reference.drivers.put(response.data[0])
     
     return response.data[0] 
\ No newline at end of file
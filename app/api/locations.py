@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Any, Optional
 from datetime import datetime
 
-from app.core.db import supabase
+from app.core.config import settings
+from app.core.db import db
+from app.core.paging import fetch_page
 from app.core.security import get_current_user, get_current_active_user
+from app.services.names import NameResolver
+from app.services.live import live_dashboard
+from app.services.rollups import trip_rollups
 from app.schemas.location import (
     LocationCreate,
     LocationResponse,
     TripCreate,
     TripUpdate,
     TripResponse,
+    TripPage,
     RoutePoint,
     TripStatus
 )
@@ -25,7 +31,7 @@ async def update_driver_location(
     Update a driver's current location.
     """
     # Validate driver exists
-    driver = supabase.table("drivers").select("*").eq("id", location.driver_id).execute()
+    driver = await db.table("drivers").select("*").eq("id", location.driver_id).execute()
     if not driver.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -33,7 +39,7 @@ async def update_driver_location(
         )
     
     # Create location entry
-    response = supabase.table("locations").insert(location.dict()).execute()
+    response = await db.table("locations").insert(location.dict()).execute()
     
     if not response.data:
         raise HTTPException(
@@ -56,7 +62,7 @@ async def get_drivers_locations(current_user = Depends(get_current_user)) -> Any
     Get the latest location for all active drivers.
     """
     # For each active driver, get the most recent location
-    drivers = supabase.table("drivers").select("id, name").eq("status", "active").execute()
+    drivers = await db.table("drivers").select("id, name").eq("status", "active").execute()
     
     if not drivers.data:
         return []
@@ -64,8 +70,8 @@ async def get_drivers_locations(current_user = Depends(get_current_user)) -> Any
     locations = []
     for driver in drivers.data:
         # Get the most recent location for the driver
-        latest_location = (
-            supabase.table("locations")
+        latest_location = await (
+            db.table("locations")
             .select("*")
             .eq("driver_id", driver["id"])
             .order("timestamp", desc=True)
@@ -92,7 +98,7 @@ async def get_driver_location_history(
     Get location history for a specific driver.
     """
     # Validate driver exists
-    driver = supabase.table("drivers").select("name").eq("id", driver_id).execute()
+    driver = await db.table("drivers").select("name").eq("id", driver_id).execute()
     if not driver.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -100,8 +106,8 @@ async def get_driver_location_history(
         )
     
     # Get the recent locations for the driver
-    locations = (
-        supabase.table("locations")
+    locations = await (
+        db.table("locations")
         .select("*")
         .eq("driver_id", driver_id)
         .order("timestamp", desc=True)
@@ -128,7 +134,7 @@ async def start_trip(
     Start a new trip.
     """
     # Validate driver exists
-    driver = supabase.table("drivers").select("name").eq("id", trip.driver_id).execute()
+    driver = await db.table("drivers").select("name").eq("id", trip.driver_id).execute()
     if not driver.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -136,7 +142,7 @@ async def start_trip(
         )
     
     # Validate vehicle exists
-    vehicle = supabase.table("vehicles").select("reg_no").eq("id", trip.vehicle_id).execute()
+    vehicle = await db.table("vehicles").select("reg_no").eq("id", trip.vehicle_id).execute()
     if not vehicle.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -144,8 +150,8 @@ async def start_trip(
         )
     
     # Check if driver already has an active trip
-    active_trip = (
-        supabase.table("trips")
+    active_trip = await (
+        db.table("trips")
         .select("*")
         .eq("driver_id", trip.driver_id)
         .eq("status", "active")
@@ -164,10 +170,11 @@ async def start_trip(
         "vehicle_id": trip.vehicle_id,
         "start_time": datetime.utcnow().isoformat(),
         "route": [],
-        "status": "active"
+        "status": "active",
+        "updated_at": datetime.utcnow().isoformat()
     }
     
-    response = supabase.table("trips").insert(trip_data).execute()
+    response = await db.table("trips").insert(trip_data).execute()
     
     if not response.data:
         raise HTTPException(
@@ -175,6 +182,10 @@ async def start_trip(
             detail="Failed to start trip",
         )
     
+    trip_rollups.record(response.data[0])
+    
+    live_dashboard.notify()
+    
     # Enrich response with driver and vehicle info
     trip_response = {
         **response.data[0],
@@ -194,7 +205,7 @@ async def update_trip(
     Update a trip (add route points or complete/cancel).
     """
     # Validate trip exists
-    trip = supabase.table("trips").select("*").eq("id", trip_id).execute()
+    trip = await db.table("trips").select("*").eq("id", trip_id).execute()
     if not trip.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -236,20 +247,22 @@ async def update_trip(
             detail="No fields to update",
         )
     
-    response = supabase.table("trips").update(update_data).eq("id", trip_id).execute()
+    # Rollups in other workers find changed trips by updated_at
+    update_data["updated_at"] = datetime.utcnow().isoformat()
     
-    # Get driver and vehicle info
-    driver_id = current_trip["driver_id"]
-    vehicle_id = current_trip["vehicle_id"]
+    response = await db.table("trips").update(update_data).eq("id", trip_id).execute()
+    if response.data:
+        trip_rollups.record(response.data[0], current_trip)
+        live_dashboard.notify()
     
-    driver = supabase.table("drivers").select("name").eq("id", driver_id).execute()
-    vehicle = supabase.table("vehicles").select("reg_no").eq("id", vehicle_id).execute()
+    # Resolve driver name and vehicle registration
+    names = await NameResolver().collect([current_trip]).load()
     
     # Enrich response
     trip_response = {
         **response.data[0],
-        "driver_name": driver.data[0]["name"] if driver.data else None,
-        "vehicle_reg_no": vehicle.data[0]["reg_no"] if vehicle.data else None
+        "driver_name": names.driver_name(current_trip["driver_id"]),
+        "vehicle_reg_no": names.vehicle_reg_no(current_trip["vehicle_id"])
     }
     
     return trip_response
@@ -259,101 +272,118 @@ async def get_active_trips(current_user = Depends(get_current_user)) -> Any:
     """
     Get all active trips.
     """
-    trips = supabase.table("trips").select("*").eq("status", "active").execute()
+    trips = await db.table("trips").select("*").eq("status", "active").execute()
+    
+    # Resolve driver names and vehicle registrations in one batch
+    names = NameResolver().collect(trips.data)
+    await names.load()
     
     # Enrich with driver and vehicle info
     enriched_trips = []
     for trip in trips.data:
-        driver = supabase.table("drivers").select("name").eq("id", trip["driver_id"]).execute()
-        vehicle = supabase.table("vehicles").select("reg_no").eq("id", trip["vehicle_id"]).execute()
-        
         enriched_trip = {
             **trip,
-            "driver_name": driver.data[0]["name"] if driver.data else None,
-            "vehicle_reg_no": vehicle.data[0]["reg_no"] if vehicle.data else None
+            "driver_name": names.driver_name(trip["driver_id"]),
+            "vehicle_reg_no": names.vehicle_reg_no(trip["vehicle_id"])
         }
         enriched_trips.append(enriched_trip)
     
     return enriched_trips
 
-@router.get("/trips/vehicle/{vehicle_id}", response_model=List[TripResponse])
+@router.get("/trips/vehicle/{vehicle_id}", response_model=TripPage)
 async def get_vehicle_trips(
     vehicle_id: str,
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=settings.API_PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
     current_user = Depends(get_current_user)
 ) -> Any:
     """
-    Get trips for a specific vehicle.
+    Get trips for a specific vehicle, newest first, one page at a time.
     """
     # Validate vehicle exists
-    vehicle = supabase.table("vehicles").select("reg_no").eq("id", vehicle_id).execute()
+    vehicle = await db.table("vehicles").select("reg_no").eq("id", vehicle_id).execute()
     if not vehicle.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Vehicle not found",
         )
     
-    # Get trips
-    trips = (
-        supabase.table("trips")
-        .select("*")
-        .eq("vehicle_id", vehicle_id)
-        .order("start_time", desc=True)
-        .limit(limit)
-        .execute()
-    )
+    # Get one page of trips
+    try:
+        trips, next_cursor = await fetch_page(
+            lambda: db.table("trips").select("*").eq("vehicle_id", vehicle_id),
+            cursor,
+            limit,
+            keys=("start_time", "id"),
+            desc=True
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    
+    # Resolve driver names in one batch
+    names = NameResolver().collect(trips, vehicle_key=None)
+    await names.load()
     
     # Enrich with driver info
     enriched_trips = []
-    for trip in trips.data:
-        driver = supabase.table("drivers").select("name").eq("id", trip["driver_id"]).execute()
-        
+    for trip in trips:
         enriched_trip = {
             **trip,
-            "driver_name": driver.data[0]["name"] if driver.data else None,
+            "driver_name": names.driver_name(trip["driver_id"]),
             "vehicle_reg_no": vehicle.data[0]["reg_no"]
         }
         enriched_trips.append(enriched_trip)
     
-    return enriched_trips
+    return {"items": enriched_trips, "next_cursor": next_cursor}
 
-@router.get("/trips/driver/{driver_id}", response_model=List[TripResponse])
+@router.get("/trips/driver/{driver_id}", response_model=TripPage)
 async def get_driver_trips(
     driver_id: str,
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=settings.API_PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
     current_user = Depends(get_current_user)
 ) -> Any:
     """
-    Get trips for a specific driver.
+    Get trips for a specific driver, newest first, one page at a time.
     """
     # Validate driver exists
-    driver = supabase.table("drivers").select("name").eq("id", driver_id).execute()
+    driver = await db.table("drivers").select("name").eq("id", driver_id).execute()
     if not driver.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Driver not found",
         )
     
-    # Get trips
-    trips = (
-        supabase.table("trips")
-        .select("*")
-        .eq("driver_id", driver_id)
-        .order("start_time", desc=True)
-        .limit(limit)
-        .execute()
-    )
+    # Get one page of trips
+    try:
+        trips, next_cursor = await fetch_page(
+            lambda: db.table("trips").select("*").eq("driver_id", driver_id),
+            cursor,
+            limit,
+            keys=("start_time", "id"),
+            desc=True
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    
+    # Resolve vehicle registrations in one batch
+    names = NameResolver().collect(trips, driver_key=None)
+    await names.load()
     
     # Enrich with vehicle info
     enriched_trips = []
-    for trip in trips.data:
-        vehicle = supabase.table("vehicles").select("reg_no").eq("id", trip["vehicle_id"]).execute()
-        
+    for trip in trips:
         enriched_trip = {
             **trip,
             "driver_name": driver.data[0]["name"],
-            "vehicle_reg_no": vehicle.data[0]["reg_no"] if vehicle.data else None
+            "vehicle_reg_no": names.vehicle_reg_no(trip["vehicle_id"])
         }
         enriched_trips.append(enriched_trip)
     
-    return enriched_trips 
\ No newline at end of file
+    return {"items": enriched_trips, "next_cursor": next_cursor} 
\ No newline at end of file
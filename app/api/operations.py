@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Any, Optional, Dict
 from datetime import date, datetime, timedelta
 
-from app.core.db import supabase
+from app.core.db import db
 from app.core.security import get_current_user, get_current_active_user
+from app.services.names import NameResolver
 from app.schemas.operation import (
     OperationCreate,
     OperationUpdate,
@@ -31,7 +32,7 @@ async def get_operations(
     """
     Retrieve operations with optional filtering.
     """
-    query = supabase.table("operations").select("*").order("date", desc=True).range(skip, skip + limit - 1)
+    query = db.table("operations").select("*").order("date", desc=True).range(skip, skip + limit - 1)
     
     if start_date:
         query = query.gte("date", start_date.isoformat())
@@ -45,29 +46,25 @@ async def get_operations(
     if driver_id:
         query = query.eq("driver_id", driver_id)
     
-    operation_data = query.execute()
+    operation_data = await query.execute()
+    
+    # Resolve vehicle registrations and driver names in one batch
+    # (skipped when already filtered by that vehicle or driver)
+    names = NameResolver().collect(
+        operation_data.data,
+        driver_key=None if driver_id else "driver_id",
+        vehicle_key=None if vehicle_id else "vehicle_id"
+    )
+    await names.load()
     
     # If we have operations, enrich them with vehicle and driver info
     result = []
     for op in operation_data.data:
-        # Fetch vehicle and driver info to add registration number and driver name
-        if vehicle_id:
-            vehicle = {"reg_no": None}  # Already know vehicle_id, avoid additional query
-        else:
-            vehicle_response = supabase.table("vehicles").select("reg_no").eq("id", op["vehicle_id"]).execute()
-            vehicle = vehicle_response.data[0] if vehicle_response.data else {"reg_no": None}
-        
-        if driver_id:
-            driver = {"name": None}  # Already know driver_id, avoid additional query
-        else:
-            driver_response = supabase.table("drivers").select("name").eq("id", op["driver_id"]).execute()
-            driver = driver_response.data[0] if driver_response.data else {"name": None}
-        
         # Combine operation with vehicle and driver info
         enriched_op = {
             **op,
-            "vehicle_reg_no": vehicle["reg_no"],
-            "driver_name": driver["name"]
+            "vehicle_reg_no": None if vehicle_id else names.vehicle_reg_no(op["vehicle_id"]),
+            "driver_name": None if driver_id else names.driver_name(op["driver_id"])
         }
         result.append(enriched_op)
     
@@ -82,7 +79,7 @@ async def create_operation(
     Create new operation record.
     """
     # Validate vehicle exists
-    vehicle = supabase.table("vehicles").select("reg_no").eq("id", operation_in.vehicle_id).execute()
+    vehicle = await db.table("vehicles").select("reg_no").eq("id", operation_in.vehicle_id).execute()
     if not vehicle.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,7 +87,7 @@ async def create_operation(
         )
     
     # Validate driver exists
-    driver = supabase.table("drivers").select("name").eq("id", operation_in.driver_id).execute()
+    driver = await db.table("drivers").select("name").eq("id", operation_in.driver_id).execute()
     if not driver.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -98,8 +95,8 @@ async def create_operation(
         )
     
     # Check if operation already exists for this vehicle and date
-    existing = (
-        supabase.table("operations")
+    existing = await (
+        db.table("operations")
         .select("*")
         .eq("vehicle_id", operation_in.vehicle_id)
         .eq("date", operation_in.date.isoformat())
@@ -118,7 +115,7 @@ async def create_operation(
         "created_by": current_user.user_id
     }
     
-    response = supabase.table("operations").insert(operation_data).execute()
+    response = await db.table("operations").insert(operation_data).execute()
     
     if not response.data:
         raise HTTPException(
@@ -143,7 +140,7 @@ async def get_operation(
     """
     Get operation by ID.
     """
-    operation = supabase.table("operations").select("*").eq("id", operation_id).execute()
+    operation = await db.table("operations").select("*").eq("id", operation_id).execute()
     
     if not operation.data:
         raise HTTPException(
@@ -153,15 +150,14 @@ async def get_operation(
     
     op = operation.data[0]
     
-    # Fetch vehicle and driver info
-    vehicle = supabase.table("vehicles").select("reg_no").eq("id", op["vehicle_id"]).execute()
-    driver = supabase.table("drivers").select("name").eq("id", op["driver_id"]).execute()
+    # Resolve vehicle registration and driver name
+    names = await NameResolver().collect([op]).load()
     
     # Combine operation with vehicle and driver info
     enriched_op = {
         **op,
-        "vehicle_reg_no": vehicle.data[0]["reg_no"] if vehicle.data else None,
-        "driver_name": driver.data[0]["name"] if driver.data else None
+        "vehicle_reg_no": names.vehicle_reg_no(op["vehicle_id"]),
+        "driver_name": names.driver_name(op["driver_id"])
     }
     
     return enriched_op
@@ -176,7 +172,7 @@ async def update_operation(
     Update an operation.
     """
     # Check if operation exists
-    operation = supabase.table("operations").select("*").eq("id", operation_id).execute()
+    operation = await db.table("operations").select("*").eq("id", operation_id).execute()
     
     if not operation.data:
         raise HTTPException(
@@ -196,19 +192,18 @@ async def update_operation(
     # Add updated_at timestamp
     update_data["updated_at"] = datetime.utcnow().isoformat()
     
-    response = supabase.table("operations").update(update_data).eq("id", operation_id).execute()
+    response = await db.table("operations").update(update_data).eq("id", operation_id).execute()
     
     op = response.data[0]
     
-    # Fetch vehicle and driver info
-    vehicle = supabase.table("vehicles").select("reg_no").eq("id", op["vehicle_id"]).execute()
-    driver = supabase.table("drivers").select("name").eq("id", op["driver_id"]).execute()
+    # Resolve vehicle registration and driver name
+    names = await NameResolver().collect([op]).load()
     
     # Combine operation with vehicle and driver info
     enriched_op = {
         **op,
-        "vehicle_reg_no": vehicle.data[0]["reg_no"] if vehicle.data else None,
-        "driver_name": driver.data[0]["name"] if driver.data else None
+        "vehicle_reg_no": names.vehicle_reg_no(op["vehicle_id"]),
+        "driver_name": names.driver_name(op["driver_id"])
     }
     
     return enriched_op
@@ -222,7 +217,7 @@ async def delete_operation(
     Delete an operation.
     """
     # Check if operation exists
-    operation = supabase.table("operations").select("*").eq("id", operation_id).execute()
+    operation = await db.table("operations").select("*").eq("id", operation_id).execute()
     
     if not operation.data:
         raise HTTPException(
@@ -230,7 +225,7 @@ async def delete_operation(
             detail="Operation not found",
         )
     
-    response = supabase.table("operations").delete().eq("id", operation_id).execute()
+    response = await db.table("operations").delete().eq("id", operation_id).execute()
     
     return {"message": "Operation deleted successfully"}
 
@@ -251,8 +246,8 @@ async def get_operations_summary(
         )
     
     # Get operations within date range
-    operations = (
-        supabase.table("operations")
+    operations = await (
+        db.table("operations")
         .select("*")
         .gte("date", start_date.isoformat())
         .lte("date", end_date.isoformat())
@@ -303,19 +298,19 @@ async def get_dashboard_stats(current_user = Depends(get_current_user)) -> Any:
     Get dashboard statistics.
     """
     # Get counts for vehicles
-    vehicles = supabase.table("vehicles").select("id, status").execute()
+    vehicles = await db.table("vehicles").select("id, status").execute()
     total_vehicles = len(vehicles.data)
     active_vehicles = sum(1 for v in vehicles.data if v["status"] == "active")
     
     # Get counts for drivers
-    drivers = supabase.table("drivers").select("id, status").execute()
+    drivers = await db.table("drivers").select("id, status").execute()
     total_drivers = len(drivers.data)
     active_drivers = sum(1 for d in drivers.data if d["status"] == "active")
     
     # Get today's collections and expenses
     today = date.today()
-    today_ops = (
-        supabase.table("operations")
+    today_ops = await (
+        db.table("operations")
         .select("morning_collection, evening_collection, fuel_expense, repair_expense")
         .eq("date", today.isoformat())
         .execute()
@@ -326,8 +321,8 @@ async def get_dashboard_stats(current_user = Depends(get_current_user)) -> Any:
     
     # Get weekly collections (last 7 days)
     week_ago = today - timedelta(days=7)
-    weekly_ops = (
-        supabase.table("operations")
+    weekly_ops = await (
+        db.table("operations")
         .select("date, morning_collection, evening_collection")
         .gte("date", week_ago.isoformat())
         .lte("date", today.isoformat())
@@ -348,8 +343,8 @@ async def get_dashboard_stats(current_user = Depends(get_current_user)) -> Any:
     
     # Get monthly collections (last 30 days by week)
     month_ago = today - timedelta(days=30)
-    monthly_ops = (
-        supabase.table("operations")
+    monthly_ops = await (
+        db.table("operations")
         .select("date, morning_collection, evening_collection")
         .gte("date", month_ago.isoformat())
         .lte("date", today.isoformat())
@@ -370,11 +365,19 @@ async def get_dashboard_stats(current_user = Depends(get_current_user)) -> Any:
     # Format monthly collections
     monthly_data = [{"week": week, "amount": amount} for week, amount in monthly_collections.items()]
     
+    # Resolve registrations and names for the dashboard entries in one batch
+    names = NameResolver()
+    for vehicle in vehicles.data[:5]:
+        names.add_vehicle(vehicle["id"])
+    for driver in drivers.data[:5]:
+        names.add_driver(driver["id"])
+    await names.load()
+    
     # Get vehicle performance
     vehicle_performance = []
     for vehicle in vehicles.data[:5]:  # Limited to top 5 for dashboard
-        vehicle_ops = (
-            supabase.table("operations")
+        vehicle_ops = await (
+            db.table("operations")
             .select("morning_collection, evening_collection, fuel_expense, repair_expense")
             .eq("vehicle_id", vehicle["id"])
             .gte("date", month_ago.isoformat())
@@ -386,8 +389,7 @@ async def get_dashboard_stats(current_user = Depends(get_current_user)) -> Any:
             expenses = sum(op["fuel_expense"] + op["repair_expense"] for op in vehicle_ops.data)
             
             # Get vehicle details
-            vehicle_details = supabase.table("vehicles").select("reg_no").eq("id", vehicle["id"]).execute()
-            reg_no = vehicle_details.data[0]["reg_no"] if vehicle_details.data else "Unknown"
+            reg_no = names.vehicle_reg_no(vehicle["id"], "Unknown")
             
             vehicle_performance.append({
                 "vehicle_id": vehicle["id"],
@@ -403,8 +405,8 @@ async def get_dashboard_stats(current_user = Depends(get_current_user)) -> Any:
     # Get driver performance
     driver_performance = []
     for driver in drivers.data[:5]:  # Limited to top 5 for dashboard
-        driver_ops = (
-            supabase.table("operations")
+        driver_ops = await (
+            db.table("operations")
             .select("morning_collection, evening_collection")
             .eq("driver_id", driver["id"])
             .gte("date", month_ago.isoformat())
@@ -416,8 +418,7 @@ async def get_dashboard_stats(current_user = Depends(get_current_user)) -> Any:
             days = len(driver_ops.data)
             
             # Get driver details
-            driver_details = supabase.table("drivers").select("name").eq("id", driver["id"]).execute()
-            name = driver_details.data[0]["name"] if driver_details.data else "Unknown"
+            name = names.driver_name(driver["id"], "Unknown")
             
             driver_performance.append({
                 "driver_id": driver["id"],
@@ -1,98 +1,143 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from typing import List, Any, Optional
 from datetime import datetime, date, timedelta
+import asyncio
+import csv
 import json
 import base64
 import io
+import hashlib
 from tempfile import NamedTemporaryFile
-import os
 import logging
 import traceback
-import sys
+import zipfile
 
-from jinja2 import Environment, FileSystemLoader, exceptions as jinja2_exceptions
-from xhtml2pdf import pisa
+from anyio import from_thread
+from jinja2 import Environment, FileSystemLoader
+from starlette.concurrency import run_in_threadpool
 
-from app.core.db import supabase
+from app.core.config import settings
+from app.core.db import db, fan_out
+from app.core.logs import IssueSummary
+from app.core.paging import iter_pages
+from app.core.projection import Projection
+from app.core.watermark import table_watermark
 from app.core.security import get_current_active_user
-from app.schemas.dashboard import ReportFormat, ReportResponse
+from app.schemas.dashboard import BundleKind, ExportFormat, ReportFormat, ReportResponse
+from app.schemas.reports import ReportJobResponse
+from app.services.names import NameResolver
+from app.services import reference
+from app.services.pdf import PdfRenderError, PdfRenderTimeout, render_pdf
+from app.services.report_cache import CachedReport, report_cache, report_key
+from app.services.report_metrics import combined_report_metrics
+from app.services.report_jobs import DONE, FAILED, ReportDocument, report_jobs
+from app.services.rollups import trip_rollups
+from app.services.trip_records import decode_trips
 
-# Set up logger
+# Handlers and levels are configured by app.core.logs
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-
-# Create console handler with a higher log level
-ch = logging.StreamHandler(sys.stdout)
-ch.setLevel(logging.DEBUG)
-
-# Create file handler for persistent logs
-try:
-    log_dir = "logs"
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    fh = logging.FileHandler(os.path.join(log_dir, "reports_api.log"))
-    fh.setLevel(logging.DEBUG)
-except Exception as e:
-    # If file logging fails, just log to console
-    print(f"Warning: Could not set up file logging: {str(e)}")
-    fh = None
-
-# Create formatter and add it to the handlers
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-ch.setFormatter(formatter)
-if fh:
-    fh.setFormatter(formatter)
-
-# Add the handlers to logger
-logger.addHandler(ch)
-if fh:
-    logger.addHandler(fh)
-
-logger.info("Reports API logger initialized")
 
 router = APIRouter()
 
+# Trip columns used by the report trip logs and route breakdowns
+TRIP_LOG_COLUMNS = Projection(
+    "trips",
+    "report trip log",
+    ["id", "vehicle_id", "driver_id", "collection_time", "collected_amount", "repair_expense"],
+    optional=["expected_amount", "fuel_expense", "other_expense", "route_id", "route_name"]
+)
+
 # Initialize Jinja2 environment for template rendering
 template_env = Environment(loader=FileSystemLoader("app/templates"))
 
-def render_template_to_pdf(template_name, context_data):
-    """Render an HTML template to PDF and return the PDF bytes"""
+# Bytes of rendered HTML collected before a chunk is sent to the client
+STREAM_CHUNK_SIZE = 16 * 1024
+
+class HtmlReport:
+    """
+    An HTML report rendered lazily from a template.
+    
+    `chunks()` renders with Jinja2's `generate()`, so a response can start
+    sending while the trip log is still being produced and the whole page
+    is never held in memory as one string. Both must run in a threadpool
+    worker when the context holds a TripLog.
+    """
+    __slots__ = ("filename", "media_type", "template", "context")
+    
+    def __init__(self, filename, template_name, context):
+        self.filename = filename
+        self.media_type = "text/html"
+        self.template = template_env.get_template(template_name)
+        self.context = context
+    
+    def chunks(self):
+        """UTF-8 encoded chunks of about STREAM_CHUNK_SIZE bytes"""
+        buffer = []
+        size = 0
+        for piece in self.template.generate(**self.context):
+            data = piece.encode("utf-8")
+            buffer.append(data)
+            size += len(data)
+            if size >= STREAM_CHUNK_SIZE:
+                yield b"".join(buffer)
+                buffer = []
+                size = 0
+        if buffer:
+            yield b"".join(buffer)
+    
+    def render(self):
+        """The whole document, for callers that need it in memory"""
+        return ReportDocument(self.filename, self.media_type, b"".join(self.chunks()))
+
+def stream_html_report(report, key=None):
+    """
+    Yield an HTML report's chunks, copying them into the document cache.
+    
+    Sync on purpose: StreamingResponse runs it in the threadpool, so
+    template rendering stays off the event loop. The cached copy is only
+    committed once the last chunk was produced.
+    """
+    writer = report_cache.open_writer(key, report.filename, report.media_type) if key else None
+    completed = False
+    try:
+        for chunk in report.chunks():
+            if writer:
+                writer.write(chunk)
+            yield chunk
+        completed = True
+    except Exception as e:
+        logger.error(f"Error streaming HTML report {report.filename}: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise
+    finally:
+        if writer:
+            if completed:
+                writer.commit()
+            else:
+                writer.abort()
+
+async def render_template_to_pdf(template_name, context_data):
+    """Render an HTML template to PDF in the render pool and return the PDF bytes"""
     try:
         logger.info(f"Starting PDF rendering for template: {template_name}")
+        logger.debug("Rendering template with context keys: %s", list(context_data))
         
-        # Get the template
-        template = template_env.get_template(template_name)
-        
-        # Render the template with the context data
-        logger.debug(f"Rendering template with context keys: {list(context_data.keys())}")
-        html = template.render(**context_data)
-        
-        # Convert HTML to PDF
-        pdf_content = io.BytesIO()
-        logger.debug("Converting HTML to PDF")
-        pisa_status = pisa.CreatePDF(html, dest=pdf_content)
-        
-        if pisa_status.err:
-            error_msg = f"PDF generation error: {pisa_status.err}"
-            logger.error(error_msg)
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=error_msg
-            )
+        pdf_content = await render_pdf(template_name, context_data)
         
-        # Reset file pointer to the beginning
-        pdf_content.seek(0)
         logger.info("PDF rendering completed successfully")
-        
         return pdf_content
-    except jinja2_exceptions.TemplateError as e:
-        error_msg = f"Template error: {str(e)}"
-        logger.error(error_msg)
-        logger.error(traceback.format_exc())
+    except PdfRenderTimeout as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e)
+        )
+    except PdfRenderError as e:
+        logger.error(str(e))
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=error_msg
+            detail=str(e)
         )
     except Exception as e:
         error_msg = f"Error rendering PDF: {str(e)}"
@@ -103,145 +148,349 @@ def render_template_to_pdf(template_name, context_data):
             detail=error_msg
         )
 
-def fetch_trip_data(start_date, end_date, vehicle_ids=None, driver_ids=None):
-    """Fetch trip data with optional filters for multiple vehicles and drivers"""
+def resolve_report_dates(start_date, end_date):
+    """Parse a report's date range, defaulting to the last 30 days"""
+    today = date.today()
+    parsed = []
+    for name, value, default in (("start_date", start_date, today - timedelta(days=29)), ("end_date", end_date, today)):
+        if not value:
+            parsed.append(default)
+            continue
+        try:
+            parsed.append(datetime.strptime(value, "%Y-%m-%d").date())
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid {name} format. Use YYYY-MM-DD."
+            )
+    return parsed[0], parsed[1]
+
+async def report_cache_key(template_name, start_date, end_date, format, vehicle_ids=None, driver_ids=None):
+    """
+    Document cache key for a report request.
+    
+    Built from the normalized parameters, the watermarks (row count and
+    latest updated_at) of the trips in the report and of the vehicle,
+    driver and route tables whose names it prints, and the rows of the
+    requested vehicles and drivers. The watermarks are read from the
+    database, so every worker sharing the document cache computes the same
+    key, and it changes whenever the report would.
+    
+    Returns None, and the report is rendered uncached, when the document
+    cache is disabled or the watermarks cannot be read.
+    """
+    if not report_cache.enabled:
+        return None
+    
+    parsed_start_date, parsed_end_date = resolve_report_dates(start_date, end_date)
+    vehicle_ids = sorted(set(vehicle_ids)) if vehicle_ids else None
+    driver_ids = sorted(set(driver_ids)) if driver_ids else None
+    
     try:
-        logger.info(f"Fetching trip data from {start_date} to {end_date}")
-        logger.debug(f"Vehicle IDs: {vehicle_ids}, Driver IDs: {driver_ids}")
-        
-        # Create start_datetime with time at 00:00:00
-        start_datetime = datetime.combine(start_date, datetime.min.time())
-        # Create end_datetime with time at 23:59:59
-        end_datetime = datetime.combine(end_date, datetime.max.time())
-        
-        query = supabase.table("trips").select("*").gte("collection_time", start_datetime.isoformat()).lte("collection_time", end_datetime.isoformat())
+        watermarks = await fan_out(
+            table_watermark("trips", lambda query: filter_report_trips(query, parsed_start_date, parsed_end_date, vehicle_ids, driver_ids)),
+            table_watermark("vehicles"),
+            table_watermark("drivers"),
+            table_watermark("routes")
+        )
         
+        # Names and details of the requested vehicles and drivers are printed in the report
+        entities = []
         if vehicle_ids:
-            if isinstance(vehicle_ids, list):
-                query = query.in_("vehicle_id", vehicle_ids)
-            else:
-                query = query.eq("vehicle_id", vehicle_ids)
-            
+            entities.extend(sorted((await reference.vehicles.get_many(vehicle_ids)).items()))
         if driver_ids:
-            if isinstance(driver_ids, list):
-                query = query.in_("driver_id", driver_ids)
-            else:
-                query = query.eq("driver_id", driver_ids)
+            entities.extend(sorted((await reference.drivers.get_many(driver_ids)).items()))
+    except Exception as e:
+        logger.warning(f"Could not read the data version of a {template_name} report, rendering it uncached: {str(e)}")
+        return None
+    entity_hash = hashlib.sha256(json.dumps(entities, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    
+    params = {
+        "start_date": parsed_start_date.isoformat(),
+        "end_date": parsed_end_date.isoformat(),
+        "format": ReportFormat(format).value,
+        "vehicle_ids": vehicle_ids,
+        "driver_ids": driver_ids
+    }
+    return report_key(template_name, params, f"{json.dumps(watermarks)}:{entity_hash}")
+
+async def cached_report(key, build, load=False):
+    """
+    Serve a report from the document cache, or build and store it on a miss.
+    
+    A hit is returned as a CachedReport pointing at the file, and an HTML
+    miss as an HtmlReport that is cached while it streams, unless `load` is
+    set (for background jobs, whose document must be complete and outlive
+    cache eviction). Without a `key` the report is built and not cached.
+    """
+    cached = report_cache.get(key) if key else None
+    if cached is not None:
+        logger.info(f"Serving cached report {cached.filename}")
+        if load:
+            return ReportDocument(cached.filename, cached.media_type, await asyncio.to_thread(cached.read))
+        return cached
+    
+    document = await build()
+    if isinstance(document, HtmlReport):
+        if not load:
+            return document
+        document = await run_in_threadpool(document.render)
+    if key:
+        await asyncio.to_thread(report_cache.put, key, document.filename, document.media_type, document.content)
+    return document
+
+# Trip log columns in exports, in spreadsheet order
+EXPORT_COLUMNS = [
+    "id",
+    "collection_date",
+    "collection_time_only",
+    "vehicle_id",
+    "vehicle_registration",
+    "driver_id",
+    "driver_name",
+    "route_name",
+    "collected_amount",
+    "expected_amount",
+    "efficiency",
+    "fuel_expense",
+    "repair_expense",
+    "other_expense",
+    "total_expense"
+]
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson"
+}
+
+def encode_export_rows(rows, format, header=False):
+    """One chunk of export output for a page of enriched trip records"""
+    if format == ExportFormat.NDJSON:
+        return "".join(
+            json.dumps({column: getattr(row, column) for column in EXPORT_COLUMNS}, default=str) + "\n"
+            for row in rows
+        ).encode("utf-8")
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows([getattr(row, column) for column in EXPORT_COLUMNS] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+async def stream_trip_export(start_date, end_date, format, vehicle_ids=None, driver_ids=None):
+    """
+    Yield a trip log export page by page, oldest trip first.
+    
+    Only one page of trips is held at a time, so memory stays flat however
+    long the range is, and every page is sent as soon as it is enriched.
+    """
+    names = NameResolver()
+    issues = IssueSummary(logger, "trip export")
+    exported = 0
+    if format == ExportFormat.CSV:
+        yield encode_export_rows([], format, header=True)
+    try:
+        async for page in iter_trip_pages(start_date, end_date, vehicle_ids, driver_ids, desc=False, issues=issues):
+            rows = await enrich_trip_data(page, names)
+            exported += len(rows)
+            yield encode_export_rows(rows, format)
+    except Exception as e:
+        # Headers are already sent, so the client only sees a truncated file
+        logger.error(f"Trip export failed after {exported} rows: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise
+    finally:
+        issues.flush()
+    logger.info(f"Exported {exported} trips as {format.value}")
+
+def export_response(start_date, end_date, format, name, vehicle_ids=None, driver_ids=None):
+    """Streaming download of a trip log export"""
+    filename = f"{name}_trips_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.{format.value}"
+    return StreamingResponse(
+        stream_trip_export(start_date, end_date, format, vehicle_ids, driver_ids),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+def document_response(document, key=None):
+    """
+    HTTP response carrying a generated or cached report as a download.
+    
+    HTML reports are streamed, and copied into the document cache under
+    `key` if one is given.
+    """
+    headers = {"Content-Disposition": f"attachment; filename={document.filename}"}
+    if isinstance(document, CachedReport):
+        return FileResponse(document.path, media_type=document.media_type, headers=headers)
+    if isinstance(document, HtmlReport):
+        return StreamingResponse(stream_html_report(document, key), media_type=document.media_type, headers=headers)
+    return Response(
+        content=document.content,
+        media_type=document.media_type,
+        headers=headers
+    )
+
+def filter_report_trips(query, start_date, end_date, vehicle_ids=None, driver_ids=None):
+    """Restrict a trips query to the trips of a report"""
+    # Create start_datetime with time at 00:00:00
+    start_datetime = datetime.combine(start_date, datetime.min.time())
+    # Create end_datetime with time at 23:59:59
+    end_datetime = datetime.combine(end_date, datetime.max.time())
+    
+    query = query.gte("collection_time", start_datetime.isoformat()).lte("collection_time", end_datetime.isoformat())
+    
+    if vehicle_ids:
+        if isinstance(vehicle_ids, list):
+            query = query.in_("vehicle_id", vehicle_ids)
+        else:
+            query = query.eq("vehicle_id", vehicle_ids)
         
-        response = query.order("collection_time", desc=True).execute()
-        logger.info(f"Found {len(response.data)} trips")
-        return response.data
+    if driver_ids:
+        if isinstance(driver_ids, list):
+            query = query.in_("driver_id", driver_ids)
+        else:
+            query = query.eq("driver_id", driver_ids)
+    
+    return query
+
+async def iter_trip_pages(start_date, end_date, vehicle_ids=None, driver_ids=None, desc=True, issues=None):
+    """
+    Yield decoded trip log records in the date range one page at a time,
+    newest first unless `desc` is off. Invalid values are reported to `issues`.
+    """
+    columns = await TRIP_LOG_COLUMNS.resolve()
+    
+    def build_query():
+        return filter_report_trips(db.table("trips").select(columns), start_date, end_date, vehicle_ids, driver_ids)
+    
+    # Keyset pages, so long ranges are not truncated by max-rows
+    async for page in iter_pages(build_query, desc=desc):
+        yield decode_trips(page, TRIP_LOG_COLUMNS, issues)
+
+async def fetch_trip_data(start_date, end_date, vehicle_ids=None, driver_ids=None):
+    """Fetch decoded trip records with optional filters for multiple vehicles and drivers"""
+    issues = IssueSummary(logger, "fetch_trip_data")
+    try:
+        logger.info(f"Fetching trip data from {start_date} to {end_date}")
+        logger.debug("Vehicle IDs: %s, Driver IDs: %s", vehicle_ids, driver_ids)
+        
+        trips = []
+        async for page in iter_trip_pages(start_date, end_date, vehicle_ids, driver_ids, issues=issues):
+            trips.extend(page)
+        logger.info(f"Found {len(trips)} trips")
+        return trips
     except Exception as e:
         logger.error(f"Error fetching trip data: {str(e)}")
         logger.error(traceback.format_exc())
         raise
+    finally:
+        issues.flush()
+
+class TripLog:
+    """
+    Trip log section of an HTML report, read while the report renders.
+
+    The template iterates it inside `HtmlReport.chunks()`, which runs in a
+    threadpool worker. Each page is fetched and enriched on the event loop
+    through anyio's portal, so the document starts sending before the log
+    is read and only one page of trips is held at a time.
+    """
+    def __init__(self, start_date, end_date, vehicle_ids=None, driver_ids=None, names=None):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.vehicle_ids = vehicle_ids
+        self.driver_ids = driver_ids
+        self.names = names or NameResolver()
+    
+    async def pages(self):
+        issues = IssueSummary(logger, "trip log")
+        try:
+            async for page in iter_trip_pages(self.start_date, self.end_date, self.vehicle_ids, self.driver_ids, issues=issues):
+                yield await enrich_trip_data(page, self.names)
+        finally:
+            issues.flush()
+    
+    def __iter__(self):
+        pages = self.pages()
+        
+        async def next_page():
+            try:
+                return await pages.__anext__()
+            except StopAsyncIteration:
+                return None
+        
+        try:
+            while True:
+                page = from_thread.run(next_page)
+                if page is None:
+                    return
+                yield from page
+        finally:
+            from_thread.run(pages.aclose)
 
-def enrich_trip_data(trips):
-    """Enrich trip data with driver, vehicle and date/time info"""
+async def fetch_rollup_data(start_date, end_date, vehicle_ids=None, driver_ids=None):
+    """Fetch daily rollup cells and resolve the driver/vehicle names they reference"""
     try:
-        logger.info(f"Enriching {len(trips)} trips with additional data")
-        enriched_trips = []
+        if vehicle_ids and not isinstance(vehicle_ids, list):
+            vehicle_ids = [vehicle_ids]
+        if driver_ids and not isinstance(driver_ids, list):
+            driver_ids = [driver_ids]
+        
+        # Picks up trips written by other workers, so the totals match the trip log read alongside
+        await trip_rollups.sync(start_date, end_date)
+        cells = await trip_rollups.cells(start_date, end_date, vehicle_ids, driver_ids)
+        logger.info(f"Found {len(cells)} rollup cells")
         
+        names = NameResolver()
+        for cell in cells:
+            names.add_driver(cell.driver_id)
+            names.add_vehicle(cell.vehicle_id)
+        await names.load()
+        
+        return cells, names
+    except Exception as e:
+        logger.error(f"Error fetching rollup data: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise
+
+async def enrich_trip_data(trips, names=None):
+    """
+    Attach driver names and vehicle registrations to decoded trip records.
+    
+    Records are updated in place and returned. Pass the same NameResolver
+    for successive pages of one export so names already resolved are not
+    looked up again.
+    """
+    try:
+        logger.debug("Enriching %d trips with additional data", len(trips))
+        
+        # Resolve driver names and vehicle registrations in one batch
+        names = names or NameResolver()
         for trip in trips:
-            try:
-                # Get driver info
-                driver_response = supabase.table("drivers").select("name").eq("id", trip["driver_id"]).execute()
-                
-                # Get vehicle info
-                vehicle_response = supabase.table("vehicles").select("reg_no").eq("id", trip["vehicle_id"]).execute()
-                
-                # Calculate efficiency
-                efficiency = 0
-                collected = float(trip.get("collected_amount", 0) or 0)
-                expected = 0
-                
-                # Safely handle expected_amount which might not exist in the database
-                if trip.get("expected_amount") and str(trip.get("expected_amount")).strip().lower() not in ["none", "null", ""]:
-                    try:
-                        expected = float(trip.get("expected_amount"))
-                        if expected > 0:
-                            efficiency = (collected / expected) * 100
-                    except (ValueError, TypeError) as err:
-                        logger.warning(f"Invalid expected_amount for trip {trip.get('id')}: {err}")
-                        expected = 0
-                
-                # Add date and time fields
-                collection_date = None
-                collection_time_only = None
-                if trip.get("collection_time"):
-                    try:
-                        dt_obj = datetime.fromisoformat(trip["collection_time"].replace('Z', '+00:00'))
-                        collection_date = dt_obj.strftime("%Y-%m-%d")
-                        collection_time_only = dt_obj.strftime("%H:%M:%S")
-                    except (ValueError, TypeError) as err:
-                        logger.warning(f"Invalid collection_time for trip {trip.get('id')}: {err}")
-                
-                # Ensure expense fields exist with default values
-                fuel_expense = 0
-                repair_expense = 0
-                other_expense = 0
-                
-                # Safely parse expense fields that might not exist
-                try:
-                    repair_expense = float(trip.get("repair_expense", 0) or 0)
-                except (ValueError, TypeError) as err:
-                    logger.warning(f"Invalid repair_expense for trip {trip.get('id')}: {err}")
-                    repair_expense = 0
-                    
-                try:
-                    fuel_expense = float(trip.get("fuel_expense", 0) or 0)
-                except (ValueError, TypeError) as err:
-                    logger.warning(f"Invalid fuel_expense for trip {trip.get('id')}: {err}")
-                    fuel_expense = 0
-                    
-                try:
-                    other_expense = float(trip.get("other_expense", 0) or 0)
-                except (ValueError, TypeError) as err:
-                    logger.warning(f"Invalid other_expense for trip {trip.get('id')}: {err}")
-                    other_expense = 0
-                    
-                total_trip_expense = fuel_expense + repair_expense + other_expense
-                
-                # Create enriched trip object
-                enriched_trip = {
-                    **trip,
-                    "driver_name": driver_response.data[0]["name"] if driver_response.data else "Unknown",
-                    "vehicle_registration": vehicle_response.data[0]["reg_no"] if vehicle_response.data else "Unknown",
-                    "efficiency": efficiency,
-                    "collection_date": collection_date,
-                    "collection_time_only": collection_time_only,
-                    "fuel_expense": fuel_expense,
-                    "repair_expense": repair_expense,
-                    "other_expense": other_expense,
-                    "total_expense": total_trip_expense,
-                    "expected_amount": expected  # Add expected_amount to the enriched trip
-                }
-                
-                enriched_trips.append(enriched_trip)
-            except Exception as trip_error:
-                logger.error(f"Error enriching trip {trip.get('id', 'unknown')}: {str(trip_error)}")
-                logger.debug(f"Trip data that caused error: {trip}")
-                # Continue with other trips instead of failing completely
-        
-        logger.info(f"Successfully enriched {len(enriched_trips)} trips")
-        return enriched_trips
+            names.add_driver(trip.driver_id)
+            names.add_vehicle(trip.vehicle_id)
+        await names.load()
+        
+        for trip in trips:
+            trip.driver_name = names.driver_name(trip.driver_id, "Unknown")
+            trip.vehicle_registration = names.vehicle_reg_no(trip.vehicle_id, "Unknown")
+        
+        logger.debug("Successfully enriched %d trips", len(trips))
+        return trips
     except Exception as e:
         logger.error(f"Error in enrich_trip_data: {str(e)}")
         logger.error(traceback.format_exc())
         raise
 
-def process_daily_performance(trips):
-    """Process trips to get daily performance data"""
+def process_daily_performance(cells):
+    """Process rollup cells to get daily performance data"""
     try:
-        logger.info(f"Processing daily performance for {len(trips)} trips")
+        logger.info(f"Processing daily performance for {len(cells)} rollup cells")
         daily_data = {}
         
-        for trip in trips:
-            if not trip.get("collection_date"):
-                logger.warning(f"Trip {trip.get('id', 'unknown')} has no collection_date, skipping")
-                continue
-                
-            date_str = trip["collection_date"]
+        for cell in cells:
+            date_str = cell.day.isoformat()
             
             if date_str not in daily_data:
                 daily_data[date_str] = {
@@ -252,13 +501,9 @@ def process_daily_performance(trips):
                 }
             
             # Add data
-            try:
-                daily_data[date_str]["collections"] += float(trip.get("collected_amount", 0) or 0)
-                daily_data[date_str]["expenses"] += float(trip.get("total_expense", 0) or 0)
-                daily_data[date_str]["trips"] += 1
-            except (ValueError, TypeError) as err:
-                logger.warning(f"Error adding trip {trip.get('id', 'unknown')} data for date {date_str}: {err}")
-                # Continue processing other fields
+            daily_data[date_str]["collections"] += cell.collected_amount
+            daily_data[date_str]["expenses"] += cell.fuel_expense + cell.repair_expense + cell.other_expense
+            daily_data[date_str]["trips"] += cell.trip_count
         
         # Convert to sorted list
         result = [v for k, v in sorted(daily_data.items())]
@@ -269,18 +514,178 @@ def process_daily_performance(trips):
         logger.error(traceback.format_exc())
         raise
 
-@router.get("/driver/{driver_id}", response_class=StreamingResponse)
-async def generate_driver_report(
-    driver_id: str,
-    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    format: ReportFormat = Query(ReportFormat.PDF, description="Report format (pdf or html)"),
-    current_user = Depends(get_current_active_user)
-) -> Any:
+def driver_report_context(driver, enriched_trips, cells, names, start_date, end_date):
+    """Template context of a driver report, from the driver's enriched trips and rollup cells"""
+    # Process driver performance metrics
+    logger.info("Processing driver performance metrics")
+    total_collections = 0
+    total_expected = 0
+    total_expenses = 0
+    trip_count = 0
+    vehicles_data = {}
+    
+    for cell in cells:
+        # Get basic metrics
+        collected_amount = cell.collected_amount
+        
+        total_collections += collected_amount
+        total_expected += cell.expected_amount
+        total_expenses += cell.fuel_expense + cell.repair_expense + cell.other_expense
+        trip_count += cell.trip_count
+        
+        # Track vehicles
+        vehicle_id = cell.vehicle_id
+        
+        if vehicle_id:
+            if vehicle_id not in vehicles_data:
+                vehicles_data[vehicle_id] = {
+                    "vehicle_id": vehicle_id,
+                    "registration": names.vehicle_reg_no(vehicle_id, "Unknown"),
+                    "trip_count": 0,
+                    "total_collections": 0
+                }
+            
+            vehicles_data[vehicle_id]["trip_count"] += cell.trip_count
+            vehicles_data[vehicle_id]["total_collections"] += collected_amount
+        
+    # Calculate derived metrics
+    avg_per_trip = total_collections / trip_count if trip_count > 0 else 0
+    collection_efficiency = (total_collections / total_expected * 100) if total_expected > 0 else 0
+    net_profit = total_collections - total_expenses
+
+    logger.info(f"Driver metrics calculated: trips={trip_count}, collections={total_collections}, expenses={total_expenses}")
+    
+    # Prepare driver performance data
+    driver_performance = {
+        **driver,
+        "total_collections": total_collections,
+        "total_expenses": total_expenses,
+        "net_profit": net_profit,
+        "trip_count": trip_count,
+        "avg_per_trip": avg_per_trip,
+        "collection_efficiency": collection_efficiency,
+        "vehicles_driven": list(vehicles_data.values()),
+    }
+    
+    # Process daily performance
+    daily_data = process_daily_performance(cells)
+    
+    # Prepare the report context
+    context = {
+        "driver": driver_performance,
+        "trips": enriched_trips,
+        "daily_data": daily_data,
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "report_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    
+    return context
+
+def vehicle_report_context(vehicle_base, enriched_trips, cells, names, start_date, end_date):
+    """Template context of a vehicle report, from the vehicle's enriched trips and rollup cells"""
+    # Process vehicle performance metrics
+    total_collections = 0
+    fuel_expense = 0
+    repair_expense = 0
+    other_expense = 0
+    total_expenses = 0
+    trip_count = 0
+    active_days = set()
+    drivers_data = {}
+    routes_data = {}
+    
+    for cell in cells:
+        # Get basic metrics
+        collected_amount = cell.collected_amount
+        
+        total_collections += collected_amount
+        fuel_expense += cell.fuel_expense
+        repair_expense += cell.repair_expense
+        other_expense += cell.other_expense
+        total_expenses += cell.fuel_expense + cell.repair_expense + cell.other_expense
+        trip_count += cell.trip_count
+        
+        # Track active days
+        active_days.add(cell.day)
+        
+        # Track drivers
+        driver_id = cell.driver_id
+        
+        if driver_id:
+            if driver_id not in drivers_data:
+                drivers_data[driver_id] = {
+                    "driver_id": driver_id,
+                    "name": names.driver_name(driver_id, "Unknown"),
+                    "trip_count": 0,
+                    "total_collections": 0
+                }
+            
+            drivers_data[driver_id]["trip_count"] += cell.trip_count
+            drivers_data[driver_id]["total_collections"] += collected_amount
+    
+    # Routes are not part of the rollups, so take them from the trip list
+    for trip in enriched_trips:
+        collected_amount = trip.collected_amount
+        
+        # Track routes
+        route_id = trip.route_id
+        route_name = trip.route_name
+        
+        if route_id and route_name:
+            if route_id not in routes_data:
+                routes_data[route_id] = {
+                    "route_id": route_id,
+                    "name": route_name,
+                    "trip_count": 0,
+                    "total_collections": 0
+                }
+            
+            routes_data[route_id]["trip_count"] += 1
+            routes_data[route_id]["total_collections"] += collected_amount
+    
+    # Calculate derived metrics
+    net_profit = total_collections - total_expenses
+    profit_per_trip = net_profit / trip_count if trip_count > 0 else 0
+    date_range_days = (end_date - start_date).days + 1
+    utilization_rate = (len(active_days) / date_range_days * 100) if date_range_days > 0 else 0
+    
+    # Prepare vehicle performance data
+    vehicle_performance = {
+        **vehicle_base,
+        "total_collections": total_collections,
+        "fuel_expense": fuel_expense,
+        "repair_expense": repair_expense,
+        "other_expense": other_expense,
+        "total_expenses": total_expenses,
+        "net_profit": net_profit,
+        "trip_count": trip_count,
+        "profit_per_trip": profit_per_trip,
+        "utilization_rate": utilization_rate
+    }
+    
+    # Process daily performance
+    daily_data = process_daily_performance(cells)
+    
+    # Prepare the report context
+    context = {
+        "vehicle": vehicle_performance,
+        "trips": enriched_trips,
+        "daily_data": daily_data,
+        "vehicle_drivers": list(drivers_data.values()),
+        "vehicle_routes": list(routes_data.values()),
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "report_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    
+    return context
+
+async def build_driver_report(driver_id, start_date, end_date, format):
     """
-    Generate a detailed performance report for a specific driver.
+    Build a detailed performance report for a specific driver.
     
-    Returns a formatted document containing:
+    Returns a ReportDocument containing:
     - Trip counts, collections, and efficiency metrics
     - Vehicles used by the driver
     - Daily performance breakdown
@@ -321,145 +726,66 @@ async def generate_driver_report(
                     detail="Invalid end_date format. Use YYYY-MM-DD."
                 )
         
-        # Check if driver exists
-        logger.info(f"Checking if driver with ID {driver_id} exists")
-        driver_response = supabase.table("drivers").select("*").eq("id", driver_id).execute()
+        # The driver, the daily rollups and (for PDFs) the trip log are read at once.
+        # Totals come from the rollups, the trip list is only used for the log,
+        # which HTML reports read while they are sent.
+        logger.info(f"Fetching driver {driver_id} and trip data from {parsed_start_date} to {parsed_end_date}")
+        reads = [
+            reference.drivers.get(driver_id),
+            fetch_rollup_data(parsed_start_date, parsed_end_date, driver_ids=driver_id)
+        ]
+        if format != ReportFormat.HTML:
+            reads.append(fetch_trip_data(parsed_start_date, parsed_end_date, driver_ids=driver_id))
+        driver, (cells, names), *trips = await fan_out(*reads)
         
-        if not driver_response.data:
+        if not driver:
             logger.error(f"Driver with ID {driver_id} not found")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Driver not found"
             )
         
-        driver = driver_response.data[0]
-        logger.info(f"Found driver: {driver.get('name', 'Unknown')}")
+        logger.info(f"Found driver {driver.get('name', 'Unknown')}")
         
-        # Get and enrich trip data
-        logger.info(f"Fetching trip data for driver from {parsed_start_date} to {parsed_end_date}")
-        trips = fetch_trip_data(parsed_start_date, parsed_end_date, driver_ids=driver_id)
-        logger.info(f"Found {len(trips)} trips for driver")
+        if format == ReportFormat.HTML:
+            trip_log = TripLog(parsed_start_date, parsed_end_date, driver_ids=driver_id, names=names)
+        else:
+            trip_log = await enrich_trip_data(trips[0], names)
         
-        enriched_trips = enrich_trip_data(trips)
+        context = driver_report_context(driver, trip_log, cells, names, parsed_start_date, parsed_end_date)
         
-        # Process driver performance metrics
-        logger.info("Processing driver performance metrics")
-        total_collections = 0
-        total_expected = 0
-        total_expenses = 0
-        trip_count = len(enriched_trips)
-        vehicles_data = {}
-        
-        for trip in enriched_trips:
-            # Get basic metrics
-            collected_amount = float(trip.get("collected_amount", 0) or 0)
-            expected_amount = float(trip.get("expected_amount", 0) or 0)
-            trip_expenses = float(trip.get("total_expense", 0) or 0)
-            
-            total_collections += collected_amount
-            total_expected += expected_amount
-            total_expenses += trip_expenses
-            
-            # Track vehicles
-            vehicle_id = trip.get("vehicle_id")
-            vehicle_reg = trip.get("vehicle_registration")
-            
-            if vehicle_id and vehicle_reg:
-                if vehicle_id not in vehicles_data:
-                    vehicles_data[vehicle_id] = {
-                        "vehicle_id": vehicle_id,
-                        "registration": vehicle_reg,
-                        "trip_count": 0,
-                        "total_collections": 0
-                    }
-                
-                vehicles_data[vehicle_id]["trip_count"] += 1
-                vehicles_data[vehicle_id]["total_collections"] += collected_amount
-            
-        # Calculate derived metrics
-        avg_per_trip = total_collections / trip_count if trip_count > 0 else 0
-        collection_efficiency = (total_collections / total_expected * 100) if total_expected > 0 else 0
-        net_profit = total_collections - total_expenses
-
-        logger.info(f"Driver metrics calculated: trips={trip_count}, collections={total_collections}, expenses={total_expenses}")
-        
-        # Prepare driver performance data
-        driver_performance = {
-            **driver,
-            "total_collections": total_collections,
-            "total_expenses": total_expenses,
-            "net_profit": net_profit,
-            "trip_count": trip_count,
-            "avg_per_trip": avg_per_trip,
-            "collection_efficiency": collection_efficiency,
-            "vehicles_driven": list(vehicles_data.values()),
-        }
-        
-        # Process daily performance
-        daily_data = process_daily_performance(enriched_trips)
-        
-        # Prepare the report context
-        context = {
-            "driver": driver_performance,
-            "trips": enriched_trips,
-            "daily_data": daily_data,
-            "start_date": parsed_start_date.strftime("%Y-%m-%d"),
-            "end_date": parsed_end_date.strftime("%Y-%m-%d"),
-            "report_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        logger.debug(f"Report context prepared with keys: {list(context.keys())}")
+        logger.debug("Report context prepared with keys: %s", list(context))
         
         # Generate the report in the specified format
         if format == ReportFormat.HTML:
-            # Render the HTML template directly
-            logger.info("Rendering HTML report")
-            template = template_env.get_template(f"driver_report.html")
-            html_content = template.render(**context)
-            
-            # Return HTML response
+            # Rendered while it is sent
             filename = f"{driver['name'].replace(' ', '_')}_{parsed_start_date.strftime('%Y%m%d')}_report.html"
-            logger.info(f"HTML report generated, filename: {filename}")
+            logger.info(f"Streaming HTML report, filename: {filename}")
             
-            return StreamingResponse(
-                io.StringIO(html_content),
-                media_type="text/html",
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
-            )
+            return HtmlReport(filename, "driver_report.html", context)
         else:
             # Render PDF
             logger.info("Rendering PDF report")
-            pdf_content = render_template_to_pdf("driver_report.html", context)
+            pdf_content = await render_template_to_pdf("driver_report.html", context)
             filename = f"{driver['name'].replace(' ', '_')}_{parsed_start_date.strftime('%Y%m%d')}_report.pdf"
             logger.info(f"PDF report generated, filename: {filename}")
             
-            return StreamingResponse(
-                pdf_content,
-                media_type="application/pdf",
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
-            )
+            return ReportDocument(filename, "application/pdf", pdf_content)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unhandled exception in generate_driver_report: {str(e)}")
+        logger.error(f"Unhandled exception in build_driver_report: {str(e)}")
         logger.error(traceback.format_exc())
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generating driver report: {str(e)}"
         )
 
-@router.get("/vehicle/{vehicle_id}", response_class=StreamingResponse)
-async def generate_vehicle_report(
-    vehicle_id: str,
-    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    format: ReportFormat = Query(ReportFormat.PDF, description="Report format (pdf or html)"),
-    current_user = Depends(get_current_active_user)
-) -> Any:
+async def build_vehicle_report(vehicle_id, start_date, end_date, format):
     """
-    Generate a detailed performance report for a specific vehicle.
+    Build a detailed performance report for a specific vehicle.
     
-    Returns a formatted document containing:
+    Returns a ReportDocument containing:
     - Collections, expenses, and profit metrics
     - Expense breakdown by category
     - Driver performance with this vehicle
@@ -493,141 +819,37 @@ async def generate_vehicle_report(
                     detail="Invalid end_date format. Use YYYY-MM-DD."
                 )
         
-        # Check if vehicle exists
-        vehicle_response = supabase.table("vehicles").select("*").eq("id", vehicle_id).execute()
+        # The vehicle, the trip log and the daily rollups are read at once.
+        # Totals come from the rollups. The trip list is read in full even for
+        # HTML, because the route breakdown comes from it and precedes the log.
+        vehicle_base, trips, (cells, names) = await fan_out(
+            reference.vehicles.get(vehicle_id),
+            fetch_trip_data(parsed_start_date, parsed_end_date, vehicle_ids=vehicle_id),
+            fetch_rollup_data(parsed_start_date, parsed_end_date, vehicle_ids=vehicle_id)
+        )
         
-        if not vehicle_response.data:
+        if not vehicle_base:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Vehicle not found"
             )
         
-        vehicle_base = vehicle_response.data[0]
-        
-        # Get and enrich trip data
-        trips = fetch_trip_data(parsed_start_date, parsed_end_date, vehicle_ids=vehicle_id)
-        enriched_trips = enrich_trip_data(trips)
-        
-        # Process vehicle performance metrics
-        total_collections = 0
-        fuel_expense = 0
-        repair_expense = 0
-        other_expense = 0
-        total_expenses = 0
-        trip_count = len(enriched_trips)
-        active_days = set()
-        drivers_data = {}
-        routes_data = {}
-        
-        for trip in enriched_trips:
-            # Get basic metrics
-            collected_amount = float(trip.get("collected_amount", 0) or 0)
-            trip_fuel_expense = float(trip.get("fuel_expense", 0) or 0)
-            trip_repair_expense = float(trip.get("repair_expense", 0) or 0)
-            trip_other_expense = float(trip.get("other_expense", 0) or 0)
-            trip_expense = trip_fuel_expense + trip_repair_expense + trip_other_expense
-            
-            total_collections += collected_amount
-            fuel_expense += trip_fuel_expense
-            repair_expense += trip_repair_expense
-            other_expense += trip_other_expense
-            total_expenses += trip_expense
-            
-            # Track active days
-            if trip.get("collection_date"):
-                active_days.add(trip["collection_date"])
-            
-            # Track drivers
-            driver_id = trip.get("driver_id")
-            driver_name = trip.get("driver_name")
-            
-            if driver_id and driver_name:
-                if driver_id not in drivers_data:
-                    drivers_data[driver_id] = {
-                        "driver_id": driver_id,
-                        "name": driver_name,
-                        "trip_count": 0,
-                        "total_collections": 0
-                    }
-                
-                drivers_data[driver_id]["trip_count"] += 1
-                drivers_data[driver_id]["total_collections"] += collected_amount
-            
-            # Track routes
-            route_id = trip.get("route_id")
-            route_name = trip.get("route_name")
-            
-            if route_id and route_name:
-                if route_id not in routes_data:
-                    routes_data[route_id] = {
-                        "route_id": route_id,
-                        "name": route_name,
-                        "trip_count": 0,
-                        "total_collections": 0
-                    }
-                
-                routes_data[route_id]["trip_count"] += 1
-                routes_data[route_id]["total_collections"] += collected_amount
-        
-        # Calculate derived metrics
-        net_profit = total_collections - total_expenses
-        profit_per_trip = net_profit / trip_count if trip_count > 0 else 0
-        date_range_days = (parsed_end_date - parsed_start_date).days + 1
-        utilization_rate = (len(active_days) / date_range_days * 100) if date_range_days > 0 else 0
-        
-        # Prepare vehicle performance data
-        vehicle_performance = {
-            **vehicle_base,
-            "total_collections": total_collections,
-            "fuel_expense": fuel_expense,
-            "repair_expense": repair_expense,
-            "other_expense": other_expense,
-            "total_expenses": total_expenses,
-            "net_profit": net_profit,
-            "trip_count": trip_count,
-            "profit_per_trip": profit_per_trip,
-            "utilization_rate": utilization_rate
-        }
-        
-        # Process daily performance
-        daily_data = process_daily_performance(enriched_trips)
+        enriched_trips = await enrich_trip_data(trips, names)
         
-        # Prepare the report context
-        context = {
-            "vehicle": vehicle_performance,
-            "trips": enriched_trips,
-            "daily_data": daily_data,
-            "vehicle_drivers": list(drivers_data.values()),
-            "vehicle_routes": list(routes_data.values()),
-            "start_date": parsed_start_date.strftime("%Y-%m-%d"),
-            "end_date": parsed_end_date.strftime("%Y-%m-%d"),
-            "report_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        context = vehicle_report_context(vehicle_base, enriched_trips, cells, names, parsed_start_date, parsed_end_date)
         
         # Generate the report in the specified format
         if format == ReportFormat.HTML:
-            # Render the HTML template directly
-            template = template_env.get_template("vehicle_report.html")
-            html_content = template.render(**context)
-            
-            # Return HTML response
+            # Rendered while it is sent
             filename = f"{vehicle_base['reg_no'].replace(' ', '_')}_{parsed_start_date.strftime('%Y%m%d')}_report.html"
             
-            return StreamingResponse(
-                io.StringIO(html_content),
-                media_type="text/html",
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
-            )
+            return HtmlReport(filename, "vehicle_report.html", context)
         else:
             # Render PDF
-            pdf_content = render_template_to_pdf("vehicle_report.html", context)
+            pdf_content = await render_template_to_pdf("vehicle_report.html", context)
             filename = f"{vehicle_base['reg_no'].replace(' ', '_')}_{parsed_start_date.strftime('%Y%m%d')}_report.pdf"
             
-            return StreamingResponse(
-                pdf_content,
-                media_type="application/pdf",
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
-            )
+            return ReportDocument(filename, "application/pdf", pdf_content)
     except HTTPException:
         raise
     except Exception as e:
@@ -636,19 +858,11 @@ async def generate_vehicle_report(
             detail=f"Error generating vehicle report: {str(e)}"
         )
 
-@router.get("/combined", response_class=StreamingResponse)
-async def generate_combined_report(
-    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    vehicle_ids: Optional[str] = Query(None, description="Comma-separated list of vehicle IDs"),
-    driver_ids: Optional[str] = Query(None, description="Comma-separated list of driver IDs"),
-    format: ReportFormat = Query(ReportFormat.PDF, description="Report format (pdf or html)"),
-    current_user = Depends(get_current_active_user)
-) -> Any:
+async def build_combined_report(start_date, end_date, vehicle_ids, driver_ids, format):
     """
-    Generate a combined performance report for multiple vehicles and/or drivers.
+    Build a combined performance report for multiple vehicles and/or drivers.
     
-    Returns a formatted document containing:
+    Returns a ReportDocument containing:
     - Overall summary metrics
     - Vehicle performance breakdown
     - Driver performance breakdown
@@ -686,220 +900,33 @@ async def generate_combined_report(
                     detail="Invalid end_date format. Use YYYY-MM-DD."
                 )
         
-        # Fetch vehicle and driver details
-        vehicles_data = {}
-        if vehicle_id_list:
-            vehicles_response = supabase.table("vehicles").select("*").in_("id", vehicle_id_list).execute()
-            for vehicle in vehicles_response.data:
-                vehicles_data[vehicle["id"]] = vehicle
-        
-        drivers_data = {}
-        if driver_id_list:
-            drivers_response = supabase.table("drivers").select("*").in_("id", driver_id_list).execute()
-            for driver in drivers_response.data:
-                drivers_data[driver["id"]] = driver
-        
-        # Get and enrich trip data
-        trips = fetch_trip_data(parsed_start_date, parsed_end_date, vehicle_id_list, driver_id_list)
-        enriched_trips = enrich_trip_data(trips)
-        
-        # Process metrics
-        total_collections = 0
-        total_fuel_expense = 0
-        total_repair_expense = 0
-        total_other_expense = 0
-        total_expenses = 0
-        trip_count = len(enriched_trips)
-        active_days = set()
-        vehicle_metrics = {}
-        driver_metrics = {}
-        routes_data = {}
-        
-        # Initialize metrics dictionaries
-        for v_id in vehicles_data:
-            vehicle_metrics[v_id] = {
-                "vehicle_id": v_id,
-                "registration": vehicles_data[v_id]["reg_no"],
-                "total_collections": 0,
-                "fuel_expense": 0,
-                "repair_expense": 0,
-                "other_expense": 0,
-                "total_expenses": 0,
-                "trip_count": 0,
-                "active_days": set(),
-                "drivers": {}
-            }
-        
-        for d_id in drivers_data:
-            driver_metrics[d_id] = {
-                "driver_id": d_id,
-                "name": drivers_data[d_id]["name"],
-                "total_collections": 0,
-                "total_expected": 0,
-                "trip_count": 0,
-                "vehicles": {},
-                "routes": {}
-            }
-        
-        # Process trip data
-        for trip in enriched_trips:
-            # Extract basic metrics
-            collected_amount = float(trip.get("collected_amount", 0) or 0)
-            expected_amount = float(trip.get("expected_amount", 0) or 0)
-            fuel_exp = float(trip.get("fuel_expense", 0) or 0)
-            repair_exp = float(trip.get("repair_expense", 0) or 0)
-            other_exp = float(trip.get("other_expense", 0) or 0)
-            total_trip_expense = fuel_exp + repair_exp + other_exp
-            
-            # Update overall totals
-            total_collections += collected_amount
-            total_fuel_expense += fuel_exp
-            total_repair_expense += repair_exp
-            total_other_expense += other_exp
-            total_expenses += total_trip_expense
-            
-            # Track active days
-            if trip.get("collection_date"):
-                active_days.add(trip["collection_date"])
-            
-            # Update vehicle metrics
-            v_id = trip.get("vehicle_id")
-            if v_id and v_id in vehicle_metrics:
-                vm = vehicle_metrics[v_id]
-                vm["total_collections"] += collected_amount
-                vm["fuel_expense"] += fuel_exp
-                vm["repair_expense"] += repair_exp
-                vm["other_expense"] += other_exp
-                vm["total_expenses"] += total_trip_expense
-                vm["trip_count"] += 1
-                if trip.get("collection_date"):
-                    vm["active_days"].add(trip["collection_date"])
-                
-                # Track drivers for this vehicle
-                d_id = trip.get("driver_id")
-                if d_id:
-                    if d_id not in vm["drivers"]:
-                        vm["drivers"][d_id] = {
-                            "name": trip.get("driver_name", "Unknown"),
-                            "trip_count": 0,
-                            "total_collections": 0
-                        }
-                    vm["drivers"][d_id]["trip_count"] += 1
-                    vm["drivers"][d_id]["total_collections"] += collected_amount
-            
-            # Update driver metrics
-            d_id = trip.get("driver_id")
-            if d_id and d_id in driver_metrics:
-                dm = driver_metrics[d_id]
-                dm["total_collections"] += collected_amount
-                dm["total_expected"] += expected_amount
-                dm["trip_count"] += 1
-                
-                # Track vehicles for this driver
-                if v_id:
-                    if v_id not in dm["vehicles"]:
-                        dm["vehicles"][v_id] = {
-                            "registration": trip.get("vehicle_registration", "Unknown"),
-                            "trip_count": 0,
-                            "total_collections": 0
-                        }
-                    dm["vehicles"][v_id]["trip_count"] += 1
-                    dm["vehicles"][v_id]["total_collections"] += collected_amount
-                
-                # Track routes
-                route_id = trip.get("route_id")
-                route_name = trip.get("route_name")
-                if route_id and route_name:
-                    if route_id not in dm["routes"]:
-                        dm["routes"][route_id] = {
-                            "name": route_name,
-                            "trip_count": 0,
-                            "total_collections": 0,
-                            "total_expected": 0
-                        }
-                    dm["routes"][route_id]["trip_count"] += 1
-                    dm["routes"][route_id]["total_collections"] += collected_amount
-                    dm["routes"][route_id]["total_expected"] += expected_amount
-        
-        # Calculate derived metrics
-        date_range_days = (parsed_end_date - parsed_start_date).days + 1
-        overall_utilization = (len(active_days) / date_range_days * 100) if date_range_days > 0 else 0
-        
-        # Process vehicle metrics
-        vehicles_list = []
-        for v_id, vm in vehicle_metrics.items():
-            # Calculate utilization rate
-            v_utilization = (len(vm["active_days"]) / date_range_days * 100) if date_range_days > 0 else 0
-            
-            # Convert drivers dict to list
-            drivers_list = [{"driver_id": k, **v} for k, v in vm["drivers"].items()]
-            drivers_list.sort(key=lambda x: x["trip_count"], reverse=True)
-            
-            # Create final vehicle metrics
-            vehicle_data = {
-                **vm,
-                "utilization_rate": v_utilization,
-                "drivers": drivers_list,
-                "active_days": len(vm["active_days"])
-            }
-            del vehicle_data["active_days"]  # Remove the set
-            vehicles_list.append(vehicle_data)
-        
-        # Sort vehicles by total collections
-        vehicles_list.sort(key=lambda x: x["total_collections"], reverse=True)
-        
-        # Process driver metrics
-        drivers_list = []
-        for d_id, dm in driver_metrics.items():
-            # Calculate efficiency
-            efficiency = (dm["total_collections"] / dm["total_expected"] * 100) if dm["total_expected"] > 0 else 0
-            
-            # Convert vehicles dict to list
-            vehicles_list_for_driver = [{"vehicle_id": k, **v} for k, v in dm["vehicles"].items()]
-            vehicles_list_for_driver.sort(key=lambda x: x["trip_count"], reverse=True)
-            
-            # Convert routes dict to list and calculate efficiency
-            routes_list = []
-            for r_id, r_data in dm["routes"].items():
-                route_efficiency = (r_data["total_collections"] / r_data["total_expected"] * 100) if r_data["total_expected"] > 0 else 0
-                routes_list.append({
-                    "route_id": r_id,
-                    **r_data,
-                    "efficiency": route_efficiency
-                })
-            routes_list.sort(key=lambda x: x["trip_count"], reverse=True)
-            
-            # Create final driver metrics
-            driver_data = {
-                **dm,
-                "collection_efficiency": efficiency,
-                "avg_per_trip": dm["total_collections"] / dm["trip_count"] if dm["trip_count"] > 0 else 0,
-                "vehicles": vehicles_list_for_driver,
-                "routes": routes_list
-            }
-            del driver_data["total_expected"]
-            drivers_list.append(driver_data)
-        
-        # Sort drivers by total collections
-        drivers_list.sort(key=lambda x: x["total_collections"], reverse=True)
+        # Vehicle and driver details, the trip log and the daily rollups are read at once.
+        # Totals come from the rollups, the trip list is only used for the log.
+        vehicles_data, drivers_data, trips, (cells, names) = await fan_out(
+            reference.vehicles.get_many(vehicle_id_list or []),
+            reference.drivers.get_many(driver_id_list or []),
+            fetch_trip_data(parsed_start_date, parsed_end_date, vehicle_id_list, driver_id_list),
+            fetch_rollup_data(parsed_start_date, parsed_end_date, vehicle_id_list, driver_id_list)
+        )
+        enriched_trips = await enrich_trip_data(trips, names)
+        
+        # Summary, vehicle and driver metrics, grouped over columnar copies of the cells and trips
+        summary, vehicles_list, drivers_list = combined_report_metrics(
+            cells,
+            enriched_trips,
+            parsed_start_date,
+            parsed_end_date,
+            vehicles_data,
+            drivers_data,
+            names
+        )
         
         # Process daily performance
-        daily_data = process_daily_performance(enriched_trips)
+        daily_data = process_daily_performance(cells)
         
         # Prepare the report context
         context = {
-            "summary": {
-                "total_collections": total_collections,
-                "total_expenses": total_expenses,
-                "fuel_expense": total_fuel_expense,
-                "repair_expense": total_repair_expense,
-                "other_expense": total_other_expense,
-                "net_profit": total_collections - total_expenses,
-                "trip_count": trip_count,
-                "utilization_rate": overall_utilization,
-                "active_days": len(active_days),
-                "total_days": date_range_days
-            },
+            "summary": summary,
             "vehicles": vehicles_list,
             "drivers": drivers_list,
             "daily_data": daily_data,
@@ -911,32 +938,462 @@ async def generate_combined_report(
         
         # Generate the report in the specified format
         if format == ReportFormat.HTML:
-            # Render the HTML template directly
-            template = template_env.get_template("combined_report.html")
-            html_content = template.render(**context)
-            
-            # Return HTML response
+            # Rendered while it is sent
             filename = f"combined_report_{parsed_start_date.strftime('%Y%m%d')}.html"
             
-            return StreamingResponse(
-                io.StringIO(html_content),
-                media_type="text/html",
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
-            )
+            return HtmlReport(filename, "combined_report.html", context)
         else:
             # Render PDF
-            pdf_content = render_template_to_pdf("combined_report.html", context)
+            pdf_content = await render_template_to_pdf("combined_report.html", context)
             filename = f"combined_report_{parsed_start_date.strftime('%Y%m%d')}.pdf"
             
-            return StreamingResponse(
-                pdf_content,
-                media_type="application/pdf",
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
-            )
+            return ReportDocument(filename, "application/pdf", pdf_content)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generating combined report: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+class ZipSink:
+    """
+    Write-only file for zipfile.ZipFile that hands out the bytes written so
+    far. It cannot seek, so the archive is written with data descriptors and
+    can be streamed entry by entry.
+    """
+    def __init__(self):
+        self._chunks = []
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+class BundleEntry:
+    """One report of a bundle, ready to render"""
+    __slots__ = ("entity_id", "filename", "template_name", "context")
+    
+    def __init__(self, entity_id, filename, template_name, context):
+        self.entity_id = entity_id
+        self.filename = filename
+        self.template_name = template_name
+        self.context = context
+
+async def load_report_bundle(kind, start_date, end_date, format):
+    """
+    Report contexts for every driver or vehicle with trips in the range.
+    
+    The range's trips are fetched and enriched once and its rollup cells
+    read once, then both are partitioned by driver or vehicle, instead of
+    running a full report pipeline per entity.
+    """
+    try:
+        logger.info(f"Loading {kind.value} report bundle from {start_date} to {end_date}")
+        key = "driver_id" if kind == BundleKind.DRIVERS else "vehicle_id"
+        
+        trips, (cells, names) = await fan_out(
+            fetch_trip_data(start_date, end_date),
+            fetch_rollup_data(start_date, end_date)
+        )
+        enriched_trips = await enrich_trip_data(trips, names)
+        
+        trips_by_entity = {}
+        for trip in enriched_trips:
+            trips_by_entity.setdefault(getattr(trip, key), []).append(trip)
+        cells_by_entity = {}
+        for cell in cells:
+            cells_by_entity.setdefault(getattr(cell, key), []).append(cell)
+        
+        entity_ids = [i for i in {**cells_by_entity, **trips_by_entity} if i]
+        if kind == BundleKind.DRIVERS:
+            entities = await reference.drivers.get_many(entity_ids)
+        else:
+            entities = await reference.vehicles.get_many(entity_ids)
+        
+        entries = []
+        extension = "html" if format == ReportFormat.HTML else "pdf"
+        for entity_id, entity in entities.items():
+            entity_trips = trips_by_entity.get(entity_id, [])
+            entity_cells = cells_by_entity.get(entity_id, [])
+            if kind == BundleKind.DRIVERS:
+                name = entity["name"]
+                template_name = "driver_report.html"
+                context = driver_report_context(entity, entity_trips, entity_cells, names, start_date, end_date)
+            else:
+                name = entity["reg_no"]
+                template_name = "vehicle_report.html"
+                context = vehicle_report_context(entity, entity_trips, entity_cells, names, start_date, end_date)
+            
+            filename = f"{name.replace(' ', '_')}_{start_date.strftime('%Y%m%d')}_report.{extension}"
+            entries.append(BundleEntry(entity_id, filename, template_name, context))
+        
+        entries.sort(key=lambda entry: entry.filename)
+        logger.info(f"Report bundle has {len(entries)} {kind.value} reports")
+        return entries
+    except Exception as e:
+        logger.error(f"Error loading report bundle: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating report bundle: {str(e)}"
+        )
+
+async def render_bundle_entry(entry, format):
+    """Render one bundle report to a ReportDocument"""
+    if format == ReportFormat.HTML:
+        return await asyncio.to_thread(HtmlReport(entry.filename, entry.template_name, entry.context).render)
+    pdf_content = await render_template_to_pdf(entry.template_name, entry.context)
+    return ReportDocument(entry.filename, "application/pdf", pdf_content)
+
+async def stream_report_bundle(entries, format):
+    """
+    Yield a ZIP archive of the bundle's reports as they are rendered.
+    
+    Up to REPORT_PDF_WORKERS reports render at once (each in its own pool
+    worker), so a large bundle does not fill the render queue ahead of other
+    requests. Reports that fail, for whatever reason, are listed in
+    errors.txt instead of cutting the archive short.
+    """
+    semaphore = asyncio.Semaphore(max(settings.REPORT_PDF_WORKERS, 1))
+    
+    async def render(entry):
+        async with semaphore:
+            try:
+                return entry, await render_bundle_entry(entry, format), None
+            except HTTPException as e:
+                logger.error(f"Bundle report {entry.filename} failed: {e.detail}")
+                return entry, None, str(e.detail)
+            except Exception as e:
+                # The archive's headers are already sent, so nothing may escape the stream
+                logger.exception(f"Bundle report {entry.filename} failed")
+                return entry, None, f"{type(e).__name__}: {str(e)}"
+    
+    tasks = [asyncio.ensure_future(render(entry)) for entry in entries]
+    sink = ZipSink()
+    archive = zipfile.ZipFile(sink, "w")
+    compression = zipfile.ZIP_DEFLATED if format == ReportFormat.HTML else zipfile.ZIP_STORED
+    filenames = set()
+    errors = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            entry, document, error = await next_done
+            if error:
+                errors.append(f"{entry.filename}: {error}")
+                continue
+            
+            # Two drivers (or vehicles) can share a name
+            filename = document.filename
+            if filename in filenames:
+                filename = f"{entry.entity_id}_{filename}"
+            filenames.add(filename)
+            
+            archive.writestr(filename, document.content, compress_type=compression)
+            yield sink.take()
+        
+        if errors:
+            archive.writestr("errors.txt", "\n".join(errors) + "\n", compress_type=zipfile.ZIP_DEFLATED)
+        archive.close()
+        yield sink.take()
+        logger.info(f"Report bundle sent: {len(filenames)} reports, {len(errors)} failed")
+    finally:
+        # Stop rendering if the client went away
+        for task in tasks:
+            task.cancel()
+
+def bundle_filename(kind, start_date, end_date):
+    return f"{kind.value}_reports_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.zip"
+
+@router.get("/driver/{driver_id}", response_class=Response)
+async def generate_driver_report(
+    driver_id: str,
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    format: ReportFormat = Query(ReportFormat.PDF, description="Report format (pdf or html)"),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Generate a detailed performance report for a specific driver.
+    
+    Returns a formatted document containing:
+    - Trip counts, collections, and efficiency metrics
+    - Vehicles used by the driver
+    - Daily performance breakdown
+    - Complete trip logs
+    """
+    key = await report_cache_key("driver_report.html", start_date, end_date, format, driver_ids=[driver_id])
+    document = await cached_report(key, lambda: build_driver_report(driver_id, start_date, end_date, format))
+    return document_response(document, key)
+
+@router.get("/vehicle/{vehicle_id}", response_class=Response)
+async def generate_vehicle_report(
+    vehicle_id: str,
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    format: ReportFormat = Query(ReportFormat.PDF, description="Report format (pdf or html)"),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Generate a detailed performance report for a specific vehicle.
+    
+    Returns a formatted document containing:
+    - Collections, expenses, and profit metrics
+    - Expense breakdown by category
+    - Driver performance with this vehicle
+    - Daily performance breakdown
+    - Complete trip logs
+    """
+    key = await report_cache_key("vehicle_report.html", start_date, end_date, format, vehicle_ids=[vehicle_id])
+    document = await cached_report(key, lambda: build_vehicle_report(vehicle_id, start_date, end_date, format))
+    return document_response(document, key)
+
+@router.get("/combined", response_class=Response)
+async def generate_combined_report(
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    vehicle_ids: Optional[str] = Query(None, description="Comma-separated list of vehicle IDs"),
+    driver_ids: Optional[str] = Query(None, description="Comma-separated list of driver IDs"),
+    format: ReportFormat = Query(ReportFormat.PDF, description="Report format (pdf or html)"),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Generate a combined performance report for multiple vehicles and/or drivers.
+    
+    Returns a formatted document containing:
+    - Overall summary metrics
+    - Vehicle performance breakdown
+    - Driver performance breakdown
+    - Daily performance breakdown
+    - Complete trip logs
+    """
+    key = await report_cache_key(
+        "combined_report.html", start_date, end_date, format,
+        vehicle_ids=vehicle_ids.split(",") if vehicle_ids else None,
+        driver_ids=driver_ids.split(",") if driver_ids else None
+    )
+    document = await cached_report(key, lambda: build_combined_report(start_date, end_date, vehicle_ids, driver_ids, format))
+    return document_response(document, key)
+
+@router.post("/driver/{driver_id}", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_driver_report(
+    driver_id: str,
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    format: ReportFormat = Query(ReportFormat.PDF, description="Report format (pdf or html)"),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Queue a driver report and return a job id at once.
+    
+    Poll `GET /api/reports/jobs/{job_id}` and download the document from
+    `GET /api/reports/jobs/{job_id}/download` once its status is "done".
+    """
+    resolve_report_dates(start_date, end_date)
+    
+    async def build():
+        key = await report_cache_key("driver_report.html", start_date, end_date, format, driver_ids=[driver_id])
+        return await cached_report(key, lambda: build_driver_report(driver_id, start_date, end_date, format), load=True)
+    
+    job = report_jobs.submit("driver", current_user.user_id, build)
+    return job.to_dict()
+
+@router.post("/vehicle/{vehicle_id}", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_vehicle_report(
+    vehicle_id: str,
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    format: ReportFormat = Query(ReportFormat.PDF, description="Report format (pdf or html)"),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Queue a vehicle report and return a job id at once (see submit_driver_report).
+    """
+    resolve_report_dates(start_date, end_date)
+    
+    async def build():
+        key = await report_cache_key("vehicle_report.html", start_date, end_date, format, vehicle_ids=[vehicle_id])
+        return await cached_report(key, lambda: build_vehicle_report(vehicle_id, start_date, end_date, format), load=True)
+    
+    job = report_jobs.submit("vehicle", current_user.user_id, build)
+    return job.to_dict()
+
+@router.post("/combined", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_combined_report(
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    vehicle_ids: Optional[str] = Query(None, description="Comma-separated list of vehicle IDs"),
+    driver_ids: Optional[str] = Query(None, description="Comma-separated list of driver IDs"),
+    format: ReportFormat = Query(ReportFormat.PDF, description="Report format (pdf or html)"),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Queue a combined report and return a job id at once (see submit_driver_report).
+    """
+    resolve_report_dates(start_date, end_date)
+    
+    async def build():
+        key = await report_cache_key(
+            "combined_report.html", start_date, end_date, format,
+            vehicle_ids=vehicle_ids.split(",") if vehicle_ids else None,
+            driver_ids=driver_ids.split(",") if driver_ids else None
+        )
+        return await cached_report(key, lambda: build_combined_report(start_date, end_date, vehicle_ids, driver_ids, format), load=True)
+    
+    job = report_jobs.submit("combined", current_user.user_id, build)
+    return job.to_dict()
+
+@router.get("/bundle/{kind}", response_class=StreamingResponse)
+async def generate_report_bundle(
+    kind: BundleKind,
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    format: ReportFormat = Query(ReportFormat.PDF, description="Report format (pdf or html)"),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Generate the report of every driver or every vehicle with trips in the
+    range, as one ZIP archive streamed while the reports are rendered.
+    """
+    parsed_start_date, parsed_end_date = resolve_report_dates(start_date, end_date)
+    entries = await load_report_bundle(kind, parsed_start_date, parsed_end_date, format)
+    
+    filename = bundle_filename(kind, parsed_start_date, parsed_end_date)
+    return StreamingResponse(
+        stream_report_bundle(entries, format),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@router.post("/bundle/{kind}", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_report_bundle(
+    kind: BundleKind,
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    format: ReportFormat = Query(ReportFormat.PDF, description="Report format (pdf or html)"),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Queue a report bundle and return a job id at once (see submit_driver_report).
+    """
+    parsed_start_date, parsed_end_date = resolve_report_dates(start_date, end_date)
+    
+    async def build():
+        entries = await load_report_bundle(kind, parsed_start_date, parsed_end_date, format)
+        content = b"".join([chunk async for chunk in stream_report_bundle(entries, format)])
+        return ReportDocument(bundle_filename(kind, parsed_start_date, parsed_end_date), "application/zip", content)
+    
+    job = report_jobs.submit("bundle", current_user.user_id, build)
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}", response_model=ReportJobResponse)
+async def get_report_job(job_id: str, current_user = Depends(get_current_active_user)) -> Any:
+    """
+    Get the status of a queued report: pending, running, done or failed.
+    """
+    job = report_jobs.get(job_id, current_user.user_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report job not found"
+        )
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}/download", response_class=Response)
+async def download_report_job(job_id: str, current_user = Depends(get_current_active_user)) -> Any:
+    """
+    Download the document of a finished report job.
+    
+    Returns 409 while the job is still running, and the job's own error
+    status if it failed.
+    """
+    job = report_jobs.get(job_id, current_user.user_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report job not found"
+        )
+    
+    if job.status == FAILED:
+        raise HTTPException(
+            status_code=job.error_status or status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=job.error
+        )
+    
+    if job.status != DONE:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Report is not ready yet (status: {job.status})"
+        )
+    
+    return document_response(job.document)
+
+@router.get("/driver/{driver_id}/export", response_class=StreamingResponse)
+async def export_driver_trips(
+    driver_id: str,
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    format: ExportFormat = Query(ExportFormat.CSV, description="Export format (csv or ndjson)"),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Export a driver's trip log as CSV or NDJSON, streamed page by page.
+    """
+    parsed_start_date, parsed_end_date = resolve_report_dates(start_date, end_date)
+    driver = await reference.drivers.get(driver_id)
+    if not driver:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Driver not found"
+        )
+    
+    name = (driver.get("name") or "driver").replace(" ", "_")
+    return export_response(parsed_start_date, parsed_end_date, format, name, driver_ids=driver_id)
+
+@router.get("/vehicle/{vehicle_id}/export", response_class=StreamingResponse)
+async def export_vehicle_trips(
+    vehicle_id: str,
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    format: ExportFormat = Query(ExportFormat.CSV, description="Export format (csv or ndjson)"),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Export a vehicle's trip log as CSV or NDJSON, streamed page by page.
+    """
+    parsed_start_date, parsed_end_date = resolve_report_dates(start_date, end_date)
+    vehicle = await reference.vehicles.get(vehicle_id)
+    if not vehicle:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Vehicle not found"
+        )
+    
+    name = (vehicle.get("reg_no") or "vehicle").replace(" ", "_")
+    return export_response(parsed_start_date, parsed_end_date, format, name, vehicle_ids=vehicle_id)
+
+@router.get("/combined/export", response_class=StreamingResponse)
+async def export_combined_trips(
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    vehicle_ids: Optional[str] = Query(None, description="Comma-separated list of vehicle IDs"),
+    driver_ids: Optional[str] = Query(None, description="Comma-separated list of driver IDs"),
+    format: ExportFormat = Query(ExportFormat.CSV, description="Export format (csv or ndjson)"),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Export the trip log of several vehicles and/or drivers (or the whole
+    fleet) as CSV or NDJSON, streamed page by page.
+    """
+    parsed_start_date, parsed_end_date = resolve_report_dates(start_date, end_date)
+    return export_response(
+        parsed_start_date, parsed_end_date, format, "combined",
+        vehicle_ids=vehicle_ids.split(",") if vehicle_ids else None,
+        driver_ids=driver_ids.split(",") if driver_ids else None
+    )
@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Any, Optional
 from datetime import datetime
 
-from app.core.db import supabase
+from app.core.db import db
 from app.core.security import get_current_active_user, check_admin_role
+from app.services import reference
 from app.schemas.routes import RouteCreate, RouteUpdate, RouteResponse
 from app.core.utils import DateTimeEncoder
 import json
@@ -16,7 +17,7 @@ async def create_route(route_data: RouteCreate, current_user = Depends(check_adm
     Create a new route (admin only).
     """
     try:
-        response = supabase.table("routes").insert(route_data.dict()).execute()
+        response = await db.table("routes").insert(route_data.dict()).execute()
         
         if not response.data:
             raise HTTPException(
@@ -24,6 +25,8 @@ async def create_route(route_data: RouteCreate, current_user = Depends(check_adm
                 detail="Failed to create route"
             )
         
+        reference.routes.put(response.data[0])
+        
         return response.data[0]
     except Exception as e:
         raise HTTPException(
@@ -40,12 +43,12 @@ async def get_routes(
     Get all routes, with optional filtering by status.
     """
     try:
-        query = supabase.table("routes").select("*")
+        query = db.table("routes").select("*")
         
         if status:
             query = query.eq("status", status)
         
-        response = query.order("name").execute()
+        response = await query.order("name").execute()
         
         return response.data
     except Exception as e:
@@ -60,15 +63,15 @@ async def get_route(route_id: str, current_user = Depends(get_current_active_use
     Get a specific route by ID.
     """
     try:
-        response = supabase.table("routes").select("*").eq("id", route_id).execute()
+        route = await reference.routes.get(route_id)
         
-        if not response.data:
+        if not route:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Route not found"
             )
         
-        return response.data[0]
+        return route
     except HTTPException:
         raise
     except Exception as e:
@@ -88,7 +91,7 @@ async def update_route(
     """
     try:
         # Check if route exists
-        check_response = supabase.table("routes").select("*").eq("id", route_id).execute()
+        check_response = await db.table("routes").select("*").eq("id", route_id).execute()
         
         if not check_response.data:
             raise HTTPException(
@@ -103,7 +106,7 @@ async def update_route(
             return check_response.data[0]
         
         # Update route
-        response = supabase.table("routes").update(update_data).eq("id", route_id).execute()
+        response = await db.table("routes").update(update_data).eq("id", route_id).execute()
         
         if not response.data:
             raise HTTPException(
@@ -111,6 +114,8 @@ async def update_route(
                 detail="Failed to update route"
             )
         
+        reference.routes.put(response.data[0])
+        
         return response.data[0]
     except HTTPException:
         raise
@@ -127,7 +132,7 @@ async def delete_route(route_id: str, current_user = Depends(check_admin_role))
     """
     try:
         # Check if route exists
-        check_response = supabase.table("routes").select("*").eq("id", route_id).execute()
+        check_response = await db.table("routes").select("*").eq("id", route_id).execute()
         
         if not check_response.data:
             raise HTTPException(
@@ -136,7 +141,7 @@ async def delete_route(route_id: str, current_user = Depends(check_admin_role))
             )
         
         # Check if route is in use by vehicles
-        vehicle_check = supabase.table("vehicles").select("id").eq("route_id", route_id).execute()
+        vehicle_check = await db.table("vehicles").select("id").eq("route_id", route_id).execute()
         
         if vehicle_check.data:
             raise HTTPException(
@@ -145,15 +150,17 @@ async def delete_route(route_id: str, current_user = Depends(check_admin_role))
             )
         
         # Check if route is used in trips
-        trip_check = supabase.table("trips").select("id").eq("route_id", route_id).execute()
+        trip_check = await db.table("trips").select("id").eq("route_id", route_id).execute()
         
         if trip_check.data:
             # Instead of deleting, mark as inactive
-            supabase.table("routes").update({"status": "inactive"}).eq("id", route_id).execute()
+            await db.table("routes").update({"status": "inactive"}).eq("id", route_id).execute()
+            reference.routes.invalidate(route_id)
             return
         
         # Delete route if no dependencies
-        supabase.table("routes").delete().eq("id", route_id).execute()
+        await db.table("routes").delete().eq("id", route_id).execute()
+        reference.routes.invalidate(route_id)
     except HTTPException:
         raise
     except Exception as e:
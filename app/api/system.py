@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any
+
+from app.core import logs
+from app.core.cache import cache_stats
+from app.core.security import check_admin_role
+from app.services.expiry import vehicle_expiry
+from app.services.live import live_dashboard
+from app.services.report_cache import report_cache
+from app.services.rollups import trip_rollups
+
+router = APIRouter()
+
+@router.get("/cache", response_model=dict)
+async def get_cache_stats(current_user = Depends(check_admin_role)) -> Any:
+    """
+    Get size and hit/miss counters for every in-process cache, the report
+    document cache, the vehicle expiry index and the live dashboard stream
+    (admin only).
+    """
+    return {
+        **cache_stats(),
+        "report_documents": report_cache.stats(),
+        "vehicle_expiry": vehicle_expiry.stats(),
+        "live_dashboard": live_dashboard.stats()
+    }
+
+@router.get("/rollups", response_model=dict)
+async def get_rollup_stats(current_user = Depends(check_admin_role)) -> Any:
+    """
+    Get the state of the in-memory trip rollups (admin only).
+    """
+    return trip_rollups.stats()
+
+@router.get("/logging", response_model=dict)
+async def get_logging_stats(current_user = Depends(check_admin_role)) -> Any:
+    """
+    Get the log writer queue depth and the records dropped because it was full (admin only).
+    """
+    return logs.stats()
+
+@router.post("/rollups/rebuild", response_model=dict)
+async def rebuild_rollups(current_user = Depends(check_admin_role)) -> Any:
+    """
+    Rebuild the trip rollups from the trips table (admin only).
+
+    Use after bulk imports or edits made directly in the database.
+    """
+    try:
+        return await trip_rollups.rebuild()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error rebuilding rollups: {str(e)}"
+        )
@@ -1,11 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Any, Optional
-from datetime import datetime, date
+from fastapi import status as http_status
+from typing import Any, Optional
+from datetime import datetime, date, timedelta
+import asyncio
 
-from app.core.db import supabase
+from postgrest.types import CountMethod
+
+from app.core.config import settings
+from app.core.db import db, fan_out
+from app.core.paging import fetch_page
 from app.core.security import get_current_active_user, check_admin_role
-from app.schemas.trips import TripCreate, TripUpdate, TripResponse, TripDetail
+from app.schemas.trips import TripCreate, TripUpdate, TripResponse, TripDetail, TripPage
 from app.core.utils import DateTimeEncoder, serialize_datetime
+from app.services.names import NameResolver
+from app.services import reference
+from app.services.live import live_dashboard
+from app.services.rollups import trip_rollups
 import json
 
 router = APIRouter()
@@ -25,19 +35,19 @@ async def create_trip(trip_data: TripCreate, current_user = Depends(get_current_
     Create a new trip.
     """
     try:
-        # Check if vehicle exists
-        vehicle_response = supabase.table("vehicles").select("passenger_capacity, reg_no").eq("id", trip_data.vehicle_id).execute()
+        # Check if vehicle and driver exist
+        vehicle, driver = await fan_out(
+            reference.vehicles.get(trip_data.vehicle_id),
+            reference.drivers.get(trip_data.driver_id)
+        )
         
-        if not vehicle_response.data:
+        if not vehicle:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Vehicle not found"
             )
         
-        # Check if driver exists
-        driver_response = supabase.table("drivers").select("name").eq("id", trip_data.driver_id).execute()
-        
-        if not driver_response.data:
+        if not driver:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Driver not found"
@@ -49,7 +59,7 @@ async def create_trip(trip_data: TripCreate, current_user = Depends(get_current_
         # # Get route information if route_id is provided
         # if trip_data.route_id:
         #     # Check if route exists and get fare amount
-        #     route_response = supabase.table("routes").select("*").eq("id", trip_data.route_id).execute()
+        #     route_response = await db.table("routes").select("*").eq("id", trip_data.route_id).execute()
             
         #     if not route_response.data:
         #         raise HTTPException(
@@ -65,12 +75,13 @@ async def create_trip(trip_data: TripCreate, current_user = Depends(get_current_
         
         # Create trip with calculated expected amount
         trip_dict = trip_data.dict()
-        
+        # Rollups in other workers find changed trips by updated_at
+        trip_dict["updated_at"] = datetime.utcnow().isoformat()
         
         # Serialize datetime objects for database
         trip_dict = serialize_for_db(trip_dict)
         
-        response = supabase.table("trips").insert(trip_dict).execute()
+        response = await db.table("trips").insert(trip_dict).execute()
         
         if not response.data:
             raise HTTPException(
@@ -80,11 +91,13 @@ async def create_trip(trip_data: TripCreate, current_user = Depends(get_current_
         
         # Enrich response with driver and vehicle information
         trip_data = response.data[0]
+        trip_rollups.record(trip_data)
+        live_dashboard.notify()
         
         enriched_trip = {
             **trip_data,
-            "driver_name": driver_response.data[0]["name"],
-            "vehicle_registration": vehicle_response.data[0]["reg_no"],
+            "driver_name": driver["name"],
+            "vehicle_registration": vehicle["reg_no"],
             "route": route,
         }
         
@@ -97,21 +110,27 @@ async def create_trip(trip_data: TripCreate, current_user = Depends(get_current_
             detail=f"Error creating trip: {str(e)}"
         )
 
-@router.get("/", response_model=List[TripDetail])
+@router.get("/", response_model=TripPage)
 async def get_trips(
     vehicle_id: Optional[str] = None,
     driver_id: Optional[str] = None,
     route: Optional[str] = None,
     status: Optional[str] = None,
     date: Optional[date] = None,
+    limit: int = Query(settings.API_PAGE_SIZE_DEFAULT, ge=1, le=settings.API_PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     current_user = Depends(get_current_active_user)
 ) -> Any:
     """
-    Get all trips, with optional filtering.
+    Get trips newest first, one page at a time, with optional filtering.
+    
+    Pass the returned `next_cursor` back as `cursor` to get the following
+    page. `total` counts every trip matching the filters and is only
+    computed when `include_total` is set.
     """
-    try:
-        query = supabase.table("trips").select("*")
-        
+    # `status` is a query parameter here, so the status-code constants come from http_status
+    def filtered(query):
         if vehicle_id:
             query = query.eq("vehicle_id", vehicle_id)
         
@@ -126,25 +145,44 @@ async def get_trips(
         
         if date:
             query = query.gte("collection_time", date.isoformat())
-            next_day = date.replace(day=date.day + 1)
+            next_day = date + timedelta(days=1)
             query = query.lt("collection_time", next_day.isoformat())
         
-        response = query.order("collection_time", desc=True).execute()
+        return query
+    
+    try:
+        page = fetch_page(lambda: filtered(db.table("trips").select("*")), cursor, limit, desc=True)
+        if include_total:
+            count = filtered(db.table("trips").select("id", count=CountMethod.exact, head=True)).execute()
+            (trips, next_cursor), count_response = await asyncio.gather(page, count)
+            total = count_response.count
+        else:
+            trips, next_cursor = await page
+            total = None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching trips: {str(e)}"
+        )
+    
+    try:
+        # Resolve driver names and vehicle registrations in one batch
+        names = NameResolver().collect(trips)
+        await names.load()
         
         # Enrich trip data with driver and vehicle information
         enriched_trips = []
-        for trip in response.data:
-            # Get driver info
-            driver = supabase.table("drivers").select("name").eq("id", trip["driver_id"]).execute()
-            
-            # Get vehicle info
-            vehicle = supabase.table("vehicles").select("reg_no").eq("id", trip["vehicle_id"]).execute()
-            
+        for trip in trips:
             # Create enriched trip object
             enriched_trip = {
                 **trip,
-                "driver_name": driver.data[0]["name"] if driver.data else None,
-                "vehicle_registration": vehicle.data[0]["reg_no"] if vehicle.data else None,
+                "driver_name": names.driver_name(trip["driver_id"]),
+                "vehicle_registration": names.vehicle_reg_no(trip["vehicle_id"]),
                 "route": None,  # These fields are in TripDetail but we're not populating them here
                 "route_text": trip.get("route_text"),  # Include route_text in response
                 "origin": None,
@@ -160,10 +198,10 @@ async def get_trips(
             
             enriched_trips.append(enriched_trip)
         
-        return enriched_trips
+        return {"items": enriched_trips, "next_cursor": next_cursor, "total": total}
     except Exception as e:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching trips: {str(e)}"
         )
 
@@ -174,7 +212,7 @@ async def get_trip_detail(trip_id: str, current_user = Depends(get_current_activ
     """
     try:
         # Call database function to get trip details
-        response = supabase.rpc('get_trip_detail', {'trip_id': trip_id}).execute()
+        response = await db.rpc('get_trip_detail', {'trip_id': trip_id}).execute()
         
         if not response.data:
             raise HTTPException(
@@ -187,7 +225,7 @@ async def get_trip_detail(trip_id: str, current_user = Depends(get_current_activ
         # Ensure route_text is included in the response
         if "route_text" not in trip_data and trip_data.get("route_text") is None:
             # Fallback to fetch from database if needed
-            trip_raw = supabase.table("trips").select("route_text").eq("id", trip_id).execute()
+            trip_raw = await db.table("trips").select("route_text").eq("id", trip_id).execute()
             if trip_raw.data:
                 trip_data["route_text"] = trip_raw.data[0].get("route_text")
         
@@ -217,7 +255,7 @@ async def update_trip(
     """
     try:
         # Check if trip exists
-        check_response = supabase.table("trips").select("*").eq("id", trip_id).execute()
+        check_response = await db.table("trips").select("*").eq("id", trip_id).execute()
         
         if not check_response.data:
             raise HTTPException(
@@ -231,13 +269,12 @@ async def update_trip(
         if not update_data:
             # Even if no updates, we need to enrich the response with driver and vehicle info
             trip_data = check_response.data[0]
-            driver = supabase.table("drivers").select("name").eq("id", trip_data["driver_id"]).execute()
-            vehicle = supabase.table("vehicles").select("reg_no").eq("id", trip_data["vehicle_id"]).execute()
+            names = await NameResolver().collect([trip_data]).load()
             
             enriched_trip = {
                 **trip_data,
-                "driver_name": driver.data[0]["name"] if driver.data else None,
-                "vehicle_registration": vehicle.data[0]["reg_no"] if vehicle.data else None,
+                "driver_name": names.driver_name(trip_data["driver_id"]),
+                "vehicle_registration": names.vehicle_reg_no(trip_data["vehicle_id"]),
                 "route": None,
                 "origin": None,
                 "destination": None,
@@ -252,11 +289,14 @@ async def update_trip(
             
             return enriched_trip
         
+        # Rollups in other workers find changed trips by updated_at
+        update_data["updated_at"] = datetime.utcnow().isoformat()
+        
         # Serialize datetime objects for database
         update_data = serialize_for_db(update_data)
         
         # Update trip
-        response = supabase.table("trips").update(update_data).eq("id", trip_id).execute()
+        response = await db.table("trips").update(update_data).eq("id", trip_id).execute()
         
         if not response.data:
             raise HTTPException(
@@ -264,6 +304,10 @@ async def update_trip(
                 detail="Failed to update trip"
             )
         
+        trip_rollups.record(response.data[0], check_response.data[0])
+        
+        live_dashboard.notify()
+        
         # If trip is completed, update daily summary
         if "status" in update_data and update_data["status"] == "completed":
             trip_data = response.data[0]
@@ -274,7 +318,7 @@ async def update_trip(
             net_profit = trip_data.get("collected_amount", 0) - total_expenses
             
             # Check if summary exists for this vehicle and date
-            summary_check = supabase.table("daily_summaries").select("*").eq("vehicle_id", trip_data["vehicle_id"]).eq("date", trip_date.isoformat()).execute()
+            summary_check = await db.table("daily_summaries").select("*").eq("vehicle_id", trip_data["vehicle_id"]).eq("date", trip_date.isoformat()).execute()
             
             if summary_check.data:
                 # Update existing summary
@@ -287,7 +331,7 @@ async def update_trip(
                     "net_profit": summary["net_profit"] + net_profit
                 }
                 
-                supabase.table("daily_summaries").update(summary_update).eq("id", summary["id"]).execute()
+                await db.table("daily_summaries").update(summary_update).eq("id", summary["id"]).execute()
             else:
                 # Create new summary
                 summary_data = {
@@ -301,17 +345,16 @@ async def update_trip(
                     "net_profit": net_profit
                 }
                 
-                supabase.table("daily_summaries").insert(summary_data).execute()
+                await db.table("daily_summaries").insert(summary_data).execute()
         
         # Enrich response with driver and vehicle information
         trip_data = response.data[0]
-        driver = supabase.table("drivers").select("name").eq("id", trip_data["driver_id"]).execute()
-        vehicle = supabase.table("vehicles").select("reg_no").eq("id", trip_data["vehicle_id"]).execute()
+        names = await NameResolver().collect([trip_data]).load()
         
         enriched_trip = {
             **trip_data,
-            "driver_name": driver.data[0]["name"] if driver.data else None,
-            "vehicle_registration": vehicle.data[0]["reg_no"] if vehicle.data else None,
+            "driver_name": names.driver_name(trip_data["driver_id"]),
+            "vehicle_registration": names.vehicle_reg_no(trip_data["vehicle_id"]),
             "route": None,
             "origin": None,
             "destination": None,
@@ -340,7 +383,7 @@ async def delete_trip(trip_id: str, current_user = Depends(check_admin_role)) ->
     """
     try:
         # Check if trip exists
-        check_response = supabase.table("trips").select("*").eq("id", trip_id).execute()
+        check_response = await db.table("trips").select("*").eq("id", trip_id).execute()
         
         if not check_response.data:
             raise HTTPException(
@@ -349,7 +392,9 @@ async def delete_trip(trip_id: str, current_user = Depends(check_admin_role)) ->
             )
         
         # Delete trip
-        supabase.table("trips").delete().eq("id", trip_id).execute()
+        await db.table("trips").delete().eq("id", trip_id).execute()
+        trip_rollups.discard(check_response.data[0])
+        live_dashboard.notify()
     except HTTPException:
         raise
     except Exception as e:
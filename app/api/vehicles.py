@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Any, Optional, Dict
-from datetime import date, timedelta, datetime
+from datetime import date, datetime
 import json
 
-from app.core.db import supabase
+from app.core.db import db
 from app.core.security import get_current_user, check_admin_role
+from app.services import reference
+from app.services.expiry import vehicle_expiry
 from app.schemas.vehicle import (
     VehicleCreate,
     VehicleUpdate,
@@ -61,22 +63,19 @@ async def get_expiring_vehicles(
     current_user = Depends(get_current_user)
 ) -> Any:
     """
-    Get vehicles with documents expiring within the next X days.
+    Get vehicles with any license (insurance, TLB, inspection or speed
+    governor) expiring within the next X days, soonest expiry first.
     """
     try:
-        today = date.today()
-        expiry_date = today + timedelta(days=days)
+        # Answered from the in-memory expiry index, no table scan
+        vehicles = {}
+        for expiry in await vehicle_expiry.expiring_within(days):
+            vehicle_id = expiry.vehicle["id"]
+            if vehicle_id not in vehicles:
+                # Copied, the index shares its rows with the reference cache
+                vehicles[vehicle_id] = convert_iso_dates_to_client_format(dict(expiry.vehicle))
         
-        # Get vehicles where either insurance or TLB is expiring
-        query = supabase.table("vehicles").select("*").or_(
-            f"insurance_expiry.lte.{expiry_date.isoformat()},tlb_expiry.lte.{expiry_date.isoformat()}"
-        ).gte("insurance_expiry", today.isoformat()).gte("tlb_expiry", today.isoformat()).execute()
-        
-        # Convert date formats for each vehicle
-        for i in range(len(query.data)):
-            query.data[i] = convert_iso_dates_to_client_format(query.data[i])
-        
-        return query.data
+        return list(vehicles.values())
     except Exception as e:
         raise create_vehicle_error(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -96,12 +95,12 @@ async def get_vehicles(
     Retrieve all vehicles with optional status filtering.
     """
     try:
-        query = supabase.table("vehicles").select("*").order("reg_no").range(skip, skip + limit - 1)
+        query = db.table("vehicles").select("*").order("reg_no").range(skip, skip + limit - 1)
         
         if status:
             query = query.eq("status", status)
         
-        response = query.execute()
+        response = await query.execute()
         
         # Convert date formats for each vehicle
         for i in range(len(response.data)):
@@ -125,7 +124,7 @@ async def create_vehicle(
     """
     try:
         # Check if reg_no already exists
-        existing = supabase.table("vehicles").select("*").eq("reg_no", vehicle_in.registration).execute()
+        existing = await db.table("vehicles").select("*").eq("reg_no", vehicle_in.registration).execute()
         
         if existing.data:
             raise create_vehicle_error(
@@ -143,7 +142,7 @@ async def create_vehicle(
             if date_field in vehicle_dict and isinstance(vehicle_dict[date_field], date):
                 vehicle_dict[date_field] = vehicle_dict[date_field].isoformat()
         
-        response = supabase.table("vehicles").insert(vehicle_dict).execute()
+        response = await db.table("vehicles").insert(vehicle_dict).execute()
         
         if not response.data:
             raise create_vehicle_error(
@@ -152,6 +151,9 @@ async def create_vehicle(
                 error_type="database_error"
             )
         
+        reference.vehicles.put(response.data[0])
+        vehicle_expiry.put(response.data[0])
+        
         return response.data[0]
     
     except HTTPException:
@@ -182,7 +184,7 @@ async def get_vehicle(
     Get vehicle by ID.
     """
     try:
-        response = supabase.table("vehicles").select("*").eq("id", vehicle_id).execute()
+        response = await db.table("vehicles").select("*").eq("id", vehicle_id).execute()
         
         if not response.data:
             raise create_vehicle_error(
@@ -217,7 +219,7 @@ async def update_vehicle(
     """
     try:
         # Check if vehicle exists
-        existing = supabase.table("vehicles").select("*").eq("id", vehicle_id).execute()
+        existing = await db.table("vehicles").select("*").eq("id", vehicle_id).execute()
         
         if not existing.data:
             raise create_vehicle_error(
@@ -249,7 +251,9 @@ async def update_vehicle(
                 error_type="missing_data"
             )
         
-        response = supabase.table("vehicles").update(update_data).eq("id", vehicle_id).execute()
+        response = await db.table("vehicles").update(update_data).eq("id", vehicle_id).execute()
+        reference.vehicles.put(response.data[0])
+        vehicle_expiry.put(response.data[0])
         
         # Add default passenger_capacity if missing
         if "passenger_capacity" not in response.data[0] or response.data[0]["passenger_capacity"] is None:
@@ -283,7 +287,7 @@ async def delete_vehicle(
     """
     try:
         # Check if vehicle exists
-        existing = supabase.table("vehicles").select("*").eq("id", vehicle_id).execute()
+        existing = await db.table("vehicles").select("*").eq("id", vehicle_id).execute()
         
         if not existing.data:
             raise create_vehicle_error(
@@ -294,11 +298,14 @@ async def delete_vehicle(
             )
         
         # Check if vehicle has operations
-        operations = supabase.table("operations").select("id").eq("vehicle_id", vehicle_id).limit(1).execute()
+        operations = await db.table("operations").select("id").eq("vehicle_id", vehicle_id).limit(1).execute()
         
         if operations.data:
             # Instead of deleting, mark as inactive
-            response = supabase.table("vehicles").update({"status": "inactive"}).eq("id", vehicle_id).execute()
+            response = await db.table("vehicles").update({"status": "inactive"}).eq("id", vehicle_id).execute()
+            reference.vehicles.invalidate(vehicle_id)
+            if response.data:
+                vehicle_expiry.put(response.data[0])
             return {
                 "status": "success",
                 "message": "Vehicle marked as inactive (has operations)",
@@ -306,7 +313,9 @@ async def delete_vehicle(
             }
         
         # If no operations, delete the vehicle
-        response = supabase.table("vehicles").delete().eq("id", vehicle_id).execute()
+        response = await db.table("vehicles").delete().eq("id", vehicle_id).execute()
+        reference.vehicles.invalidate(vehicle_id)
+        vehicle_expiry.discard(vehicle_id)
         
         return {
             "status": "success",
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# All named caches, so their counters can be reported in one place
+_registry: Dict[str, Any] = {}
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    In-process LRU cache with a per-entry time-to-live.
+
+    Entries older than `ttl` seconds are treated as misses. When more than
+    `maxsize` entries are stored, the least recently used entry is evicted.
+    Hit, miss and eviction counters are kept for sizing.
+    """
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _registry[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] >= time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups * 100) if lookups > 0 else 0
+        }
+
+
+class RevalidatingCache:
+    """
+    In-process cache of computed results that serves stale values while
+    refreshing them (stale-while-revalidate).
+
+    An entry is fresh for `fresh_for` seconds after it was computed, then
+    stale for another `stale_for` seconds. A stale entry, or one computed
+    from an older data `version`, is returned at once and one background
+    task recomputes it. Older entries are recomputed before returning. Only
+    one computation per key runs at a time: concurrent callers share it.
+    """
+    def __init__(self, name: str, maxsize: int, fresh_for: float, stale_for: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.fresh_for = fresh_for
+        self.stale_for = stale_for
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._running: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+        self.evictions = 0
+        _registry[name] = self
+
+    async def get(self, key: Hashable, compute: Callable[[], Awaitable[Any]], version: Any = None) -> Any:
+        """Cached result of `compute()` for `key`, computed from data at `version`"""
+        entry = self._data.get(key)
+        if entry is not None:
+            computed_at, entry_version, value = entry
+            age = time.monotonic() - computed_at
+            if age <= self.fresh_for and entry_version == version:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            if age <= self.fresh_for + self.stale_for:
+                self._data.move_to_end(key)
+                self.stale_hits += 1
+                if key not in self._running:
+                    self.refreshes += 1
+                    self._start(key, compute, version)
+                return value
+
+        self.misses += 1
+        task = self._running.get(key) or self._start(key, compute, version)
+        # Shielded so a caller that disconnects does not cancel the others' result
+        return await asyncio.shield(task)
+
+    def _start(self, key: Hashable, compute: Callable[[], Awaitable[Any]], version: Any) -> asyncio.Task:
+        task = asyncio.create_task(self._compute(key, compute, version))
+        task.add_done_callback(self._finished)
+        self._running[key] = task
+        return task
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]], version: Any) -> Any:
+        try:
+            value = await compute()
+            self._data[key] = (time.monotonic(), version, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            return value
+        finally:
+            self._running.pop(key, None)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        # Retrieves the error even for refreshes nobody awaits; a stale entry stays in place
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+            logger.warning(f"Error computing {self.name} cache entry: {str(task.exception())}")
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "fresh_for": self.fresh_for,
+            "stale_for": self.stale_for,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "running": len(self._running),
+            "evictions": self.evictions,
+            "hit_rate": ((self.hits + self.stale_hits) / lookups * 100) if lookups > 0 else 0
+        }
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters for every named cache in the process"""
+    return {name: cache.stats() for name, cache in _registry.items()}
@@ -23,6 +23,67 @@ class Settings(BaseSettings):
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
     
+    # Database connection pool (shared async PostgREST client)
+    DB_POOL_MAX_CONNECTIONS: int = 20
+    DB_POOL_MAX_KEEPALIVE: int = 10
+    DB_POOL_KEEPALIVE_EXPIRY: float = 30.0
+    DB_CONNECT_TIMEOUT: float = 5.0
+    DB_TIMEOUT: float = 30.0
+    DB_HTTP2: bool = True
+    # Independent reads one request may run at the same time
+    DB_REQUEST_CONCURRENCY: int = 4
+    # Rows per request for paged scans (PostgREST max-rows defaults to 1000)
+    DB_PAGE_SIZE: int = 1000
+    
+    # Client-facing list endpoints (cursor pagination)
+    API_PAGE_SIZE_DEFAULT: int = 50
+    API_PAGE_SIZE_MAX: int = 200
+    
+    # Reference-data cache (vehicles, drivers, routes)
+    REFERENCE_CACHE_TTL: float = 300.0
+    REFERENCE_CACHE_MAX_ENTRIES: int = 5000
+    
+    # Dashboard result cache (seconds fresh, then seconds served stale while one task refreshes)
+    DASHBOARD_CACHE_FRESH: float = 30.0
+    DASHBOARD_CACHE_STALE: float = 300.0
+    DASHBOARD_CACHE_MAX_ENTRIES: int = 256
+    
+    # Trip rollups (seconds between background checks against the trips table, 0 disables)
+    ROLLUP_REFRESH_INTERVAL: float = 60.0
+    # Days before today and after today a trip may be collected on to be rolled up
+    ROLLUP_HISTORY_DAYS: int = 3660
+    ROLLUP_FUTURE_DAYS: int = 31
+    
+    # Live dashboard stream (seconds from a trip write to the update, seconds between keep-alives)
+    LIVE_UPDATE_DELAY: float = 1.0
+    LIVE_KEEPALIVE: float = 15.0
+    LIVE_MAX_CONNECTIONS: int = 200
+    
+    # Report generation (PDF render pool and background jobs)
+    REPORT_PDF_WORKERS: int = 2
+    REPORT_PDF_TIMEOUT: float = 120.0
+    REPORT_JOB_TTL: float = 3600.0
+    REPORT_JOB_MAX_ENTRIES: int = 100
+    # Generated documents cache (empty dir means the system temp directory, 0 bytes disables)
+    REPORT_CACHE_DIR: str = ""
+    REPORT_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    
+    # Logging (handlers run on a background thread; empty LOG_FILE logs to the console only)
+    LOG_LEVEL: str = "INFO"
+    # Per-module levels, e.g. "app.api.reports=DEBUG,app.services.pdf=WARNING"
+    LOG_LEVELS: str = ""
+    LOG_FILE: str = "logs/app.log"
+    LOG_FILE_MAX_BYTES: int = 10 * 1024 * 1024
+    # Rotate by time instead of size, e.g. "midnight" or "H"
+    LOG_FILE_ROTATE_WHEN: str = ""
+    LOG_FILE_BACKUPS: int = 5
+    LOG_QUEUE_SIZE: int = 10000
+    # Examples kept in a per-request summary of repeated warnings
+    LOG_ISSUE_SAMPLES: int = 3
+    
+    # Raise when code reads a column its query did not select (for development)
+    PROJECTION_GUARD: bool = False
+    
     class Config:
         case_sensitive = True
 
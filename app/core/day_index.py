@@ -0,0 +1,192 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Spare positions a key's tree is allocated with, so appending its newest
+# days does not reallocate on every write
+HEADROOM_DAYS = 16
+
+
+def _fenwick(values: np.ndarray, capacity: int) -> np.ndarray:
+    """Fenwick tree of per-day values (one row each), position 0 unused, in O(days)"""
+    tree = np.zeros((capacity + 1, values.shape[1]))
+    if len(values):
+        prefix = np.zeros((len(values) + 1, values.shape[1]))
+        np.cumsum(values, axis=0, out=prefix[1:])
+        positions = np.arange(1, len(values) + 1)
+        tree[positions] = prefix[positions] - prefix[positions - (positions & -positions)]
+    return tree
+
+
+class _KeyDays:
+    """
+    The days one key has values on, in order, and a Fenwick tree over them.
+
+    Position p of the tree is the p-th day in `days`. Only days with values
+    take up room, so a vehicle active for a month costs a month of rows
+    however long the rest of the fleet's history is.
+    """
+    __slots__ = ("days", "tree")
+
+    def __init__(self, days: List[int], values: np.ndarray):
+        self.days = days
+        self.tree = _fenwick(values, len(days) + HEADROOM_DAYS)
+
+    def prefix(self, position: int) -> np.ndarray:
+        total = np.zeros(self.tree.shape[1])
+        while position > 0:
+            total += self.tree[position]
+            position -= position & -position
+        return total
+
+    def prefixes(self, positions: np.ndarray) -> np.ndarray:
+        # Walks every position's path at once; position 0 is an all-zero row
+        total = np.zeros((len(positions), self.tree.shape[1]))
+        positions = positions.copy()
+        while positions.any():
+            total += self.tree[positions]
+            positions -= positions & -positions
+        return total
+
+    def upto(self, ordinal: int) -> int:
+        """Tree position of the last day <= `ordinal` (0 if none)"""
+        return bisect_right(self.days, ordinal)
+
+    def add(self, ordinal: int, values: np.ndarray) -> None:
+        index = bisect_left(self.days, ordinal)
+        if index < len(self.days) and self.days[index] == ordinal:
+            position, size = index + 1, len(self.days)
+            while position <= size:
+                self.tree[position] += values
+                position += position & -position
+        elif index == len(self.days) and index + 1 < self.tree.shape[0]:
+            # A new latest day: its node sums itself and the nodes it covers
+            self.days.append(ordinal)
+            position = index + 1
+            low = position - (position & -position)
+            self.tree[position] = values + self.prefix(position - 1) - self.prefix(low)
+        else:
+            # An earlier day, or no room left: re-build this key's tree only
+            size = len(self.days)
+            positions = np.arange(size + 1)
+            prefix = self.prefixes(positions)
+            per_day = np.insert(prefix[1:] - prefix[:-1], index, values, axis=0)
+            self.days.insert(index, ordinal)
+            self.tree = _fenwick(per_day, 2 * len(self.days) + HEADROOM_DAYS)
+
+
+class DayIndex:
+    """
+    Fenwick (binary indexed) trees over calendar days, one per key.
+
+    Each key (e.g. the whole fleet, one vehicle, one driver) has per-day
+    values with `width` columns, stored for the days it has values on only.
+    Adding to one day and summing any range of days both cost O(log days),
+    whatever the range. A day before a key's latest one that it had no
+    values on re-builds that key's tree, in O(its days).
+    """
+    def __init__(self, width: int):
+        self.width = width
+        self.keys: Dict[Hashable, _KeyDays] = {}
+
+    def build(self, points: Dict[Tuple[Hashable, date], Sequence[float]]) -> None:
+        """Replace the index with the given values per (key, day)"""
+        self.keys = {}
+        if not points:
+            return
+
+        rows: Dict[Hashable, int] = {}
+        key_rows = np.fromiter((rows.setdefault(key, len(rows)) for key, _ in points), dtype=np.int64, count=len(points))
+        ordinals = np.fromiter((day.toordinal() for _, day in points), dtype=np.int64, count=len(points))
+        values = np.array(list(points.values()), dtype=np.float64).reshape(len(points), self.width)
+
+        # Grouped by key, each key's days in order
+        order = np.lexsort((ordinals, key_rows))
+        key_rows, ordinals, values = key_rows[order], ordinals[order], values[order]
+        bounds = np.searchsorted(key_rows, np.arange(len(rows) + 1))
+        for key, row in rows.items():
+            low, high = bounds[row], bounds[row + 1]
+            self.keys[key] = _KeyDays(ordinals[low:high].tolist(), values[low:high])
+
+    def add(self, key: Hashable, day: date, values: np.ndarray) -> None:
+        """Add `values` to the given day of `key`, in O(log days)"""
+        key_days = self.keys.get(key)
+        if key_days is None:
+            self.keys[key] = _KeyDays([day.toordinal()], np.asarray(values, dtype=np.float64).reshape(1, self.width))
+        else:
+            key_days.add(day.toordinal(), values)
+
+    def point(self, key: Hashable, day: date) -> np.ndarray:
+        """Values of a single day of `key`"""
+        key_days = self.keys.get(key)
+        if key_days is None:
+            return np.zeros(self.width)
+        position = key_days.upto(day.toordinal())
+        if position == 0 or key_days.days[position - 1] != day.toordinal():
+            return np.zeros(self.width)
+        return key_days.prefix(position) - key_days.prefix(position - 1)
+
+    def totals(self, keys: Iterable[Hashable], start: Optional[date] = None, end: Optional[date] = None) -> np.ndarray:
+        """
+        Sum of each key's values over start <= day <= end (either bound
+        optional), one row per key in the order given. Unknown keys sum to 0.
+        """
+        return self.period_totals(keys, [(start, end)])[0]
+
+    def period_totals(
+        self,
+        keys: Iterable[Hashable],
+        periods: Sequence[Tuple[Optional[date], Optional[date]]]
+    ) -> np.ndarray:
+        """
+        `totals()` of several (start, end) periods at once, shaped
+        (periods, keys, width). Each distinct period boundary is summed
+        once per key, so adjacent periods (e.g. this month and last month)
+        share the prefix sum between them.
+        """
+        keys = list(keys)
+        result = np.zeros((len(periods), len(keys), self.width))
+        for column, key in enumerate(keys):
+            key_days = self.keys.get(key)
+            if key_days is None:
+                continue
+
+            bounds = [
+                (
+                    key_days.upto(start.toordinal() - 1) if start else 0,
+                    key_days.upto(end.toordinal()) if end else len(key_days.days)
+                )
+                for start, end in periods
+            ]
+            positions = sorted({position for pair in bounds for position in pair})
+            prefixes = dict(zip(positions, key_days.prefixes(np.array(positions, dtype=np.int64))))
+            for period, (low, high) in enumerate(bounds):
+                if high > low:
+                    result[period, column] = prefixes[high] - prefixes[low]
+        return result
+
+    def series(self, key: Hashable, start: date, end: date) -> np.ndarray:
+        """Values of `key` on every day from start to end inclusive, one row per day"""
+        days = max(end.toordinal() - start.toordinal() + 1, 0)
+        result = np.zeros((days, self.width))
+        key_days = self.keys.get(key)
+        if key_days is None or not days:
+            return result
+
+        low = key_days.upto(start.toordinal() - 1)
+        high = key_days.upto(end.toordinal())
+        if high > low:
+            positions = np.arange(low, high + 1)
+            prefix = key_days.prefixes(positions)
+            offsets = np.array(key_days.days[low:high], dtype=np.int64) - start.toordinal()
+            result[offsets] = prefix[1:] - prefix[:-1]
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "keys": len(self.keys),
+            "days": sum(len(key_days.days) for key_days in self.keys.values()),
+            "bytes": sum(int(key_days.tree.nbytes) for key_days in self.keys.values())
+        }
@@ -1,7 +1,17 @@
+import asyncio
 import os
+from typing import Any, Awaitable, Dict, List, Optional, Union
+
+import httpx
 from supabase import create_client, Client
+from postgrest import AsyncPostgrestClient
+from postgrest._async.request_builder import AsyncRequestBuilder, AsyncRPCFilterRequestBuilder
+from postgrest.utils import AsyncClient
 from dotenv import load_dotenv
 
+from app.core.config import settings
+from app.core.query_memo import MemoizingAsyncClient
+
 # Load environment variables
 load_dotenv()
 
@@ -14,8 +24,108 @@ def get_supabase_client() -> Client:
     """
     if not SUPABASE_URL or not SUPABASE_KEY:
         raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
-    
+
     return create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# Create a client instance for reuse
-supabase = get_supabase_client() 
\ No newline at end of file
+# Create a client instance for reuse (used for Supabase Auth calls)
+supabase = get_supabase_client()
+
+
+class PooledPostgrestClient(AsyncPostgrestClient):
+    """
+    Async PostgREST client backed by a bounded keep-alive connection pool.
+    """
+    def create_session(
+        self,
+        base_url: str,
+        headers: Dict[str, str],
+        timeout: Union[int, float, httpx.Timeout],
+        verify: bool = True,
+        proxy: Optional[str] = None,
+    ) -> AsyncClient:
+        return MemoizingAsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+            follow_redirects=True,
+            http2=settings.DB_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.DB_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.DB_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.DB_POOL_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+
+class AsyncDatabase:
+    """
+    Shared async data-access layer for the API routers.
+
+    Exposes the same `table(...)` / `rpc(...)` query builder as the Supabase
+    client, but every `execute()` must be awaited so PostgREST round trips
+    never block the event loop. The underlying client is created lazily so it
+    binds to the running event loop, and is reused for every request.
+    """
+    def __init__(self, url: Optional[str], key: Optional[str]):
+        self.url = url
+        self.key = key
+        self._client: Optional[PooledPostgrestClient] = None
+
+    @property
+    def client(self) -> PooledPostgrestClient:
+        if self._client is None:
+            if not self.url or not self.key:
+                raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
+
+            self._client = PooledPostgrestClient(
+                f"{self.url}/rest/v1",
+                headers={
+                    "apiKey": self.key,
+                    "Authorization": f"Bearer {self.key}",
+                },
+                timeout=httpx.Timeout(settings.DB_TIMEOUT, connect=settings.DB_CONNECT_TIMEOUT),
+            )
+        return self._client
+
+    def table(self, table_name: str) -> AsyncRequestBuilder:
+        """Start an async query against a table."""
+        return self.client.from_(table_name)
+
+    def rpc(self, func: str, params: Dict[str, Any]) -> AsyncRPCFilterRequestBuilder:
+        """Call a database function."""
+        return self.client.rpc(func, params)
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Async database instance shared by all routers
+db = AsyncDatabase(SUPABASE_URL, SUPABASE_KEY)
+
+
+async def fan_out(*reads: Awaitable[Any], limit: Optional[int] = None) -> List[Any]:
+    """
+    Await independent reads concurrently and return their results in order.
+
+    At most `limit` (default DB_REQUEST_CONCURRENCY) run at once, so one
+    request cannot take over the connection pool. If a read fails, the
+    others are cancelled and the error is raised.
+    """
+    semaphore = asyncio.Semaphore(max(limit or settings.DB_REQUEST_CONCURRENCY, 1))
+
+    async def bounded(read: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await read
+
+    tasks = [asyncio.ensure_future(bounded(read)) for read in reads]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
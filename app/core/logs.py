@@ -0,0 +1,167 @@
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional["DroppingQueueHandler"] = None
+_lock = threading.Lock()
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the writer thread without waiting.
+
+    When the queue is full (the disk or terminal cannot keep up) records are
+    dropped and counted rather than blocking the request that logged them.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """Per-logger levels from "app.api.reports=DEBUG,app.services.pdf=WARNING" """
+    levels = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, level = item.partition("=")
+        value = logging.getLevelName(level.strip().upper())
+        if not name.strip() or not isinstance(value, int):
+            raise ValueError(f"Invalid LOG_LEVELS entry: {item.strip()!r}")
+        levels[name.strip()] = value
+    return levels
+
+
+def build_handlers() -> List[logging.Handler]:
+    """Console and, if LOG_FILE is set, rotating file handlers for the writer thread"""
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+
+    if settings.LOG_FILE:
+        try:
+            log_dir = os.path.dirname(settings.LOG_FILE)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
+            if settings.LOG_FILE_ROTATE_WHEN:
+                handlers.append(logging.handlers.TimedRotatingFileHandler(
+                    settings.LOG_FILE,
+                    when=settings.LOG_FILE_ROTATE_WHEN,
+                    backupCount=settings.LOG_FILE_BACKUPS,
+                    encoding="utf-8",
+                    delay=True
+                ))
+            else:
+                handlers.append(logging.handlers.RotatingFileHandler(
+                    settings.LOG_FILE,
+                    maxBytes=settings.LOG_FILE_MAX_BYTES,
+                    backupCount=settings.LOG_FILE_BACKUPS,
+                    encoding="utf-8",
+                    delay=True
+                ))
+        except (OSError, ValueError) as e:
+            # If file logging fails, just log to console
+            print(f"Warning: Could not set up file logging: {str(e)}")
+
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def setup_logging() -> None:
+    """
+    Route the "app" loggers through a queue to a background writer thread.
+
+    Log calls on the request path only format the message and enqueue it;
+    console and file output, including rotation, happen on the writer
+    thread. Safe to call more than once.
+    """
+    global _listener, _handler
+    with _lock:
+        if _listener is not None:
+            return
+
+        log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        _handler = DroppingQueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, *build_handlers(), respect_handler_level=True)
+
+        app_logger = logging.getLogger("app")
+        app_logger.setLevel(settings.LOG_LEVEL.upper())
+        app_logger.addHandler(_handler)
+        app_logger.propagate = False
+        for name, level in parse_levels(settings.LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+
+        _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the writer thread"""
+    global _listener, _handler
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        logging.getLogger("app").removeHandler(_handler)
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _handler = None
+
+
+def stats() -> dict:
+    """Queue depth and dropped records, for the system endpoints"""
+    if _handler is None:
+        return {"running": False, "queued": 0, "dropped": 0}
+    return {"running": True, "queued": _handler.queue.qsize(), "dropped": _handler.dropped}
+
+
+class IssueSummary:
+    """
+    Collects repeated warnings of one operation, such as invalid values
+    across the trips of a report, into a single log line.
+
+    The line gives a count per kind and the first few examples, instead of
+    one line per trip.
+    """
+    def __init__(self, logger: logging.Logger, operation: str, samples: Optional[int] = None):
+        self.logger = logger
+        self.operation = operation
+        self.samples = settings.LOG_ISSUE_SAMPLES if samples is None else samples
+        self.counts: Dict[str, int] = {}
+        self.examples: List[str] = []
+
+    def add(self, kind: str, detail: str) -> None:
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        if len(self.examples) < self.samples:
+            self.examples.append(f"{kind}: {detail}")
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def flush(self, level: int = logging.WARNING) -> None:
+        """Log the summary line, if anything was collected, and start over"""
+        if self.counts:
+            kinds = ", ".join(f"{kind}={count}" for kind, count in sorted(self.counts.items()))
+            self.logger.log(
+                level,
+                "%s: %d issues (%s); e.g. %s",
+                self.operation, self.total, kinds, "; ".join(self.examples)
+            )
+        self.counts = {}
+        self.examples = []
@@ -0,0 +1,165 @@
+import base64
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+# Characters PostgREST treats as syntax inside or=(...) filters
+_RESERVED = set(',.:()"\\ ')
+
+
+def _literal(value: Any) -> str:
+    text = str(value)
+    if any(ch in _RESERVED for ch in text):
+        return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return text
+
+
+def _after(key: str, value: Any, desc: bool) -> List[str]:
+    """
+    Terms for "`key` comes strictly after `value`", one per alternative.
+
+    NULLs sort as PostgreSQL's default order puts them: after every value
+    ascending and before every value descending.
+    """
+    if value is None:
+        return [f"{key}.not.is.null"] if desc else []
+    if desc:
+        return [f"{key}.lt.{_literal(value)}"]
+    return [f"{key}.gt.{_literal(value)}", f"{key}.is.null"]
+
+
+def keyset_filter(keys: Sequence[str], values: Sequence[Any], desc: bool = False) -> str:
+    """
+    PostgREST `or` filter body selecting rows strictly after `values` in
+    (keys...) order, e.g. for ("collection_time", "id"):
+
+        collection_time.gt.T,collection_time.is.null,and(collection_time.eq.T,id.gt.I)
+    """
+    branches = []
+    for i, key in enumerate(keys):
+        prefix = [
+            f"{k}.is.null" if v is None else f"{k}.eq.{_literal(v)}"
+            for k, v in zip(keys[:i], values[:i])
+        ]
+        for term in _after(key, values[i], desc):
+            terms = prefix + [term]
+            branches.append(terms[0] if len(terms) == 1 else f"and({','.join(terms)})")
+    return ",".join(branches)
+
+
+def apply_keyset(query: Any, keys: Sequence[str], after: Optional[Sequence[Any]], desc: bool = False) -> Any:
+    """Restrict a select builder to rows after `after` and order it by `keys`"""
+    if after is not None:
+        if len(keys) == 1 and after[0] is not None:
+            # A single key is unique (in practice "id"), so it has no NULLs to step over
+            query = query.filter(keys[0], "lt" if desc else "gt", after[0])
+        else:
+            query = query.or_(keyset_filter(keys, after, desc))
+    for key in keys:
+        query = query.order(key, desc=desc)
+    return query
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque client-facing token for a keyset position"""
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[str]) -> List[Any]:
+    """Inverse of `encode_cursor`; raises ValueError for malformed or foreign tokens"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+async def fetch_page(
+    build_query: Callable[[], Any],
+    cursor: Optional[str],
+    limit: int,
+    keys: Sequence[str] = ("collection_time", "id"),
+    desc: bool = False
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch one client-requested page of a select query.
+
+    Returns the rows and the cursor for the following page, or None when
+    this is the last one. One extra row is requested to tell the two apart,
+    so a full final page does not cost the client an empty round trip.
+    """
+    after = decode_cursor(cursor, keys) if cursor else None
+    query = apply_keyset(build_query(), keys, after, desc)
+    response = await query.limit(limit + 1).execute()
+
+    rows = response.data
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    try:
+        next_cursor = encode_cursor([rows[-1][key] for key in keys])
+    except KeyError as e:
+        raise ValueError(f"Paged query must select its keyset column {e}")
+    return rows, next_cursor
+
+
+async def iter_pages(
+    build_query: Callable[[], Any],
+    keys: Sequence[str] = ("collection_time", "id"),
+    desc: bool = False,
+    page_size: Optional[int] = None
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield the rows of a select query one page at a time, using keyset pagination.
+
+    `build_query` must return a fresh select builder (filters applied, no
+    order or range) every time it is called, because builders are mutated
+    by each filter. The selected columns must include every key column,
+    and the keys must be unique together (end with "id"). Key columns may
+    be NULL, e.g. trips without a collection_time.
+
+        async for page in iter_pages(lambda: db.table("trips").select(cols).gte(...)):
+            for trip in page:
+                ...
+
+    Each page is one request of at most `page_size` rows, so long ranges
+    are never truncated by the PostgREST max-rows limit and never held in
+    memory all at once.
+    """
+    page_size = page_size or settings.DB_PAGE_SIZE
+    last: Optional[List[Any]] = None
+
+    while True:
+        query = apply_keyset(build_query(), keys, last, desc)
+        response = await query.limit(page_size).execute()
+        rows = response.data
+        if not rows:
+            return
+
+        try:
+            last = [rows[-1][key] for key in keys]
+        except KeyError as e:
+            raise ValueError(f"Paged query must select its keyset column {e}")
+
+        yield rows
+
+        if len(rows) < page_size:
+            return
+
+
+async def iter_rows(
+    build_query: Callable[[], Any],
+    keys: Sequence[str] = ("collection_time", "id"),
+    desc: bool = False,
+    page_size: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Row-at-a-time view of `iter_pages`"""
+    async for page in iter_pages(build_query, keys, desc, page_size):
+        for row in page:
+            yield row
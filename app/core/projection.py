@@ -0,0 +1,111 @@
+import time
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+
+from app.core.config import settings
+from app.core.db import db
+
+# Columns seen on each table, discovered once per process for optional columns
+_table_columns: Dict[str, Set[str]] = {}
+
+# Tables found empty, by when to look again, so reads of an empty table do
+# not each repeat the discovery query
+_empty_until: Dict[str, float] = {}
+EMPTY_TABLE_RECHECK = 60.0
+
+
+class UnprojectedFieldError(KeyError):
+    """A row was read for a column its query did not select"""
+
+
+class ProjectedRow(dict):
+    """
+    Row that refuses reads of columns outside its projection.
+
+    Only used when PROJECTION_GUARD is enabled. `row.get("x", 0)` on a plain
+    dict silently returns the default for a column that was never selected;
+    here it raises instead, so a missing column shows up as an error during
+    development rather than as a wrong total.
+    """
+    __slots__ = ("_projection",)
+
+    def __init__(self, data: Dict[str, Any], projection: "Projection"):
+        super().__init__(data)
+        self._projection = projection
+
+    def _check(self, key: Any) -> None:
+        if key not in self._projection.allowed:
+            raise UnprojectedFieldError(
+                f"Column '{key}' is not in the {self._projection.name} projection of '{self._projection.table}'"
+            )
+
+    def __getitem__(self, key: Any) -> Any:
+        self._check(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key: Any) -> bool:
+        self._check(key)
+        return super().__contains__(key)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        self._check(key)
+        return super().get(key, default)
+
+
+class Projection:
+    """
+    Columns one use site reads from a table.
+
+    Declare it next to the code that consumes the rows, build the query from
+    `await projection.resolve()` and pass the response through `rows()`:
+
+        TRIP_TOTALS = Projection("trips", "trips totals", ["vehicle_id", "collected_amount"])
+
+        columns = await TRIP_TOTALS.resolve()
+        response = await db.table("trips").select(columns).execute()
+        for trip in TRIP_TOTALS.rows(response.data):
+            ...
+
+    `optional` columns are only selected if the table has them, for columns
+    that do not exist in every deployment. Reading an optional column that
+    the table lacks returns the default like a plain dict.
+    """
+    def __init__(self, table: str, name: str, columns: Iterable[str], optional: Iterable[str] = ()):
+        self.table = table
+        self.name = name
+        self.columns = list(columns)
+        self.optional = [c for c in optional if c not in self.columns]
+        self.allowed: FrozenSet[str] = frozenset(self.columns) | frozenset(self.optional)
+        self._select: Optional[str] = None if self.optional else ",".join(self.columns)
+
+    async def resolve(self) -> str:
+        """The PostgREST select string for this projection"""
+        if self._select is not None:
+            return self._select
+
+        available = await _get_table_columns(self.table)
+        if available is None:
+            # Empty table, nothing to project optional columns against yet
+            return ",".join(self.columns)
+
+        self._select = ",".join(self.columns + [c for c in self.optional if c in available])
+        return self._select
+
+    def rows(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Response rows, guarded against unprojected reads when PROJECTION_GUARD is on"""
+        if not settings.PROJECTION_GUARD:
+            return data
+        return [ProjectedRow(row, self) for row in data]
+
+
+async def _get_table_columns(table: str) -> Optional[Set[str]]:
+    columns = _table_columns.get(table)
+    if columns is None:
+        if time.monotonic() < _empty_until.get(table, 0.0):
+            return None
+        response = await db.table(table).select("*").limit(1).execute()
+        if not response.data:
+            _empty_until[table] = time.monotonic() + EMPTY_TABLE_RECHECK
+            return None
+        _empty_until.pop(table, None)
+        columns = _table_columns[table] = set(response.data[0].keys())
+    return columns
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, FrozenSet, Hashable, Iterator, List, Optional, Union
+
+import httpx
+from postgrest.utils import AsyncClient
+
+# Stands for select=* (every column) in a memo entry
+ALL_COLUMNS = "*"
+
+_PLAIN_COLUMN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Headers a PostgREST response cannot be re-encoded with after projection
+_STALE_HEADERS = ("content-length", "content-encoding", "transfer-encoding")
+
+# Methods that may change data, and so invalidate the request's memo
+_WRITE_METHODS = frozenset({"POST", "PATCH", "PUT", "DELETE"})
+
+_current: ContextVar[Optional["QueryMemo"]] = ContextVar("query_memo", default=None)
+
+Columns = Union[str, FrozenSet[str], None]
+
+
+def parse_select(select: Optional[str]) -> Columns:
+    """
+    Column set of a PostgREST `select` parameter.
+
+    Returns ALL_COLUMNS for `*` (or no select at all), a frozenset for a list
+    of plain columns, and None for anything else (embedded resources,
+    aliases, casts), which can only be served by an identical select.
+    """
+    if select is None or select.strip() == "*":
+        return ALL_COLUMNS
+    columns = [c.strip() for c in select.split(",")]
+    if all(_PLAIN_COLUMN.match(c) for c in columns):
+        return frozenset(columns)
+    return None
+
+
+def _covers(cached: Columns, wanted: Columns) -> bool:
+    if cached is None or not isinstance(wanted, frozenset):
+        return False
+    return cached == ALL_COLUMNS or wanted <= cached
+
+
+def _project(response: httpx.Response, columns: FrozenSet[str]) -> httpx.Response:
+    """Copy of a JSON response keeping only `columns` of each row"""
+    data = response.json()
+    if isinstance(data, list):
+        data = [{k: v for k, v in row.items() if k in columns} for row in data]
+    elif isinstance(data, dict):
+        data = {k: v for k, v in data.items() if k in columns}
+
+    headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in _STALE_HEADERS]
+    return httpx.Response(
+        response.status_code,
+        headers=headers,
+        content=json.dumps(data).encode("utf-8"),
+        request=response.request,
+    )
+
+
+class _Entry:
+    __slots__ = ("select", "columns", "task")
+
+    def __init__(self, select: Optional[str], columns: Columns, task: "asyncio.Task[httpx.Response]"):
+        self.select = select
+        self.columns = columns
+        self.task = task
+
+
+class QueryMemo:
+    """
+    Per-request memo of PostgREST reads.
+
+    Reads are keyed on the normalized query: table path, filters, order,
+    limit/range and the headers that change the result. Within one memo an
+    identical read goes to the network once, concurrent identical reads
+    share the same in-flight request, and a read of a narrower column set
+    is answered from a wider result (or select=*) already fetched with the
+    same filters. Any write clears the memo, so a request never reads
+    around its own changes. Failed and non-2xx reads are not kept.
+    """
+    def __init__(self):
+        self._entries: Dict[Hashable, List[_Entry]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def fetch(
+        self,
+        key: Hashable,
+        select: Optional[str],
+        send: Callable[[], Awaitable[httpx.Response]],
+        projectable: bool = True
+    ) -> httpx.Response:
+        columns = parse_select(select)
+        entries = self._entries.setdefault(key, [])
+
+        for entry in entries:
+            if entry.select == select:
+                self.hits += 1
+                return await asyncio.shield(entry.task)
+
+        if projectable:
+            for entry in entries:
+                if _covers(entry.columns, columns):
+                    self.hits += 1
+                    return _project(await asyncio.shield(entry.task), columns)
+
+        self.misses += 1
+        entry = _Entry(select, columns, asyncio.ensure_future(send()))
+        entries.append(entry)
+        entry.task.add_done_callback(lambda task: self._settle(key, entry))
+        return await asyncio.shield(entry.task)
+
+    def _settle(self, key: Hashable, entry: _Entry) -> None:
+        task = entry.task
+        failed = task.cancelled() or task.exception() is not None or task.result().is_error
+        if failed:
+            entries = self._entries.get(key)
+            if entries and entry in entries:
+                entries.remove(entry)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class MemoizingAsyncClient(AsyncClient):
+    """
+    PostgREST session that routes GET requests through the current request's
+    QueryMemo, if one is active, and behaves like the plain client otherwise.
+    """
+    async def request(self, method: str, url: Any, **kwargs: Any) -> httpx.Response:
+        memo = _current.get()
+        if memo is None:
+            return await super().request(method, url, **kwargs)
+
+        if method.upper() != "GET":
+            # A write may change anything read so far; other reads (HEAD counts) are not memoized
+            if method.upper() in _WRITE_METHODS:
+                memo.clear()
+            return await super().request(method, url, **kwargs)
+
+        params = httpx.QueryParams(kwargs.get("params"))
+        headers = httpx.Headers(kwargs.get("headers"))
+        accept = headers.get("accept")
+        key = (
+            str(url),
+            tuple(sorted((k, v) for k, v in params.multi_items() if k != "select")),
+            headers.get("prefer"),
+            headers.get("range"),
+            accept,
+        )
+        projectable = accept in (None, "*/*") or ("json" in accept and "plan" not in accept)
+
+        send = super().request
+        return await memo.fetch(key, params.get("select"), lambda: send(method, url, **kwargs), projectable)
+
+
+async def query_memo_scope() -> AsyncIterator[QueryMemo]:
+    """
+    FastAPI dependency that de-duplicates database reads for one request.
+
+        app.include_router(router, dependencies=[Depends(query_memo_scope)])
+    """
+    memo = QueryMemo()
+    _current.set(memo)
+    try:
+        yield memo
+    finally:
+        memo.clear()
+
+
+@contextmanager
+def bypass_query_memo() -> Iterator[None]:
+    """
+    Send reads straight to the database, e.g. for full-table scans that would
+    otherwise be held in the memo, or for background tasks started from a
+    request (they inherit its context).
+    """
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
@@ -0,0 +1,40 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from postgrest.types import CountMethod
+
+from app.core.db import db
+from app.core.projection import Projection
+
+# Row count and latest updated_at of a selection of rows
+Watermark = Tuple[int, Optional[str]]
+
+# Per table, only to find out whether it has an updated_at column
+_projections: Dict[str, Projection] = {}
+
+
+async def table_watermark(table: str, restrict: Optional[Callable[[Any], Any]] = None) -> Watermark:
+    """
+    Number of rows of `table` (those `restrict` keeps, if given) and their
+    latest updated_at, from one query.
+
+    Changes whenever a row is added or removed, and whenever one is edited
+    if the database maintains updated_at. Tables without the column are
+    compared by count only. Read from the database, so every worker sees
+    the same value however recently it last read the rows.
+
+        await table_watermark("trips", lambda query: query.eq("vehicle_id", vehicle_id))
+    """
+    projection = _projections.get(table)
+    if projection is None:
+        projection = _projections[table] = Projection(table, "watermark", ["id"], optional=["updated_at"])
+
+    if "updated_at" in (await projection.resolve()).split(","):
+        query = db.table(table).select("updated_at", count=CountMethod.exact).order("updated_at", desc=True, nullsfirst=False).limit(1)
+    else:
+        query = db.table(table).select("id", count=CountMethod.exact, head=True)
+    if restrict is not None:
+        query = restrict(query)
+
+    response = await query.execute()
+    latest = response.data[0].get("updated_at") if response.data else None
+    return response.count or 0, (str(latest) if latest else None)
@@ -1,17 +1,25 @@
-from fastapi import FastAPI, Request, status
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.openapi.utils import get_openapi
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from app.api import auth, vehicles, routes, drivers, trips, dashboard, reports, deficits
+from app.api import auth, vehicles, routes, drivers, trips, dashboard, reports, deficits, system
 from app.schemas.user import ErrorResponse
 from app.core.utils import DateTimeEncoder
 from app.core.config import settings
+from app.core.db import db
+from app.core.logs import setup_logging, shutdown_logging
+from app.core.query_memo import query_memo_scope
+from app.services import pdf
+from app.services.rollups import synced_trip_rollups, trip_rollups
 import json
 import os
 from datetime import datetime
 
+# Log output is written by a background thread, configured from settings
+setup_logging()
+
 class CustomJSONResponse(JSONResponse):
     """Custom JSONResponse that handles datetime serialization"""
     def render(self, content) -> bytes:
@@ -193,9 +201,31 @@ app.include_router(vehicles.router, prefix="/api/vehicles", tags=["Vehicles"])
 app.include_router(drivers.router, prefix="/api/drivers", tags=["Drivers"])
 app.include_router(routes.router, prefix="/api/routes", tags=["Routes"])
 app.include_router(trips.router, prefix="/api/trips", tags=["Trips"])
-app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+# Dashboard handlers compose several reads, so identical reads within one request are shared
+app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"], dependencies=[Depends(query_memo_scope), Depends(synced_trip_rollups)])
 app.include_router(reports.router, prefix="/api/reports", tags=["Reports"])
 app.include_router(deficits.router, prefix="/api/deficits", tags=["Deficits"])
+app.include_router(system.router, prefix="/api/system", tags=["System"])
+
+@app.on_event("startup")
+async def warm_trip_rollups():
+    """Backfill trip rollups in the background so the first dashboard request does not wait"""
+    trip_rollups.schedule_refresh()
+
+@app.on_event("shutdown")
+async def close_database_pool():
+    """Close pooled database connections on shutdown"""
+    await db.aclose()
+
+@app.on_event("shutdown")
+async def stop_pdf_workers():
+    """Stop the PDF render pool on shutdown"""
+    pdf.shutdown_pool()
+
+@app.on_event("shutdown")
+async def stop_log_writer():
+    """Write out queued log records on shutdown"""
+    shutdown_logging()
 
 @app.get("/")
 async def root():
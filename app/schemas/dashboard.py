@@ -30,6 +30,12 @@ class DashboardOverview(BaseModel):
     vehicle_utilization: float  # Vehicle utilization percentage
     avg_collection_comparison: float  # Average collection compared to previous week
     
+class MetricChange(BaseModel):
+    """One metric of a period compared with the baseline period"""
+    baseline: float  # Value over the baseline period
+    change: float  # Current value minus baseline value
+    percent_change: float  # Change as a percentage of the baseline value
+
 class VehiclePerformance(BaseModel):
     """Performance metrics for a vehicle"""
     vehicle_id: str
@@ -44,6 +50,7 @@ class VehiclePerformance(BaseModel):
     collection_per_trip: float = 0
     expense_ratio: float = 0  # Expenses as percentage of collections
     utilization_rate: Optional[float] = None  # Percentage of days vehicle was used
+    comparison: Optional[Dict[str, MetricChange]] = None  # Per metric, when a baseline period was given
 
 class DetailedVehiclePerformance(VehiclePerformance):
     """Detailed performance metrics with time series data"""
@@ -52,6 +59,13 @@ class DetailedVehiclePerformance(VehiclePerformance):
     profit_by_day: List[TimeSeriesData] = []
     trips_by_day: List[TimeSeriesData] = []
 
+class DetailedVehiclePerformanceBatch(BaseModel):
+    """Detailed performance of several vehicles, by vehicle ID"""
+    vehicles: Dict[str, DetailedVehiclePerformance]
+    not_found: List[str] = []
+    start_date: date
+    end_date: date
+
 class VehiclePerformanceList(BaseModel):
     """List of vehicle performance data with summary metrics"""
     vehicles: List[VehiclePerformance]
@@ -61,6 +75,9 @@ class VehiclePerformanceList(BaseModel):
     average_profit_per_vehicle: float
     start_date: date
     end_date: date
+    baseline_start_date: Optional[date] = None
+    baseline_end_date: Optional[date] = None
+    comparison: Optional[Dict[str, MetricChange]] = None
 
 class DriverPerformance(BaseModel):
     """Performance metrics for a driver"""
@@ -72,6 +89,7 @@ class DriverPerformance(BaseModel):
     collection_efficiency: float = 0  # Collected amount vs expected amount
     total_vehicles_driven: int = 0
     most_driven_vehicle: Optional[str] = None
+    comparison: Optional[Dict[str, MetricChange]] = None  # Per metric, when a baseline period was given
 
 class DetailedDriverPerformance(DriverPerformance):
     """Detailed driver performance with time series data"""
@@ -79,6 +97,13 @@ class DetailedDriverPerformance(DriverPerformance):
     trips_by_day: List[TimeSeriesData] = []
     vehicles_driven: List[Dict[str, Any]] = []
 
+class DetailedDriverPerformanceBatch(BaseModel):
+    """Detailed performance of several drivers, by driver ID"""
+    drivers: Dict[str, DetailedDriverPerformance]
+    not_found: List[str] = []
+    start_date: date
+    end_date: date
+
 class DriverPerformanceList(BaseModel):
     """List of driver performance data with summary metrics"""
     drivers: List[DriverPerformance]
@@ -87,6 +112,9 @@ class DriverPerformanceList(BaseModel):
     average_collections_per_driver: float
     start_date: date
     end_date: date
+    baseline_start_date: Optional[date] = None
+    baseline_end_date: Optional[date] = None
+    comparison: Optional[Dict[str, MetricChange]] = None
 
 class DashboardStats(BaseModel):
     """Comprehensive dashboard statistics"""
@@ -123,12 +151,25 @@ class PerformanceSummary(BaseModel):
     end_date: date
     vehicle_ids: Optional[List[str]] = None
     driver_ids: Optional[List[str]] = None
+    baseline_start_date: Optional[date] = None
+    baseline_end_date: Optional[date] = None
+    comparison: Optional[Dict[str, MetricChange]] = None
 
 class ReportFormat(str, Enum):
     """Format options for generated reports"""
     PDF = "pdf"
     HTML = "html"
 
+class ExportFormat(str, Enum):
+    """Format options for trip log exports"""
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+class BundleKind(str, Enum):
+    """Entities a report bundle has one report for"""
+    DRIVERS = "drivers"
+    VEHICLES = "vehicles"
+
 class ReportResponse(BaseModel):
     """Response with report file information"""
     filename: str
@@ -70,4 +70,9 @@ class TripResponse(TripBase):
     vehicle_reg_no: Optional[str] = None
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class TripPage(BaseModel):
+    items: List[TripResponse]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` for the next page
+    total: Optional[int] = None  # Only counted when include_total=true 
\ No newline at end of file
@@ -23,4 +23,14 @@ class DailySummaryResponse(DailySummaryBase):
 
 class DailySummaryDetail(DailySummaryResponse):
     vehicle_registration: str
-    driver_name: Optional[str] = None 
\ No newline at end of file
+    driver_name: Optional[str] = None
+
+class ReportJobResponse(BaseModel):
+    """State of a report generated in the background"""
+    job_id: str
+    kind: str  # driver, vehicle, combined or bundle
+    status: str  # pending, running, done or failed
+    created_at: float
+    finished_at: Optional[float] = None
+    filename: Optional[str] = None
+    error: Optional[str] = None
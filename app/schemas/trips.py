@@ -54,4 +54,9 @@ class TripDetail(TripResponse):
     destination: Optional[str] = None
     fare_amount: Optional[float] = None
     collection_date: Optional[str] = None
-    collection_time_only: Optional[str] = None 
\ No newline at end of file
+    collection_time_only: Optional[str] = None
+
+class TripPage(BaseModel):
+    items: List[TripDetail]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` for the next page
+    total: Optional[int] = None  # Only counted when include_total=true 
\ No newline at end of file
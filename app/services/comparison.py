@@ -0,0 +1,34 @@
+from typing import Any, Dict, Iterable, Optional
+
+
+def percent_change(current: float, previous: float) -> float:
+    """
+    Change from `previous` to `current` in percent of `previous`. Growth from
+    nothing counts as 100%, and a negative `previous` (e.g. a loss) is
+    measured by its size, so an improvement is always a positive change.
+    """
+    if previous:
+        return ((current - previous) / abs(previous)) * 100
+    return 100 if current > 0 else 0
+
+
+def compare_metrics(
+    current: Dict[str, Any],
+    baseline: Optional[Dict[str, Any]],
+    fields: Iterable[str]
+) -> Dict[str, Dict[str, float]]:
+    """
+    Baseline value, absolute change and percent change of each field, for
+    one entity measured over two periods. A missing baseline counts as 0.
+    """
+    baseline = baseline or {}
+    result = {}
+    for field in fields:
+        now = current.get(field) or 0
+        before = baseline.get(field) or 0
+        result[field] = {
+            "baseline": before,
+            "change": now - before,
+            "percent_change": percent_change(now, before)
+        }
+    return result
@@ -0,0 +1,153 @@
+import asyncio
+import bisect
+import logging
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services import reference
+
+logger = logging.getLogger(__name__)
+
+# Expiry columns on the vehicles table and their display names
+LICENSE_COLUMNS = [
+    ("insurance_expiry", "Insurance"),
+    ("tlb_expiry", "TLB"),
+    ("inspection_expiry", "Inspection"),
+    ("speed_governor_expiry", "Speed Governor"),
+]
+
+# (expiry day ordinal, vehicle id, position in LICENSE_COLUMNS)
+Entry = Tuple[int, str, int]
+
+
+def parse_expiry(value: Any) -> Optional[date]:
+    """Calendar day of an expiry column, or None if it is empty or invalid"""
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+class Expiry:
+    """One license of one vehicle expiring on `expiry`"""
+    __slots__ = ("vehicle", "column_index", "column", "label", "expiry")
+
+    def __init__(self, vehicle: Dict[str, Any], column_index: int, expiry: date):
+        self.vehicle = vehicle
+        self.column_index = column_index
+        self.column, self.label = LICENSE_COLUMNS[column_index]
+        self.expiry = expiry
+
+
+class ExpiryIndex:
+    """
+    Every license expiry date of the fleet, kept in one sorted list.
+
+    "What expires between two days" is two bisections and a slice, with no
+    date parsing and no query. The index is loaded from the (cached)
+    vehicles table, kept current by `put()` / `discard()` from the vehicle
+    write handlers, and reloaded every REFERENCE_CACHE_TTL seconds to pick
+    up vehicles written by other processes.
+    """
+    def __init__(self):
+        self._entries: List[Entry] = []
+        self._by_vehicle: Dict[str, List[Entry]] = {}
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+        # Writes seen while a reload is reading the table, replayed onto it
+        self._pending: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # Created on first use so it binds to the running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def put(self, vehicle: Dict[str, Any]) -> None:
+        """Write-through after a vehicle insert or update"""
+        # Copied, handlers go on to shape the response row they pass in
+        vehicle = dict(vehicle)
+        vehicle_id = str(vehicle["id"])
+        if self._pending is not None:
+            self._pending[vehicle_id] = vehicle
+        self._apply(vehicle_id, vehicle)
+
+    def discard(self, vehicle_id: str) -> None:
+        """Write-through after a vehicle delete"""
+        vehicle_id = str(vehicle_id)
+        if self._pending is not None:
+            self._pending[vehicle_id] = None
+        self._apply(vehicle_id, None)
+
+    def _apply(self, vehicle_id: str, vehicle: Optional[Dict[str, Any]]) -> None:
+        for entry in self._by_vehicle.pop(vehicle_id, []):
+            position = bisect.bisect_left(self._entries, entry)
+            if position < len(self._entries) and self._entries[position] == entry:
+                del self._entries[position]
+        self.rows.pop(vehicle_id, None)
+        if vehicle is None:
+            return
+
+        self.rows[vehicle_id] = vehicle
+        entries = self._by_vehicle[vehicle_id] = []
+        for column, (name, _) in enumerate(LICENSE_COLUMNS):
+            expiry = parse_expiry(vehicle.get(name))
+            if expiry is not None:
+                entry = (expiry.toordinal(), vehicle_id, column)
+                bisect.insort(self._entries, entry)
+                entries.append(entry)
+
+    async def ensure_loaded(self) -> None:
+        """Load on first use and reload once older than REFERENCE_CACHE_TTL"""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at <= settings.REFERENCE_CACHE_TTL:
+            return
+        async with self.lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at <= settings.REFERENCE_CACHE_TTL:
+                return
+            self._pending = {}
+            try:
+                vehicles = await reference.vehicles.all()
+                self._entries = []
+                self._by_vehicle = {}
+                self.rows = {}
+                for vehicle in vehicles:
+                    self._apply(str(vehicle["id"]), vehicle)
+                for vehicle_id, vehicle in self._pending.items():
+                    self._apply(vehicle_id, vehicle)
+            finally:
+                self._pending = None
+            self._loaded_at = time.monotonic()
+            logger.debug("Loaded %d license expiries of %d vehicles", len(self._entries), len(self.rows))
+
+    async def between(self, start: date, end: date) -> List[Expiry]:
+        """Licenses expiring on start <= day <= end, soonest first"""
+        await self.ensure_loaded()
+        low = bisect.bisect_left(self._entries, (start.toordinal(),))
+        high = bisect.bisect_left(self._entries, (end.toordinal() + 1,))
+        return [
+            Expiry(self.rows[vehicle_id], column, date.fromordinal(day))
+            for day, vehicle_id, column in self._entries[low:high]
+        ]
+
+    async def expiring_within(self, days: int, today: Optional[date] = None) -> List[Expiry]:
+        """Licenses expiring from today through the next `days` days"""
+        today = today or date.today()
+        return await self.between(today, today + timedelta(days=days))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "vehicles": len(self.rows),
+            "expiries": len(self._entries),
+            "age_seconds": (time.monotonic() - self._loaded_at) if self._loaded_at is not None else None
+        }
+
+
+vehicle_expiry = ExpiryIndex()
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.db import fan_out
+from app.core.query_memo import bypass_query_memo
+from app.services import reference
+from app.services.comparison import percent_change
+from app.services.rollups import trip_rollups
+
+logger = logging.getLogger(__name__)
+
+# Vehicles listed in the "top movers" card
+TOP_MOVERS = 5
+
+
+class LiveFeedFull(Exception):
+    """The feed already has LIVE_MAX_CONNECTIONS subscribers"""
+
+
+class Subscription:
+    """
+    One connected screen: the cards changed since it last read, merged.
+
+    A screen that reads slower than cards change never queues updates. A
+    newer value of a card replaces the unread one, so each connection holds
+    at most one set of cards however far behind it is.
+    """
+    __slots__ = ("_pending", "_ready", "conflated")
+
+    def __init__(self):
+        self._pending: Optional[Dict[str, Any]] = None
+        self._ready = asyncio.Event()
+        self.conflated = 0
+
+    def offer(self, cards: Dict[str, Any]) -> None:
+        if self._pending is None:
+            self._pending = dict(cards)
+        else:
+            self._pending.update(cards)
+            self.conflated += 1
+        self._ready.set()
+
+    async def next(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """The changed cards, or None if nothing changed within `timeout` seconds"""
+        if self._pending is None:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        self._ready.clear()
+        cards, self._pending = self._pending, None
+        return cards
+
+
+class LiveFeed:
+    """
+    Cards computed once and pushed to every subscriber.
+
+    `notify()` after a write schedules one recomputation LIVE_UPDATE_DELAY
+    seconds later, so a burst of writes is computed once. Only the cards
+    whose value changed are offered to the subscribers. Nothing is computed
+    while nobody is subscribed; the next subscriber computes on arrival if
+    the data changed (per `version()`) or the day rolled over.
+    """
+    def __init__(
+        self,
+        name: str,
+        compute: Callable[[date], Awaitable[Dict[str, Any]]],
+        version: Callable[[], Any]
+    ):
+        self.name = name
+        self.compute = compute
+        self.version = version
+        self.cards: Optional[Dict[str, Any]] = None
+        self._computed_for: Optional[Tuple[date, Any]] = None
+        self._subscribers: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.computations = 0
+        self.updates = 0
+        self.errors = 0
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # Created on first use so it binds to the running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _stale(self) -> bool:
+        return self._computed_for != (date.today(), self.version())
+
+    async def subscribe(self) -> Subscription:
+        """A new subscription, whose first read is the full set of cards"""
+        if len(self._subscribers) >= settings.LIVE_MAX_CONNECTIONS:
+            raise LiveFeedFull(f"The {self.name} feed already has {len(self._subscribers)} connections")
+        if self.cards is None or self._stale():
+            await self.refresh()
+
+        subscription = Subscription()
+        subscription.offer(self.cards)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def notify(self) -> None:
+        """Data changed: recompute for the subscribers, once per burst of calls"""
+        if self._subscribers and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    def check(self) -> None:
+        """Notify if the data changed without a `notify()` (e.g. a rollup rebuild) or the day rolled over"""
+        if self._stale():
+            self.notify()
+
+    async def _run(self) -> None:
+        try:
+            while self._subscribers:
+                await asyncio.sleep(settings.LIVE_UPDATE_DELAY)
+                await self.refresh()
+                # Writes during the computation need another one
+                if not self._stale():
+                    break
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Error updating the {self.name} feed: {str(e)}")
+
+    async def refresh(self) -> None:
+        """Recompute the cards and offer the changed ones to every subscriber"""
+        async with self.lock:
+            computed_for = (date.today(), self.version())
+            if self.cards is not None and computed_for == self._computed_for:
+                return
+
+            # Shared by every subscriber, so it must not read through one request's query memo
+            with bypass_query_memo():
+                cards = await self.compute(computed_for[0])
+            self.computations += 1
+
+            changed = {
+                name: value for name, value in cards.items()
+                if self.cards is None or self.cards.get(name) != value
+            }
+            self.cards = cards
+            self._computed_for = computed_for
+            if changed:
+                self.updates += 1
+                for subscription in self._subscribers:
+                    subscription.offer(changed)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": len(self._subscribers),
+            "max_connections": settings.LIVE_MAX_CONNECTIONS,
+            "computations": self.computations,
+            "updates": self.updates,
+            "conflated": sum(subscription.conflated for subscription in self._subscribers),
+            "errors": self.errors,
+            "computed_for": self._computed_for[0].isoformat() if self._computed_for else None
+        }
+
+
+async def compute_live_cards(today: date) -> Dict[str, Any]:
+    """
+    Live dashboard cards from the trip rollups: today's revenue against
+    yesterday, today's vehicle utilization and the vehicles whose
+    collections moved most since yesterday.
+    """
+    yesterday = today - timedelta(days=1)
+    days = [(today, today), (yesterday, yesterday)]
+    (fleet_today, fleet_yesterday), (vehicles_today, vehicles_yesterday), vehicles = await fan_out(
+        trip_rollups.period_totals(days),
+        trip_rollups.period_totals_by("vehicle", days),
+        reference.vehicles.all()
+    )
+
+    active_vehicles_count = sum(1 for v in vehicles if v.get("status") == "active")
+    registrations = {v["id"]: v.get("reg_no", "Unknown") for v in vehicles}
+
+    movers = []
+    for vehicle_id in set(vehicles_today) | set(vehicles_yesterday):
+        now = vehicles_today[vehicle_id].collected_amount if vehicle_id in vehicles_today else 0
+        before = vehicles_yesterday[vehicle_id].collected_amount if vehicle_id in vehicles_yesterday else 0
+        movers.append({
+            "vehicle_id": vehicle_id,
+            "registration": registrations.get(vehicle_id, "Unknown"),
+            "collections_today": now,
+            "collections_yesterday": before,
+            "change": now - before,
+            "percent_change": percent_change(now, before)
+        })
+    movers.sort(key=lambda mover: (-abs(mover["change"]), mover["vehicle_id"]))
+
+    return {
+        "date": today.isoformat(),
+        "revenue": {
+            "total_revenue_today": fleet_today.collected_amount,
+            "total_revenue_yesterday": fleet_yesterday.collected_amount,
+            "revenue_comparison": percent_change(fleet_today.collected_amount, fleet_yesterday.collected_amount),
+            "trip_count_today": fleet_today.trip_count
+        },
+        "utilization": {
+            "active_vehicles_today": len(vehicles_today),
+            "active_vehicles_count": active_vehicles_count,
+            "vehicle_utilization": (len(vehicles_today) / active_vehicles_count * 100) if active_vehicles_count > 0 else 0
+        },
+        "top_movers": movers[:TOP_MOVERS]
+    }
+
+
+live_dashboard = LiveFeed("dashboard", compute_live_cards, lambda: trip_rollups.version)
@@ -0,0 +1,72 @@
+from typing import Any, Dict, Iterable, Optional, Set
+
+from app.core.db import fan_out
+from app.services import reference
+
+
+class NameResolver:
+    """
+    Request-scoped batch loader for driver names and vehicle registrations.
+
+    Collect every driver_id / vehicle_id needed while building a response,
+    then call `load()` once. Ids are served from the reference-data cache and
+    any misses are fetched with a single `in_()` query per table instead of
+    one query per row.
+
+        names = NameResolver()
+        names.collect(trips)
+        await names.load()
+        names.driver_name(trip["driver_id"])
+    """
+    def __init__(self):
+        self._pending_drivers: Set[str] = set()
+        self._pending_vehicles: Set[str] = set()
+        self.drivers: Dict[str, str] = {}
+        self.vehicles: Dict[str, str] = {}
+
+    def add_driver(self, driver_id: Optional[str]) -> None:
+        if driver_id and driver_id not in self.drivers:
+            self._pending_drivers.add(str(driver_id))
+
+    def add_vehicle(self, vehicle_id: Optional[str]) -> None:
+        if vehicle_id and vehicle_id not in self.vehicles:
+            self._pending_vehicles.add(str(vehicle_id))
+
+    def collect(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        driver_key: Optional[str] = "driver_id",
+        vehicle_key: Optional[str] = "vehicle_id"
+    ) -> "NameResolver":
+        """Queue the driver and vehicle ids referenced by a list of rows"""
+        for row in rows:
+            if driver_key:
+                self.add_driver(row.get(driver_key))
+            if vehicle_key:
+                self.add_vehicle(row.get(vehicle_key))
+        return self
+
+    async def load(self) -> "NameResolver":
+        """Resolve all queued ids, one query per table, both tables at once"""
+        driver_ids = list(self._pending_drivers)
+        vehicle_ids = list(self._pending_vehicles)
+        self._pending_drivers.clear()
+        self._pending_vehicles.clear()
+
+        drivers, vehicles = await fan_out(
+            reference.drivers.get_many(driver_ids),
+            reference.vehicles.get_many(vehicle_ids)
+        )
+        for row_id, row in drivers.items():
+            self.drivers[row_id] = row.get("name")
+        for row_id, row in vehicles.items():
+            self.vehicles[row_id] = row.get("reg_no")
+
+        return self
+
+    def driver_name(self, driver_id: Optional[str], default: Optional[str] = None) -> Optional[str]:
+        return self.drivers.get(driver_id, default) if driver_id else default
+
+    def vehicle_reg_no(self, vehicle_id: Optional[str], default: Optional[str] = None) -> Optional[str]:
+        return self.vehicles.get(vehicle_id, default) if vehicle_id else default
+
@@ -0,0 +1,148 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, List
+
+from app.core.projection import Projection
+from app.services.comparison import percent_change
+from app.services.expiry import Expiry
+from app.services.trip_records import TripRecord
+
+# Number of days ahead a license expiry counts as an upcoming renewal
+RENEWAL_WINDOW_DAYS = 10
+
+# Columns the overview needs from the trips table
+TRIP_COLUMNS = Projection("trips", "overview", ["id", "vehicle_id", "collected_amount", "collection_time"])
+
+
+def overview_scan_start(today: date) -> datetime:
+    """Earliest collection_time any overview card looks at (30-day window)"""
+    return datetime.combine(today - timedelta(days=30), time.min)
+
+
+def _utc_timestamp(value: datetime) -> float:
+    """POSIX seconds of a naive UTC datetime, comparable with `TripRecord.timestamp`"""
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def compute_renewals(vehicles: Iterable[Dict[str, Any]], expiring: Iterable[Expiry], today: date) -> List[Dict[str, Any]]:
+    """
+    Vehicles with at least one license expiring within the renewal window, in
+    vehicles table order. `expiring` comes from `vehicle_expiry.between()`
+    over today .. today + RENEWAL_WINDOW_DAYS.
+    """
+    expiring_by_vehicle: Dict[str, List[Expiry]] = {}
+    for expiry in expiring:
+        expiring_by_vehicle.setdefault(str(expiry.vehicle["id"]), []).append(expiry)
+
+    renewals = []
+    for vehicle in vehicles:
+        expiries = expiring_by_vehicle.get(str(vehicle.get("id")))
+        if not expiries:
+            continue
+        # Licenses in column order, as on the vehicle form
+        expiries.sort(key=lambda expiry: expiry.column_index)
+        renewals.append({
+            "vehicle_name": vehicle.get("reg_no", f"Vehicle {vehicle.get('id')}"),
+            "expiring_licenses": [
+                {"license": expiry.label, "days_left": (expiry.expiry - today).days}
+                for expiry in expiries
+            ]
+        })
+    return renewals
+
+
+class FinancialOverview:
+    """
+    Single-pass aggregator for the dashboard finance cards.
+
+    Feed it every trip collected since `overview_scan_start(today)`, decoded
+    with TRIP_COLUMNS, with `add()` (in any order, page by page) and call
+    `result()` with the whole vehicles table and the licenses expiring
+    within the renewal window. Window bounds are kept as
+    POSIX seconds so each trip is compared without date arithmetic.
+    """
+    def __init__(self, today: date):
+        self.today = today
+        today_start = datetime.combine(today, time.min)
+        today_end = datetime.combine(today, time(23, 59, 59))
+        week_ago = today_start - timedelta(days=7)
+        self.today_start = _utc_timestamp(today_start)
+        self.today_end = _utc_timestamp(today_end)
+        self.yesterday_start = _utc_timestamp(today_start - timedelta(days=1))
+        self.yesterday_end = _utc_timestamp(today_end - timedelta(days=1))
+        self.thirty_days_start = _utc_timestamp(overview_scan_start(today))
+        self.week_ago = _utc_timestamp(week_ago)
+        self.prev_week_start = _utc_timestamp(week_ago - timedelta(days=7))
+
+        self.total_revenue_today = 0
+        self.total_revenue_yesterday = 0
+        self.total_collections = 0
+        self.prev_week_total = 0
+        self.prev_week_has_vehicles = False
+        self.active_vehicles_today = set()
+
+    def add(self, trip: TripRecord) -> None:
+        collected_at = trip.timestamp
+        if collected_at is None or collected_at < self.thirty_days_start:
+            return
+
+        amount = trip.collected_amount
+        vehicle_id = trip.vehicle_id
+
+        if self.today_start <= collected_at < self.today_end:
+            self.total_revenue_today += amount
+            if vehicle_id:
+                self.active_vehicles_today.add(vehicle_id)
+        elif self.yesterday_start <= collected_at < self.yesterday_end:
+            self.total_revenue_yesterday += amount
+
+        if vehicle_id:
+            self.total_collections += amount
+            if self.prev_week_start <= collected_at < self.week_ago:
+                self.prev_week_total += amount
+                self.prev_week_has_vehicles = True
+
+    def result(self, vehicles: List[Dict[str, Any]], expiring: Iterable[Expiry]) -> Dict[str, Any]:
+        active_vehicles_count = sum(1 for v in vehicles if v.get("status") == "active")
+        total_vehicles_count = len(vehicles)
+
+        avg_collection_per_vehicle = self.total_collections / total_vehicles_count if total_vehicles_count > 0 else 0
+
+        if self.prev_week_has_vehicles and total_vehicles_count > 0:
+            prev_week_avg = self.prev_week_total / total_vehicles_count
+            avg_collection_comparison = percent_change(avg_collection_per_vehicle, prev_week_avg)
+        else:
+            avg_collection_comparison = 0
+
+        vehicle_utilization = (len(self.active_vehicles_today) / active_vehicles_count) * 100 if active_vehicles_count > 0 else 0
+
+        renewals = compute_renewals(vehicles, expiring, self.today)
+
+        return {
+            "total_revenue_today": self.total_revenue_today,
+            "active_vehicles_count": active_vehicles_count,
+            "total_vehicles_count": total_vehicles_count,
+            "upcoming_renewals": len(renewals),
+            "renewals": renewals,
+            "avg_collection_per_vehicle": avg_collection_per_vehicle,
+            "revenue_comparison": percent_change(self.total_revenue_today, self.total_revenue_yesterday),
+            "vehicle_utilization": vehicle_utilization,
+            "avg_collection_comparison": avg_collection_comparison
+        }
+
+
+def compute_financial_overview(
+    trips: Iterable[TripRecord],
+    vehicles: List[Dict[str, Any]],
+    expiring: Iterable[Expiry],
+    today: date
+) -> Dict[str, Any]:
+    """
+    Compute every dashboard finance card from one pass over the trips.
+
+    `trips` must cover everything collected since `overview_scan_start(today)`
+    and `vehicles` must be the whole vehicles table.
+    """
+    aggregator = FinancialOverview(today)
+    for trip in trips:
+        aggregator.add(trip)
+    return aggregator.result(vehicles, expiring)
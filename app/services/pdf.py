@@ -0,0 +1,189 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import signal
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from jinja2 import Environment, FileSystemLoader
+from xhtml2pdf import pisa
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = "app/templates"
+
+# One environment per process (the server and each pool worker), so templates compile once
+_template_env: Optional[Environment] = None
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class PdfRenderError(Exception):
+    """The template could not be rendered or converted to PDF"""
+
+
+class PdfRenderTimeout(PdfRenderError):
+    """Rendering took longer than REPORT_PDF_TIMEOUT"""
+
+
+class _Deadline(BaseException):
+    # Not an Exception, so the `except Exception` blocks inside xhtml2pdf cannot swallow it
+    pass
+
+
+def _get_template_env() -> Environment:
+    global _template_env
+    if _template_env is None:
+        _template_env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+    return _template_env
+
+
+def render_pdf_sync(template_name: str, context: Dict[str, Any]) -> bytes:
+    """
+    Render an HTML template and convert it to PDF bytes.
+
+    Runs in a pool worker, so it only touches the template directory and
+    raises PdfRenderError with a plain message (tracebacks of worker
+    exceptions do not survive the trip back to the server process).
+    """
+    try:
+        html = _get_template_env().get_template(template_name).render(**context)
+    except Exception as e:
+        raise PdfRenderError(f"Template error: {str(e)}")
+
+    pdf_content = io.BytesIO()
+    pisa_status = pisa.CreatePDF(html, dest=pdf_content)
+    if pisa_status.err:
+        raise PdfRenderError(f"PDF generation error: {pisa_status.err}")
+    return pdf_content.getvalue()
+
+
+def _deadline_passed(signum: int, frame: Any) -> None:
+    raise _Deadline()
+
+
+def render_pdf_job(template_name: str, context: Dict[str, Any], timeout: float) -> bytes:
+    """
+    `render_pdf_sync` in a pool worker, stopped with PdfRenderTimeout after
+    `timeout` seconds.
+
+    The clock is a timer signal in the worker itself, so it starts when the
+    worker picks the job up (time queued behind other renders does not
+    count) and stopping it leaves the worker and the other renders alone.
+    Where timer signals are not available, only `render_pdf`'s backstop
+    applies.
+    """
+    if not hasattr(signal, "setitimer"):
+        return render_pdf_sync(template_name, context)
+
+    previous = signal.signal(signal.SIGALRM, _deadline_passed)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return render_pdf_sync(template_name, context)
+    except _Deadline:
+        raise PdfRenderTimeout(f"PDF rendering timed out after {timeout:g}s")
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn, not fork: the server process holds an event loop, threads and open sockets
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.REPORT_PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def _recycle_pool(pool: ProcessPoolExecutor) -> None:
+    """Kill a pool whose worker is stuck, the next render starts a fresh one"""
+    global _pool
+    if _pool is pool:
+        _pool = None
+    # Executor.shutdown() cannot stop a running task, so terminate the workers directly
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _await_render(future: Future, timeout: float) -> bytes:
+    """
+    Result of a submitted render, or PdfRenderTimeout if it is still running
+    2 x `timeout` seconds after it left the queue.
+
+    The worker stops its own render after `timeout` (see `render_pdf_job`);
+    this only catches a worker that no longer reacts, e.g. stuck in C code.
+    A job leaves the queue when it is handed to the workers, which can be up
+    to one render before a worker starts it, hence the factor 2.
+    """
+    loop = asyncio.get_running_loop()
+    result = asyncio.wrap_future(future)
+    started = None
+    try:
+        while True:
+            if started is None and future.running():
+                started = loop.time()
+            # Queued jobs are checked twice a second for having started
+            wait = 0.5 if started is None else started + 2 * timeout - loop.time()
+            if wait <= 0:
+                raise PdfRenderTimeout(f"PDF rendering timed out after {timeout:g}s")
+            done, _ = await asyncio.wait({result}, timeout=wait)
+            if done:
+                return result.result()
+    except asyncio.CancelledError:
+        # A queued render nobody waits for any more is dropped
+        future.cancel()
+        raise
+
+
+async def render_pdf(template_name: str, context: Dict[str, Any]) -> bytes:
+    """
+    Render a template to PDF without blocking the event loop.
+
+    Renders run in a pool of REPORT_PDF_WORKERS processes (or a thread when
+    it is 0), so at most that many PDFs are converted at once and the rest
+    queue. A render that runs longer than REPORT_PDF_TIMEOUT, counted from
+    when a worker starts it, raises PdfRenderTimeout without affecting the
+    other renders. Only a worker that does not stop by itself gets the pool
+    recycled; renders that shared the pool are then retried once.
+    """
+    if settings.REPORT_PDF_WORKERS <= 0:
+        try:
+            return await asyncio.wait_for(
+                asyncio.to_thread(render_pdf_sync, template_name, context),
+                timeout=settings.REPORT_PDF_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            raise PdfRenderTimeout(f"PDF rendering timed out after {settings.REPORT_PDF_TIMEOUT:g}s")
+
+    for attempt in range(2):
+        pool = _get_pool()
+        try:
+            future = pool.submit(render_pdf_job, template_name, context, settings.REPORT_PDF_TIMEOUT)
+            return await _await_render(future, settings.REPORT_PDF_TIMEOUT)
+        except PdfRenderTimeout:
+            if not future.done():
+                logger.error(f"PDF render worker for {template_name} did not stop at its timeout, recycling the render pool")
+                _recycle_pool(pool)
+            raise
+        except BrokenProcessPool:
+            # Another render's timeout (or a crashed worker) took the pool down
+            _recycle_pool(pool)
+            if attempt:
+                raise PdfRenderError("PDF render pool crashed")
+    raise PdfRenderError("PDF render pool crashed")
+
+
+def shutdown_pool() -> None:
+    """Stop the render workers (on application shutdown)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,87 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.db import db
+
+# Maximum ids per `in_()` filter, keeps the PostgREST URL well under server limits
+BATCH_SIZE = 200
+
+# Cache key for the snapshot of the whole table
+_ALL = ("__all__",)
+
+
+class ReferenceTable:
+    """
+    Read-through cache of full rows from a small, rarely written table.
+
+    Rows are cached by id. Writers must call `put()` with the stored row
+    after an insert/update, or `invalidate()` after a delete, so the cache
+    never serves a row this process knows to be stale. Rows written by other
+    processes are picked up once their TTL expires.
+
+    Readers get copies of the cached rows, so enriching or trimming a row
+    for one response does not change it for the next.
+    """
+    def __init__(self, table: str):
+        self.table = table
+        self.cache = TTLCache(
+            name=table,
+            maxsize=settings.REFERENCE_CACHE_MAX_ENTRIES,
+            ttl=settings.REFERENCE_CACHE_TTL
+        )
+
+    async def get(self, row_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Get one row by id, or None if it does not exist"""
+        if not row_id:
+            return None
+        rows = await self.get_many([row_id])
+        return rows.get(str(row_id))
+
+    async def get_many(self, ids: Iterable[Optional[str]]) -> Dict[str, Dict[str, Any]]:
+        """Get rows by id. Cache misses are fetched with one in_() query"""
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for row_id in {str(i) for i in ids if i}:
+            row = self.cache.get(row_id)
+            if row is None:
+                missing.append(row_id)
+            else:
+                found[row_id] = dict(row)
+
+        for i in range(0, len(missing), BATCH_SIZE):
+            response = await db.table(self.table).select("*").in_("id", missing[i:i + BATCH_SIZE]).execute()
+            for row in response.data:
+                self.cache.set(row["id"], row)
+                found[row["id"]] = dict(row)
+
+        return found
+
+    async def all(self) -> List[Dict[str, Any]]:
+        """Get every row in the table"""
+        rows = self.cache.get(_ALL)
+        if rows is None:
+            response = await db.table(self.table).select("*").execute()
+            rows = response.data
+            self.cache.set(_ALL, rows)
+            for row in rows:
+                self.cache.set(row["id"], row)
+        return [dict(row) for row in rows]
+
+    def put(self, row: Dict[str, Any]) -> None:
+        """Write-through after an insert or update"""
+        self.cache.set(row["id"], dict(row))
+        self.cache.invalidate(_ALL)
+
+    def invalidate(self, row_id: Optional[str] = None) -> None:
+        """Drop one row (after a delete), or everything when no id is given"""
+        if row_id is None:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(str(row_id))
+            self.cache.invalidate(_ALL)
+
+
+vehicles = ReferenceTable("vehicles")
+drivers = ReferenceTable("drivers")
+routes = ReferenceTable("routes")
@@ -0,0 +1,252 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Sources a report document is rendered from, relative to the app package.
+# Their content is part of every key, so a deploy that changes any of them
+# never serves documents rendered by the old code.
+REPORT_SOURCES = ("templates", "api/reports.py", "services/report_metrics.py", "services/trip_records.py")
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_source_version: Optional[str] = None
+
+_DATA_SUFFIX = ".bin"
+_META_SUFFIX = ".json"
+
+
+def source_version() -> str:
+    """Hash of the REPORT_SOURCES files, read once per process"""
+    global _source_version
+    if _source_version is None:
+        digest = hashlib.sha256()
+        for source in REPORT_SOURCES:
+            path = os.path.join(_APP_DIR, source)
+            if os.path.isdir(path):
+                files = sorted(
+                    os.path.join(root, name)
+                    for root, _, names in os.walk(path)
+                    for name in names
+                    if not name.endswith(".pyc")
+                )
+            else:
+                files = [path]
+            for file_path in files:
+                with open(file_path, "rb") as f:
+                    digest.update(os.path.relpath(file_path, _APP_DIR).encode("utf-8") + b"\0" + f.read() + b"\0")
+        _source_version = digest.hexdigest()
+    return _source_version
+
+
+def report_key(template_name: str, params: Dict[str, Any], fingerprint: str) -> str:
+    """
+    Content address of a report: which template, rendered by which version
+    of the report sources, for which normalized parameters, over which
+    version of the data.
+    """
+    raw = json.dumps(
+        {"v": source_version(), "template": template_name, "params": params, "data": fingerprint},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CachedReport:
+    """A report document stored on disk"""
+    __slots__ = ("path", "filename", "media_type")
+
+    def __init__(self, path: str, filename: str, media_type: str):
+        self.path = path
+        self.filename = filename
+        self.media_type = media_type
+
+    def read(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+class CacheWriter:
+    """
+    Incremental write of one document, for documents streamed to a client
+    while they are produced. Nothing is visible in the cache until
+    `commit()`; `abort()` (or going over the size limit) discards it.
+    """
+    def __init__(self, cache: "ReportCache", key: str, filename: str, media_type: str):
+        self.cache = cache
+        self.key = key
+        self.filename = filename
+        self.media_type = media_type
+        self.size = 0
+        fd, self._tmp_path = tempfile.mkstemp(dir=cache.directory, suffix=".tmp")
+        self._file: Optional[Any] = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        if self._file is None:
+            return
+        self.size += len(chunk)
+        if self.size > self.cache.max_bytes:
+            self.abort()
+            return
+        try:
+            self._file.write(chunk)
+        except OSError as e:
+            logger.warning(f"Could not cache report {self.filename}: {str(e)}")
+            self.abort()
+
+    def commit(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+            self._file = None
+            os.replace(self._tmp_path, self.cache._path(self.key, _DATA_SUFFIX))
+            self.cache._write_meta(self.key, self.filename, self.media_type)
+            self.cache._evict()
+        except OSError as e:
+            logger.warning(f"Could not cache report {self.filename}: {str(e)}")
+            self.abort()
+
+    def abort(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        try:
+            os.unlink(self._tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class ReportCache:
+    """
+    Size-bounded on-disk LRU of generated report documents.
+
+    Each document is stored as `<key>.bin` with a `<key>.json` sidecar
+    holding its filename and media type. A hit refreshes the file's mtime,
+    and when the directory grows past `max_bytes` the least recently used
+    documents are deleted. The directory can be shared by several worker
+    processes: writes are atomic renames and eviction works from the files
+    on disk rather than from in-process state.
+    """
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key + suffix)
+
+    def get(self, key: str) -> Optional[CachedReport]:
+        if not self.enabled:
+            return None
+
+        data_path = self._path(key, _DATA_SUFFIX)
+        try:
+            with open(self._path(key, _META_SUFFIX), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            os.utime(data_path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return CachedReport(data_path, meta["filename"], meta["media_type"])
+
+    def put(self, key: str, filename: str, media_type: str, content: bytes) -> None:
+        if not self.enabled or len(content) > self.max_bytes:
+            return
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._write(self._path(key, _DATA_SUFFIX), content)
+            self._write_meta(key, filename, media_type)
+            self._evict()
+        except OSError as e:
+            logger.warning(f"Could not cache report {filename}: {str(e)}")
+
+    def open_writer(self, key: str, filename: str, media_type: str) -> Optional[CacheWriter]:
+        """Start writing a document chunk by chunk, or None if caching is off or fails"""
+        if not self.enabled:
+            return None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            return CacheWriter(self, key, filename, media_type)
+        except OSError as e:
+            logger.warning(f"Could not cache report {filename}: {str(e)}")
+            return None
+
+    def _write_meta(self, key: str, filename: str, media_type: str) -> None:
+        # The sidecar goes last, a document only counts as cached once it exists
+        meta = json.dumps({"filename": filename, "media_type": media_type}).encode("utf-8")
+        self._write(self._path(key, _META_SUFFIX), meta)
+
+    def _write(self, path: str, content: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _evict(self) -> None:
+        with self._lock:
+            documents = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith(_DATA_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                documents.append((stat.st_mtime, stat.st_size, entry.name[:-len(_DATA_SUFFIX)]))
+                total += stat.st_size
+
+            documents.sort()
+            for _, size, key in documents:
+                if total <= self.max_bytes:
+                    break
+                self.invalidate(key)
+                total -= size
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        for suffix in (_META_SUFFIX, _DATA_SUFFIX):
+            try:
+                os.unlink(self._path(key, suffix))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "directory": self.directory,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups * 100) if lookups > 0 else 0
+        }
+
+
+report_cache = ReportCache(
+    settings.REPORT_CACHE_DIR or os.path.join(tempfile.gettempdir(), "mat-app-reports"),
+    settings.REPORT_CACHE_MAX_BYTES
+)
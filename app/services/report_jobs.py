@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from fastapi import HTTPException
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class ReportDocument:
+    """A generated report file"""
+    __slots__ = ("filename", "media_type", "content")
+
+    def __init__(self, filename: str, media_type: str, content: bytes):
+        self.filename = filename
+        self.media_type = media_type
+        self.content = content
+
+
+class ReportJob:
+    """One report generated in the background for one user"""
+    def __init__(self, kind: str, owner_id: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.owner_id = owner_id
+        self.status = PENDING
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.document: Optional[ReportDocument] = None
+        self.error: Optional[str] = None
+        self.error_status: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "filename": self.document.filename if self.document else None,
+            "error": self.error
+        }
+
+
+class ReportJobs:
+    """
+    In-process registry of background report jobs.
+
+    `submit()` starts building a report and returns at once. Finished jobs
+    (and their documents) are kept for REPORT_JOB_TTL seconds, and at most
+    REPORT_JOB_MAX_ENTRIES jobs are kept, so documents that are never
+    downloaded do not pile up. Jobs live in the worker process that
+    accepted them, so deployments with several workers need sticky
+    sessions for the job endpoints.
+    """
+    def __init__(self):
+        self.jobs = TTLCache(
+            name="report_jobs",
+            maxsize=settings.REPORT_JOB_MAX_ENTRIES,
+            ttl=settings.REPORT_JOB_TTL
+        )
+        # Strong references, the event loop only keeps weak ones to running tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+    def submit(self, kind: str, owner_id: str, build: Callable[[], Awaitable[ReportDocument]]) -> ReportJob:
+        job = ReportJob(kind, owner_id)
+        self.jobs.set(job.id, job)
+        task = asyncio.create_task(self._run(job, build))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: ReportJob, build: Callable[[], Awaitable[ReportDocument]]) -> None:
+        job.status = RUNNING
+        try:
+            job.document = await build()
+            job.status = DONE
+        except HTTPException as e:
+            job.status = FAILED
+            job.error = str(e.detail)
+            job.error_status = e.status_code
+        except Exception as e:
+            logger.error(f"Report job {job.id} ({job.kind}) failed: {str(e)}")
+            job.status = FAILED
+            job.error = str(e)
+            job.error_status = 500
+        finally:
+            job.finished_at = time.time()
+            # Restart the TTL so a slow job is kept as long as a fast one after it finishes
+            self.jobs.set(job.id, job)
+
+    def get(self, job_id: str, owner_id: str) -> Optional[ReportJob]:
+        """A job, if it exists and belongs to `owner_id`"""
+        job = self.jobs.get(job_id)
+        if job is None or job.owner_id != owner_id:
+            return None
+        return job
+
+
+report_jobs = ReportJobs()
@@ -0,0 +1,290 @@
+from datetime import date
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from app.services.names import NameResolver
+from app.services.rollups import RollupCell
+from app.services.trip_records import TripRecord
+
+
+def factorize(values: Iterable[Any]) -> Tuple[np.ndarray, List[Any]]:
+    """
+    Integer code of each value, numbered in order of first appearance, and
+    the distinct values in code order (so `uniques[codes[i]] == values[i]`).
+    """
+    index: Dict[Any, int] = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int64)
+    return codes, list(index)
+
+
+def _floats(values: Iterable[Any], count: int) -> np.ndarray:
+    return np.fromiter((float(v or 0) for v in values), dtype=np.float64, count=count)
+
+
+def _present(uniques: Sequence[Any]) -> np.ndarray:
+    """Which codes stand for an actual id (not None or empty)"""
+    return np.fromiter((bool(v) for v in uniques), dtype=bool, count=len(uniques))
+
+
+def group_sum(codes: np.ndarray, weights: np.ndarray, size: int) -> np.ndarray:
+    """Sum of `weights` per code, for codes 0..size-1"""
+    return np.bincount(codes, weights=weights, minlength=size)
+
+
+def pair_groups(a: np.ndarray, b: np.ndarray, b_size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Distinct (a, b) code pairs, in order of first appearance.
+
+    Returns the a and b code of each pair, the row each pair first appears
+    in, and the pair number of every row (for `group_sum`).
+    """
+    b_size = max(b_size, 1)
+    combined = a * b_size + b
+    pairs, first, inverse = np.unique(combined, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(order.size)
+    pairs = pairs[order]
+    return pairs // b_size, pairs % b_size, first[order], rank[inverse.reshape(-1)]
+
+
+def _by_first(groups: np.ndarray, size: int) -> List[List[int]]:
+    """Pair numbers of each group, in order of first appearance"""
+    members: List[List[int]] = [[] for _ in range(size)]
+    for pair, group in enumerate(groups.tolist()):
+        members[group].append(pair)
+    return members
+
+
+class CellColumns:
+    """
+    Rollup cells as parallel arrays, one entry per (day, vehicle, driver)
+    cell: amounts and expenses, the day as an offset from the range start,
+    and vehicle/driver ids as integer codes.
+    """
+    def __init__(self, cells: Sequence[RollupCell], start: date):
+        count = len(cells)
+        self.size = count
+        self.day = np.fromiter(((cell.day - start).days for cell in cells), dtype=np.int64, count=count)
+        self.vehicle, self.vehicle_ids = factorize(cell.vehicle_id for cell in cells)
+        self.driver, self.driver_ids = factorize(cell.driver_id for cell in cells)
+        self.collected = _floats((cell.collected_amount for cell in cells), count)
+        self.expected = _floats((cell.expected_amount for cell in cells), count)
+        self.fuel = _floats((cell.fuel_expense for cell in cells), count)
+        self.repair = _floats((cell.repair_expense for cell in cells), count)
+        self.other = _floats((cell.other_expense for cell in cells), count)
+        self.trip_count = np.fromiter((cell.trip_count for cell in cells), dtype=np.int64, count=count)
+
+
+class RouteColumns:
+    """Driver, route, collected and expected amount of each trip record, as parallel arrays"""
+    def __init__(self, trips: Sequence[TripRecord]):
+        count = len(trips)
+        self.trips = trips
+        self.driver, self.driver_ids = factorize(trip.driver_id for trip in trips)
+        self.route, self.route_ids = factorize(trip.route_id for trip in trips)
+        self.named = np.fromiter((bool(trip.route_name) for trip in trips), dtype=bool, count=count)
+        # Amounts are already floats once decoded
+        self.collected = np.fromiter((trip.collected_amount for trip in trips), dtype=np.float64, count=count)
+        self.expected = np.fromiter((trip.expected_amount for trip in trips), dtype=np.float64, count=count)
+
+
+def combined_report_metrics(
+    cells: Sequence[RollupCell],
+    trips: Sequence[TripRecord],
+    start: date,
+    end: date,
+    vehicles_data: Dict[str, Dict[str, Any]],
+    drivers_data: Dict[str, Dict[str, Any]],
+    names: NameResolver
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Summary, per-vehicle and per-driver metrics of the combined report.
+
+    Totals come from the rollup cells and routes from the decoded trip
+    records. Both are loaded into columns once and every group-by is a
+    bincount over integer codes, so the cost per trip is a few array
+    operations rather than several dict updates.
+    """
+    columns = CellColumns(cells, start)
+    date_range_days = (end - start).days + 1
+
+    # Overall totals
+    total_collections = float(columns.collected.sum())
+    total_fuel_expense = float(columns.fuel.sum())
+    total_repair_expense = float(columns.repair.sum())
+    total_other_expense = float(columns.other.sum())
+    total_expenses = total_fuel_expense + total_repair_expense + total_other_expense
+    trip_count = int(columns.trip_count.sum())
+    active_days = int(np.unique(columns.day).size)
+
+    summary = {
+        "total_collections": total_collections,
+        "total_expenses": total_expenses,
+        "fuel_expense": total_fuel_expense,
+        "repair_expense": total_repair_expense,
+        "other_expense": total_other_expense,
+        "net_profit": total_collections - total_expenses,
+        "trip_count": trip_count,
+        "utilization_rate": (active_days / date_range_days * 100) if date_range_days > 0 else 0,
+        "active_days": active_days,
+        "total_days": date_range_days
+    }
+
+    vehicles_list = _vehicle_metrics(columns, date_range_days, vehicles_data, names)
+    drivers_list = _driver_metrics(columns, RouteColumns(trips), drivers_data, names)
+    return summary, vehicles_list, drivers_list
+
+
+def _vehicle_metrics(
+    columns: CellColumns,
+    date_range_days: int,
+    vehicles_data: Dict[str, Dict[str, Any]],
+    names: NameResolver
+) -> List[Dict[str, Any]]:
+    size = len(columns.vehicle_ids)
+    code_of = {v_id: code for code, v_id in enumerate(columns.vehicle_ids)}
+
+    collections = group_sum(columns.vehicle, columns.collected, size).tolist()
+    fuel = group_sum(columns.vehicle, columns.fuel, size).tolist()
+    repair = group_sum(columns.vehicle, columns.repair, size).tolist()
+    other = group_sum(columns.vehicle, columns.other, size).tolist()
+    trips = group_sum(columns.vehicle, columns.trip_count, size).astype(np.int64).tolist()
+
+    # Distinct (vehicle, day) pairs give each vehicle's active days
+    span = int(columns.day.max()) + 1 if columns.size else 1
+    vehicle_days = np.unique(columns.vehicle * span + columns.day) // span
+    active_days = np.bincount(vehicle_days, minlength=size).tolist()
+
+    # Drivers of each vehicle, from the cells that name one
+    rows = _present(columns.driver_ids)[columns.driver]
+    pair_vehicle, pair_driver, _, pair_of_row = pair_groups(
+        columns.vehicle[rows], columns.driver[rows], len(columns.driver_ids)
+    )
+    pair_trips = group_sum(pair_of_row, columns.trip_count[rows], pair_vehicle.size).astype(np.int64).tolist()
+    pair_collections = group_sum(pair_of_row, columns.collected[rows], pair_vehicle.size).tolist()
+    pair_driver = pair_driver.tolist()
+    drivers_of = _by_first(pair_vehicle, size)
+
+    vehicles_list = []
+    for v_id, vehicle in vehicles_data.items():
+        code = code_of.get(v_id)
+        drivers_list = []
+        if code is not None:
+            for pair in drivers_of[code]:
+                d_id = columns.driver_ids[pair_driver[pair]]
+                drivers_list.append({
+                    "driver_id": d_id,
+                    "name": names.driver_name(d_id, "Unknown"),
+                    "trip_count": pair_trips[pair],
+                    "total_collections": pair_collections[pair]
+                })
+            drivers_list.sort(key=lambda x: x["trip_count"], reverse=True)
+
+        vehicle_fuel = fuel[code] if code is not None else 0
+        vehicle_repair = repair[code] if code is not None else 0
+        vehicle_other = other[code] if code is not None else 0
+        vehicle_active_days = active_days[code] if code is not None else 0
+        vehicles_list.append({
+            "vehicle_id": v_id,
+            "registration": vehicle["reg_no"],
+            "total_collections": collections[code] if code is not None else 0,
+            "fuel_expense": vehicle_fuel,
+            "repair_expense": vehicle_repair,
+            "other_expense": vehicle_other,
+            "total_expenses": vehicle_fuel + vehicle_repair + vehicle_other,
+            "trip_count": trips[code] if code is not None else 0,
+            "drivers": drivers_list,
+            "utilization_rate": (vehicle_active_days / date_range_days * 100) if date_range_days > 0 else 0
+        })
+
+    # Sort vehicles by total collections
+    vehicles_list.sort(key=lambda x: x["total_collections"], reverse=True)
+    return vehicles_list
+
+
+def _driver_metrics(
+    columns: CellColumns,
+    routes: RouteColumns,
+    drivers_data: Dict[str, Dict[str, Any]],
+    names: NameResolver
+) -> List[Dict[str, Any]]:
+    size = len(columns.driver_ids)
+    code_of = {d_id: code for code, d_id in enumerate(columns.driver_ids)}
+
+    collections = group_sum(columns.driver, columns.collected, size).tolist()
+    expected = group_sum(columns.driver, columns.expected, size).tolist()
+    trips = group_sum(columns.driver, columns.trip_count, size).astype(np.int64).tolist()
+
+    # Vehicles of each driver, from the cells that name one
+    rows = _present(columns.vehicle_ids)[columns.vehicle]
+    pair_driver, pair_vehicle, _, pair_of_row = pair_groups(
+        columns.driver[rows], columns.vehicle[rows], len(columns.vehicle_ids)
+    )
+    pair_trips = group_sum(pair_of_row, columns.trip_count[rows], pair_driver.size).astype(np.int64).tolist()
+    pair_collections = group_sum(pair_of_row, columns.collected[rows], pair_driver.size).tolist()
+    pair_vehicle = pair_vehicle.tolist()
+    vehicles_of = _by_first(pair_driver, size)
+
+    # Routes of each driver, from the trips that name one
+    route_driver_code = {d_id: code for code, d_id in enumerate(routes.driver_ids)}
+    rows = _present(routes.route_ids)[routes.route] & routes.named
+    route_driver, route_code, route_first, route_of_row = pair_groups(
+        routes.driver[rows], routes.route[rows], len(routes.route_ids)
+    )
+    route_trips = np.bincount(route_of_row, minlength=route_driver.size).tolist()
+    route_collections = group_sum(route_of_row, routes.collected[rows], route_driver.size).tolist()
+    route_expected = group_sum(route_of_row, routes.expected[rows], route_driver.size).tolist()
+    # A route keeps the name of its first trip
+    route_trip = np.flatnonzero(rows)[route_first].tolist()
+    route_code = route_code.tolist()
+    routes_of = _by_first(route_driver, len(routes.driver_ids))
+
+    drivers_list = []
+    for d_id, driver in drivers_data.items():
+        code = code_of.get(d_id)
+        driver_collections = collections[code] if code is not None else 0
+        driver_expected = expected[code] if code is not None else 0
+        driver_trips = trips[code] if code is not None else 0
+
+        vehicles_list = []
+        if code is not None:
+            for pair in vehicles_of[code]:
+                v_id = columns.vehicle_ids[pair_vehicle[pair]]
+                vehicles_list.append({
+                    "vehicle_id": v_id,
+                    "registration": names.vehicle_reg_no(v_id, "Unknown"),
+                    "trip_count": pair_trips[pair],
+                    "total_collections": pair_collections[pair]
+                })
+            vehicles_list.sort(key=lambda x: x["trip_count"], reverse=True)
+
+        routes_list = []
+        route_driver_of = route_driver_code.get(d_id)
+        if route_driver_of is not None:
+            for pair in routes_of[route_driver_of]:
+                routes_list.append({
+                    "route_id": routes.route_ids[route_code[pair]],
+                    "name": routes.trips[route_trip[pair]].route_name,
+                    "trip_count": route_trips[pair],
+                    "total_collections": route_collections[pair],
+                    "total_expected": route_expected[pair],
+                    "efficiency": (route_collections[pair] / route_expected[pair] * 100) if route_expected[pair] > 0 else 0
+                })
+            routes_list.sort(key=lambda x: x["trip_count"], reverse=True)
+
+        drivers_list.append({
+            "driver_id": d_id,
+            "name": driver["name"],
+            "total_collections": driver_collections,
+            "trip_count": driver_trips,
+            "vehicles": vehicles_list,
+            "routes": routes_list,
+            "collection_efficiency": (driver_collections / driver_expected * 100) if driver_expected > 0 else 0,
+            "avg_per_trip": driver_collections / driver_trips if driver_trips > 0 else 0
+        })
+
+    # Sort drivers by total collections
+    drivers_list.sort(key=lambda x: x["total_collections"], reverse=True)
+    return drivers_list
@@ -0,0 +1,684 @@
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.day_index import DayIndex
+from app.core.db import db
+from app.core.logs import IssueSummary
+from app.core.paging import iter_pages
+from app.core.query_memo import bypass_query_memo
+from app.core.projection import Projection
+from app.core.watermark import Watermark, table_watermark
+
+logger = logging.getLogger(__name__)
+
+# Summed trip columns. The expense columns differ between endpoints
+# (fuel_expense/repair_expense/other_expense vs fuel_cost/other_expenses),
+# so all of them are kept.
+MEASURES = (
+    "collected_amount",
+    "expected_amount",
+    "fuel_expense",
+    "repair_expense",
+    "other_expense",
+    "fuel_cost",
+    "other_expenses",
+)
+
+# Columns read while backfilling. Only collected_amount is guaranteed to exist.
+# updated_at feeds the sync watermark (see `trip_watermark`).
+ROLLUP_COLUMNS = Projection(
+    "trips",
+    "rollups",
+    ["id", "vehicle_id", "driver_id", "collection_time", "collected_amount"],
+    optional=MEASURES + ("updated_at",)
+)
+
+CellKey = Tuple[Optional[str], Optional[str]]
+
+# (start, end) days of a range, both inclusive and either one optional
+Period = Tuple[Optional[date], Optional[date]]
+
+# Columns of the day index: trip count, the summed measures, and 1 for each
+# day with at least one trip (for utilization)
+INDEX_FIELDS = ("trip_count",) + MEASURES + ("active_days",)
+
+# Longest range `TripRollups.sync` rescans in one piece; longer ranges that
+# differ from the table are halved until they are this short
+SYNC_SPAN_DAYS = 31
+
+# Day index key of the whole fleet; vehicles and drivers are ("vehicle", id) and ("driver", id)
+FLEET = ("fleet", None)
+
+
+def index_keys(vehicle_id: Optional[str], driver_id: Optional[str]) -> List[Tuple[str, Optional[str]]]:
+    """Day index keys a trip of this vehicle and driver counts towards"""
+    keys = [FLEET]
+    if vehicle_id:
+        keys.append(("vehicle", vehicle_id))
+    if driver_id:
+        keys.append(("driver", driver_id))
+    return keys
+
+
+def _amount(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _within(day: date, period: Period) -> bool:
+    start, end = period
+    return (start is None or day >= start) and (end is None or day <= end)
+
+
+def _union(periods: Sequence[Period]) -> Period:
+    """Smallest (start, end) covering all the periods"""
+    starts = [start for start, _ in periods]
+    ends = [end for _, end in periods]
+    return (
+        None if None in starts else min(starts),
+        None if None in ends else max(ends)
+    )
+
+
+def trip_day(trip: Dict[str, Any]) -> Optional[date]:
+    """Calendar day of a trip's collection_time, or None if it has none"""
+    value = trip.get("collection_time")
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def rollup_window(today: Optional[date] = None) -> Tuple[date, date]:
+    """
+    First and last day a trip may be collected on to be rolled up.
+
+    The day index spans every day between the oldest and the newest trip,
+    so a single mistyped year (e.g. 2205) would otherwise allocate
+    centuries of empty days for every vehicle and driver.
+    """
+    today = today or date.today()
+    return (
+        today - timedelta(days=settings.ROLLUP_HISTORY_DAYS),
+        today + timedelta(days=settings.ROLLUP_FUTURE_DAYS)
+    )
+
+
+def _day_runs(days: Iterable[date]) -> List[Tuple[date, date]]:
+    """Consecutive days grouped into (first, last) runs"""
+    runs: List[Tuple[date, date]] = []
+    for day in sorted(days):
+        if runs and (day - runs[-1][1]).days == 1:
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def _day_range(query: Any, start: date, end: date) -> Any:
+    """Restrict a trips query to collection days start <= day <= end"""
+    return query.gte("collection_time", start.isoformat()).lt("collection_time", (end + timedelta(days=1)).isoformat())
+
+
+async def trip_watermark(start: date, end: date) -> Watermark:
+    """Trip count and latest updated_at of the collection days start <= day <= end"""
+    return await table_watermark("trips", lambda query: _day_range(query, start, end))
+
+
+class Totals:
+    """Trip count and summed amounts for a group of trips"""
+    __slots__ = ("trip_count",) + MEASURES
+
+    def __init__(self):
+        self.trip_count = 0
+        for field in MEASURES:
+            setattr(self, field, 0.0)
+
+    @classmethod
+    def from_trip(cls, trip: Dict[str, Any]) -> "Totals":
+        totals = cls()
+        totals.trip_count = 1
+        for field in MEASURES:
+            setattr(totals, field, _amount(trip.get(field)))
+        return totals
+
+    def add(self, other: "Totals", sign: int = 1) -> None:
+        self.trip_count += sign * other.trip_count
+        for field in MEASURES:
+            setattr(self, field, getattr(self, field) + sign * getattr(other, field))
+
+
+class RangeTotals(Totals):
+    """
+    Totals over a range of days, read from the day index.
+
+    `active_days` counts days with at least one trip; when several vehicles
+    or drivers are summed it is the total over them (vehicle-days).
+    """
+    __slots__ = ("active_days",)
+
+    def __init__(self):
+        super().__init__()
+        self.active_days = 0
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> "RangeTotals":
+        totals = cls()
+        totals.trip_count = int(round(values[0]))
+        totals.active_days = int(round(values[-1]))
+        # Differences of prefix sums leave rounding noise, and exact zeros when there are no trips
+        if totals.trip_count:
+            for field, value in zip(MEASURES, values[1:-1]):
+                setattr(totals, field, round(float(value), 6))
+        return totals
+
+
+class RollupCell(Totals):
+    """
+    Totals for one (day, vehicle, driver) combination.
+
+    `updated_at` is the latest updated_at of the trips added to the cell. It
+    is not lowered when a trip is taken back out, so it may run ahead of the
+    table until the cell is rescanned (see `TripRollups.sync`).
+    """
+    __slots__ = ("day", "vehicle_id", "driver_id", "updated_at")
+
+    def __init__(self, day: date, vehicle_id: Optional[str], driver_id: Optional[str]):
+        super().__init__()
+        self.day = day
+        self.vehicle_id = vehicle_id
+        self.driver_id = driver_id
+        self.updated_at: Optional[str] = None
+
+    def same_totals(self, other: "RollupCell") -> bool:
+        return self.trip_count == other.trip_count and all(
+            getattr(self, field) == getattr(other, field) for field in MEASURES
+        )
+
+
+class _RollupStore:
+    """
+    Rollup cells, adjusted in place as trips are added and taken back out.
+
+    Once `build_index()` has run, every change also updates the day index of
+    the fleet and of the trip's vehicle and driver. Trips outside `window`
+    are counted and reported to `issues` (or logged), never rolled up.
+    """
+    def __init__(self, window: Optional[Period] = None):
+        self.days: Dict[date, Dict[CellKey, RollupCell]] = {}
+        self.index: Optional[DayIndex] = None
+        self.window = window or rollup_window()
+        self.out_of_window = 0
+        self.issues: Optional[IssueSummary] = None
+
+    def build_index(self) -> None:
+        """Build the day index from the cells in one pass (cheaper than per-trip updates)"""
+        points: Dict[Tuple[Any, date], List[float]] = {}
+        for day, cells in self.days.items():
+            for cell in cells.values():
+                values = [cell.trip_count] + [getattr(cell, field) for field in MEASURES]
+                for key in index_keys(cell.vehicle_id, cell.driver_id):
+                    point = points.get((key, day))
+                    if point is None:
+                        points[(key, day)] = values + [1.0]
+                    else:
+                        for i, value in enumerate(values):
+                            point[i] += value
+
+        index = DayIndex(len(INDEX_FIELDS))
+        index.build(points)
+        self.index = index
+
+    def _index_add(self, day: date, key: CellKey, totals: Totals, sign: int) -> None:
+        values = sign * np.array(
+            [totals.trip_count] + [getattr(totals, field) for field in MEASURES] + [0.0],
+            dtype=np.float64
+        )
+        for index_key in index_keys(*key):
+            before = self.index.point(index_key, day)[0]
+            after = before + values[0]
+            values[-1] = int(after > 0) - int(before > 0)
+            self.index.add(index_key, day, values)
+
+    def add(self, trip: Dict[str, Any], sign: int = 1) -> None:
+        """Add a trip row to its cell, or take it back out with sign -1"""
+        day = trip_day(trip)
+        if day is None:
+            return
+        first, last = self.window
+        if not first <= day <= last:
+            if sign > 0:
+                self.out_of_window += 1
+                if self.issues is not None:
+                    self.issues.add("out_of_window", f"trip {trip.get('id')} on {day}")
+                else:
+                    logger.warning(f"Trip {trip.get('id')} collected on {day} is outside the rollup window {first} .. {last}, not rolled up")
+            return
+
+        key = (trip.get("vehicle_id"), trip.get("driver_id"))
+        cells = self.days.get(day)
+        cell = cells.get(key) if cells is not None else None
+        if cell is None:
+            if sign < 0:
+                # Never rolled up here, e.g. written while its days were rescanned
+                return
+            cells = self.days.setdefault(day, {})
+            cell = cells[key] = RollupCell(day, *key)
+
+        totals = Totals.from_trip(trip)
+        cell.add(totals, sign)
+        updated_at = trip.get("updated_at")
+        if sign > 0 and updated_at and (cell.updated_at is None or str(updated_at) > cell.updated_at):
+            cell.updated_at = str(updated_at)
+        if self.index is not None:
+            self._index_add(day, key, totals, sign)
+        if cell.trip_count <= 0:
+            del cells[key]
+            if not cells:
+                del self.days[day]
+
+    def replace(self, start: date, end: date, days: Dict[date, Dict[CellKey, RollupCell]]) -> int:
+        """
+        Replace the cells of start <= day <= end with `days`, updating the
+        day index for the cells whose totals changed. Returns their number.
+        """
+        changed = 0
+        for day in {day for day in self.days if start <= day <= end} | set(days):
+            old_cells = self.days.pop(day, {})
+            new_cells = days.get(day, {})
+            for key in set(old_cells) | set(new_cells):
+                old, new = old_cells.get(key), new_cells.get(key)
+                if old is not None and new is not None and old.same_totals(new):
+                    continue
+                changed += 1
+                if self.index is not None:
+                    delta = Totals()
+                    if new is not None:
+                        delta.add(new)
+                    if old is not None:
+                        delta.add(old, -1)
+                    self._index_add(day, key, delta, 1)
+            if new_cells:
+                self.days[day] = new_cells
+        return changed
+
+    def watermark(self, start: date, end: date) -> Watermark:
+        """`trip_watermark()` of start <= day <= end as seen by the cells"""
+        count, latest = 0, None
+        for day, cells in self.days.items():
+            if start <= day <= end:
+                for cell in cells.values():
+                    count += cell.trip_count
+                    if cell.updated_at is not None and (latest is None or cell.updated_at > latest):
+                        latest = cell.updated_at
+        return count, latest
+
+
+class TripRollups:
+    """
+    Per-day trip totals for every vehicle/driver pair, kept in memory.
+
+    The first read backfills from the trips table. After that, trip writers
+    call `record()` with the stored row (and the row it replaced) after an
+    insert/update and `discard()` with the deleted row, and the totals are
+    adjusted by the difference. `sync()` compares the rollups with the table
+    and rescans only the days that differ, picking up trips written by other
+    workers or outside this API. It runs before dashboard and report reads
+    (`catch_up()`, concurrent readers share one) and in the background every
+    `ROLLUP_REFRESH_INTERVAL` seconds.
+    """
+    def __init__(self):
+        self._store = _RollupStore()
+        self._loaded_at: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        # While the table is being scanned, the days written to meanwhile, rescanned afterwards
+        self._scanning = False
+        self._dirty: Set[date] = set()
+        self.rebuilds = 0
+        self.last_rebuild_seconds: Optional[float] = None
+        self.checks = 0
+        self.rescanned_days = 0
+        # Bumped on every change, so results derived from the trips can tell they are out of date
+        self.version = 0
+
+    def record(self, trip: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> None:
+        """Write-through after a trip insert, or an update with the row as it was before"""
+        self._store.window = rollup_window()
+        if previous is not None:
+            self._store.add(previous, -1)
+        self._store.add(trip)
+        self._written(previous, trip)
+
+    def discard(self, previous: Dict[str, Any]) -> None:
+        """Write-through after a trip delete, with the deleted row"""
+        self._store.add(previous, -1)
+        self._written(previous)
+
+    def _written(self, *trips: Optional[Dict[str, Any]]) -> None:
+        if self._scanning:
+            # The scan may or may not have seen this write, so its days are read again
+            self._dirty.update(day for day in map(trip_day, filter(None, trips)) if day is not None)
+        self.version += 1
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # Created on first use so it binds to the running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def rebuild(self) -> Dict[str, Any]:
+        """Rescan the trips table and replace all rollups"""
+        async with self.lock:
+            with bypass_query_memo():
+                await self._rebuild()
+        return self.stats()
+
+    async def _rebuild(self) -> None:
+        started = time.monotonic()
+        store = _RollupStore()
+        store.issues = IssueSummary(logger, "rebuilding trip rollups")
+        self._scanning = True
+        try:
+            # Full-table scan, never worth keeping in a request's query memo
+            columns = await ROLLUP_COLUMNS.resolve()
+            async for page in iter_pages(lambda: db.table("trips").select(columns), keys=("id",)):
+                for trip in ROLLUP_COLUMNS.rows(page):
+                    store.add(trip)
+            store.issues.flush()
+            store.issues = None
+            # The store is not shared yet, so the index is built off the event loop
+            await asyncio.to_thread(store.build_index)
+
+            # Writes during the scan went to the old store
+            self._store = store
+            await self._rescan_dirty()
+        finally:
+            self._scanning = False
+
+        self._loaded_at = self._checked_at = time.monotonic()
+        self.version += 1
+        self.rebuilds += 1
+        self.last_rebuild_seconds = self._loaded_at - started
+        trips = sum(cell.trip_count for cells in store.days.values() for cell in cells.values())
+        logger.info(f"Rebuilt trip rollups from {trips} trips in {self.last_rebuild_seconds:.2f}s")
+
+    async def _rescan(self, start: date, end: date) -> None:
+        """Read the trips of start <= day <= end again and replace their cells"""
+        store = _RollupStore(window=(start, end))
+        store.issues = IssueSummary(logger, f"rescanning trip rollups {start} .. {end}")
+        was_scanning, self._scanning = self._scanning, True
+        try:
+            columns = await ROLLUP_COLUMNS.resolve()
+            async for page in iter_pages(lambda: _day_range(db.table("trips").select(columns), start, end), keys=("id",)):
+                for trip in ROLLUP_COLUMNS.rows(page):
+                    store.add(trip)
+            store.issues.flush()
+        finally:
+            self._scanning = was_scanning
+
+        if self._store.replace(start, end, store.days):
+            self.version += 1
+        self.rescanned_days += (end - start).days + 1
+
+    async def _rescan_dirty(self) -> None:
+        # Writes during these rescans dirty their days again, so settle in a few rounds at most;
+        # what is left is rescanned by the next sync
+        for _ in range(3):
+            if not self._dirty:
+                break
+            first, last = rollup_window()
+            days, self._dirty = self._dirty, set()
+            for start, end in _day_runs(day for day in days if first <= day <= last):
+                await self._rescan(start, end)
+
+    async def _sync_range(self, start: date, end: date) -> None:
+        if await trip_watermark(start, end) == self._store.watermark(start, end):
+            return
+        if (end - start).days < SYNC_SPAN_DAYS:
+            await self._rescan(start, end)
+            return
+        # Halve the range until the differing days are found
+        middle = start + (end - start) // 2
+        await self._sync_range(start, middle)
+        await self._sync_range(middle + timedelta(days=1), end)
+
+    async def sync(self, start: Optional[date] = None, end: Optional[date] = None) -> None:
+        """
+        Bring the rollups of start <= day <= end (default: the whole rollup
+        window) up to date with the trips table.
+
+        Compares the trip count and latest updated_at of the range with the
+        table, one query, and halves the range until the days that differ
+        are found, which are then rescanned. Edits are seen through
+        trips.updated_at, which every trip write in this API sets.
+        """
+        await self.ensure_loaded()
+        first, last = rollup_window()
+        start = max(start, first) if start else first
+        end = min(end, last) if end else last
+        async with self.lock:
+            with bypass_query_memo():
+                self._store.window = (first, last)
+                await self._rescan_dirty()
+                if start <= end:
+                    await self._sync_range(start, end)
+        self.checks += 1
+        if (start, end) == (first, last):
+            self._checked_at = time.monotonic()
+
+    async def refresh(self) -> None:
+        """Sync, logging instead of raising (for background tasks)"""
+        try:
+            await self.sync()
+        except Exception as e:
+            logger.error(f"Error refreshing trip rollups: {str(e)}")
+
+    async def ensure_loaded(self) -> None:
+        """Backfill on first use and schedule a sync once the last one is old"""
+        if self._loaded_at is None:
+            async with self.lock:
+                if self._loaded_at is None:
+                    with bypass_query_memo():
+                        await self._rebuild()
+            return
+
+        interval = settings.ROLLUP_REFRESH_INTERVAL
+        stale = interval > 0 and time.monotonic() - self._checked_at > interval
+        if stale:
+            self.schedule_refresh()
+
+    def schedule_refresh(self) -> None:
+        """Start a background sync unless one is already running"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+
+    async def catch_up(self) -> None:
+        """
+        Sync the whole window before a read that must include the other
+        workers' writes. Concurrent callers share one sync; if it fails, the
+        error is logged and the rollups are read as they are.
+        """
+        await self.ensure_loaded()
+        self.schedule_refresh()
+        await asyncio.shield(self._refresh_task)
+
+    async def cells(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        vehicle_ids: Optional[Iterable[str]] = None,
+        driver_ids: Optional[Iterable[str]] = None
+    ) -> List[RollupCell]:
+        """
+        Rollup cells with start <= day <= end (either bound optional), in day order.
+
+        Cells are shared with the store and must not be modified.
+        """
+        await self.ensure_loaded()
+        vehicle_filter = set(vehicle_ids) if vehicle_ids else None
+        driver_filter = set(driver_ids) if driver_ids else None
+
+        result = []
+        for day in sorted(self._store.days):
+            if (start and day < start) or (end and day > end):
+                continue
+            for cell in self._store.days[day].values():
+                if vehicle_filter is not None and cell.vehicle_id not in vehicle_filter:
+                    continue
+                if driver_filter is not None and cell.driver_id not in driver_filter:
+                    continue
+                result.append(cell)
+        return result
+
+    async def totals(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        vehicle_ids: Optional[Iterable[str]] = None,
+        driver_ids: Optional[Iterable[str]] = None
+    ) -> RangeTotals:
+        """
+        Totals of the trips with start <= day <= end (either bound optional),
+        for the whole fleet or the given vehicles or drivers.
+
+        Read from the day index in O(log days) per vehicle or driver, however
+        long the range. Filtering by vehicles and drivers together selects
+        vehicle/driver pairs, which the index does not track, so the cells
+        are summed instead.
+        """
+        return (await self.period_totals([(start, end)], vehicle_ids, driver_ids))[0]
+
+    async def period_totals(
+        self,
+        periods: Sequence[Period],
+        vehicle_ids: Optional[Iterable[str]] = None,
+        driver_ids: Optional[Iterable[str]] = None
+    ) -> List[RangeTotals]:
+        """
+        `totals()` of several (start, end) periods, e.g. a period and the
+        baseline it is compared with, from one read of the index (or one
+        pass over the cells of all the periods).
+        """
+        await self.ensure_loaded()
+        if vehicle_ids and driver_ids:
+            result = [RangeTotals() for _ in periods]
+            days = [set() for _ in periods]
+            for cell in await self.cells(*_union(periods), vehicle_ids, driver_ids):
+                for i, period in enumerate(periods):
+                    if _within(cell.day, period):
+                        result[i].add(cell)
+                        days[i].add(cell.day)
+            for totals, period_days in zip(result, days):
+                totals.active_days = len(period_days)
+            return result
+
+        if vehicle_ids:
+            keys = [("vehicle", vehicle_id) for vehicle_id in set(vehicle_ids)]
+        elif driver_ids:
+            keys = [("driver", driver_id) for driver_id in set(driver_ids)]
+        else:
+            keys = [FLEET]
+        return [
+            RangeTotals.from_values(values.sum(axis=0))
+            for values in self._store.index.period_totals(keys, periods)
+        ]
+
+    async def totals_by(
+        self,
+        kind: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> Dict[str, RangeTotals]:
+        """
+        Totals per vehicle (kind "vehicle") or driver ("driver") over
+        start <= day <= end, for those with at least one trip in the range.
+        """
+        return (await self.period_totals_by(kind, [(start, end)]))[0]
+
+    async def period_totals_by(self, kind: str, periods: Sequence[Period]) -> List[Dict[str, RangeTotals]]:
+        """`totals_by()` of several (start, end) periods, from one read of the index"""
+        await self.ensure_loaded()
+        index = self._store.index
+        keys = [key for key in index.keys if key[0] == kind]
+        result = []
+        for period_values in index.period_totals(keys, periods):
+            totals = {}
+            for key, values in zip(keys, period_values):
+                if values[0] > 0:
+                    totals[key[1]] = RangeTotals.from_values(values)
+            result.append(totals)
+        return result
+
+    async def daily(
+        self,
+        start: date,
+        end: Optional[date] = None,
+        vehicle_id: Optional[str] = None,
+        driver_id: Optional[str] = None
+    ) -> List[Tuple[date, RangeTotals]]:
+        """
+        Totals of every day from start to end, including days without trips,
+        for the whole fleet or one vehicle or driver. Without an end the
+        series runs to the last day with trips.
+        """
+        await self.ensure_loaded()
+        if end is None:
+            end = max(self._store.days, default=start)
+        if vehicle_id:
+            key = ("vehicle", vehicle_id)
+        elif driver_id:
+            key = ("driver", driver_id)
+        else:
+            key = FLEET
+
+        series = self._store.index.series(key, start, end)
+        return [
+            (date.fromordinal(start.toordinal() + offset), RangeTotals.from_values(values))
+            for offset, values in enumerate(series)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self._loaded_at is not None,
+            "age_seconds": (time.monotonic() - self._loaded_at) if self._loaded_at is not None else None,
+            "checked_seconds_ago": (time.monotonic() - self._checked_at) if self._checked_at is not None else None,
+            "refresh_interval": settings.ROLLUP_REFRESH_INTERVAL,
+            "trips": sum(cell.trip_count for cells in self._store.days.values() for cell in cells.values()),
+            "days": len(self._store.days),
+            "cells": sum(len(cells) for cells in self._store.days.values()),
+            "window": [day.isoformat() for day in self._store.window],
+            "out_of_window": self._store.out_of_window,
+            "day_index": self._store.index.stats() if self._store.index is not None else None,
+            "version": self.version,
+            "rebuilds": self.rebuilds,
+            "last_rebuild_seconds": self.last_rebuild_seconds,
+            "checks": self.checks,
+            "rescanned_days": self.rescanned_days
+        }
+
+
+trip_rollups = TripRollups()
+
+
+async def synced_trip_rollups() -> None:
+    """
+    FastAPI dependency that syncs the trip rollups before the request reads them.
+
+        app.include_router(router, dependencies=[Depends(synced_trip_rollups)])
+    """
+    await trip_rollups.catch_up()
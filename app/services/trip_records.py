@@ -0,0 +1,121 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.logs import IssueSummary
+from app.core.projection import Projection
+
+logger = logging.getLogger(__name__)
+
+# Trip columns kept on a record as they come from PostgREST
+TEXT_FIELDS = ("id", "vehicle_id", "driver_id", "route_id", "route_name")
+
+# Trip columns decoded to floats; missing, empty and null values are 0
+AMOUNT_FIELDS = ("collected_amount", "expected_amount", "fuel_expense", "repair_expense", "other_expense")
+
+# Strings some rows carry for a missing amount
+_NULLS = ("", "none", "null")
+
+
+class TripRecord:
+    """
+    One decoded trip row.
+
+    `collected_at` is the parsed collection_time, `timestamp` the same
+    instant as POSIX seconds (a timestamp without offset counts as UTC)
+    and `day` the ordinal of its calendar day. Amounts are floats.
+
+    Columns outside the projection the row was decoded for are left unset,
+    so reading one raises AttributeError instead of returning a default.
+    """
+    __slots__ = TEXT_FIELDS + AMOUNT_FIELDS + (
+        "collected_at", "timestamp", "day", "driver_name", "vehicle_registration"
+    )
+
+    @property
+    def collection_date(self) -> Optional[str]:
+        return self.collected_at.strftime("%Y-%m-%d") if self.collected_at else None
+
+    @property
+    def collection_time_only(self) -> Optional[str]:
+        return self.collected_at.strftime("%H:%M:%S") if self.collected_at else None
+
+    @property
+    def efficiency(self) -> float:
+        return (self.collected_amount / self.expected_amount * 100) if self.expected_amount > 0 else 0
+
+    @property
+    def total_expense(self) -> float:
+        return self.fuel_expense + self.repair_expense + self.other_expense
+
+
+def _amount(value: Any) -> float:
+    if value is None or (isinstance(value, str) and value.strip().lower() in _NULLS):
+        return 0.0
+    return float(value)
+
+
+def _collection_time(record: TripRecord, value: Any) -> None:
+    collected_at = value
+    if isinstance(value, str):
+        collected_at = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    record.collected_at = collected_at
+    record.timestamp = (collected_at if collected_at.tzinfo else collected_at.replace(tzinfo=timezone.utc)).timestamp()
+    record.day = collected_at.toordinal()
+
+
+def decode_trips(
+    rows: Iterable[Dict[str, Any]],
+    projection: Projection,
+    issues: Optional[IssueSummary] = None
+) -> List[TripRecord]:
+    """
+    Decode a page of trip rows selected with `projection` into records.
+
+    Invalid amounts and timestamps are reported to `issues` (one summary
+    line per page if none is given) and read as 0 / no time. A trip whose
+    collected_amount is invalid is skipped.
+    """
+    own_issues = issues is None
+    if own_issues:
+        issues = IssueSummary(logger, f"decoding {projection.name} trips")
+
+    texts = [field for field in TEXT_FIELDS if field in projection.allowed]
+    amounts = [field for field in AMOUNT_FIELDS if field in projection.allowed and field != "collected_amount"]
+    timed = "collection_time" in projection.allowed
+
+    records = []
+    for row in rows:
+        record = TripRecord()
+        for field in texts:
+            setattr(record, field, row.get(field))
+
+        try:
+            record.collected_amount = _amount(row.get("collected_amount"))
+        except (ValueError, TypeError) as err:
+            issues.add("skipped", f"trip {row.get('id', 'unknown')}: {err}")
+            continue
+
+        for field in amounts:
+            try:
+                setattr(record, field, _amount(row.get(field)))
+            except (ValueError, TypeError) as err:
+                issues.add(field, f"trip {row.get('id')}: {err}")
+                setattr(record, field, 0.0)
+
+        if timed:
+            record.collected_at = record.timestamp = record.day = None
+            value = row.get("collection_time")
+            if value:
+                try:
+                    _collection_time(record, value)
+                except (ValueError, TypeError, AttributeError) as err:
+                    issues.add("collection_time", f"trip {row.get('id')}: {err}")
+                    record.collected_at = record.timestamp = record.day = None
+
+        record.driver_name = record.vehicle_registration = None
+        records.append(record)
+
+    if own_issues:
+        issues.flush()
+    return records
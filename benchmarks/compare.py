@@ -0,0 +1,71 @@
+"""
+Side-by-side comparison of two benchmarks.endpoints result files.
+
+For every endpoint in both files it prints the p50 latency before and
+after, the speedup (before / after) and the upstream PostgREST calls per
+request, so the effect of a change shows up per endpoint.
+
+Usage:
+    python -m benchmarks.endpoints --latency-ms 20 --concurrency 1 --output serial.json
+    python -m benchmarks.endpoints --latency-ms 20 --output concurrent.json
+    python -m benchmarks.compare serial.json concurrent.json [--only dashboard]
+"""
+import argparse
+import json
+from typing import Any, Dict, List, Optional
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def latency(result: Dict[str, Any]) -> Optional[float]:
+    # Endpoints run only once (e.g. --repeat 0) have no percentiles
+    return result.get("p50_ms") if result.get("p50_ms") is not None else result.get("first_ms")
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any], only: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """One row per endpoint found in both runs"""
+    rows = []
+    for name, old in before.get("endpoints", {}).items():
+        new = after.get("endpoints", {}).get(name)
+        if new is None or (only and not any(term in name for term in only)):
+            continue
+        old_ms, new_ms = latency(old), latency(new)
+        rows.append({
+            "name": name,
+            "before_ms": old_ms,
+            "after_ms": new_ms,
+            "speedup": round(old_ms / new_ms, 2) if old_ms and new_ms else None,
+            "calls_before": old.get("upstream_calls_per_request"),
+            "calls_after": new.get("upstream_calls_per_request"),
+        })
+    return rows
+
+
+def describe(meta: Dict[str, Any]) -> str:
+    return (f"commit {meta.get('commit')}, latency {meta.get('latency_ms')} ms, "
+            f"concurrency {meta.get('request_concurrency')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--only", action="append", help="Only endpoints whose name contains this (repeatable)")
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    print(f"before: {describe(before.get('meta', {}))}")
+    print(f"after:  {describe(after.get('meta', {}))}")
+    print(f"  {'endpoint':<28}{'before':>12}{'after':>12}{'speedup':>9}{'calls':>15}")
+
+    for row in compare(before, after, args.only):
+        speedup = f"{row['speedup']:.2f}x" if row["speedup"] is not None else "-"
+        calls = f"{row['calls_before']} -> {row['calls_after']}"
+        print(f"  {row['name']:<28}{row['before_ms']:>9.1f} ms{row['after_ms']:>9.1f} ms{speedup:>9}{calls:>15}")
+
+
+if __name__ == "__main__":
+    main()
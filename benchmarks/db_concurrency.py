@@ -0,0 +1,111 @@
+"""
+Concurrent-request throughput: blocking Supabase client vs pooled async client.
+
+Starts a local stand-in for PostgREST that answers every request after a fixed
+latency, then simulates a burst of dashboard requests. Each simulated request
+is an `async def` handler that issues several table reads, exactly like the
+routers in app/api.
+
+- "blocking": the old pattern, a sync client called inside async handlers
+- "pooled async": the shared `db` client from app/core/db.py
+
+Usage:
+    python -m benchmarks.db_concurrency [--requests 50] [--queries 5] [--latency-ms 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DUMMY_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.benchmark"
+
+
+class FakePostgrestHandler(BaseHTTPRequestHandler):
+    """Answers every GET with an empty JSON array after a fixed delay"""
+    protocol_version = "HTTP/1.1"
+    latency = 0.02
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        body = json.dumps([{"id": "1", "collected_amount": 100}]).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(latency: float) -> ThreadingHTTPServer:
+    FakePostgrestHandler.latency = latency
+    ThreadingHTTPServer.request_queue_size = 128
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakePostgrestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_blocking(sync_client, requests: int, queries: int) -> float:
+    async def handler():
+        for _ in range(queries):
+            sync_client.table("trips").select("collected_amount").execute()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(requests)))
+    return time.perf_counter() - start
+
+
+async def run_pooled(db, requests: int, queries: int) -> float:
+    async def handler():
+        for _ in range(queries):
+            await db.table("trips").select("collected_amount").execute()
+
+    # Warm the pool so connection setup is not part of the measurement
+    await db.table("trips").select("id").execute()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    await db.aclose()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="Concurrent API requests")
+    parser.add_argument("--queries", type=int, default=5, help="Upstream queries per request")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Simulated PostgREST latency")
+    args = parser.parse_args()
+
+    server = start_server(args.latency_ms / 1000)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["SUPABASE_URL"] = url
+    os.environ["SUPABASE_KEY"] = DUMMY_KEY
+    os.environ.setdefault("DB_HTTP2", "false")
+
+    from postgrest import SyncPostgrestClient
+    from app.core.db import db
+
+    sync_client = SyncPostgrestClient(f"{url}/rest/v1", headers={"apiKey": DUMMY_KEY})
+    blocking = asyncio.run(run_blocking(sync_client, args.requests, args.queries))
+    pooled = asyncio.run(run_pooled(db, args.requests, args.queries))
+    server.shutdown()
+
+    print(f"{args.requests} concurrent requests x {args.queries} queries, {args.latency_ms:g} ms upstream latency")
+    for name, elapsed in (("blocking", blocking), ("pooled async", pooled)):
+        print(f"  {name:<13} {elapsed:8.3f}s  {args.requests / elapsed:8.1f} req/s")
+    print(f"  speedup       {blocking / pooled:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+End-to-end latency of the API endpoints on a synthetic fleet.
+
+Serves a seeded fleet (see benchmarks.fleet_data) from a PostgREST
+stand-in in a child process, then calls the GET endpoints of every router
+mounted in app.main in-process, each `--repeat` times. Per endpoint it
+records latency percentiles, the upstream PostgREST calls and rows per
+request, and the process's peak RSS. Results are written as JSON with
+stable key order, so two runs (e.g. before and after a commit) diff
+cleanly.
+
+The first call of an endpoint pays for cold caches (reference tables,
+report documents); it is reported as `first_ms` and left out of the
+percentiles. Trip rollups are backfilled once before any endpoint runs
+and reported under "setup". If any endpoint answers with a non-2xx
+status, the run exits with an error and writes no results.
+
+Usage:
+    python -m benchmarks.endpoints [--trips 200000] [--vehicles 200] [--drivers 300]
+        [--repeat 5] [--only dashboard] [--output bench_results.json]
+
+To measure concurrent upstream reads, run with simulated latency once with
+`--concurrency 1` and once with the default, then compare the two files
+with benchmarks.compare.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.fake_postgrest import start_in_process
+from benchmarks.fleet_data import BENCH_USER_ID, ID_PREFIXES, FleetScale
+
+DUMMY_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.benchmark"
+
+# Endpoints that render a document per call are run fewer times
+HEAVY_REPEAT = 2
+
+
+def _id(table: str, code: int) -> str:
+    return f"{ID_PREFIXES[table]}-0000-4000-8000-{code:012x}"
+
+
+def endpoint_plan(scale: FleetScale, today: date) -> List[Tuple[str, str, Dict[str, Any], bool]]:
+    """(name, path, query parameters, heavy) for every benchmarked endpoint"""
+    vehicle_id = _id("vehicles", 0)
+    driver_id = _id("drivers", 0)
+    month = {"start_date": (today - timedelta(days=29)).isoformat(), "end_date": today.isoformat()}
+    baseline = {
+        "baseline_start_date": (today - timedelta(days=59)).isoformat(),
+        "baseline_end_date": (today - timedelta(days=30)).isoformat()
+    }
+    quarter = {"start_date": (today - timedelta(days=89)).isoformat(), "end_date": today.isoformat()}
+    vehicle_ids = ",".join(_id("vehicles", i) for i in range(min(10, scale.vehicles)))
+    # Repeated query parameters, as a fleet view opening ten detail cards sends them
+    vehicle_batch = {"vehicle_ids": [_id("vehicles", i) for i in range(min(10, scale.vehicles))]}
+    driver_batch = {"driver_ids": [_id("drivers", i) for i in range(min(10, scale.drivers))]}
+
+    return [
+        ("auth.me", "/api/auth/me", {}, False),
+        ("auth.test", "/api/auth/test-auth", {}, False),
+        ("vehicles.list", "/api/vehicles/", {}, False),
+        ("vehicles.expiring", "/api/vehicles/expiring", {}, False),
+        ("vehicles.get", f"/api/vehicles/{vehicle_id}", {}, False),
+        ("drivers.list", "/api/drivers/", {}, False),
+        ("drivers.get", f"/api/drivers/{driver_id}", {}, False),
+        ("drivers.performance", f"/api/drivers/{driver_id}/performance", {}, False),
+        ("routes.list", "/api/routes/", {}, False),
+        ("routes.get", f"/api/routes/{_id('routes', 0)}", {}, False),
+        ("trips.list", "/api/trips/", {"include_total": "true"}, False),
+        ("trips.list_vehicle", "/api/trips/", {"vehicle_id": vehicle_id}, False),
+        ("trips.get", f"/api/trips/{_id('trips', max(scale.trips - 1, 0))}", {}, False),
+        ("dashboard.overview", "/api/dashboard/overview/finances", {}, False),
+        ("dashboard.stats", "/api/dashboard/stats", {}, False),
+        ("dashboard.trends", "/api/dashboard/trends/collections", {}, False),
+        ("dashboard.vehicles", "/api/dashboard/performance/vehicles", month, False),
+        ("dashboard.vehicles_compare", "/api/dashboard/performance/vehicles", {**month, **baseline}, False),
+        ("dashboard.vehicle", f"/api/dashboard/performance/vehicles/{vehicle_id}", month, False),
+        ("dashboard.vehicle_batch", "/api/dashboard/performance/vehicles/batch", {**month, **vehicle_batch}, False),
+        ("dashboard.drivers", "/api/dashboard/performance/drivers", month, False),
+        ("dashboard.driver", f"/api/dashboard/performance/drivers/{driver_id}", month, False),
+        ("dashboard.driver_batch", "/api/dashboard/performance/drivers/batch", {**month, **driver_batch}, False),
+        ("dashboard.summary", "/api/dashboard/performance/summary", month, False),
+        ("dashboard.drivers_compare", "/api/dashboard/performance/drivers", {**month, **baseline}, False),
+        ("deficits.list", "/api/deficits/", {}, False),
+        ("deficits.get", f"/api/deficits/{_id('deficits', 0)}", {}, False),
+        ("reports.driver_html", f"/api/reports/driver/{driver_id}", {**month, "format": "html"}, True),
+        ("reports.driver_pdf", f"/api/reports/driver/{driver_id}", {**month, "format": "pdf"}, True),
+        ("reports.vehicle_html", f"/api/reports/vehicle/{vehicle_id}", {**month, "format": "html"}, True),
+        ("reports.combined_html", "/api/reports/combined", {**quarter, "vehicle_ids": vehicle_ids, "format": "html"}, True),
+        ("reports.combined_export", "/api/reports/combined/export", {**month, "format": "csv"}, True),
+        ("reports.bundle_drivers", "/api/reports/bundle/drivers", {**month, "format": "html"}, True),
+        ("system.cache", "/api/system/cache", {}, False),
+        ("system.rollups", "/api/system/rollups", {}, False),
+    ]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"p50_ms": None, "p90_ms": None, "p99_ms": None, "mean_ms": None, "max_ms": None}
+    values = np.array(samples)
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {
+        "p50_ms": round(float(p50), 3),
+        "p90_ms": round(float(p90), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class UpstreamCounter:
+    """Reads and resets the stand-in's request counters"""
+    def __init__(self, client, url: str):
+        self.client = client
+        self.url = url
+
+    async def reset(self) -> None:
+        await self.client.post(f"{self.url}/__reset")
+
+    async def read(self) -> Dict[str, Any]:
+        return (await self.client.get(f"{self.url}/__stats")).json()
+
+
+async def measure(client, upstream: UpstreamCounter, path: str, params: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    samples: List[float] = []
+    calls: List[int] = []
+    rows: List[int] = []
+    tables: Dict[str, int] = {}
+    statuses: Dict[str, int] = {}
+    error: Optional[str] = None
+    response_bytes = 0
+    rss_before = peak_rss_mb()
+
+    for _ in range(repeat + 1):
+        await upstream.reset()
+        start = time.perf_counter()
+        response = await client.get(path, params=params)
+        body = await response.aread()
+        elapsed = (time.perf_counter() - start) * 1000
+        stats = await upstream.read()
+
+        samples.append(elapsed)
+        calls.append(stats["requests"])
+        rows.append(stats["rows"])
+        for table, count in stats["tables"].items():
+            tables[table] = tables.get(table, 0) + count
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        response_bytes = len(body)
+        if not response.is_success and error is None:
+            error = f"{response.status_code}: {body[:300].decode('utf-8', 'replace')}"
+
+    runs = len(samples)
+    return {
+        "status": statuses,
+        "error": error,
+        "first_ms": round(samples[0], 3),
+        **percentiles(samples[1:]),
+        "upstream_calls_first": calls[0],
+        "upstream_calls_per_request": round(sum(calls[1:]) / max(runs - 1, 1), 2),
+        "upstream_rows_per_request": round(sum(rows[1:]) / max(runs - 1, 1), 1),
+        "upstream_calls_by_table": {table: round(count / runs, 2) for table, count in sorted(tables.items())},
+        "response_bytes": response_bytes,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "rss_growth_mb": round(peak_rss_mb() - rss_before, 1),
+    }
+
+
+async def run(args: argparse.Namespace, scale: FleetScale, url: str) -> Dict[str, Any]:
+    import httpx
+    from app.main import app
+    from app.core.security import create_access_token
+    from app.services import pdf
+    from app.services.rollups import trip_rollups
+
+    token = create_access_token({"sub": BENCH_USER_ID, "role": "admin"}, expires_delta=timedelta(days=1))
+    results: Dict[str, Any] = {"setup": {}, "endpoints": {}}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers={"Authorization": f"Bearer {token}"}, timeout=None) as client, \
+            httpx.AsyncClient(timeout=None) as control:
+        upstream = UpstreamCounter(control, url)
+
+        await upstream.reset()
+        start = time.perf_counter()
+        await trip_rollups.ensure_loaded()
+        stats = await upstream.read()
+        results["setup"]["rollup_backfill"] = {
+            "ms": round((time.perf_counter() - start) * 1000, 3),
+            "upstream_calls": stats["requests"],
+            "upstream_rows": stats["rows"],
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+
+        for name, path, params, heavy in endpoint_plan(scale, date.today()):
+            if args.only and not any(term in name for term in args.only):
+                continue
+            repeat = min(args.repeat, HEAVY_REPEAT) if heavy else args.repeat
+            print(f"  {name:<28}", end="", flush=True)
+            result = await measure(client, upstream, path, params, repeat)
+            results["endpoints"][name] = {"path": path, **result}
+            p50 = result["p50_ms"]
+            print(f"p50 {p50 if p50 is not None else result['first_ms']:>10.1f} ms  "
+                  f"{result['upstream_calls_per_request']:>7} calls  {result['peak_rss_mb']:>8.1f} MB  {result['status']}")
+            if result["error"]:
+                print(f"    {result['error']}")
+
+    pdf.shutdown_pool()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vehicles", type=int, default=FleetScale.vehicles)
+    parser.add_argument("--drivers", type=int, default=FleetScale.drivers)
+    parser.add_argument("--trips", type=int, default=FleetScale.trips)
+    parser.add_argument("--days", type=int, default=FleetScale.days)
+    parser.add_argument("--seed", type=int, default=FleetScale.seed)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per endpoint after the first")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Simulated PostgREST latency")
+    parser.add_argument("--only", action="append", help="Only endpoints whose name contains this (repeatable)")
+    parser.add_argument("--report-cache", action="store_true", help="Keep the report document cache on")
+    parser.add_argument("--no-dashboard-cache", action="store_true", help="Recompute dashboard results on every call")
+    parser.add_argument("--concurrency", type=int, help="DB_REQUEST_CONCURRENCY for the app (default: its setting)")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    scale = FleetScale(args.vehicles, args.drivers, args.trips, args.days, args.seed)
+    print(f"Generating {scale.trips:,} trips for {scale.vehicles} vehicles and {scale.drivers} drivers")
+    server, url = start_in_process(scale, args.latency_ms / 1000)
+
+    # Settings are read when app modules are imported
+    os.environ["SUPABASE_URL"] = url
+    os.environ["SUPABASE_KEY"] = DUMMY_KEY
+    os.environ.setdefault("DB_HTTP2", "false")
+    os.environ.setdefault("ROLLUP_REFRESH_INTERVAL", "0")
+    if not args.report_cache:
+        os.environ["REPORT_CACHE_MAX_BYTES"] = "0"
+    if args.no_dashboard_cache:
+        os.environ["DASHBOARD_CACHE_FRESH"] = "0"
+        os.environ["DASHBOARD_CACHE_STALE"] = "0"
+    if args.concurrency is not None:
+        os.environ["DB_REQUEST_CONCURRENCY"] = str(args.concurrency)
+
+    try:
+        results = asyncio.run(run(args, scale, url))
+    finally:
+        server.terminate()
+
+    # Timings of error responses are not benchmark numbers
+    failed = [name for name, result in results["endpoints"].items() if result["error"]]
+    if failed:
+        sys.exit(f"{len(failed)} endpoint(s) answered with errors, no results written: {', '.join(failed)}")
+
+    from app.core.config import settings
+    results["meta"] = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale.to_dict(),
+        "repeat": args.repeat,
+        "latency_ms": args.latency_ms,
+        "report_cache": args.report_cache,
+        "dashboard_cache": not args.no_dashboard_cache,
+        "request_concurrency": settings.DB_REQUEST_CONCURRENCY,
+        "date": date.today().isoformat(),
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+"""
+Local stand-in for Supabase's PostgREST API, serving a synthetic fleet.
+
+Answers the read queries the routers in app/api send: column selects,
+eq/neq/gt/gte/lt/lte/in/is filters, or=(...)/and(...) groups, order,
+limit/offset, Range headers and `Prefer: count=exact` (with HEAD), and
+the get_trip_detail function under /rpc. Writes are refused. Every request is counted per table, and the
+counters are read and reset through two extra endpoints:
+
+    GET  /__stats   {"requests": n, "rows": n, "tables": {"trips": n, ...}}
+    POST /__reset
+
+Usage (point SUPABASE_URL at the printed address):
+    python -m benchmarks.fake_postgrest [--port 54321] [--trips 200000] [--latency-ms 0]
+"""
+import argparse
+import json
+import multiprocessing
+import socket
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from benchmarks.fleet_data import FleetScale, Table, generate_fleet
+
+# PostgREST's max-rows: no response holds more rows than this
+MAX_ROWS = 1000
+
+# Rows tested per step when a query can stop early (ordered like the storage)
+SCAN_CHUNK = 16384
+
+# Query parameters that are not filters
+_RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+Node = Tuple[Any, ...]
+
+
+class QueryError(Exception):
+    """A query the stand-in cannot answer, sent back as a 400 like PostgREST's"""
+
+
+def split_top_level(text: str) -> List[str]:
+    """Split on commas that are not inside parentheses or double quotes"""
+    parts, depth, quoted, escaped, current = [], 0, False, False, []
+    for ch in text:
+        if escaped:
+            current.append(ch)
+            escaped = False
+            continue
+        if ch == "\\" and quoted:
+            current.append(ch)
+            escaped = True
+            continue
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(ch)
+    parts.append("".join(current))
+    return parts
+
+
+def unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def parse_operation(column: str, expression: str) -> Node:
+    """`op.value` (or `not.op.value`) applied to `column`"""
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, raw = expression.partition(".")
+    if op == "in":
+        value: Any = [unquote(v) for v in split_top_level(raw.strip()[1:-1])] if raw.strip() != "()" else []
+    else:
+        value = unquote(raw)
+    node = ("leaf", column, op, value)
+    return ("not", node) if negate else node
+
+
+def parse_condition(text: str) -> Node:
+    """One term of a logic group: `col.op.value`, `and(...)`, `or(...)`, `not.and(...)`"""
+    negate = text.startswith("not.")
+    if negate:
+        text = text[4:]
+    for logic in ("and", "or"):
+        if text.startswith(logic + "("):
+            node: Node = (logic, [parse_condition(t) for t in split_top_level(text[len(logic) + 1:-1])])
+            break
+    else:
+        column, _, expression = text.partition(".")
+        node = parse_operation(column, expression)
+    return ("not", node) if negate else node
+
+
+def parse_filter(key: str, value: str) -> Node:
+    """A top-level query parameter (other than select/order/...) as a filter node"""
+    for logic in ("and", "or"):
+        if key in (logic, "not." + logic):
+            node: Node = (logic, [parse_condition(t) for t in split_top_level(value[1:-1])])
+            return ("not", node) if key.startswith("not.") else node
+    return parse_operation(key, value)
+
+
+def parse_order(values: Sequence[str]) -> List[Tuple[str, bool]]:
+    orders = []
+    for value in values:
+        for term in value.split(","):
+            parts = term.strip().split(".")
+            orders.append((parts[0], "desc" in parts[1:]))
+    return orders
+
+
+class Query:
+    """One parsed read against a Table"""
+    def __init__(self, table: Table, params: List[Tuple[str, str]], headers: Dict[str, str]):
+        self.table = table
+        self.select: Optional[List[str]] = None
+        self.filters: List[Node] = []
+        orders: List[str] = []
+        self.limit = MAX_ROWS
+        self.offset = 0
+
+        for key, value in params:
+            if key == "select":
+                columns = [c.strip() for c in value.split(",") if c.strip()]
+                self.select = None if columns == ["*"] else columns
+            elif key == "order":
+                orders.append(value)
+            elif key == "limit":
+                self.limit = min(int(value), MAX_ROWS)
+            elif key == "offset":
+                self.offset = int(value)
+            elif key not in _RESERVED_PARAMS:
+                self.filters.append(parse_filter(key, value))
+
+        byte_range = headers.get("range")
+        if byte_range and "-" in byte_range:
+            first, _, last = byte_range.partition("-")
+            self.offset = int(first)
+            if last:
+                self.limit = min(self.limit, int(last) - int(first) + 1)
+
+        self.orders = parse_order(orders)
+        self.count = "count=" in headers.get("prefer", "")
+
+        for name in self.columns + [column for column, _ in self.orders] + self._filter_columns(self.filters):
+            if name not in table.columns:
+                raise QueryError(f"column {table.name}.{name} does not exist")
+
+    @property
+    def columns(self) -> List[str]:
+        return self.select if self.select is not None else list(self.table.columns)
+
+    def _filter_columns(self, nodes: Sequence[Node]) -> List[str]:
+        names = []
+        for node in nodes:
+            if node[0] == "leaf":
+                names.append(node[1])
+            elif node[0] == "not":
+                names.extend(self._filter_columns([node[1]]))
+            else:
+                names.extend(self._filter_columns(node[1]))
+        return names
+
+    # Evaluation
+
+    def _mask(self, node: Node, rows: np.ndarray) -> np.ndarray:
+        kind = node[0]
+        if kind == "leaf":
+            _, column, op, value = node
+            return self.table.columns[column].compare(op, value, rows)
+        if kind == "not":
+            return ~self._mask(node[1], rows)
+        masks = [self._mask(child, rows) for child in node[1]]
+        if kind == "and":
+            return np.logical_and.reduce(masks) if masks else np.ones(rows.size, dtype=bool)
+        return np.logical_or.reduce(masks) if masks else np.zeros(rows.size, dtype=bool)
+
+    def matches(self, rows: np.ndarray) -> np.ndarray:
+        mask = np.ones(rows.size, dtype=bool)
+        for node in self.filters:
+            mask &= self._mask(node, rows)
+        return rows[mask]
+
+    def _bounds(self, node: Node) -> Tuple[int, int]:
+        """Row range a filter limits the first storage key to (the whole table if it does not)"""
+        size = self.table.size
+        kind = node[0]
+        if kind == "leaf":
+            _, column, op, value = node
+            if not self.table.sort_keys or column != self.table.sort_keys[0] or op not in ("eq", "gt", "gte", "lt", "lte"):
+                return 0, size
+            stored = self.table.columns[column]
+            target = stored.parse(value)
+            if op in ("gt", "gte"):
+                return int(np.searchsorted(stored.data, target, side="right" if op == "gt" else "left")), size
+            if op in ("lt", "lte"):
+                return 0, int(np.searchsorted(stored.data, target, side="left" if op == "lt" else "right"))
+            return int(np.searchsorted(stored.data, target, side="left")), int(np.searchsorted(stored.data, target, side="right"))
+        if kind == "not":
+            return 0, size
+        bounds = [self._bounds(child) for child in node[1]]
+        if not bounds:
+            return 0, size
+        if kind == "and":
+            return max(b[0] for b in bounds), min(b[1] for b in bounds)
+        return min(b[0] for b in bounds), max(b[1] for b in bounds)
+
+    def _storage_order(self) -> Optional[bool]:
+        """True/False (descending or not) if the requested order is the storage order, else None"""
+        if not self.orders:
+            return False
+        keys = tuple(column for column, _ in self.orders)
+        directions = {desc for _, desc in self.orders}
+        if keys != self.table.sort_keys[:len(keys)] or len(directions) != 1:
+            return None
+        return directions.pop()
+
+    def run(self) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """The page of rows and, if counting was asked for, the total number of matches"""
+        lo, hi = 0, self.table.size
+        for node in self.filters:
+            node_lo, node_hi = self._bounds(node)
+            lo, hi = max(lo, node_lo), min(hi, node_hi)
+        hi = max(lo, hi)
+
+        wanted = self.offset + self.limit
+        desc = self._storage_order()
+        if desc is not None and not self.count:
+            # Walk the rows in storage order and stop once the page is full
+            found: List[np.ndarray] = []
+            total = 0
+            chunk = max(SCAN_CHUNK, wanted * 4)
+            start, stop = (hi, lo) if desc else (lo, hi)
+            while total < wanted and start != stop:
+                if desc:
+                    rows = np.arange(max(stop, start - chunk), start)[::-1]
+                    start = max(stop, start - chunk)
+                else:
+                    rows = np.arange(start, min(stop, start + chunk))
+                    start = min(stop, start + chunk)
+                selected = self.matches(rows)
+                found.append(selected)
+                total += selected.size
+            selected = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+            page = selected[self.offset:wanted]
+            return self.table.rows(page, self.select), None
+
+        selected = self.matches(np.arange(lo, hi))
+        if self.orders and desc is None:
+            keys = []
+            for column, column_desc in reversed(self.orders):
+                key = self.table.columns[column].sort_key(selected)
+                keys.append(-key if column_desc else key)
+            selected = selected[np.lexsort(keys)]
+        elif desc:
+            selected = selected[::-1]
+        page = selected[self.offset:wanted]
+        return self.table.rows(page, self.select), (int(selected.size) if self.count else None)
+
+
+class FakePostgrest:
+    """The tables plus request counters, shared by the server threads"""
+    def __init__(self, tables: Dict[str, Table], latency: float = 0.0):
+        self.tables = tables
+        self.latency = latency
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.rows = 0
+            self.by_table: Counter = Counter()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"requests": self.requests, "rows": self.rows, "tables": dict(self.by_table)}
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        query: str,
+        headers: Dict[str, str],
+        body: Optional[Dict[str, Any]] = None
+    ) -> Tuple[int, Dict[str, str], Any]:
+        if self.latency:
+            time.sleep(self.latency)
+
+        name = path.rsplit("/", 1)[-1]
+        with self._lock:
+            self.requests += 1
+            self.by_table[name] += 1
+
+        if path.rsplit("/", 2)[-2] == "rpc":
+            return self.rpc(name, body or {})
+
+        table = self.tables.get(name)
+        if table is None:
+            return 404, {}, {"code": "42P01", "message": f'relation "public.{name}" does not exist'}
+        if method not in ("GET", "HEAD"):
+            return 405, {}, {"code": "PGRST000", "message": "The benchmark database is read-only"}
+
+        try:
+            request = Query(table, parse_qsl(query, keep_blank_values=True), headers)
+            rows, count = request.run()
+        except (QueryError, ValueError) as e:
+            return 400, {}, {"code": "PGRST100", "message": str(e)}
+
+        with self._lock:
+            self.rows += len(rows)
+
+        offset = request.offset
+        total = "*" if count is None else str(count)
+        content_range = f"{offset}-{offset + len(rows) - 1}/{total}" if rows else f"*/{total}"
+        return 200, {"Content-Range": content_range}, rows
+
+
+    def row(self, table: str, row_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """A row by id; ids are generated in storage order, so the id code is the row number"""
+        if row_id is None:
+            return None
+        stored = self.tables[table]
+        code = stored.columns["id"].parse(row_id)
+        if not 0 <= code < stored.size:
+            return None
+        return stored.rows(np.array([code]))[0]
+
+    def rpc(self, name: str, args: Dict[str, Any]) -> Tuple[int, Dict[str, str], Any]:
+        """The database functions the API calls"""
+        if name != "get_trip_detail":
+            return 404, {}, {"code": "PGRST202", "message": f"Could not find the function public.{name}"}
+
+        trip = self.row("trips", args.get("trip_id"))
+        if trip is None:
+            return 200, {}, []
+        vehicle = self.row("vehicles", trip["vehicle_id"]) or {}
+        driver = self.row("drivers", trip["driver_id"]) or {}
+        route = self.row("routes", trip["route_id"]) or {}
+        with self._lock:
+            self.rows += 1
+        return 200, {}, [{
+            **trip,
+            "vehicle_registration": vehicle.get("reg_no"),
+            "driver_name": driver.get("name"),
+            "route": route.get("name"),
+            "route_text": route.get("name"),
+            "origin": route.get("origin"),
+            "destination": route.get("destination"),
+            "fare_amount": route.get("fare_amount"),
+        }]
+
+
+class FakePostgrestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    database: FakePostgrest
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _send(self, status: int, headers: Dict[str, str], payload: Any, body: bool = True) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data) if body else 0))
+        self.end_headers()
+        if body:
+            self.wfile.write(data)
+
+    def _dispatch(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+
+        url = urlsplit(self.path)
+        if url.path == "/__stats":
+            return self._send(200, {}, self.database.stats())
+        if url.path == "/__reset":
+            self.database.reset()
+            return self._send(200, {}, {})
+
+        headers = {k.lower(): v for k, v in self.headers.items()}
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = None
+        status, extra, payload = self.database.handle(method, url.path, url.query, headers, body)
+        self._send(status, extra, payload, body=method != "HEAD")
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_HEAD(self):
+        self._dispatch("HEAD")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(scale: FleetScale, latency: float = 0.0, port: int = 0, ready: Optional[Any] = None) -> None:
+    """Generate the fleet and serve it until the process is stopped"""
+    database = FakePostgrest(generate_fleet(scale), latency)
+    handler = type("Handler", (FakePostgrestHandler,), {"database": database})
+    ThreadingHTTPServer.request_queue_size = 128
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    if ready is not None:
+        ready.put(server.server_address[1])
+    else:
+        print(f"Serving {scale.trips:,} trips at http://127.0.0.1:{server.server_address[1]}", flush=True)
+    server.serve_forever()
+
+
+def start_in_process(scale: FleetScale, latency: float = 0.0) -> Tuple[multiprocessing.Process, str]:
+    """
+    Serve a fleet from a child process, so the database's memory and CPU
+    do not count towards the API process being measured.
+    """
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    process = context.Process(target=serve, args=(scale, latency, 0, ready), daemon=True)
+    process.start()
+    port = ready.get(timeout=600)
+    return process, f"http://127.0.0.1:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--vehicles", type=int, default=FleetScale.vehicles)
+    parser.add_argument("--drivers", type=int, default=FleetScale.drivers)
+    parser.add_argument("--trips", type=int, default=FleetScale.trips)
+    parser.add_argument("--days", type=int, default=FleetScale.days)
+    parser.add_argument("--seed", type=int, default=FleetScale.seed)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Added to every request")
+    args = parser.parse_args()
+
+    scale = FleetScale(args.vehicles, args.drivers, args.trips, args.days, args.seed)
+    serve(scale, args.latency_ms / 1000, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+"""
+Seeded synthetic fleet data for the benchmarks.
+
+Generates the vehicles, drivers, routes, trips, deficits, locations,
+daily_summaries, operations and users tables at a configurable scale
+(up to ~1k vehicles and 5M trips). Tables are stored column by column in
+NumPy arrays, so 5M trips take a few hundred MB and filters run as array
+operations. The same seed always produces the same fleet.
+
+Usage:
+    python -m benchmarks.fleet_data [--vehicles 200] [--drivers 300] [--trips 200000] [--days 365] [--seed 1]
+"""
+import argparse
+import bisect
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+EPOCH_DAY = date(1970, 1, 1)
+
+# Id of the user the benchmark runner signs its requests as
+BENCH_USER_ID = "75736572-0000-4000-8000-000000000001"
+
+# First id block of each table, so ids never collide between tables
+ID_PREFIXES = {
+    "vehicles": "76656869",
+    "drivers": "64726976",
+    "routes": "726f7574",
+    "trips": "74726970",
+    "deficits": "64656669",
+    "locations": "6c6f6361",
+    "daily_summaries": "64617973",
+    "operations": "6f706572",
+    "users": "75736572",
+}
+
+TOWNS = ["Nairobi", "Thika", "Kiambu", "Machakos", "Kitengela", "Ngong", "Rongai", "Ruiru", "Limuru", "Juja"]
+FIRST_NAMES = ["John", "Mary", "Peter", "Grace", "James", "Ann", "David", "Faith", "Joseph", "Jane", "Samuel", "Lucy"]
+LAST_NAMES = ["Kamau", "Otieno", "Wanjiru", "Mwangi", "Njoroge", "Achieng", "Kiprop", "Mutua", "Wafula", "Njeri"]
+MODELS = ["Toyota HiAce", "Nissan Caravan", "Isuzu NQR", "Mitsubishi Rosa"]
+
+
+@dataclass
+class FleetScale:
+    """Size of a generated fleet"""
+    vehicles: int = 200
+    drivers: int = 300
+    trips: int = 200_000
+    days: int = 365
+    seed: int = 1
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class Column:
+    """
+    One column of a table.
+
+    Kinds:
+    - uuid: int64 codes rendered as `<table prefix>-0000-4000-8000-<code>`, -1 is null
+    - text: int32 codes into `labels`, -1 is null
+    - float / int: numbers, NaN is null for floats
+    - timestamp: int64 seconds since the epoch (UTC), rendered as ISO 8601
+    - date: int64 days since the epoch
+    """
+    __slots__ = ("kind", "data", "labels", "prefix", "_index", "_rank", "_sorted")
+
+    def __init__(self, kind: str, data: np.ndarray, labels: Optional[List[str]] = None, prefix: str = ""):
+        self.kind = kind
+        self.data = data
+        self.labels = labels
+        self.prefix = prefix
+        self._index: Optional[Dict[str, int]] = None
+        self._rank: Optional[np.ndarray] = None
+        self._sorted: Optional[List[str]] = None
+
+    @classmethod
+    def text(cls, values: Sequence[Optional[str]]) -> "Column":
+        labels: Dict[str, int] = {}
+        codes = np.fromiter(
+            (-1 if v is None else labels.setdefault(v, len(labels)) for v in values),
+            dtype=np.int32,
+            count=len(values)
+        )
+        return cls("text", codes, list(labels))
+
+    @classmethod
+    def categories(cls, labels: List[str], codes: np.ndarray) -> "Column":
+        return cls("text", codes.astype(np.int32), list(labels))
+
+    def uuid(self, code: int) -> str:
+        return f"{self.prefix}-0000-4000-8000-{code:012x}"
+
+    # Rendering
+
+    def render(self, rows: np.ndarray) -> List[Any]:
+        values = self.data[rows]
+        if self.kind == "uuid":
+            return [None if v < 0 else self.uuid(v) for v in values.tolist()]
+        if self.kind == "text":
+            labels = self.labels
+            return [None if v < 0 else labels[v] for v in values.tolist()]
+        if self.kind == "float":
+            return [None if v != v else v for v in values.tolist()]
+        if self.kind == "timestamp":
+            stamps = np.datetime_as_string(values.astype("datetime64[s]"))
+            return [f"{s}+00:00" for s in stamps.tolist()]
+        if self.kind == "date":
+            return np.datetime_as_string(values.astype("datetime64[D]")).tolist()
+        return values.tolist()
+
+    # Filters
+
+    def parse(self, raw: str) -> Any:
+        """A filter value in the column's storage representation"""
+        if self.kind == "uuid":
+            if raw.startswith(self.prefix + "-"):
+                return int(raw[-12:], 16)
+            # Ids of another table sort entirely before or after this one
+            return -3 if raw < self.prefix else 2 ** 62
+        if self.kind == "text":
+            return raw
+        if self.kind in ("float", "int"):
+            return float(raw)
+        if self.kind == "timestamp":
+            value = datetime.fromisoformat(raw.replace("Z", "+00:00").replace(" ", "T"))
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            return int(value.timestamp())
+        return (date.fromisoformat(raw[:10]) - EPOCH_DAY).days
+
+    def is_null(self, rows: np.ndarray) -> np.ndarray:
+        values = self.data[rows]
+        if self.kind == "float":
+            return np.isnan(values)
+        if self.kind in ("uuid", "text"):
+            return values < 0
+        return np.zeros(values.shape, dtype=bool)
+
+    def sort_key(self, rows: np.ndarray) -> np.ndarray:
+        """Values of `rows` as numbers that sort like the rendered values"""
+        if self.kind == "text":
+            return self.rank[np.maximum(self.data[rows], 0)]
+        return self.data[rows]
+
+    @property
+    def sorted_labels(self) -> List[str]:
+        if self._sorted is None:
+            self._sorted = sorted(self.labels)
+        return self._sorted
+
+    @property
+    def rank(self) -> np.ndarray:
+        """Alphabetical position of each label"""
+        if self._rank is None:
+            position = {label: i for i, label in enumerate(self.sorted_labels)}
+            self._rank = np.fromiter((position[label] for label in self.labels), dtype=np.int64, count=len(self.labels))
+        return self._rank
+
+    def compare(self, op: str, raw: Any, rows: np.ndarray) -> np.ndarray:
+        """Mask of `rows` matching `<column>.<op>.<raw>`"""
+        if op == "is":
+            nulls = self.is_null(rows)
+            return nulls if raw == "null" else ~nulls
+
+        if op == "in":
+            if self.kind == "text":
+                codes = [self._code(v) for v in raw]
+                return np.isin(self.data[rows], codes)
+            return np.isin(self.data[rows], [self.parse(v) for v in raw])
+
+        if op in ("like", "ilike"):
+            raise ValueError(f"Operator {op} is not supported by the benchmark database")
+
+        if self.kind == "text":
+            if op in ("eq", "neq"):
+                matches = self.data[rows] == self._code(raw)
+                return matches if op == "eq" else ~matches & (self.data[rows] >= 0)
+            # Ordered comparison: compare alphabetical ranks
+            values = self.sort_key(rows)
+            position = bisect.bisect_left(self.sorted_labels, raw)
+            exact = position < len(self.labels) and self.sorted_labels[position] == raw
+            nonnull = self.data[rows] >= 0
+            if op == "gt":
+                return nonnull & ((values > position) if exact else (values >= position))
+            if op == "gte":
+                return nonnull & (values >= position)
+            if op == "lt":
+                return nonnull & (values < position)
+            if op == "lte":
+                return nonnull & ((values <= position) if exact else (values < position))
+            raise ValueError(f"Unknown operator {op}")
+
+        value = self.parse(raw)
+        values = self.data[rows]
+        nonnull = ~self.is_null(rows)
+        if op == "eq":
+            return nonnull & (values == value)
+        if op == "neq":
+            return nonnull & (values != value)
+        if op == "gt":
+            return nonnull & (values > value)
+        if op == "gte":
+            return nonnull & (values >= value)
+        if op == "lt":
+            return nonnull & (values < value)
+        if op == "lte":
+            return nonnull & (values <= value)
+        raise ValueError(f"Unknown operator {op}")
+
+    @property
+    def index(self) -> Dict[str, int]:
+        if self._index is None:
+            self._index = {label: code for code, label in enumerate(self.labels)}
+        return self._index
+
+    def _code(self, label: str) -> int:
+        # -2 never matches a stored code (nulls are -1)
+        return self.index.get(label, -2)
+
+
+class Table:
+    """
+    A generated table.
+
+    `sort_keys` are the columns the rows are stored in order of, if any;
+    queries ordered by them (or filtered on a range of the first one) are
+    answered without scanning the whole table.
+    """
+    def __init__(self, name: str, columns: Dict[str, Column], sort_keys: Sequence[str] = ()):
+        self.name = name
+        self.columns = columns
+        self.sort_keys = tuple(sort_keys)
+        self.size = len(next(iter(columns.values())).data) if columns else 0
+
+    def rows(self, indices: np.ndarray, names: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        names = list(names or self.columns)
+        rendered = [self.columns[name].render(indices) for name in names]
+        return [dict(zip(names, values)) for values in zip(*rendered)]
+
+
+def _uuid_column(table: str, codes: np.ndarray) -> Column:
+    return Column("uuid", codes.astype(np.int64), prefix=ID_PREFIXES[table])
+
+
+def _ids(table: str, count: int) -> Column:
+    return _uuid_column(table, np.arange(count, dtype=np.int64))
+
+
+def _timestamps(values: np.ndarray) -> Column:
+    return Column("timestamp", values.astype(np.int64))
+
+
+def _dates(values: np.ndarray) -> Column:
+    return Column("date", values.astype(np.int64))
+
+
+def _day_seconds(day: date) -> int:
+    return (day - EPOCH_DAY).days * 86400
+
+
+def generate_fleet(scale: FleetScale, today: Optional[date] = None) -> Dict[str, Table]:
+    """All tables of one synthetic fleet, ending at `today`"""
+    rng = np.random.default_rng(scale.seed)
+    today = today or date.today()
+    today_day = (today - EPOCH_DAY).days
+    start_seconds = _day_seconds(today - timedelta(days=scale.days - 1))
+    end_seconds = _day_seconds(today) + 86400
+    created = np.full(1, start_seconds - 86400 * 30, dtype=np.int64)
+
+    tables: Dict[str, Table] = {}
+
+    # Routes
+    route_count = max(5, scale.vehicles // 20)
+    origins = rng.integers(0, len(TOWNS), route_count)
+    destinations = (origins + rng.integers(1, len(TOWNS), route_count)) % len(TOWNS)
+    fares = rng.choice([50.0, 70.0, 80.0, 100.0, 120.0, 150.0], route_count)
+    route_names = [f"{TOWNS[o]} - {TOWNS[d]} {i + 1}" for i, (o, d) in enumerate(zip(origins.tolist(), destinations.tolist()))]
+    tables["routes"] = Table("routes", {
+        "id": _ids("routes", route_count),
+        "name": Column.text(route_names),
+        "origin": Column.categories(TOWNS, origins),
+        "destination": Column.categories(TOWNS, destinations),
+        "fare_amount": Column("float", fares),
+        "distance": Column("float", rng.uniform(10, 60, route_count).round(1)),
+        "estimated_duration": Column("int", rng.integers(30, 120, route_count)),
+        "status": Column.categories(["active", "inactive"], (rng.random(route_count) < 0.05).astype(np.int32)),
+        "description": Column.text([None] * route_count),
+        "created_at": _timestamps(np.repeat(created, route_count)),
+        "updated_at": _timestamps(np.repeat(created, route_count)),
+    })
+
+    # Vehicles
+    vehicle_routes = rng.integers(0, route_count, scale.vehicles)
+    reg_nos = [f"K{chr(65 + (i // 1000) % 26)}{chr(65 + (i // 26000) % 26)} {i % 1000:03d}{chr(65 + i % 26)}" for i in range(scale.vehicles)]
+
+    def expiries() -> Column:
+        return _dates(today_day + rng.integers(-30, 365, scale.vehicles))
+
+    tables["vehicles"] = Table("vehicles", {
+        "id": _ids("vehicles", scale.vehicles),
+        "reg_no": Column.text(reg_nos),
+        "model": Column.categories(MODELS, rng.integers(0, len(MODELS), scale.vehicles)),
+        "owner": Column.text([f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[i % len(LAST_NAMES)]}" for i in range(scale.vehicles)]),
+        "status": Column.categories(["active", "maintenance", "inactive"], rng.choice(3, scale.vehicles, p=[0.9, 0.07, 0.03])),
+        "insurance_expiry": expiries(),
+        "tlb_expiry": expiries(),
+        "speed_governor_expiry": expiries(),
+        "inspection_expiry": expiries(),
+        "passenger_capacity": Column("int", rng.choice([14, 25, 33], scale.vehicles)),
+        "route_id": _uuid_column("routes", vehicle_routes),
+        "created_at": _timestamps(np.repeat(created, scale.vehicles)),
+        "updated_at": _timestamps(np.repeat(created, scale.vehicles)),
+    })
+
+    # Drivers
+    driver_names = [
+        f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]} {i // (len(FIRST_NAMES) * len(LAST_NAMES)) + 1}"
+        for i in range(scale.drivers)
+    ]
+    tables["drivers"] = Table("drivers", {
+        "id": _ids("drivers", scale.drivers),
+        "name": Column.text(driver_names),
+        "license_no": Column.text([f"DL{i:07d}" for i in range(scale.drivers)]),
+        "phone": Column.text([f"+2547{i:08d}" for i in range(scale.drivers)]),
+        "status": Column.categories(["active", "inactive"], (rng.random(scale.drivers) < 0.1).astype(np.int32)),
+        "experience": Column.categories(["1 year", "3 years", "5 years", "10 years"], rng.integers(0, 4, scale.drivers)),
+        "rating": Column("float", rng.uniform(3, 5, scale.drivers).round(1)),
+        "photo_url": Column.text([None] * scale.drivers),
+        "created_at": _timestamps(np.repeat(created, scale.drivers)),
+        "updated_at": _timestamps(np.repeat(created, scale.drivers)),
+    })
+
+    # Trips, stored in (collection_time, id) order like a clustered index
+    collection_time = np.sort(rng.integers(start_seconds, end_seconds, scale.trips))
+    trip_vehicles = rng.integers(0, scale.vehicles, scale.trips)
+    # Most trips are driven by the vehicle's regular driver
+    regular_driver = rng.integers(0, scale.drivers, scale.vehicles)
+    trip_drivers = np.where(
+        rng.random(scale.trips) < 0.8,
+        regular_driver[trip_vehicles],
+        rng.integers(0, scale.drivers, scale.trips)
+    )
+    trip_routes = vehicle_routes[trip_vehicles]
+    passengers = rng.integers(5, 15, scale.trips)
+    expected = fares[trip_routes] * 14
+    collected = (fares[trip_routes] * passengers).round()
+    fuel = np.where(rng.random(scale.trips) < 0.3, rng.integers(500, 3000, scale.trips), 0).astype(np.float64)
+    repair = np.where(rng.random(scale.trips) < 0.02, rng.integers(1000, 20000, scale.trips), 0).astype(np.float64)
+    other = np.where(rng.random(scale.trips) < 0.1, rng.integers(100, 1000, scale.trips), 0).astype(np.float64)
+    route_labels = Column.text(route_names)
+    tables["trips"] = Table("trips", {
+        "id": _ids("trips", scale.trips),
+        "vehicle_id": _uuid_column("vehicles", trip_vehicles),
+        "driver_id": _uuid_column("drivers", trip_drivers),
+        "route_id": _uuid_column("routes", trip_routes),
+        "route_name": Column.categories(route_labels.labels, trip_routes),
+        "route": Column.categories(route_labels.labels, trip_routes),
+        "collection_time": _timestamps(collection_time),
+        "start_time": _timestamps(collection_time),
+        "collected_amount": Column("int", collected.astype(np.int64)),
+        "expected_amount": Column("float", expected),
+        "fuel_expense": Column("float", fuel),
+        "repair_expense": Column("float", repair),
+        "other_expense": Column("float", other),
+        "status": Column.categories(["completed", "cancelled", "in_progress"], rng.choice(3, scale.trips, p=[0.97, 0.02, 0.01])),
+        "notes": Column.text([None]),
+        "created_by": Column.text([BENCH_USER_ID]),
+        "created_at": _timestamps(collection_time),
+        "updated_at": _timestamps(collection_time),
+    }, sort_keys=("collection_time", "id"))
+    # Constant columns share one stored value
+    for name in ("notes", "created_by"):
+        column = tables["trips"].columns[name]
+        column.data = np.full(scale.trips, column.data[0], dtype=np.int32)
+
+    # Deficits
+    deficit_count = max(50, scale.trips // 500)
+    deficit_trips = rng.integers(0, scale.trips, deficit_count) if scale.trips else np.zeros(deficit_count, dtype=np.int64)
+    tables["deficits"] = Table("deficits", {
+        "id": _ids("deficits", deficit_count),
+        "driver": _uuid_column("drivers", trip_drivers[deficit_trips] if scale.trips else rng.integers(0, scale.drivers, deficit_count)),
+        "vehicle": _uuid_column("vehicles", trip_vehicles[deficit_trips] if scale.trips else rng.integers(0, scale.vehicles, deficit_count)),
+        "amount": Column("int", rng.integers(100, 3000, deficit_count)),
+        "deficit_type": Column.categories(["deficit", "repayment"], (rng.random(deficit_count) < 0.4).astype(np.int32)),
+        "notes": Column.text([None] * deficit_count),
+        "created_at": _timestamps(np.sort(rng.integers(start_seconds, end_seconds, deficit_count))),
+    })
+
+    # Latest positions, 20 per driver
+    location_count = scale.drivers * 20
+    tables["locations"] = Table("locations", {
+        "id": _ids("locations", location_count),
+        "driver_id": _uuid_column("drivers", np.repeat(np.arange(scale.drivers), 20)),
+        "latitude": Column("float", rng.uniform(-1.45, -1.1, location_count).round(6)),
+        "longitude": Column("float", rng.uniform(36.6, 37.1, location_count).round(6)),
+        "timestamp": _timestamps(end_seconds - rng.integers(60, 86400, location_count)),
+    })
+
+    # Daily summaries, one per vehicle and day with trips
+    trip_days = collection_time // 86400
+    pair = trip_vehicles.astype(np.int64) * (today_day + 1) + trip_days
+    pairs, first, inverse = np.unique(pair, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    summary_count = pairs.size
+    expenses = fuel + repair + other
+
+    def per_summary(values: np.ndarray) -> np.ndarray:
+        return np.bincount(inverse, weights=values, minlength=summary_count)
+
+    summary_collected = per_summary(collected)
+    summary_expenses = per_summary(expenses)
+    tables["daily_summaries"] = Table("daily_summaries", {
+        "id": _ids("daily_summaries", summary_count),
+        "vehicle_id": _uuid_column("vehicles", pairs // (today_day + 1)),
+        "driver_id": _uuid_column("drivers", trip_drivers[first]),
+        "date": _dates(pairs % (today_day + 1)),
+        "trip_count": Column("int", np.bincount(inverse, minlength=summary_count)),
+        "total_passengers": Column("int", per_summary(passengers).astype(np.int64)),
+        "total_expected_amount": Column("float", per_summary(expected)),
+        "total_collected_amount": Column("float", summary_collected),
+        "total_expenses": Column("float", summary_expenses),
+        "net_profit": Column("float", summary_collected - summary_expenses),
+        "created_at": _timestamps(collection_time[first]),
+        "updated_at": _timestamps(collection_time[first]),
+    })
+
+    # Operations, one per vehicle and day with trips, collections split at noon
+    morning = (collection_time % 86400) < 12 * 3600
+    tables["operations"] = Table("operations", {
+        "id": _ids("operations", summary_count),
+        "date": _dates(pairs % (today_day + 1)),
+        "vehicle_id": _uuid_column("vehicles", pairs // (today_day + 1)),
+        "driver_id": _uuid_column("drivers", trip_drivers[first]),
+        "morning_collection": Column("float", per_summary(np.where(morning, collected, 0))),
+        "evening_collection": Column("float", per_summary(np.where(morning, 0, collected))),
+        "fuel_expense": Column("float", per_summary(fuel)),
+        "repair_expense": Column("float", per_summary(repair)),
+        "notes": Column.text([None] * summary_count),
+        "created_by": Column.text([BENCH_USER_ID] * summary_count),
+        "created_at": _timestamps(collection_time[first]),
+        "updated_at": _timestamps(collection_time[first]),
+    })
+
+    # The user the benchmark signs in as
+    tables["users"] = Table("users", {
+        "id": Column("uuid", np.array([1], dtype=np.int64), prefix=ID_PREFIXES["users"]),
+        "email": Column.text(["bench@example.com"]),
+        "full_name": Column.text(["Benchmark User"]),
+        "role": Column.text(["admin"]),
+        "phone": Column.text([None]),
+        "created_at": _timestamps(created),
+        "updated_at": _timestamps(created),
+    })
+
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vehicles", type=int, default=FleetScale.vehicles)
+    parser.add_argument("--drivers", type=int, default=FleetScale.drivers)
+    parser.add_argument("--trips", type=int, default=FleetScale.trips)
+    parser.add_argument("--days", type=int, default=FleetScale.days)
+    parser.add_argument("--seed", type=int, default=FleetScale.seed)
+    args = parser.parse_args()
+
+    scale = FleetScale(args.vehicles, args.drivers, args.trips, args.days, args.seed)
+    start = time.perf_counter()
+    tables = generate_fleet(scale)
+    elapsed = time.perf_counter() - start
+
+    print(f"Generated in {elapsed:.2f}s")
+    for name, table in tables.items():
+        size = sum(column.data.nbytes for column in table.columns.values())
+        print(f"  {name:<16} {table.size:>10,} rows  {size / 1024 / 1024:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
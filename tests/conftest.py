@@ -0,0 +1,61 @@
+import os
+import tempfile
+from datetime import timedelta
+
+import pytest
+
+from benchmarks.endpoints import DUMMY_KEY
+from benchmarks.fleet_data import BENCH_USER_ID
+from tests.support import MemoryDB, start_fake_postgrest
+
+# Settings are read when app modules are imported, so this runs first
+os.environ["SUPABASE_URL"] = start_fake_postgrest()
+os.environ["SUPABASE_KEY"] = DUMMY_KEY
+os.environ["DB_HTTP2"] = "false"
+os.environ["ROLLUP_REFRESH_INTERVAL"] = "0"
+os.environ["REPORT_CACHE_MAX_BYTES"] = "0"
+os.environ["PROJECTION_GUARD"] = "true"
+os.environ["LOG_FILE"] = os.path.join(tempfile.mkdtemp(prefix="mat-app-tests-"), "app.log")
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    # One event loop for the session: the app's pooled database client is bound to it
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def client():
+    """API client authenticated as the fleet's admin user"""
+    import httpx
+    from app.core.security import create_access_token
+    from app.main import app
+
+    token = create_access_token({"sub": BENCH_USER_ID, "role": "admin"}, expires_delta=timedelta(hours=1))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", headers={"Authorization": f"Bearer {token}"}) as client:
+        yield client
+
+
+@pytest.fixture(scope="session", autouse=True)
+def stop_pdf_workers():
+    yield
+    from app.services import pdf
+    pdf.shutdown_pool()
+
+
+@pytest.fixture
+def memory_db(mocker):
+    """A MemoryDB in place of the Supabase client for the rollup and paging code"""
+    from app.core import projection, watermark
+    from app.services import rollups
+
+    database = MemoryDB()
+    for module in (projection, watermark, rollups):
+        mocker.patch.object(module, "db", database)
+    # Columns discovered on the real tables would not match the memory ones
+    mocker.patch.dict(projection._table_columns, clear=True)
+    mocker.patch.dict(projection._empty_until, clear=True)
+    mocker.patch.dict(watermark._projections, clear=True)
+    mocker.patch.object(rollups.ROLLUP_COLUMNS, "_select", None)
+    return database
@@ -0,0 +1,151 @@
+"""
+Test doubles for the database.
+
+`start_fake_postgrest()` serves a small generated fleet through the
+benchmark's PostgREST stand-in, which honours `select`, for tests that run
+whole handlers. `MemoryDB` is an in-process stand-in for the Supabase
+client with the builder calls the services use, for tests that edit rows
+between calls.
+"""
+import queue
+import threading
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.fake_postgrest import serve
+from benchmarks.fleet_data import FleetScale
+
+# Fleet served to the handler tests
+SCALE = FleetScale(vehicles=6, drivers=8, trips=800, days=90, seed=7)
+
+
+def start_fake_postgrest(scale: FleetScale = SCALE) -> str:
+    """Serve `scale` from a daemon thread and return its URL"""
+    ready: "queue.Queue[int]" = queue.Queue()
+    threading.Thread(target=serve, args=(scale, 0.0, 0, ready), daemon=True).start()
+    return f"http://127.0.0.1:{ready.get(timeout=120)}"
+
+
+def _split(text: str) -> List[str]:
+    """Top-level comma-separated terms of a PostgREST logic filter"""
+    terms, depth, current = [], 0, ""
+    for ch in text:
+        if ch == "," and depth == 0:
+            terms.append(current)
+            current = ""
+            continue
+        depth += ch == "("
+        depth -= ch == ")"
+        current += ch
+    terms.append(current)
+    return terms
+
+
+def _literal(raw: str, like: Any) -> Any:
+    if raw.startswith('"') and raw.endswith('"'):
+        raw = raw[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return type(like)(raw)
+
+
+def _term(term: str) -> Callable[[Dict[str, Any]], bool]:
+    """Row test for one term of an or=(...) filter, e.g. `collection_time.gt.X` or `and(...)`"""
+    if term.startswith("and("):
+        tests = [_term(part) for part in _split(term[4:-1])]
+        return lambda row: all(test(row) for test in tests)
+
+    column, rest = term.split(".", 1)
+    if rest == "is.null":
+        return lambda row: row.get(column) is None
+    if rest == "not.is.null":
+        return lambda row: row.get(column) is not None
+
+    operator, raw = rest.split(".", 1)
+    compare = {"eq": lambda a, b: a == b, "gt": lambda a, b: a > b, "lt": lambda a, b: a < b}[operator]
+    return lambda row: row.get(column) is not None and compare(row[column], _literal(raw, row[column]))
+
+
+class MemoryQuery:
+    """A select builder over a list of row dicts"""
+    def __init__(self, rows: List[Dict[str, Any]], columns: str, count: Any, head: bool):
+        self._rows = rows
+        self._columns = columns
+        self._count = count
+        self._head = head
+        self._tests: List[Callable[[Dict[str, Any]], bool]] = []
+        self._orders: List[tuple] = []
+        self._limit: Optional[int] = None
+
+    def _where(self, test: Callable[[Dict[str, Any]], bool]) -> "MemoryQuery":
+        self._tests.append(test)
+        return self
+
+    def _compare(self, column: str, value: Any, compare: Callable[[Any, Any], bool]) -> "MemoryQuery":
+        return self._where(lambda row: row.get(column) is not None and compare(row[column], value))
+
+    def eq(self, column: str, value: Any) -> "MemoryQuery":
+        return self._where(lambda row: row.get(column) == value)
+
+    def gt(self, column: str, value: Any) -> "MemoryQuery":
+        return self._compare(column, value, lambda a, b: a > b)
+
+    def gte(self, column: str, value: Any) -> "MemoryQuery":
+        return self._compare(column, value, lambda a, b: a >= b)
+
+    def lt(self, column: str, value: Any) -> "MemoryQuery":
+        return self._compare(column, value, lambda a, b: a < b)
+
+    def lte(self, column: str, value: Any) -> "MemoryQuery":
+        return self._compare(column, value, lambda a, b: a <= b)
+
+    def in_(self, column: str, values: List[Any]) -> "MemoryQuery":
+        values = set(values)
+        return self._where(lambda row: row.get(column) in values)
+
+    def filter(self, column: str, operator: str, value: Any) -> "MemoryQuery":
+        return getattr(self, operator)(column, value)
+
+    def or_(self, filters: str) -> "MemoryQuery":
+        tests = [_term(term) for term in _split(filters)]
+        return self._where(lambda row: any(test(row) for test in tests))
+
+    def order(self, column: str, desc: bool = False, nullsfirst: Optional[bool] = None) -> "MemoryQuery":
+        # PostgreSQL's default puts NULLs last ascending and first descending
+        self._orders.append((column, desc, desc if nullsfirst is None else nullsfirst))
+        return self
+
+    def limit(self, size: int) -> "MemoryQuery":
+        self._limit = size
+        return self
+
+    async def execute(self) -> SimpleNamespace:
+        rows = [row for row in self._rows if all(test(row) for test in self._tests)]
+        for column, desc, nulls_first in reversed(self._orders):
+            present = sorted((row for row in rows if row.get(column) is not None), key=lambda row: row[column], reverse=desc)
+            missing = [row for row in rows if row.get(column) is None]
+            rows = missing + present if nulls_first else present + missing
+        count = len(rows) if self._count else None
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        if self._head:
+            rows = []
+        elif self._columns != "*":
+            columns = self._columns.split(",")
+            rows = [{column: row.get(column) for column in columns} for row in rows]
+        return SimpleNamespace(data=[dict(row) for row in rows], count=count)
+
+
+class MemoryTable:
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+
+    def select(self, columns: str = "*", count: Any = None, head: bool = False) -> MemoryQuery:
+        return MemoryQuery(self.rows, columns, count, head)
+
+
+class MemoryDB:
+    """Stand-in for `app.core.db.db`; tests edit `tables` directly to play other writers"""
+    def __init__(self, **tables: List[Dict[str, Any]]):
+        self.tables = {name: list(rows) for name, rows in tables.items()}
+
+    def table(self, name: str) -> MemoryTable:
+        return MemoryTable(self.tables.setdefault(name, []))
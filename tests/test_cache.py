@@ -0,0 +1,206 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import RevalidatingCache, TTLCache
+from app.services.report_cache import ReportCache, report_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(mocker):
+    # Replaces the module's `time` rather than time.monotonic, which the event loop reads too
+    clock = Clock()
+    mocker.patch.object(cache_module, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+class Counter:
+    """A compute function that records its calls and can be made to fail or wait"""
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.release = None
+
+    async def __call__(self):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        return self.calls
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_ttl_cache_expires_and_evicts(clock):
+    cache = TTLCache("test-ttl", maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.evictions == 1
+
+    clock.now += 11
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.anyio
+class TestRevalidatingCache:
+    async def test_fresh_entry_is_served_without_computing(self, clock):
+        cache = RevalidatingCache("test-fresh", maxsize=4, fresh_for=10, stale_for=50)
+        compute = Counter()
+
+        assert await cache.get("k", compute, version=1) == 1
+        clock.now += 5
+        assert await cache.get("k", compute, version=1) == 1
+        assert compute.calls == 1
+        assert cache.hits == 1
+
+    @pytest.mark.parametrize("age,version", [(20, 1), (5, 2)])
+    async def test_stale_entry_is_served_then_refreshed(self, clock, age, version):
+        cache = RevalidatingCache("test-stale", maxsize=4, fresh_for=10, stale_for=50)
+        compute = Counter()
+        await cache.get("k", compute, version=1)
+
+        clock.now += age
+        assert await cache.get("k", compute, version=version) == 1
+        await settle()
+        assert compute.calls == 2
+        assert await cache.get("k", compute, version=version) == 2
+        assert cache.stale_hits == 1
+        assert cache.refreshes == 1
+
+    async def test_expired_entry_is_recomputed_before_returning(self, clock):
+        cache = RevalidatingCache("test-expired", maxsize=4, fresh_for=10, stale_for=50)
+        compute = Counter()
+        await cache.get("k", compute)
+
+        clock.now += 61
+        assert await cache.get("k", compute) == 2
+        assert cache.misses == 2
+
+    async def test_concurrent_misses_share_one_computation(self, clock):
+        cache = RevalidatingCache("test-shared", maxsize=4, fresh_for=10, stale_for=50)
+        compute = Counter()
+        compute.release = asyncio.Event()
+
+        waiting = [asyncio.ensure_future(cache.get("k", compute)) for _ in range(5)]
+        await settle()
+        compute.release.set()
+
+        assert await asyncio.gather(*waiting) == [1] * 5
+        assert compute.calls == 1
+
+    async def test_failed_refresh_keeps_the_stale_value(self, clock):
+        cache = RevalidatingCache("test-failed", maxsize=4, fresh_for=10, stale_for=50)
+        compute = Counter()
+        await cache.get("k", compute)
+
+        compute.fail = True
+        clock.now += 20
+        assert await cache.get("k", compute) == 1
+        await settle()
+        assert cache.errors == 1
+        assert await cache.get("k", compute) == 1
+
+    async def test_failed_miss_raises_to_the_caller(self, clock):
+        cache = RevalidatingCache("test-raises", maxsize=4, fresh_for=10, stale_for=50)
+        compute = Counter()
+        compute.fail = True
+
+        with pytest.raises(RuntimeError):
+            await cache.get("k", compute)
+        assert len(cache) == 0
+
+    async def test_least_recently_used_entry_is_evicted(self, clock):
+        cache = RevalidatingCache("test-evict", maxsize=2, fresh_for=10, stale_for=50)
+        for key in ("a", "b", "a", "c"):
+            await cache.get(key, Counter())
+
+        assert len(cache) == 2
+        assert cache.evictions == 1
+        assert cache.stats()["hits"] == 1
+
+
+def test_report_cache_round_trip_and_eviction(tmp_path):
+    reports = ReportCache(str(tmp_path), max_bytes=25)
+    reports.put("a", "a.pdf", "application/pdf", b"x" * 10)
+    reports.put("b", "b.pdf", "application/pdf", b"y" * 10)
+    os.utime(tmp_path / "a.bin", (1, 1))
+
+    cached = reports.get("b")
+    assert cached.read() == b"y" * 10
+    assert (cached.filename, cached.media_type) == ("b.pdf", "application/pdf")
+
+    # The oldest document goes when a third one does not fit
+    reports.put("c", "c.pdf", "application/pdf", b"z" * 10)
+    assert reports.get("a") is None
+    assert reports.get("c").read() == b"z" * 10
+    assert reports.evictions == 1
+
+
+def test_report_cache_writer_commits_or_discards(tmp_path):
+    reports = ReportCache(str(tmp_path), max_bytes=25)
+
+    writer = reports.open_writer("a", "a.html", "text/html")
+    writer.write(b"<p>")
+    assert reports.get("a") is None
+    writer.write(b"</p>")
+    writer.commit()
+    assert reports.get("a").read() == b"<p></p>"
+
+    oversized = reports.open_writer("b", "b.html", "text/html")
+    oversized.write(b"x" * 30)
+    oversized.commit()
+    assert reports.get("b") is None
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
+
+
+def test_report_key_depends_on_every_part():
+    key = report_key("report.html", {"driver": "d1"}, "fingerprint")
+
+    assert key == report_key("report.html", {"driver": "d1"}, "fingerprint")
+    assert key != report_key("other.html", {"driver": "d1"}, "fingerprint")
+    assert key != report_key("report.html", {"driver": "d2"}, "fingerprint")
+    assert key != report_key("report.html", {"driver": "d1"}, "changed")
+
+
+@pytest.mark.anyio
+async def test_report_cache_key_is_skipped_while_the_cache_is_off(mocker):
+    from app.api import reports
+
+    watermark = mocker.patch.object(reports, "table_watermark")
+    mocker.patch.object(reports.report_cache, "max_bytes", 0)
+
+    assert await reports.report_cache_key("driver_report.html", None, None, "pdf", driver_ids=["d1"]) is None
+    watermark.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_report_cache_key_falls_back_to_uncached_when_reads_fail(mocker):
+    from app.api import reports
+
+    async def unavailable(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    mocker.patch.object(reports, "table_watermark", side_effect=unavailable)
+    mocker.patch.object(reports.report_cache, "max_bytes", 1 << 20)
+
+    assert await reports.report_cache_key("driver_report.html", None, None, "pdf", driver_ids=["d1"]) is None
@@ -0,0 +1,122 @@
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.core.day_index import DayIndex
+
+START = date(2026, 1, 1)
+KEYS = ["fleet", "a", "b"]
+
+
+@pytest.fixture
+def points():
+    rng = random.Random(3)
+    values = {}
+    for _ in range(200):
+        key = (rng.choice(KEYS), START + timedelta(days=rng.randrange(120)))
+        values[key] = [float(rng.randrange(1, 5)), float(rng.randrange(100))]
+    return values
+
+
+def brute_total(points, key, start, end):
+    total = np.zeros(2)
+    for (point_key, day), values in points.items():
+        if point_key == key and (start is None or day >= start) and (end is None or day <= end):
+            total += values
+    return total
+
+
+def test_range_totals_match_brute_force(points):
+    index = DayIndex(2)
+    index.build(points)
+
+    rng = random.Random(5)
+    for _ in range(100):
+        start = START + timedelta(days=rng.randrange(-10, 130))
+        end = start + timedelta(days=rng.randrange(0, 60))
+        totals = index.totals(KEYS, start, end)
+        for row, key in enumerate(KEYS):
+            assert totals[row] == pytest.approx(brute_total(points, key, start, end))
+
+    open_ended = index.totals(["a"], START + timedelta(days=30), None)
+    assert open_ended[0] == pytest.approx(brute_total(points, "a", START + timedelta(days=30), None))
+
+
+def test_period_totals_of_several_periods(points):
+    index = DayIndex(2)
+    index.build(points)
+    periods = [(START, START + timedelta(days=29)), (START + timedelta(days=30), START + timedelta(days=59)), (None, None)]
+
+    result = index.period_totals(["b", "unknown"], periods)
+    assert result.shape == (3, 2, 2)
+    for period, (start, end) in enumerate(periods):
+        assert result[period, 0] == pytest.approx(brute_total(points, "b", start, end))
+        assert not result[period, 1].any()
+
+
+def test_series_and_point(points):
+    index = DayIndex(2)
+    index.build(points)
+
+    series = index.series("fleet", START - timedelta(days=2), START + timedelta(days=10))
+    for offset, values in enumerate(series):
+        day = START - timedelta(days=2) + timedelta(days=offset)
+        expected = points.get(("fleet", day), [0.0, 0.0])
+        assert values == pytest.approx(expected)
+        assert index.point("fleet", day) == pytest.approx(expected)
+
+
+def test_add_widens_the_span_both_ways(points):
+    index = DayIndex(2)
+    index.build(points)
+
+    before = START - timedelta(days=400)
+    after = START + timedelta(days=900)
+    index.add("a", before, np.array([1.0, 7.0]))
+    index.add("new", after, np.array([2.0, 3.0]))
+    index.add("a", START + timedelta(days=5), np.array([1.0, 1.0]))
+
+    points = dict(points)
+    points[("a", before)] = [1.0, 7.0]
+    points[("new", after)] = [2.0, 3.0]
+    day = ("a", START + timedelta(days=5))
+    points[day] = list(np.add(points.get(day, [0.0, 0.0]), [1.0, 1.0]))
+
+    for key in KEYS + ["new"]:
+        assert index.totals([key])[0] == pytest.approx(brute_total(points, key, None, None))
+    assert index.point("a", before) == pytest.approx([1.0, 7.0])
+    assert index.totals(["a"], before, START)[0] == pytest.approx(brute_total(points, "a", before, START))
+
+
+def test_empty_index():
+    index = DayIndex(2)
+    index.build({})
+
+    assert not index.totals(["a"], START, START).any()
+    assert index.series("a", START, START + timedelta(days=2)).shape == (3, 2)
+    index.add("a", START, np.array([1.0, 2.0]))
+    assert index.point("a", START) == pytest.approx([1.0, 2.0])
+
+
+def test_random_writes_match_brute_force():
+    index = DayIndex(2)
+    index.build({})
+    points = {}
+
+    # Appends past the allocated room, earlier days and existing days, mixed
+    rng = random.Random(9)
+    for _ in range(500):
+        key = (rng.choice(KEYS), START + timedelta(days=rng.randrange(-50, 300)))
+        values = [1.0, float(rng.randrange(-20, 100))]
+        index.add(key[0], key[1], np.array(values))
+        points[key] = list(np.add(points.get(key, [0.0, 0.0]), values))
+
+    for _ in range(50):
+        start = START + timedelta(days=rng.randrange(-60, 300))
+        end = start + timedelta(days=rng.randrange(0, 90))
+        totals = index.totals(KEYS, start, end)
+        for row, key in enumerate(KEYS):
+            assert totals[row] == pytest.approx(brute_total(points, key, start, end))
+    assert index.stats()["days"] == len(points)
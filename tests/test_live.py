@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+from app.services.live import LiveFeed, LiveFeedFull, Subscription
+
+pytestmark = pytest.mark.anyio
+
+
+class Source:
+    """Cards and version a test feed computes from"""
+    def __init__(self):
+        self.cards = {"revenue": 100, "trips": 4, "fuel": 10}
+        self.version = 1
+        self.calls = 0
+
+    async def compute(self, today):
+        self.calls += 1
+        return dict(self.cards)
+
+    def write(self, **cards):
+        self.cards.update(cards)
+        self.version += 1
+
+
+@pytest.fixture
+def source():
+    return Source()
+
+
+@pytest.fixture
+def feed(source, mocker):
+    mocker.patch("app.services.live.settings.LIVE_UPDATE_DELAY", 0)
+    mocker.patch("app.services.live.settings.LIVE_MAX_CONNECTIONS", 2)
+    return LiveFeed("test", source.compute, lambda: source.version)
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+async def test_subscription_conflates_unread_cards():
+    subscription = Subscription()
+    subscription.offer({"revenue": 1, "trips": 1})
+    subscription.offer({"revenue": 2})
+
+    assert await subscription.next(1) == {"revenue": 2, "trips": 1}
+    assert subscription.conflated == 1
+    assert await subscription.next(0.01) is None
+
+
+async def test_first_read_is_every_card(feed, source):
+    subscription = await feed.subscribe()
+
+    assert await subscription.next(1) == source.cards
+    assert source.calls == 1
+
+
+async def test_notify_offers_only_changed_cards(feed, source):
+    subscription = await feed.subscribe()
+    await subscription.next(1)
+
+    source.write(revenue=150)
+    feed.notify()
+    await settle()
+
+    assert await subscription.next(1) == {"revenue": 150}
+    assert feed.updates == 2
+
+
+async def test_burst_of_writes_is_computed_once(feed, source):
+    subscription = await feed.subscribe()
+    await subscription.next(1)
+
+    for amount in (110, 120, 130):
+        source.write(revenue=amount)
+        feed.notify()
+    await settle()
+
+    assert source.calls == 2
+    assert await subscription.next(1) == {"revenue": 130}
+
+
+async def test_unchanged_data_is_not_recomputed(feed, source):
+    await feed.subscribe()
+    feed.check()
+    await settle()
+
+    assert source.calls == 1
+
+
+async def test_check_notices_changes_made_without_notify(feed, source):
+    subscription = await feed.subscribe()
+    await subscription.next(1)
+
+    source.write(trips=5)
+    feed.check()
+    await settle()
+
+    assert await subscription.next(1) == {"trips": 5}
+
+
+async def test_connections_are_limited(feed):
+    first = await feed.subscribe()
+    await feed.subscribe()
+    with pytest.raises(LiveFeedFull):
+        await feed.subscribe()
+
+    feed.unsubscribe(first)
+    await feed.subscribe()
+    assert feed.stats()["connections"] == 2
+
+
+async def test_nothing_is_computed_without_subscribers(feed, source):
+    subscription = await feed.subscribe()
+    feed.unsubscribe(subscription)
+
+    source.write(revenue=1)
+    feed.notify()
+    await settle()
+    assert source.calls == 1
+
+    # The next subscriber computes on arrival
+    subscription = await feed.subscribe()
+    assert (await subscription.next(1))["revenue"] == 1
+    assert source.calls == 2
+
+
+async def test_failed_update_is_counted(feed, source, mocker):
+    await feed.subscribe()
+    mocker.patch.object(feed, "compute", side_effect=RuntimeError("database unavailable"))
+
+    source.write(revenue=1)
+    feed.notify()
+    await settle()
+
+    assert feed.errors == 1
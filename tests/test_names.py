@@ -0,0 +1,27 @@
+import pytest
+
+from app.api import operations
+from app.services import reference
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_operation_names_come_from_the_reference_cache(memory_db, mocker):
+    for module in (operations, reference):
+        mocker.patch.object(module, "db", memory_db)
+    for table in (reference.vehicles, reference.drivers):
+        mocker.patch.object(table, "cache", type(table.cache)(f"test_{table.table}", 10, 60))
+    memory_db.tables.update(
+        operations=[{"id": "o1", "vehicle_id": "v1", "driver_id": "d1"}],
+        vehicles=[{"id": "v1", "reg_no": "KAA 001A"}],
+        drivers=[{"id": "d1", "name": "Achieng"}]
+    )
+    table = mocker.spy(memory_db, "table")
+
+    operation = await operations.get_operation("o1", current_user=None)
+
+    assert (operation["vehicle_reg_no"], operation["driver_name"]) == ("KAA 001A", "Achieng")
+    # Cached now: the next operation reads only the operations table
+    table.reset_mock()
+    await operations.get_operation("o1", current_user=None)
+    assert [call.args[0] for call in table.call_args_list] == ["operations"]
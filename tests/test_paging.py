@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from app.core.paging import decode_cursor, encode_cursor, fetch_page, iter_pages, keyset_filter
+
+pytestmark = pytest.mark.anyio
+
+
+def postgres_order(rows, keys, desc):
+    """Rows in PostgreSQL's default order: NULLs last ascending, first descending"""
+    def sort_key(row):
+        return tuple((1, "") if row[key] is None else (0, row[key]) for key in keys)
+    return sorted(rows, key=sort_key, reverse=desc)
+
+
+def trip_query(memory_db):
+    return memory_db.table("trips").select("id,collection_time")
+
+
+@pytest.fixture
+def trips(memory_db):
+    rng = random.Random(11)
+    rows = memory_db.tables["trips"] = [
+        {"id": f"t{i:03d}", "collection_time": rng.choice([None, "2026-01-01T08:00:00", "2026-01-02T08:00:00", "2026-01-03T08:00:00"])}
+        for i in range(40)
+    ]
+    rng.shuffle(rows)
+    return rows
+
+
+def test_cursor_round_trip():
+    values = ["2026-01-01T08:00:00+00:00", "t1"]
+    assert decode_cursor(encode_cursor(values), ["collection_time", "id"]) == values
+    assert decode_cursor(encode_cursor([None, "t1"]), ["collection_time", "id"]) == [None, "t1"]
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor(["only one"]), encode_cursor({"a": 1})])
+def test_foreign_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, ["collection_time", "id"])
+
+
+def test_keyset_filter_steps_over_nulls():
+    assert keyset_filter(["collection_time", "id"], ["T", "I"]) == (
+        "collection_time.gt.T,collection_time.is.null,"
+        "and(collection_time.eq.T,id.gt.I),and(collection_time.eq.T,id.is.null)"
+    )
+    assert keyset_filter(["collection_time", "id"], [None, "I"], desc=True) == (
+        "collection_time.not.is.null,and(collection_time.is.null,id.lt.I)"
+    )
+
+
+@pytest.mark.parametrize("desc", [False, True])
+async def test_iter_pages_yields_every_row_once_in_order(memory_db, trips, desc):
+    seen = []
+    async for page in iter_pages(lambda: trip_query(memory_db), desc=desc, page_size=7):
+        assert len(page) <= 7
+        seen.extend(row["id"] for row in page)
+
+    assert seen == [row["id"] for row in postgres_order(trips, ("collection_time", "id"), desc)]
+
+
+@pytest.mark.parametrize("desc", [False, True])
+async def test_fetch_page_cursors_walk_the_whole_table(memory_db, trips, desc):
+    seen, cursor = [], None
+    while True:
+        rows, cursor = await fetch_page(lambda: trip_query(memory_db), cursor, 6, desc=desc)
+        seen.extend(row["id"] for row in rows)
+        if cursor is None:
+            break
+
+    assert seen == [row["id"] for row in postgres_order(trips, ("collection_time", "id"), desc)]
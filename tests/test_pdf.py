@@ -0,0 +1,46 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import pdf
+from app.services.pdf import PdfRenderTimeout, render_pdf_job
+
+
+def slow_render(seconds):
+    def render(template_name, context):
+        time.sleep(seconds)
+        return b"%PDF"
+    return render
+
+
+@pytest.mark.skipif(not hasattr(pdf.signal, "setitimer"), reason="needs timer signals")
+def test_worker_stops_its_own_render_at_the_timeout(mocker):
+    mocker.patch.object(pdf, "render_pdf_sync", side_effect=slow_render(5))
+
+    started = time.monotonic()
+    with pytest.raises(PdfRenderTimeout):
+        render_pdf_job("driver_report.html", {}, 0.2)
+    assert time.monotonic() - started < 2
+
+    # The timer is cleared, a render within the timeout completes
+    mocker.patch.object(pdf, "render_pdf_sync", side_effect=slow_render(0.01))
+    assert render_pdf_job("driver_report.html", {}, 0.2) == b"%PDF"
+
+
+@pytest.mark.anyio
+async def test_time_in_the_queue_does_not_count():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        futures = [executor.submit(time.sleep, 0.3) for _ in range(3)]
+        # The last render waits 0.6s for the others, longer than 2 x its timeout
+        await asyncio.gather(*(pdf._await_render(future, 0.25) for future in futures))
+
+
+@pytest.mark.anyio
+async def test_unresponsive_render_times_out():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(time.sleep, 1)
+        with pytest.raises(PdfRenderTimeout):
+            await pdf._await_render(future, 0.1)
+        assert not future.done()
@@ -0,0 +1,70 @@
+"""
+Handlers against rows that hold only the columns their queries select.
+
+The fake PostgREST server honours `select` and PROJECTION_GUARD is on, so a
+handler that reads a trip column it did not project fails with an error
+(UnprojectedFieldError for guarded rows, AttributeError for decoded trip
+records) instead of silently reading a default.
+"""
+from datetime import date
+
+import pytest
+
+from app.core.projection import Projection, UnprojectedFieldError
+from app.services.trip_records import decode_trips
+from benchmarks.endpoints import endpoint_plan
+from tests.support import SCALE
+
+ENDPOINTS = [(name, path, params) for name, path, params, _ in endpoint_plan(SCALE, date.today())]
+
+TOTALS = Projection("trips", "test totals", ["id", "vehicle_id", "collected_amount"])
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("name,path,params", ENDPOINTS, ids=[name for name, _, _ in ENDPOINTS])
+async def test_endpoint_reads_only_projected_columns(client, name, path, params):
+    response = await client.get(path, params=params)
+    assert response.status_code == 200, response.text[:500]
+
+
+def test_projected_row_refuses_unprojected_column(mocker):
+    mocker.patch("app.core.projection.settings.PROJECTION_GUARD", True)
+    row = TOTALS.rows([{"id": "t1", "vehicle_id": "v1", "collected_amount": 10}])[0]
+
+    assert row["collected_amount"] == 10
+    assert row.get("vehicle_id") == "v1"
+    with pytest.raises(UnprojectedFieldError):
+        row.get("fuel_expense", 0)
+    with pytest.raises(UnprojectedFieldError):
+        row["notes"]
+    with pytest.raises(UnprojectedFieldError):
+        "route_text" in row
+
+
+def test_rows_are_plain_without_guard(mocker):
+    mocker.patch("app.core.projection.settings.PROJECTION_GUARD", False)
+    row = TOTALS.rows([{"id": "t1", "vehicle_id": "v1", "collected_amount": 10}])[0]
+    assert row.get("fuel_expense", 0) == 0
+
+
+def test_decoded_trip_lacks_unprojected_fields():
+    trip = decode_trips([{"id": "t1", "vehicle_id": "v1", "collected_amount": "12.5"}], TOTALS)[0]
+
+    assert trip.collected_amount == 12.5
+    with pytest.raises(AttributeError):
+        trip.fuel_expense
+
+
+@pytest.mark.anyio
+async def test_empty_table_is_not_probed_on_every_resolve(memory_db, mocker):
+    probe = mocker.spy(memory_db, "table")
+    projection = Projection("trips", "test optional", ["id"], optional=["updated_at"])
+
+    assert await projection.resolve() == "id"
+    assert await projection.resolve() == "id"
+    assert probe.call_count == 1
+
+    # Once the recheck time has passed and the table has rows, the optional column is found
+    memory_db.tables["trips"] = [{"id": "t1", "updated_at": "2026-01-01T00:00:00"}]
+    mocker.patch.dict("app.core.projection._empty_until", {"trips": 0.0})
+    assert await projection.resolve() == "id,updated_at"
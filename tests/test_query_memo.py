@@ -0,0 +1,49 @@
+import httpx
+import pytest
+
+from app.core import query_memo
+from app.core.query_memo import MemoizingAsyncClient, QueryMemo
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+async def memo_client(sent):
+    def respond(request):
+        sent.append(request.method)
+        return httpx.Response(200, json=[{"id": "t1", "collected_amount": 10}], headers={"Content-Range": "0-0/1"})
+
+    async with MemoizingAsyncClient(base_url="http://db/rest/v1", transport=httpx.MockTransport(respond)) as client:
+        token = query_memo._current.set(QueryMemo())
+        yield client
+        query_memo._current.reset(token)
+
+
+async def test_narrower_read_is_served_from_the_memo(memo_client, sent):
+    await memo_client.get("/trips", params={"select": "id,collected_amount", "vehicle_id": "eq.v1"})
+    response = await memo_client.get("/trips", params={"select": "id", "vehicle_id": "eq.v1"})
+
+    assert response.json() == [{"id": "t1"}]
+    assert sent == ["GET"]
+
+
+async def test_head_count_keeps_the_memo(memo_client, sent):
+    await memo_client.get("/trips", params={"select": "id"})
+    await memo_client.head("/trips", params={"select": "id"}, headers={"Prefer": "count=exact"})
+    await memo_client.get("/trips", params={"select": "id"})
+
+    assert sent == ["GET", "HEAD"]
+
+
+@pytest.mark.parametrize("method", ["POST", "PATCH", "PUT", "DELETE"])
+async def test_write_clears_the_memo(memo_client, sent, method):
+    await memo_client.get("/trips", params={"select": "id"})
+    await memo_client.request(method, "/trips", params={"id": "eq.t1"})
+    await memo_client.get("/trips", params={"select": "id"})
+
+    assert sent == ["GET", method, "GET"]
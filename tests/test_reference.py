@@ -0,0 +1,31 @@
+import pytest
+
+from app.services import reference
+from app.services.reference import ReferenceTable
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def vehicles(memory_db, mocker):
+    mocker.patch.object(reference, "db", memory_db)
+    memory_db.tables["vehicles"] = [{"id": "v1", "reg_no": "KAA 001A"}, {"id": "v2", "reg_no": "KAA 002B"}]
+    # Its own cache name, so the app's vehicles cache stays the registered one
+    table = ReferenceTable("test_vehicles")
+    table.table = "vehicles"
+    return table
+
+
+async def test_readers_cannot_change_cached_rows(memory_db, vehicles):
+    (await vehicles.get("v1"))["reg_no"] = "changed"
+    (await vehicles.get_many(["v1", "v2"]))["v2"].pop("reg_no")
+    for row in await vehicles.all():
+        row["driver_name"] = "enriched"
+
+    # Served from the cache now, the table is not read again
+    memory_db.tables["vehicles"] = []
+    assert await vehicles.get_many(["v1", "v2"]) == {
+        "v1": {"id": "v1", "reg_no": "KAA 001A"},
+        "v2": {"id": "v2", "reg_no": "KAA 002B"}
+    }
+    assert await vehicles.all() == [{"id": "v1", "reg_no": "KAA 001A"}, {"id": "v2", "reg_no": "KAA 002B"}]
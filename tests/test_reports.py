@@ -0,0 +1,26 @@
+import io
+import zipfile
+
+import pytest
+
+from app.api import reports
+from app.api.reports import BundleEntry, ReportDocument, ReportFormat, stream_report_bundle
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_bundle_lists_any_failed_report_in_errors_txt(mocker):
+    async def render(entry, format):
+        if entry.entity_id == "broken":
+            raise RuntimeError("template error")
+        return ReportDocument(entry.filename, "text/html", f"<p>{entry.entity_id}</p>".encode())
+
+    mocker.patch.object(reports, "render_bundle_entry", side_effect=render)
+    entries = [BundleEntry(entity_id, f"{entity_id}.html", "driver_report.html", {}) for entity_id in ("a", "broken", "b")]
+
+    content = b"".join([chunk async for chunk in stream_report_bundle(entries, ReportFormat.HTML)])
+
+    archive = zipfile.ZipFile(io.BytesIO(content))
+    assert archive.testzip() is None
+    assert sorted(archive.namelist()) == ["a.html", "b.html", "errors.txt"]
+    assert archive.read("errors.txt").decode() == "broken.html: RuntimeError: template error\n"
@@ -0,0 +1,179 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+from app.services.rollups import TripRollups
+
+pytestmark = pytest.mark.anyio
+
+TODAY = date.today()
+
+
+def trip(trip_id, days_ago, vehicle_id, driver_id, amount, updated="2026-01-01T00:00:00"):
+    day = TODAY - timedelta(days=days_ago)
+    return {
+        "id": trip_id,
+        "vehicle_id": vehicle_id,
+        "driver_id": driver_id,
+        "collection_time": f"{day.isoformat()}T08:00:00+00:00",
+        "collected_amount": amount,
+        "fuel_expense": amount / 10,
+        "updated_at": updated
+    }
+
+
+@pytest.fixture
+def trips(memory_db):
+    rows = memory_db.tables["trips"] = [
+        trip(f"t{i:03d}", i * 7 % 200, f"v{i % 3}", f"d{i % 4}", 100 + i)
+        for i in range(120)
+    ]
+    return rows
+
+
+def by_vehicle(rows):
+    totals = {}
+    for row in rows:
+        totals[row["vehicle_id"]] = totals.get(row["vehicle_id"], 0) + row["collected_amount"]
+    return totals
+
+
+async def test_backfill_matches_the_table(trips):
+    rollups = TripRollups()
+
+    totals = await rollups.totals()
+    assert totals.trip_count == len(trips)
+    assert totals.collected_amount == sum(row["collected_amount"] for row in trips)
+    assert totals.fuel_expense == pytest.approx(sum(row["fuel_expense"] for row in trips))
+
+    per_vehicle = await rollups.totals_by("vehicle")
+    assert {vehicle_id: t.collected_amount for vehicle_id, t in per_vehicle.items()} == by_vehicle(trips)
+
+    week = await rollups.totals(TODAY - timedelta(days=6), TODAY, driver_ids=["d1"])
+    assert week.trip_count == sum(
+        1 for row in trips
+        if row["driver_id"] == "d1" and row["collection_time"][:10] >= (TODAY - timedelta(days=6)).isoformat()
+    )
+
+
+async def test_record_applies_the_difference_to_the_previous_row(trips):
+    rollups = TripRollups()
+    await rollups.ensure_loaded()
+
+    previous = dict(trips[5])
+    updated = trip(previous["id"], 0, "v9", previous["driver_id"], 1000, updated="2026-01-02T00:00:00")
+    trips[5] = updated
+    rollups.record(updated, previous)
+
+    totals = await rollups.totals()
+    assert totals.trip_count == len(trips)
+    assert totals.collected_amount == sum(row["collected_amount"] for row in trips)
+    per_vehicle = await rollups.totals_by("vehicle")
+    assert {vehicle_id: t.collected_amount for vehicle_id, t in per_vehicle.items()} == by_vehicle(trips)
+    assert (await rollups.totals(TODAY, TODAY, vehicle_ids=["v9"])).active_days == 1
+
+
+async def test_discard_takes_the_deleted_row_out(trips):
+    rollups = TripRollups()
+    await rollups.ensure_loaded()
+
+    deleted = trips.pop(0)
+    rollups.discard(deleted)
+
+    totals = await rollups.totals()
+    assert totals.trip_count == len(trips)
+    assert totals.collected_amount == sum(row["collected_amount"] for row in trips)
+
+
+async def test_creating_a_trip_adds_it(trips):
+    rollups = TripRollups()
+    await rollups.ensure_loaded()
+
+    created = trip("t999", 1, "v0", "d0", 50, updated="2026-01-02T00:00:00")
+    trips.append(created)
+    rollups.record(created)
+
+    assert (await rollups.totals()).collected_amount == sum(row["collected_amount"] for row in trips)
+
+
+async def test_sync_after_local_writes_rescans_nothing(trips):
+    rollups = TripRollups()
+    await rollups.ensure_loaded()
+
+    previous = dict(trips[3])
+    updated = dict(previous, collected_amount=5, updated_at="2026-01-03T00:00:00")
+    trips[3] = updated
+    rollups.record(updated, previous)
+    await rollups.sync()
+
+    assert rollups.stats()["rescanned_days"] == 0
+
+
+async def test_sync_picks_up_other_writers(trips):
+    rollups = TripRollups()
+    await rollups.ensure_loaded()
+
+    # Another worker inserts, edits and deletes trips on days far apart
+    trips.append(trip("t500", 3, "v1", "d1", 70, updated="2026-01-05T00:00:00"))
+    trips[10] = dict(trips[10], collected_amount=1, updated_at="2026-01-05T00:00:01")
+    del trips[40]
+
+    stale = await rollups.totals()
+    assert stale.collected_amount != sum(row["collected_amount"] for row in trips)
+
+    await rollups.sync()
+    totals = await rollups.totals()
+    assert totals.trip_count == len(trips)
+    assert totals.collected_amount == sum(row["collected_amount"] for row in trips)
+    per_vehicle = await rollups.totals_by("vehicle")
+    assert {vehicle_id: t.collected_amount for vehicle_id, t in per_vehicle.items()} == by_vehicle(trips)
+
+    # Only the ranges around the three changed days were read again
+    assert 0 < rollups.stats()["rescanned_days"] <= 3 * 31
+
+
+async def test_sync_of_a_range_leaves_other_days_alone(trips):
+    rollups = TripRollups()
+    await rollups.ensure_loaded()
+
+    trips.append(trip("t501", 150, "v2", "d2", 40, updated="2026-01-06T00:00:00"))
+    await rollups.sync(TODAY - timedelta(days=10), TODAY)
+
+    assert rollups.stats()["rescanned_days"] == 0
+    assert (await rollups.totals()).trip_count == len(trips) - 1
+
+
+async def test_trips_outside_the_window_are_not_rolled_up(trips):
+    trips.append(dict(trip("t600", 0, "v0", "d0", 10), collection_time="2205-01-01T08:00:00+00:00"))
+    rollups = TripRollups()
+
+    totals = await rollups.totals()
+    stats = rollups.stats()
+    assert totals.trip_count == len(trips) - 1
+    assert stats["out_of_window"] == 1
+    # The index spans the window's trips, not two centuries
+    assert stats["day_index"]["days"] < 1000
+
+
+async def test_daily_series_includes_days_without_trips(memory_db):
+    memory_db.tables["trips"] = [trip("a", 2, "v0", "d0", 10), trip("b", 0, "v0", "d0", 5)]
+    rollups = TripRollups()
+
+    series = await rollups.daily(TODAY - timedelta(days=2), TODAY, vehicle_id="v0")
+    assert [(day, totals.collected_amount) for day, totals in series] == [
+        (TODAY - timedelta(days=2), 10.0),
+        (TODAY - timedelta(days=1), 0.0),
+        (TODAY, 5.0)
+    ]
+
+
+async def test_concurrent_readers_catch_up_with_one_sync(trips):
+    rollups = TripRollups()
+    await rollups.ensure_loaded()
+    trips.append(trip("t502", 2, "v0", "d0", 25, updated="2026-01-07T00:00:00"))
+
+    await asyncio.gather(*(rollups.catch_up() for _ in range(5)))
+
+    assert rollups.stats()["checks"] == 1
+    assert (await rollups.totals()).trip_count == len(trips)